@@ -0,0 +1,128 @@
+"""
+Throughput of /claims/verify (or /chatbot/ask) at increasing concurrency, and the latency
+of a cheap REST probe (GET /hospitals) while those LLM-bound requests are in flight.
+
+With the async endpoints the verification/chatbot requests wait on the LLM and Neo4j
+on the event loop instead of each holding one of the server's worker threads, so
+throughput should keep rising with concurrency until the LLM backend saturates, and the
+probe should stay fast instead of queueing behind them.
+
+Run against a running API (uvicorn src.api.main:app). Claims that already have a
+FRAUD/NORMAL status are answered from the stored status, so point --claims at
+unlabelled claims to exercise the engine + LLM explanation. Verdicts are stored and
+reused while the claim data is unchanged, so repeated claims after the first round are
+answered from the stored Verification; use --endpoint chatbot for a pure LLM load.
+
+Usage:
+    python3 benchmarks/bench_async_concurrency.py --base-url http://127.0.0.1:8000 \\
+        --claims C1031 C1032 C1033 --levels 1 4 16 --requests 32
+    python3 benchmarks/bench_async_concurrency.py --endpoint chatbot --requests 8 --levels 1 4
+"""
+import argparse
+import asyncio
+import itertools
+import math
+import statistics
+import time
+
+import httpx
+
+QUESTIONS = [
+    "Berapa jumlah klaim stroke di Santosa Hospital?",
+    "Dokter mana saja yang bekerja di rumah sakit kelas A?",
+    "Berapa rata-rata biaya klaim dengan diagnosis I63.9?",
+]
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of sorted values."""
+    return ordered[max(0, math.ceil(len(ordered) * fraction) - 1)]
+
+
+def describe(timings):
+    ordered = sorted(timings)
+    return (f"mean {statistics.mean(ordered):8.1f} ms | p50 {statistics.median(ordered):8.1f} ms | "
+            f"p95 {percentile(ordered, 0.95):8.1f} ms")
+
+
+async def timed_post(client, path, body, timings, errors):
+    start = time.perf_counter()
+    try:
+        response = await client.post(path, json=body)
+        response.raise_for_status()
+        timings.append((time.perf_counter() - start) * 1000)
+    except Exception as e:
+        errors.append(str(e))
+
+
+async def probe(client, stop, timings):
+    """GET /hospitals every 100 ms until the load finishes."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            response = await client.get("/hospitals")
+            response.raise_for_status()
+            timings.append((time.perf_counter() - start) * 1000)
+        except Exception:
+            pass
+        await asyncio.sleep(0.1)
+
+
+async def run_level(base_url, path, bodies, concurrency, total, timeout):
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        gate = asyncio.Semaphore(concurrency)
+        timings, errors, probe_timings = [], [], []
+        stop = asyncio.Event()
+
+        async def one(body):
+            async with gate:
+                await timed_post(client, path, body, timings, errors)
+
+        prober = asyncio.create_task(probe(client, stop, probe_timings))
+        start = time.perf_counter()
+        await asyncio.gather(*(one(body) for body in itertools.islice(itertools.cycle(bodies), total)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await prober
+    return elapsed, timings, errors, probe_timings
+
+
+async def main_async(args):
+    if args.endpoint == "chatbot":
+        path, bodies = "/chatbot/ask", [{"question": question} for question in QUESTIONS]
+    else:
+        path, bodies = "/claims/verify", [{"claim_id": claim_id, "verdict_only": args.verdict_only} for claim_id in args.claims]
+
+    print(f"🚀 {args.requests} x POST {path} at concurrency {args.levels} against {args.base_url}")
+    baseline = None
+    for concurrency in args.levels:
+        elapsed, timings, errors, probe_timings = await run_level(
+            args.base_url, path, bodies, concurrency, args.requests, args.timeout
+        )
+        throughput = len(timings) / elapsed if elapsed > 0 else 0.0
+        baseline = baseline or throughput
+        print(f"\n📊 concurrency {concurrency}: {len(timings)} ok, {len(errors)} errors in {elapsed:.1f} s "
+              f"-> {throughput:.2f} req/s ({throughput / baseline if baseline else 0:.1f}x concurrency {args.levels[0]})")
+        if timings:
+            print(f"   - {path:<18} {describe(timings)}")
+        if probe_timings:
+            print(f"   - {'GET /hospitals':<18} {describe(probe_timings)}  ({len(probe_timings)} probes during load)")
+        if errors:
+            print(f"   ⚠️  first error: {errors[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoint", choices=["verify", "chatbot"], default="verify")
+    parser.add_argument("--claims", nargs="+", default=["C1031", "C1032", "C1033"], help="Claim IDs to verify")
+    parser.add_argument("--verdict-only", action="store_true", help="Skip the LLM explanation")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16], help="Concurrency levels")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per level")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Per-request timeout in seconds")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
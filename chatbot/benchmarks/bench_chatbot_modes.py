@@ -0,0 +1,72 @@
+"""
+LLM calls per question and end-to-end latency of the chatbot in agent and pipeline mode.
+
+"agent":    the ReAct agent decides every tool call (one LLM turn per step, plus the
+            LLM call inside entity_extraction).
+"pipeline": entity_extraction -> rag_enhanced_search -> pruned schema -> one Cypher
+            generation call -> execute_cypher -> one summary call; the agent only runs
+            when the generated Cypher fails ("pipeline_fallback").
+
+Runs in-process against Neo4j and the LLM endpoint. The answer cache and the query
+exemplars are disabled so every question runs the full workflow.
+
+Usage:
+    python3 benchmarks/bench_chatbot_modes.py --rounds 2
+"""
+import argparse
+import statistics
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.api.chatbot_service import ChatbotService
+
+QUESTIONS = [
+    "Berapa jumlah klaim fraud di RSUP Dr. Hasan Sadikin?",
+    "Which doctors work at Class A hospitals?",
+    "Berapa rata-rata biaya klaim dengan diagnosis stroke?",
+    "List the facilities of Santosa Hospital",
+    "Siapa pasien dengan total biaya klaim tertinggi?",
+]
+
+
+def run_mode(service, mode, rounds):
+    latencies, llm_calls, modes, errors = [], [], {}, 0
+    for _ in range(rounds):
+        for question in QUESTIONS:
+            start = time.perf_counter()
+            result = service.process_question(question, mode=mode)
+            latencies.append((time.perf_counter() - start) * 1000)
+            metadata = result.get("metadata") or {}
+            if result["status"] != "success":
+                errors += 1
+                continue
+            llm_calls.append(metadata.get("llm_calls", 0))
+            modes[metadata.get("mode")] = modes.get(metadata.get("mode"), 0) + 1
+    return latencies, llm_calls, modes, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=1, help="Passes over the question set per mode")
+    args = parser.parse_args()
+
+    service = ChatbotService()
+    service.answer_cache = None
+    service.exemplars = None
+
+    print(f"🚀 {len(QUESTIONS)} questions x {args.rounds} rounds per mode")
+    for mode in ("agent", "pipeline"):
+        latencies, llm_calls, modes, errors = run_mode(service, mode, args.rounds)
+        ordered = sorted(latencies)
+        print(f"\n📊 {mode}")
+        print(f"   - LLM calls/question: mean {statistics.mean(llm_calls) if llm_calls else 0:.2f} | "
+              f"max {max(llm_calls) if llm_calls else 0}")
+        print(f"   - latency:            mean {statistics.mean(ordered):9.1f} ms | "
+              f"p50 {statistics.median(ordered):9.1f} ms | max {ordered[-1]:9.1f} ms")
+        print(f"   - answered by:        {modes} | errors: {errors}")
+
+
+if __name__ == "__main__":
+    main()
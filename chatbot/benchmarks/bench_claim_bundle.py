@@ -0,0 +1,78 @@
+"""
+PROFILE db hits and latency for fetching one claim's verification context.
+
+"golden": the five golden_* queries from ClaimVerificationService (claim data, cost
+          ground truth, diagnosis->procedure relation, doctor specialization, hospital
+          specialties/facilities), one round trip each, placeholders filled in.
+"bundle": HealthcareRepository.get_claim_bundle, one parameterized round trip.
+
+Usage:
+    python3 benchmarks/bench_claim_bundle.py --claims C1001 C1016 C1043
+"""
+import argparse
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.database import get_database
+from chatbot.src.api.repository import CLAIM_BUNDLE_QUERY
+from chatbot.src.api.claim_verification_service import (
+    GOLDEN_CLAIM_DATA_QUERY,
+    GOLDEN_COST_GROUND_TRUTH_QUERY,
+    GOLDEN_DIAGNOSIS_PROCEDURE_RELATION_QUERY,
+    GOLDEN_DOCTOR_SPECIALIZATION_QUERY,
+    GOLDEN_HOSPITAL_CAPABILITY_QUERY,
+)
+
+
+def db_hits(plan) -> int:
+    if not plan:
+        return 0
+    return plan.get("dbHits", 0) + sum(db_hits(child) for child in plan.get("children", []) or [])
+
+
+def profile(session, query, params=None):
+    start = time.perf_counter()
+    summary = session.run(f"PROFILE {query}", params or {}).consume()
+    return db_hits(summary.profile), (time.perf_counter() - start) * 1000
+
+
+def golden_queries(bundle):
+    fill = lambda query: (query
+        .replace("<claim_id>", repr(bundle["claim_id"]))
+        .replace("<diagnosis_id>", repr((bundle["diagnosis"] or {}).get("code")))
+        .replace("<doctor_id>", repr(bundle["doctor_id"]))
+        .replace("<hospital_id>", repr(bundle["hospital_id"])))
+    return [fill(q).strip().rstrip(";") for q in (
+        GOLDEN_CLAIM_DATA_QUERY,
+        GOLDEN_COST_GROUND_TRUTH_QUERY,
+        GOLDEN_DIAGNOSIS_PROCEDURE_RELATION_QUERY,
+        GOLDEN_DOCTOR_SPECIALIZATION_QUERY,
+        GOLDEN_HOSPITAL_CAPABILITY_QUERY,
+    )]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--claims", nargs="+", default=["C1001", "C1016", "C1043"], help="Claim IDs to profile")
+    args = parser.parse_args()
+
+    database = get_database()
+    with database.get_session() as session:
+        for claim_id in args.claims:
+            record = session.run(CLAIM_BUNDLE_QUERY, claim_id=claim_id).single()
+            if record is None:
+                print(f"⚠️  Claim {claim_id} not found, skipping")
+                continue
+
+            golden = [profile(session, query) for query in golden_queries(record.data())]
+            bundle_hits, bundle_ms = profile(session, CLAIM_BUNDLE_QUERY, {"claim_id": claim_id})
+            print(f"📊 {claim_id}")
+            print(f"   - golden x{len(golden)}  db hits {sum(h for h, _ in golden):6d} | {sum(ms for _, ms in golden):7.2f} ms")
+            print(f"   - bundle x1  db hits {bundle_hits:6d} | {bundle_ms:7.2f} ms")
+    database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Planning time for replayed agent queries, with inline literals vs. rewritten parameters.
+
+Each query is run with EXPLAIN so only planning is measured. The query caches are
+cleared before each mode; with inline literals every new claim ID / ICD-10 code is a
+new query text and gets re-planned, while the parameterized text is planned once.
+
+Usage:
+    python3 benchmarks/bench_cypher_parameterization.py --rounds 20
+"""
+import argparse
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.database import get_database
+from chatbot.src.cypher_normalizer import parameterize_cypher
+
+# Query shapes the chatbot and verification agents send, with literal slots
+AGENT_QUERY_TEMPLATES = [
+    "MATCH (c:Claim {{id: '{claim}'}})-[:CODED_AS]->(d:Diagnosis) RETURN c.id, c.total_cost, d.name",
+    "MATCH (d:Diagnosis {{code: '{icd}'}})-[r]->(p:Procedure) RETURN d.name, type(r), p.name, p.avg_cost",
+    "MATCH (h:Hospital {{id: '{hospital}'}})<-[:SUBMITTED_AT]-(c:Claim) WHERE c.total_cost > {cost} RETURN count(c)",
+    "MATCH (c:Claim)-[:SUBMITTED_AT]->(h:Hospital) WHERE h.name CONTAINS '{name}' AND c.status = 'FRAUD' RETURN count(c)",
+]
+
+CLAIMS = [f"C{1001 + i}" for i in range(50)]
+ICD_CODES = ["I21.9", "K35.80", "A90", "I63.9", "J18.9", "E11.9", "N18.5", "O80"]
+HOSPITALS = [f"HOS{i:03d}" for i in range(1, 11)]
+NAMES = ["Hasan Sadikin", "Santosa", "Borromeus", "Advent", "Al Islam"]
+
+
+def replayed_queries(rounds: int):
+    queries = []
+    for i in range(rounds):
+        for template in AGENT_QUERY_TEMPLATES:
+            queries.append(template.format(
+                claim=CLAIMS[i % len(CLAIMS)],
+                icd=ICD_CODES[i % len(ICD_CODES)],
+                hospital=HOSPITALS[i % len(HOSPITALS)],
+                cost=1_000_000 * (i + 1),
+                name=NAMES[i % len(NAMES)],
+            ))
+    return queries
+
+
+def plan_all(session, queries, parameterize: bool):
+    session.run("CALL db.clearQueryCaches()").consume()
+    server_ms = 0
+    start = time.perf_counter()
+    for query in queries:
+        text, params = parameterize_cypher(query) if parameterize else (query, {})
+        summary = session.run(f"EXPLAIN {text}", params).consume()
+        server_ms += summary.result_available_after or 0
+    wall_ms = (time.perf_counter() - start) * 1000
+    return server_ms, wall_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20, help="Replays of the agent query set")
+    args = parser.parse_args()
+
+    queries = replayed_queries(args.rounds)
+    distinct_literal = len(set(queries))
+    distinct_shapes = len({parameterize_cypher(q).text for q in queries})
+    print(f"⏱️  Planning {len(queries)} queries ({distinct_literal} literal texts, {distinct_shapes} parameterized shapes)")
+
+    with get_database().get_session() as session:
+        for label, parameterize in (("inline literals", False), ("parameterized", True)):
+            server_ms, wall_ms = plan_all(session, queries, parameterize)
+            print(f"   - {label:<16} server planning {server_ms:8.1f} ms | wall {wall_ms:8.1f} ms "
+                  f"| {server_ms / len(queries):6.2f} ms/query")
+    get_database().close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Per-call latency of a tool-style Neo4j round trip, before and after the pooled driver.
+
+"before": every call builds a driver, opens a session, runs the query and closes the
+driver (what ExecuteCypherTool / AssessEntityRiskTool used to do).
+"after":  every call borrows a session from the process-wide driver in chatbot.src.database.
+
+Usage:
+    python3 benchmarks/bench_driver_pool.py --calls 200
+"""
+import argparse
+import math
+import statistics
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neo4j import GraphDatabase
+from chatbot.src.config import NEO4J_URI, NEO4J_AUTH
+from chatbot.src.database import get_database
+
+QUERY = "MATCH (h:Hospital) RETURN count(h) AS total"
+
+
+def per_call_driver(calls: int):
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        driver = GraphDatabase.driver(NEO4J_URI, auth=NEO4J_AUTH)
+        try:
+            with driver.session() as session:
+                session.execute_read(lambda tx: list(tx.run(QUERY)))
+        finally:
+            driver.close()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def pooled_driver(calls: int):
+    database = get_database()
+    database.connect()
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        with database.get_session() as session:
+            session.execute_read(lambda tx: list(tx.run(QUERY)))
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(label: str, timings):
+    ordered = sorted(timings)
+    p95 = ordered[max(0, math.ceil(len(ordered) * 0.95) - 1)]  # nearest rank
+    print(f"   - {label:<18} mean {statistics.mean(timings):8.2f} ms | "
+          f"p50 {statistics.median(timings):8.2f} ms | p95 {p95:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100, help="Number of calls per mode")
+    args = parser.parse_args()
+
+    print(f"⏱️  Benchmarking {args.calls} calls against {NEO4J_URI}")
+    summarize("driver per call", per_call_driver(args.calls))
+    summarize("pooled driver", pooled_driver(args.calls))
+    print(f"📊 Pool metrics: {get_database().pool_metrics()}")
+    get_database().close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Latency of /claims/verify-form checks on the in-memory reference snapshot.
+
+The snapshot is built offline from the seed CSVs (same rows the reference queries
+return), and every seed claim is turned into a form with its first primary and
+secondary procedure. Each form is resolved against the snapshot and evaluated by
+the rule engine; nothing touches Neo4j or the LLM.
+
+Usage:
+    python3 benchmarks/bench_form_verification.py --repeat 500
+"""
+import argparse
+import json
+import statistics
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import pandas as pd
+from chatbot.src.reference_data import build_snapshot
+from chatbot.src.api.verification_engine import build_form_context, evaluate_claim
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+
+def snapshot_from_csv():
+    diagnoses = pd.read_csv(os.path.join(DATA_DIR, "medical_ontology", "master_diagnoses.csv"))
+    procedures = pd.read_csv(os.path.join(DATA_DIR, "medical_ontology", "master_procedure.csv"))
+    rules = pd.read_csv(os.path.join(DATA_DIR, "medical_ontology", "knowledge_rules.csv"))
+    doctors = pd.read_csv(os.path.join(DATA_DIR, "actors", "doctors.csv"))
+    hospitals = pd.read_csv(os.path.join(DATA_DIR, "actors", "hospital.csv"))
+
+    return build_snapshot(
+        0,
+        diagnoses=[{
+            "code": row["icd10_code"], "name": row["name"], "avg_cost": float(row["avg_cost"]),
+            "severity": row["severity_level"],
+            "rules": [{"code": r["target_code"], "relationship": r["relationship"]}
+                      for _, r in rules[rules["source_code"] == row["icd10_code"]].iterrows()],
+        } for _, row in diagnoses.iterrows()],
+        procedures=[{"code": row["proc_code"], "name": row["name"], "avg_cost": float(row["avg_cost"])}
+                    for _, row in procedures.iterrows()],
+        doctors=[{"id": row["doctor_id"], "name": row["name"], "specialization": row["specialization"]}
+                 for _, row in doctors.iterrows()],
+        hospitals=[{
+            "id": row["hospital_id"], "name": row["name"], "class": row["class_type"],
+            "specialties": json.loads(row["specialties_json"]), "facilities": json.loads(row["facilities_json"]),
+        } for _, row in hospitals.iterrows()],
+    )
+
+
+def forms_from_csv():
+    claims = pd.read_csv(os.path.join(DATA_DIR, "evidence", "claims_with_resume.csv"))
+    forms = []
+    for _, claim in claims.iterrows():
+        resume = json.loads(claim["medical_resume_json"])
+        resume = resume.get("Medical_Resume", resume)
+        primary = resume.get("Primary_Procedure") or [""]
+        secondary = resume.get("Secondary_Procedures") or [None]
+        forms.append({
+            "hospital_id": claim["hospital_id"],
+            "doctor_id": claim["doctor_id"],
+            "diagnosa_id": claim["diagnosis"],
+            "total_cost": float(claim["total_cost"]),
+            "primary_procedure": primary[0],
+            "secondary_procedure": secondary[0],
+            "diagnosis_text": claim["diagnosis"],
+        })
+    return forms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=500, help="Evaluations per form for timing")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    snapshot = snapshot_from_csv()
+    print(f"📦 Snapshot: {len(snapshot.diagnoses)} diagnoses, {len(snapshot.procedures)} procedures, "
+          f"{len(snapshot.doctors)} doctors, {len(snapshot.hospitals)} hospitals "
+          f"(built in {(time.perf_counter() - start) * 1000:.1f} ms)")
+
+    forms = forms_from_csv()
+    timings = []
+    unresolved = {}
+    for form in forms:
+        began = time.perf_counter()
+        for _ in range(args.repeat):
+            context, missing = build_form_context(snapshot, form)
+            evaluate_claim(context)
+        timings.append((time.perf_counter() - began) * 1000 / args.repeat)
+        for field in missing:
+            unresolved[field] = unresolved.get(field, 0) + 1
+
+    print(f"⏱️  Verified {len(forms)} forms: mean {statistics.mean(timings):.4f} ms | "
+          f"max {max(timings):.4f} ms per form (no database, no LLM)")
+    # Seed secondary procedures are free text the loader also stores as uncodified
+    print(f"🔎 Fields not found in the reference data (treated as uncodified/unknown): {unresolved or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+rag_enhanced_search latency per entity type, with a Neo4jVector built per search
+(the previous behaviour) versus the shared stores from chatbot.src.vector_store.
+
+"rebuild": the store cache is dropped before every search, so each one pays for
+           from_existing_graph (new driver, index check, scan for unembedded nodes).
+"shared":  the stores are created once and reused.
+"async":   the async path (async embeddings + async driver, no Neo4jVector).
+
+For multi-entity questions it also compares embedding every search term with its own
+request (embed_query per term, as before) against the single embed_documents batch
+the tool now sends, and reports the end-to-end tool latency.
+
+For the same questions it compares the per-type searches ("neo4j" backend, one vector
+query per entity type and term) with ENTITY_SEARCH_BACKEND=neo4j_multi, which sends all
+of them in one UNWIND query, on the sync and async paths.
+
+For IDs, codes and full names it compares vector search with the lookup tier
+(chatbot.src.entity_resolver) that resolves them without an embedding, and prints the
+lookup hits per tier.
+
+Repeated terms are answered by the embedding cache after the first round; run with
+EMBEDDING_CACHE_ENABLED=false to time every search against the embedding server. The
+cache's hit rate and saved server calls are printed at the end.
+
+Runs in-process against Neo4j and the embedding endpoint.
+
+Usage:
+    python3 benchmarks/bench_rag_search.py --rounds 10
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.embeddings import embedding_cache_stats, get_embedding_model
+from chatbot.src.entity_resolver import entity_resolver
+from chatbot.src.tool import rag_enhanced_search
+from chatbot.src.tool.rag_enhanced_search import RagEnhancedSearchTool
+from chatbot.src.vector_store import vector_stores
+
+# One entity_extraction output per entity type
+QUERIES = {
+    "diagnosis": {"diagnoses": ["stroke"]},
+    "procedure": {"procedures": ["CT scan kepala"]},
+    "hospital": {"hospitals": ["RSUP Hasan Sadikin"]},
+    "doctor": {"doctors": ["Dr. Budi"]},
+}
+
+# Extraction results with several entity types and terms
+MULTI_ENTITY = [
+    {"hospitals": ["RSUP Hasan Sadikin"], "diagnoses": ["stroke", "hipertensi"], "procedures": ["CT scan kepala"],
+     "doctors": ["Dr. Budi"]},
+    {"hospitals": ["Santosa Hospital", "RS Borromeus"], "diagnoses": ["demam berdarah"], "procedures": ["infus"],
+     "specialties": ["penyakit dalam"]},
+]
+
+# Terms the lookup tier resolves without embeddings
+LOOKUPS = {
+    "hospital id": {"hospitals": ["HOS001"]},
+    "doctor id": {"doctors": ["DOC002"]},
+    "ICD-10 code": {"diagnoses": ["I21.9"]},
+    "full name": {"hospitals": ["RSUP Dr. Hasan Sadikin"]},
+}
+
+
+def entities_json(entities):
+    return json.dumps({"entities": entities, "relationships": [], "keywords": []})
+
+
+def describe(timings):
+    ordered = sorted(timings)
+    return f"mean {statistics.mean(ordered):8.1f} ms | p50 {statistics.median(ordered):8.1f} ms | max {ordered[-1]:8.1f} ms"
+
+
+def time_sync(tool, payload, rounds, rebuild):
+    timings = []
+    for _ in range(rounds):
+        if rebuild:
+            vector_stores.close()
+        start = time.perf_counter()
+        tool._run(payload)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def time_async(tool, payload, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await tool._arun(payload)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=10, help="Searches per entity type and mode")
+    args = parser.parse_args()
+
+    tool = RagEnhancedSearchTool()
+    print(f"🚀 {args.rounds} searches per entity type")
+    for entity_type, entities in QUERIES.items():
+        payload = entities_json(entities)
+        rebuild = time_sync(tool, payload, args.rounds, rebuild=True)
+        vector_stores.get(entity_type)
+        shared = time_sync(tool, payload, args.rounds, rebuild=False)
+        concurrent = asyncio.run(time_async(tool, payload, args.rounds))
+        print(f"\n📊 {entity_type}")
+        print(f"   - rebuild: {describe(rebuild)}")
+        print(f"   - shared:  {describe(shared)}")
+        print(f"   - async:   {describe(concurrent)}")
+        print(f"   - speedup (rebuild/shared mean): {statistics.mean(rebuild) / statistics.mean(shared):.1f}x")
+
+    model = get_embedding_model()
+    print(f"\n📊 multi-entity questions")
+    for entities in MULTI_ENTITY:
+        terms = tool._unique_terms(term for _, _, terms in tool._search_plan(entities, []) for term in terms)
+        per_term, batched = [], []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            for term in terms:
+                model.embed_query(term)
+            per_term.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            model.embed_documents(terms)
+            batched.append((time.perf_counter() - start) * 1000)
+        end_to_end = time_sync(tool, entities_json(entities), args.rounds, rebuild=False)
+        print(f"   {len(terms)} terms: {', '.join(terms)}")
+        print(f"   - embedding, one request per term: {describe(per_term)}")
+        print(f"   - embedding, one batch:            {describe(batched)}")
+        print(f"   - saving per question:             {statistics.mean(per_term) - statistics.mean(batched):8.1f} ms")
+        print(f"   - tool end to end:                 {describe(end_to_end)}")
+
+    print(f"\n📊 per-type vector queries vs one multi-index query")
+    rag_enhanced_search.ENTITY_RESOLVER_ENABLED = False
+    for entities in MULTI_ENTITY:
+        payload = entities_json(entities)
+        timings = {}
+        for backend in ("neo4j", "neo4j_multi"):
+            rag_enhanced_search.ENTITY_SEARCH_BACKEND = backend
+            timings[backend] = (time_sync(tool, payload, args.rounds, rebuild=False),
+                                asyncio.run(time_async(tool, payload, args.rounds)))
+        rag_enhanced_search.ENTITY_SEARCH_BACKEND = "neo4j"
+        print(f"   {', '.join(term for terms in entities.values() for term in terms)}")
+        print(f"   - per type, sync:  {describe(timings['neo4j'][0])}")
+        print(f"   - per type, async: {describe(timings['neo4j'][1])}")
+        print(f"   - multi, sync:     {describe(timings['neo4j_multi'][0])}")
+        print(f"   - multi, async:    {describe(timings['neo4j_multi'][1])}")
+
+    print(f"\n📊 IDs, codes and names")
+    for label, entities in LOOKUPS.items():
+        payload = entities_json(entities)
+        rag_enhanced_search.ENTITY_RESOLVER_ENABLED = False
+        vector = time_sync(tool, payload, args.rounds, rebuild=False)
+        rag_enhanced_search.ENTITY_RESOLVER_ENABLED = True
+        lookup = time_sync(tool, payload, args.rounds, rebuild=False)
+        print(f"   {label}: {next(iter(entities.values()))[0]}")
+        print(f"   - vector search: {describe(vector)}")
+        print(f"   - lookup tier:   {describe(lookup)}")
+    resolver = entity_resolver.stats()
+    print(f"   - lookups: exact {resolver['exact']} | name {resolver['name']} | trigram {resolver['trigram']} | "
+          f"vector {resolver['vector']} | embeddings avoided {resolver['embeddings_avoided']} | "
+          f"embedding requests avoided {resolver['embedding_requests_avoided']}")
+    vector_stores.close()
+
+    stats = embedding_cache_stats()
+    if stats:
+        print(f"\n📦 embedding cache: hit rate {stats['hit_rate']} | memory hits {stats['memory_hits']} | "
+              f"disk hits {stats['disk_hits']} | misses {stats['misses']} | "
+              f"server calls {stats['server_calls']} | saved calls {stats['saved_calls']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Cost of mapping extracted relations to graph relationship types, old vs. new mapper.
+
+"old": every relation embeds itself plus every relationship name (one embed_documents
+       request of 1 + R texts) and scores them with a Python cosine loop.
+"new": SemanticRelationshipMapper embeds the relationship names once (again only when
+       the relationship types change) into a normalized matrix; each relation embeds only
+       itself and is scored with one matrix-vector product.
+
+Runs offline with a deterministic fake embedding model (vectors derived from a hash of
+the text); --latency-ms adds a simulated server round trip per embedding request.
+
+Usage:
+    python3 benchmarks/bench_relationship_mapper.py --relationships 40 --relations 200
+"""
+import argparse
+import hashlib
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from chatbot.src.tool.rag_enhanced_search import SemanticRelationshipMapper
+
+RELATIONSHIPS = ["WORKS_AT", "HAS_SPECIALTY", "SUBMITTED_AT", "CODED_AS", "REQUIRES", "TREATED_BY",
+                 "HAS_DIAGNOSIS", "HAS_PROCEDURE", "LOCATED_IN", "HAS_FACILITY"]
+RELATIONS = ["works at", "employed by", "specializes in", "submitted to", "diagnosed with",
+             "treated by", "located in", "has facility", "coded with", "requires referral"]
+
+
+class FakeEmbeddings:
+    """Deterministic embeddings with a fixed cost per request."""
+
+    def __init__(self, dim: int, latency_ms: float):
+        self.dim = dim
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        self.texts = 0
+
+    def _vector(self, text: str):
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(self.dim).tolist()
+
+    def embed_documents(self, texts):
+        self.requests += 1
+        self.texts += len(texts)
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def old_map(model, relationships, relation, threshold=0.0):
+    """The mapper before the relationship matrix (names re-embedded for every relation)."""
+    clean = [rel.replace(":", "").replace("_", " ").lower() for rel in relationships]
+    vectors = model.embed_documents([relation] + clean)
+    relation_vector, rel_vectors = vectors[0], vectors[1:]
+    similarities = []
+    for rel, rel_vector in zip(relationships, rel_vectors):
+        dot = sum(a * b for a, b in zip(relation_vector, rel_vector))
+        norm = (sum(a * a for a in relation_vector) ** 0.5) * (sum(b * b for b in rel_vector) ** 0.5)
+        similarity = dot / norm if norm else 0.0
+        if similarity >= threshold:
+            similarities.append((rel, similarity))
+    return [rel for rel, _ in sorted(similarities, key=lambda item: item[1], reverse=True)]
+
+
+def measure(label, model, run, relations):
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    results = [run(relation) for relation in relations]
+    wall_ms = (time.perf_counter() - start) * 1000
+    cpu_ms = (time.process_time() - cpu_start) * 1000
+    print(f"   - {label:<4} wall {wall_ms:9.2f} ms | cpu {cpu_ms:9.2f} ms | "
+          f"{model.requests:>5} requests | {model.texts:>7,} texts embedded")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--relationships", type=int, default=40, help="Relationship types in the graph")
+    parser.add_argument("--relations", type=int, default=200, help="Extracted relations to map")
+    parser.add_argument("--dim", type=int, default=1536, help="Embedding dimension")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated latency per embedding request")
+    args = parser.parse_args()
+
+    relationships = [RELATIONSHIPS[i % len(RELATIONSHIPS)] + ("" if i < len(RELATIONSHIPS) else f"_{i}")
+                     for i in range(args.relationships)]
+    relations = [RELATIONS[i % len(RELATIONS)] for i in range(args.relations)]
+
+    print(f"⏱️  Mapping {args.relations} relations onto {args.relationships} relationship types "
+          f"(dim {args.dim}, {args.latency_ms} ms per request)")
+    old_model = FakeEmbeddings(args.dim, args.latency_ms)
+    old = measure("old", old_model, lambda relation: old_map(old_model, relationships, relation), relations)
+
+    new_model = FakeEmbeddings(args.dim, args.latency_ms)
+    mapper = SemanticRelationshipMapper(new_model)
+    mapper.get_graph_relationships = lambda: relationships
+    new = measure("new", new_model, lambda relation: mapper.map_relationship(relation, threshold=0.0), relations)
+
+    same = sum(a[:3] == b[:3] for a, b in zip(old, new))
+    print(f"   - top-3 matches identical for {same}/{len(relations)} relations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Encoding cost and prompt size of execute_cypher results, old vs. new format.
+
+"old": every record materialized and dumped with json.dumps(indent=2).
+"new": rows streamed under the CYPHER_MAX_ROWS / CYPHER_MAX_BYTES caps and encoded as
+       a column header plus one compact JSON array per row.
+
+Runs offline on synthetic neo4j.Record rows shaped like Claim results. Tokens are counted
+with tiktoken when it is installed, otherwise estimated as characters / 4.
+
+Usage:
+    python3 benchmarks/bench_result_format.py --rows 10000 --repeat 5
+"""
+import argparse
+import json
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neo4j import Record
+from chatbot.src.tool.execute_chyper import collect_rows, format_rows, neo4j_json_serializer
+
+COLUMNS = ["claim_id", "diagnosis", "hospital", "total_cost", "status"]
+
+
+def synthetic_records(count: int):
+    return [
+        Record({
+            "claim_id": f"C{1001 + i}",
+            "diagnosis": "Acute myocardial infarction, unspecified",
+            "hospital": "RSUP Dr. Hasan Sadikin",
+            "total_cost": 15_000_000 + i * 1000,
+            "status": "PENDING",
+        })
+        for i in range(count)
+    ]
+
+
+def count_tokens(text: str) -> int:
+    try:
+        import tiktoken
+        return len(tiktoken.get_encoding("cl100k_base").encode(text))
+    except Exception:
+        return len(text) // 4
+
+
+def old_format(records):
+    return json.dumps([record.data() for record in records], default=neo4j_json_serializer, indent=2)
+
+
+def new_format(records):
+    return format_rows(collect_rows(iter(records), COLUMNS), "table")
+
+
+def measure(label: str, encode, records, repeat: int):
+    start = time.process_time()
+    for _ in range(repeat):
+        output = encode(records)
+    cpu_ms = (time.process_time() - start) * 1000 / repeat
+    print(f"   - {label:<4} cpu {cpu_ms:9.2f} ms | {len(output):>10,} chars | {count_tokens(output):>9,} tokens")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="Rows in the synthetic result")
+    parser.add_argument("--repeat", type=int, default=5, help="Encodings per format")
+    args = parser.parse_args()
+
+    records = synthetic_records(args.rows)
+    print(f"⏱️  Encoding {args.rows:,} rows ({args.repeat} runs each)")
+    measure("old", old_format, records, args.repeat)
+    measure("new", new_format, records, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
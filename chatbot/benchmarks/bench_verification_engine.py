@@ -0,0 +1,99 @@
+"""
+Latency and label agreement of the deterministic claim verification engine.
+
+Claim contexts are built offline from the seed CSVs the same way upsert_initial_data.py
+links them (procedures matched by name, unknown names become uncodified with cost 0),
+with the stored status removed so every claim goes through the rule checks. Labelled
+claims are then compared against the engine verdict.
+
+Usage:
+    python3 benchmarks/bench_verification_engine.py --repeat 200
+"""
+import argparse
+import json
+import statistics
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import pandas as pd
+from chatbot.src.api.verification_engine import evaluate_claim
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+
+def contexts_from_csv():
+    diagnoses = pd.read_csv(os.path.join(DATA_DIR, "medical_ontology", "master_diagnoses.csv")).set_index("icd10_code")
+    procedures = pd.read_csv(os.path.join(DATA_DIR, "medical_ontology", "master_procedure.csv"), dtype={"proc_code": str})
+    rules = pd.read_csv(os.path.join(DATA_DIR, "medical_ontology", "knowledge_rules.csv"), dtype={"target_code": str})
+    doctors = pd.read_csv(os.path.join(DATA_DIR, "actors", "doctors.csv")).set_index("doctor_id")
+    hospitals = pd.read_csv(os.path.join(DATA_DIR, "actors", "hospital.csv")).set_index("hospital_id")
+    claims = pd.read_csv(os.path.join(DATA_DIR, "evidence", "claims_with_resume.csv"))
+
+    by_name = {row["name"].lower(): row for _, row in procedures.iterrows()}
+
+    def procedure(name):
+        row = by_name.get(name.lower())
+        if row is None:
+            return {"code": "UNCODIFIED", "name": name, "avg_cost": 0.0}
+        return {"code": row["proc_code"], "name": row["name"], "avg_cost": float(row["avg_cost"])}
+
+    contexts = []
+    for _, claim in claims.iterrows():
+        resume = json.loads(claim["medical_resume_json"])
+        resume = resume.get("Medical_Resume", resume)
+        diagnosis = diagnoses.loc[claim["diagnosis"]]
+        doctor = doctors.loc[claim["doctor_id"]]
+        hospital = hospitals.loc[claim["hospital_id"]] if claim["hospital_id"] in hospitals.index else None
+        contexts.append((claim["label"] if isinstance(claim["label"], str) else None, {
+            "claim_id": claim["claim_id"],
+            "total_cost": float(claim["total_cost"]),
+            "status": None,
+            "diagnosis": {
+                "code": claim["diagnosis"], "name": diagnosis["name"],
+                "avg_cost": float(diagnosis["avg_cost"]), "severity": diagnosis["severity_level"],
+            },
+            "primary_procedures": [procedure(name) for name in resume.get("Primary_Procedure", [])],
+            "secondary_procedures": [procedure(name) for name in resume.get("Secondary_Procedures", [])],
+            "diagnosis_rules": [
+                {"code": row["target_code"], "relationship": row["relationship"]}
+                for _, row in rules[rules["source_code"] == claim["diagnosis"]].iterrows()
+            ],
+            "doctor": {"id": claim["doctor_id"], "name": doctor["name"], "specialization": doctor["specialization"]},
+            "hospital": None if hospital is None else {
+                "id": claim["hospital_id"], "name": hospital["name"],
+                "specialties": json.loads(hospital["specialties_json"]),
+                "facilities": json.loads(hospital["facilities_json"]),
+            },
+        }))
+    return contexts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="Evaluations per claim for timing")
+    args = parser.parse_args()
+
+    contexts = contexts_from_csv()
+    timings = []
+    agree = labelled = 0
+    for label, context in contexts:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            verdict = evaluate_claim(context)
+        timings.append((time.perf_counter() - start) * 1000 / args.repeat)
+        if label:
+            labelled += 1
+            agree += verdict.validation_result == label
+            if verdict.validation_result != label:
+                failed = [check.name for check in verdict.checks if check.passed is False]
+                print(f"   ⚠️  {context['claim_id']}: label {label}, engine {verdict.validation_result} {failed}")
+
+    print(f"⏱️  Evaluated {len(contexts)} claims: mean {statistics.mean(timings):.4f} ms | "
+          f"max {max(timings):.4f} ms per claim (no database, no LLM)")
+    print(f"📊 Agreement with labelled claims: {agree}/{labelled} ({agree / labelled:.0%})")
+
+
+if __name__ == "__main__":
+    main()
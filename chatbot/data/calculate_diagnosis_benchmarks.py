@@ -2,18 +2,19 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from neo4j import GraphDatabase
 from chatbot.src.config import NEO4J_URI, NEO4J_AUTH
+from chatbot.src.database import get_database
+from chatbot.src.graph_version import bump_graph_version
 
 URI = NEO4J_URI
 AUTH = NEO4J_AUTH
 
 class DiagnosisBenchmarkCalculator:
     def __init__(self, uri, auth):
-        self.driver = GraphDatabase.driver(uri, auth=auth)
+        self.database = get_database(uri, auth)
 
     def close(self):
-        self.driver.close()
+        self.database.close()
 
     def populate_market_benchmarks(self):
         """
@@ -22,7 +23,7 @@ class DiagnosisBenchmarkCalculator:
         """
         print("📊 Calculating real-world market benchmarks from Claims...")
         
-        with self.driver.session() as session:
+        with self.database.get_session() as session:
             # Update diagnosis nodes with calculated stats from actual claims
             result = session.run("""
                 // 1. MATCH all claims with a valid cost
@@ -48,6 +49,8 @@ class DiagnosisBenchmarkCalculator:
             
             if updated_count == 0:
                 print("   ⚠️ Warning: No claims found to calculate benchmarks. Ensure claims are loaded first.")
+            else:
+                bump_graph_version(session, "populate_market_benchmarks")
             
         print("✅ Market benchmark calculation complete!")
 
@@ -76,7 +79,7 @@ class DiagnosisBenchmarkCalculator:
         RETURN count(c) as processed_claims
         """
         
-        with self.driver.session() as session:
+        with self.database.get_session() as session:
             # First check how many eligible claims exist
             count_result = session.run("""
                 MATCH (c:Claim)-[:CODED_AS]->(d:Diagnosis)
@@ -96,6 +99,7 @@ class DiagnosisBenchmarkCalculator:
             processed_claims = result.single()['processed_claims']
             
             print(f"   - Processed {processed_claims} claims with z-scores and outlier status")
+            bump_graph_version(session, "calculate_diagnosis_benchmarks")
             
             # Get summary statistics
             stats_result = session.run("""
@@ -121,7 +125,7 @@ class DiagnosisBenchmarkCalculator:
         """
         print("🔍 Verifying calculation results...")
         
-        with self.driver.session() as session:
+        with self.database.get_session() as session:
             # Sample some results for verification
             sample_result = session.run("""
                 MATCH (c:Claim)-[:CODED_AS]->(d:Diagnosis)
@@ -3,9 +3,10 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from langchain_community.vectorstores import Neo4jVector
-from langchain_openai import OpenAIEmbeddings
-from neo4j import GraphDatabase
 from chatbot.src.config import NEO4J_URI, NEO4J_AUTH
+from chatbot.src.database import get_database
+from chatbot.src.embeddings import get_embedding_model
+from chatbot.src.graph_version import bump_graph_version
 
 URI = NEO4J_URI
 AUTH = NEO4J_AUTH
@@ -14,10 +15,10 @@ def clear_existing_indices():
     """Clear all existing vector indices and embedding properties"""
     print("🧹 Clearing existing vector indices...")
     
-    driver = GraphDatabase.driver(URI, auth=AUTH)
+    database = get_database(URI, AUTH)
     
     try:
-        with driver.session() as session:
+        with database.get_session() as session:
             index_names = [
                 "diagnosis_rules_index",
                 "procedure_concept_index", 
@@ -36,17 +37,14 @@ def clear_existing_indices():
             print("   - Cleared all embedding properties from nodes")
             
     finally:
-        driver.close()
+        database.close()
     
     print("✅ Index clearing complete!")
 
 def create_all_indices():
-    embedding_model = OpenAIEmbeddings(
-        model="text-embedding-qwen3-embedding-4b",
-        openai_api_base="http://127.0.0.1:1234/v1", 
-        openai_api_key="",
-        check_embedding_ctx_length=False
-    )
+    # Through the embedding cache: re-running the setup only embeds texts that changed,
+    # and the API workers find the stored vectors
+    embedding_model = get_embedding_model()
     
     config = [
         ("diagnosis_rules_index", "Diagnosis",    ["name", "code"]),
@@ -68,6 +66,8 @@ def create_all_indices():
             text_node_properties=props,
             embedding_node_property="embedding",
         )
+    with get_database(URI, AUTH).get_session() as session:
+        bump_graph_version(session, "create_all_indices")
     print("✅ All Indices Created!")
 
 if __name__ == "__main__":
@@ -1,10 +1,12 @@
 import pandas as pd
 import json
-from neo4j import GraphDatabase
 import sys
 import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from src.config import NEO4J_URI, NEO4J_AUTH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from chatbot.src.config import NEO4J_URI, NEO4J_AUTH
+from chatbot.src.database import get_database
+from chatbot.src.graph_version import bump_graph_version
+from chatbot.src.verification_store import invalidate_verifications
 
 URI = NEO4J_URI
 AUTH = NEO4J_AUTH
@@ -20,16 +22,29 @@ FILES = {
 
 class BPJSGraphLoader:
     def __init__(self, uri, auth):
-        self.driver = GraphDatabase.driver(uri, auth=auth)
+        self.database = get_database(uri, auth)
 
     def close(self):
-        self.driver.close()
+        self.database.close()
 
     def clear_database(self):
-        with self.driver.session() as session:
+        with self.database.get_session() as session:
             session.run("MATCH (n) DETACH DELETE n")
+            bump_graph_version(session, "clear_database")
             print("🧹 Database cleared.")
 
+    def mark_graph_changed(self, reason):
+        """Bump the graph data version so API caches drop results built on old data."""
+        with self.database.get_session() as session:
+            bump_graph_version(session, reason)
+
+    def invalidate_stored_verifications(self, **entities):
+        """Drop stored claim verdicts that depend on the entities a loader just rewrote."""
+        with self.database.get_session() as session:
+            invalidated = invalidate_verifications(session, **entities)
+        if invalidated:
+            print(f"   - 🗑️  Invalidated {invalidated} stored claim verification(s).")
+
     def create_constraints(self):
         queries = [
             "CREATE CONSTRAINT IF NOT EXISTS FOR (h:Hospital) REQUIRE h.id IS UNIQUE",
@@ -39,7 +54,7 @@ class BPJSGraphLoader:
             "CREATE CONSTRAINT IF NOT EXISTS FOR (c:Claim) REQUIRE c.id IS UNIQUE",
             "CREATE CONSTRAINT IF NOT EXISTS FOR (patient:Patient) REQUIRE patient.name IS UNIQUE"
         ]
-        with self.driver.session() as session:
+        with self.database.get_session() as session:
             for q in queries:
                 session.run(q)
         print("🔒 Constraints created.")
@@ -52,7 +67,7 @@ class BPJSGraphLoader:
         
         # 1. Load Diagnoses
         df_diag = pd.read_csv(FILES["diagnoses"])
-        with self.driver.session() as session:
+        with self.database.get_session() as session:
             for _, row in df_diag.iterrows():
                 session.run("""
                     MERGE (d:Diagnosis {code: $code})
@@ -63,7 +78,7 @@ class BPJSGraphLoader:
 
         # 2. Load Procedures
         df_proc = pd.read_csv(FILES["procedures"])
-        with self.driver.session() as session:
+        with self.database.get_session() as session:
             for _, row in df_proc.iterrows():
                 session.run("""
                     MERGE (p:Procedure {code: $code})
@@ -73,7 +88,7 @@ class BPJSGraphLoader:
 
         # 3. Load Knowledge Rules (Edges)
         df_rules = pd.read_csv(FILES["rules"])
-        with self.driver.session() as session:
+        with self.database.get_session() as session:
             for _, row in df_rules.iterrows():
                 rel_type = row['relationship']
                 # Note: Using F-string for rel_type is safe here because we control the CSV content.
@@ -84,6 +99,11 @@ class BPJSGraphLoader:
                 """
                 session.run(query, d_code=row['source_code'], p_code=row['target_code'])
         
+        self.mark_graph_changed("load_medical_ontology")
+        self.invalidate_stored_verifications(
+            diagnosis_codes=df_diag['icd10_code'].tolist(),
+            procedure_codes=df_proc['proc_code'].tolist(),
+        )
         print(f"   - Loaded {len(df_diag)} Diagnoses, {len(df_proc)} Procedures, {len(df_rules)} Rules.")
 
     def load_infrastructure(self):
@@ -92,7 +112,7 @@ class BPJSGraphLoader:
 
         # 1. Load Hospitals
         df_hos = pd.read_csv(FILES["hospitals"])
-        with self.driver.session() as session:
+        with self.database.get_session() as session:
             for _, row in df_hos.iterrows():
                 # Create Hospital Node
                 session.run("""
@@ -127,7 +147,7 @@ class BPJSGraphLoader:
 
         # 2. Load Doctors
         df_doc = pd.read_csv(FILES["doctors"])
-        with self.driver.session() as session:
+        with self.database.get_session() as session:
             for _, row in df_doc.iterrows():
                 session.run("""
                     MERGE (d:Doctor {id: $id})
@@ -142,6 +162,11 @@ class BPJSGraphLoader:
                     MERGE (d)-[:WORKS_AT]->(h)
                 """, did=row['doctor_id'], hid=row['primary_hospital_id'])
 
+        self.mark_graph_changed("load_infrastructure")
+        self.invalidate_stored_verifications(
+            hospital_ids=df_hos['hospital_id'].tolist(),
+            doctor_ids=df_doc['doctor_id'].tolist(),
+        )
         print(f"   - Loaded {len(df_hos)} Hospitals and {len(df_doc)} Doctors.")
 
     def load_claims_and_resume(self):
@@ -150,7 +175,7 @@ class BPJSGraphLoader:
         
         df_claims = pd.read_csv(FILES["claims"])
         
-        with self.driver.session() as session:
+        with self.database.get_session() as session:
             for _, row in df_claims.iterrows():
                 # 1. Create Basic Claim Node with Label (Status)
                 session.run("""
@@ -262,6 +287,8 @@ class BPJSGraphLoader:
                 except Exception as e:
                     print(f"⚠️ Error parsing JSON for Claim {row['claim_id']}: {e}")
 
+        self.mark_graph_changed("load_claims_and_resume")
+        self.invalidate_stored_verifications(claim_ids=df_claims['claim_id'].tolist())
         print(f"   - Loaded {len(df_claims)} Claims with Full Medical Resume Structure.")
 
 # ---------------- EXECUTION ----------------
@@ -0,0 +1,249 @@
+import sys
+import os
+import json
+import re
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from chatbot.src.api.streaming import Emit, ThinkingSplitter
+from chatbot.src.graph_schema import GRAPH_SCHEMA, graph_schema
+from chatbot.src.tool.schema_linking import prune_schema, schema_labels
+from langchain_core.messages import SystemMessage, HumanMessage
+
+# execute_cypher outputs that mean the generated query did not run
+_FAILED_OUTPUT_PREFIXES = ("Cypher Execution Error", "Cypher Plan Rejected")
+_EMPTY_OUTPUT = "Query executed successfully but returned no results"
+
+_CYPHER_BLOCK = re.compile(r"```(?:cypher)?\s*(.*?)```", flags=re.DOTALL | re.IGNORECASE)
+_CYPHER_START = re.compile(r"\b(MATCH|OPTIONAL MATCH|WITH|UNWIND|CALL|RETURN)\b")
+
+
+class PipelineResult(NamedTuple):
+    raw_answer: str
+    cypher: str
+    llm_calls: int
+    timings_ms: Dict[str, float]
+    rows: str = ""  # execute_cypher output the answer was summarized from
+
+
+class PipelineFallback(Exception):
+    """The pipeline could not answer the question; the agent should take over."""
+
+    def __init__(self, reason: str, llm_calls: int, cypher: Optional[str] = None):
+        super().__init__(reason)
+        self.llm_calls = llm_calls
+        self.cypher = cypher
+
+
+def query_failed(output: str) -> bool:
+    """True if an execute_cypher output is an error or a plan guard rejection."""
+    return output.startswith(_FAILED_OUTPUT_PREFIXES)
+
+
+def extract_cypher(content: str) -> str:
+    """The Cypher query in an LLM response (fenced block, or text from the first clause)."""
+    content = re.sub(r'<think>.*?</think>', '', content, flags=re.DOTALL).strip()
+    block = _CYPHER_BLOCK.search(content)
+    if block:
+        return block.group(1).strip()
+    start = _CYPHER_START.search(content)
+    return content[start.start():].strip() if start else content
+
+
+class ChatbotPipeline:
+    """
+    The chatbot workflow as fixed code instead of agent planning turns:
+    entity_extraction -> rag_enhanced_search -> pruned schema -> one LLM call to write
+    Cypher -> execute_cypher -> one LLM call to summarize the rows.
+
+    Three LLM calls per question (extraction, Cypher, summary). If the generated Cypher
+    fails or is rejected by the plan guard, PipelineFallback is raised so the caller can
+    hand the question to the agent.
+
+    examples are (question, Cypher) pairs answered before, added to the Cypher prompt as
+    few-shot context. run_template() skips extraction and generation altogether for a
+    stored query whose parameters were bound from the question (one LLM call).
+    """
+
+    def __init__(self, model, tools: Dict[str, Any]):
+        self.model = model
+        self.entity_extraction = tools["entity_extraction"]
+        self.rag_search = tools["rag_enhanced_search"]
+        self.execute_cypher = tools["execute_cypher"]
+
+    def run(self, question: str, emit: Optional[Emit] = None,
+            examples: Sequence[Tuple[str, str]] = ()) -> PipelineResult:
+        timings = {}
+        started = time.perf_counter()
+        self._stage(emit, "tool_start", "entity_extraction", question)
+        entities_json = self.entity_extraction._run(question)
+        search_json = self.rag_search._run(entities_json)
+        schema = graph_schema.get().text
+        timings["retrieval"] = self._elapsed(started)
+        self._stage(emit, "tool_end", "rag_enhanced_search", search_json)
+
+        started = time.perf_counter()
+        cypher = extract_cypher(self.model.invoke(self._cypher_messages(question, entities_json, search_json, examples, schema)).content)
+        timings["cypher_generation"] = self._elapsed(started)
+
+        started = time.perf_counter()
+        self._stage(emit, "tool_start", "execute_cypher", cypher)
+        rows = self.execute_cypher._run(cypher)
+        timings["execution"] = self._elapsed(started)
+        self._stage(emit, "tool_end", "execute_cypher", rows)
+        self._check_rows(rows, cypher)
+
+        started = time.perf_counter()
+        raw_answer = self._summarize(self._summary_messages(question, cypher, rows), emit)
+        timings["summary"] = self._elapsed(started)
+        return PipelineResult(raw_answer, cypher, 3, timings, rows)
+
+    def run_template(self, question: str, template: str, params: Dict[str, Any],
+                     emit: Optional[Emit] = None) -> PipelineResult:
+        """
+        Answer with a stored parameterized query: execute_cypher, then the summary call.
+        Raises PipelineFallback if the query fails or finds nothing (no LLM call spent).
+        """
+        timings = {}
+        started = time.perf_counter()
+        self._stage(emit, "tool_start", "execute_cypher", template)
+        rows = self.execute_cypher.execute(template, params)
+        timings["execution"] = self._elapsed(started)
+        self._stage(emit, "tool_end", "execute_cypher", rows)
+        self._check_template_rows(rows, template)
+
+        started = time.perf_counter()
+        raw_answer = self._summarize(self._summary_messages(question, self._with_params(template, params), rows), emit)
+        timings["summary"] = self._elapsed(started)
+        return PipelineResult(raw_answer, template, 1, timings, rows)
+
+    async def arun(self, question: str, examples: Sequence[Tuple[str, str]] = ()) -> PipelineResult:
+        """run() with ainvoke and the tools' async paths."""
+        timings = {}
+        started = time.perf_counter()
+        entities_json = await self.entity_extraction._arun(question)
+        search_json = await self.rag_search._arun(entities_json)
+        schema = (await graph_schema.aget()).text
+        timings["retrieval"] = self._elapsed(started)
+
+        started = time.perf_counter()
+        response = await self.model.ainvoke(self._cypher_messages(question, entities_json, search_json, examples, schema))
+        cypher = extract_cypher(response.content)
+        timings["cypher_generation"] = self._elapsed(started)
+
+        started = time.perf_counter()
+        rows = await self.execute_cypher._arun(cypher)
+        timings["execution"] = self._elapsed(started)
+        self._check_rows(rows, cypher)
+
+        started = time.perf_counter()
+        response = await self.model.ainvoke(self._summary_messages(question, cypher, rows))
+        timings["summary"] = self._elapsed(started)
+        return PipelineResult(response.content, cypher, 3, timings, rows)
+
+    async def arun_template(self, question: str, template: str, params: Dict[str, Any]) -> PipelineResult:
+        """run_template() on the async driver and ainvoke."""
+        timings = {}
+        started = time.perf_counter()
+        rows = await self.execute_cypher.aexecute(template, params)
+        timings["execution"] = self._elapsed(started)
+        self._check_template_rows(rows, template)
+
+        started = time.perf_counter()
+        response = await self.model.ainvoke(self._summary_messages(question, self._with_params(template, params), rows))
+        timings["summary"] = self._elapsed(started)
+        return PipelineResult(response.content, template, 1, timings, rows)
+
+    def _summarize(self, messages: List, emit: Optional[Emit]) -> str:
+        if emit is None:
+            return self.model.invoke(messages).content
+        splitter = ThinkingSplitter(emit)
+        content = []
+        for chunk in self.model.stream(messages):
+            if isinstance(chunk.content, str):
+                splitter.feed(chunk.content)
+                content.append(chunk.content)
+        return "".join(content)
+
+    @staticmethod
+    def _with_params(template: str, params: Dict[str, Any]) -> str:
+        return f"{template}\nParameters: {json.dumps(params, default=str)}"
+
+    @staticmethod
+    def _check_template_rows(rows: str, template: str):
+        if query_failed(rows) or rows.startswith(_EMPTY_OUTPUT):
+            print(f"[PIPELINE] Stored query did not answer the question: {rows[:200]}")
+            raise PipelineFallback(rows, llm_calls=0, cypher=template)
+
+    @staticmethod
+    def _check_rows(rows: str, cypher: str):
+        if query_failed(rows):
+            print(f"[PIPELINE] Generated Cypher failed, handing over to the agent: {rows[:200]}")
+            # Entity extraction and Cypher generation were spent
+            raise PipelineFallback(rows, llm_calls=2, cypher=cypher)
+
+    @staticmethod
+    def _stage(emit: Optional[Emit], event: str, tool: str, text: str):
+        if emit is None:
+            return
+        if event == "tool_start":
+            emit(event, {"tool": tool, "input": text})
+        else:
+            emit(event, {"tool": tool, "output_chars": len(text)})
+
+    @staticmethod
+    def _elapsed(started: float) -> float:
+        return round((time.perf_counter() - started) * 1000, 2)
+
+    @staticmethod
+    def _cypher_messages(question: str, entities_json: str, search_json: str,
+                         examples: Sequence[Tuple[str, str]] = (), schema: str = GRAPH_SCHEMA) -> List:
+        try:
+            entities_data = json.loads(entities_json)
+        except json.JSONDecodeError:
+            entities_data = {}
+        schema = prune_schema(schema_labels(question, entities_data), schema)
+        shots = "".join(f"Question: {text}\nCypher:\n```cypher\n{cypher}\n```\n\n" for text, cypher in examples)
+        if shots:
+            shots = f"Examples of similar questions answered correctly before:\n{shots}"
+        return [
+            SystemMessage(
+                "You are an expert Neo4j Cypher developer for a BPJS medical insurance claims graph. "
+                "Write ONE read-only Cypher query that answers the question. Use only the labels, "
+                "properties and relationships in the schema. Use the exact names, IDs and codes from the "
+                "database search results when they match the question. Return only the query in a "
+                "```cypher code block, without explanation."
+            ),
+            HumanMessage(f"""
+Schema:
+{schema}
+Entities extracted from the question:
+{entities_json}
+
+Database search results (most similar stored entities):
+{search_json}
+
+{shots}Question: {question}
+"""),
+        ]
+
+    @staticmethod
+    def _summary_messages(question: str, cypher: str, rows: str) -> List:
+        return [
+            SystemMessage(
+                "You are an expert data analyst. Answer the question using only the query result below "
+                "and explain it clearly. If the result is empty, say that no matching data was found. "
+                "Answer in the same language as the question."
+            ),
+            HumanMessage(f"""
+Question: {question}
+
+Cypher query:
+{cypher}
+
+Query result:
+{rows}
+"""),
+        ]
@@ -1,17 +1,60 @@
+import asyncio
 import sys
 import os
 import re
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
 
+from chatbot.src.config import CHATBOT_CACHE_ENABLED, CHATBOT_CACHE_SIZE, CHATBOT_CACHE_TTL, CHATBOT_CACHE_THRESHOLD, CHATBOT_MODE, EXEMPLAR_ENABLED
+from chatbot.src.embeddings import get_embedding_model
+from chatbot.src.entity_resolver import entity_resolver, normalize_name
+from chatbot.src.exemplar_store import Exemplar, ExemplarMatch, exemplar_store
+from chatbot.src.graph_version import graph_version
+from chatbot.src.semantic_cache import SemanticCache
 from chatbot.src.tool.tool_registry import ToolRegistry
-from langchain_core.messages import SystemMessage, AIMessage, HumanMessage
+from chatbot.src.api.chatbot_pipeline import ChatbotPipeline, PipelineFallback, PipelineResult, query_failed
+from chatbot.src.api.streaming import Emit, EventCallbackHandler, ThinkingSplitter
+from langchain_core.messages import SystemMessage, AIMessage, HumanMessage, ToolMessage
 from langchain_openai import ChatOpenAI
 from langchain.agents import create_agent
 from langchain_core.callbacks import BaseCallbackHandler
 
 
+# Answers shared by differently worded questions with near-identical embeddings;
+# dropped when the graph data changes
+answer_cache = SemanticCache(
+    max_size=CHATBOT_CACHE_SIZE, ttl_seconds=CHATBOT_CACHE_TTL, threshold=CHATBOT_CACHE_THRESHOLD
+)
+graph_version.subscribe(lambda version: answer_cache.clear())
+
+# Tokens containing a digit: claim/doctor/hospital IDs, ICD-10 and procedure codes, years, amounts
+_LITERAL_TOKEN = re.compile(r"\w*\d[\w.\-]*")
+# Capitalized words: hospital and doctor names, acronyms such as "RSHS"
+_NAME_TOKEN = re.compile(r"\b[^\W\d_][\w\-]*")
+
+
+def _name_tokens(question: str) -> List[str]:
+    words = _NAME_TOKEN.findall(question)
+    # The first word is capitalized anyway ("Berapa", "Which"); it only counts as a name when it is an acronym
+    return [word for i, word in enumerate(words)
+            if word[0].isupper() and (i > 0 or (len(word) > 1 and word.isupper()))]
+
+
+def question_guard(question: str) -> frozenset:
+    """
+    Literal tokens two questions must share to reuse an answer. Embeddings barely
+    separate "klaim C1001" from "klaim C1002" or "klaim di RSHS" from "klaim di RS
+    Santosa", so IDs, codes and entity names are compared exactly. Names are the
+    capitalized words plus the words that identify a hospital, doctor, diagnosis or
+    procedure in the entity catalog (so lower-case names are guarded too).
+    """
+    tokens = {token.lower().rstrip(".") for token in _LITERAL_TOKEN.findall(question)}
+    tokens.update(normalize_name(word) for word in _name_tokens(question))
+    tokens.update(entity_resolver.mentioned_names(question))
+    return frozenset(tokens)
+
+
 class ToolExecutionLogger(BaseCallbackHandler):
     """Custom callback handler to log tool executions in the API."""
     
@@ -42,6 +85,15 @@ class ChatbotService:
         
         # Create agent executor
         self.agent_executor = create_agent(self.model, self.tools)
+
+        # Fixed-step workflow used in "pipeline" mode (the agent is its fallback)
+        self.pipeline = ChatbotPipeline(self.model, self.tool_registry.get_tool_map())
+
+        # Semantic answer cache (None when disabled)
+        self.answer_cache = answer_cache if CHATBOT_CACHE_ENABLED else None
+
+        # Question/Cypher pairs that worked before (None when disabled)
+        self.exemplars = exemplar_store if EXEMPLAR_ENABLED else None
         
         # Define system message and chat history template
         self.base_chat_history = [
@@ -90,64 +142,328 @@ class ChatbotService:
         
         return content.strip()
 
-    def process_question(self, user_input: str) -> Dict[str, Any]:
+    def process_question(self, user_input: str, emit: Optional[Emit] = None, mode: Optional[str] = None) -> Dict[str, Any]:
         """
         Process user question through the agent workflow and return structured response.
         
         Args:
             user_input: The user's question
+            emit: Optional event sink for streaming; receives tool_start/tool_end events
+                  and the model's tokens while the agent runs
+            mode: "agent" or "pipeline" (default CHATBOT_MODE). The pipeline runs the
+                  workflow steps as code with three LLM calls and hands the question to
+                  the agent only when its Cypher fails
             
         Returns:
             Dictionary containing the processed answer and metadata
+
+        Answers are cached by question embedding: a question similar enough to an earlier
+        one (CHATBOT_CACHE_THRESHOLD) gets the stored answer and executed Cypher without
+        running the agent; a "cache_hit" event is emitted instead of tokens.
+
+        Cypher that returned rows is recorded with its question. A question that only
+        differs from a recorded one in its IDs, codes or names reuses the recorded query
+        with the new literals (one LLM call, mode "exemplar"); otherwise the nearest
+        recorded pairs are given to the pipeline or the agent as examples.
         """
+        version = graph_version.current()
+        vector = self._embed_question(user_input) if self._embeds_questions() else None
+        if self.answer_cache is not None:
+            cached = self._cached_answer(user_input, vector, version)
+            if cached is not None:
+                if emit is not None:
+                    emit("cache_hit", cached["metadata"]["cache"])
+                return cached
+
         try:
-            # Prepare messages following the notebook pattern
-            message = [
-                HumanMessage(f"This is the question: {user_input}"),
-                AIMessage("Understood. I will follow the workflow to answer the question."),
-                HumanMessage("Use the search result from RAG to enrich your Cypher query generation. Because the question may not be directly mapped to the database schema."),
-                AIMessage("Got it. I will enrich the context using RAG results."),
-                HumanMessage("You can use or lookup into a graph database schema from schema_linking tool to determine nodes, properties, and relationships."),
-                AIMessage("Understood. I will refer to the schema as needed."),
-                HumanMessage("Detect what language is the question input. Answer the question from the workflow using the same language as the input question."),
-                AIMessage("Got it. I will answer in the same language as the input question."),
-            ]
-            
-            # Combine base chat history with current message
-            final_messages = self.base_chat_history + message
+            match = self.exemplars.match(user_input, vector) if self.exemplars is not None else None
+            if match is not None:
+                try:
+                    result = self.pipeline.run_template(user_input, match.exemplar.template, match.params, emit=emit)
+                    return self._store_answer(user_input, vector, version, self._exemplar_answer(user_input, match, result))
+                except PipelineFallback as fallback:
+                    self._discard_exemplar(match, str(fallback))
+
+            examples = self.exemplars.similar(vector) if self.exemplars is not None else []
+            pipeline_llm_calls = 0
+            if (mode or CHATBOT_MODE) == "pipeline":
+                try:
+                    run = self.pipeline.run(user_input, emit=emit, examples=self._shots(examples))
+                    self._record_exemplar(user_input, vector, run.cypher, run.rows)
+                    return self._store_answer(user_input, vector, version, self._pipeline_answer(user_input, run))
+                except PipelineFallback as fallback:
+                    pipeline_llm_calls = fallback.llm_calls
+                    if emit is not None:
+                        emit("fallback", {"reason": str(fallback)[:500]})
+
+            final_messages = self._messages(user_input, examples)
             
             # Create callback handler instance
             callback_handler = ToolExecutionLogger()
             
             # Execute the agent with logging
             print(f"[API_LOG] Processing question: {user_input}")
-            response = self.agent_executor.invoke(
-                {"messages": final_messages},
-                {"callbacks": [callback_handler]}
-            )
-            
-            # Extract raw content from response
-            raw_content = response['messages'][-1].content
+            if emit is None:
+                response = self.agent_executor.invoke(
+                    {"messages": final_messages},
+                    {"callbacks": [callback_handler]}
+                )
+            else:
+                response = self._stream_agent(final_messages, [callback_handler, EventCallbackHandler(emit)], emit)
             
-            # Clean the response
-            final_output = self.clean_llm_response(raw_content)
+            self._record_agent_exemplar(user_input, vector, response['messages'][len(final_messages):])
+            result = self._answer(user_input, response, len(final_messages), pipeline_llm_calls)
+            return self._store_answer(user_input, vector, version, result)
             
-            return {
-                "answer": final_output,
-                "status": "success",
-                "metadata": {
-                    "raw_response": raw_content,
-                    "input_question": user_input,
-                    "tools_used": len(self.tools)
-                }
+        except Exception as e:
+            return self._error(user_input, e)
+
+    async def aprocess_question(self, user_input: str, mode: Optional[str] = None) -> Dict[str, Any]:
+        """
+        process_question() on the event loop: the agent runs with ainvoke, so LLM calls
+        and the tools' async paths (async Neo4j driver, async embeddings) do not hold a
+        worker thread while they wait. The exemplar store locks and writes SQLite, so it
+        is used from worker threads.
+        """
+        version = await graph_version.acurrent()
+        vector = await self._aembed_question(user_input) if self._embeds_questions() else None
+        if self.answer_cache is not None:
+            cached = self._cached_answer(user_input, vector, version)
+            if cached is not None:
+                return cached
+
+        try:
+            match = await asyncio.to_thread(self.exemplars.match, user_input, vector) if self.exemplars is not None else None
+            if match is not None:
+                try:
+                    result = await self.pipeline.arun_template(user_input, match.exemplar.template, match.params)
+                    answer = await asyncio.to_thread(self._exemplar_answer, user_input, match, result)
+                    return self._store_answer(user_input, vector, version, answer)
+                except PipelineFallback as fallback:
+                    await asyncio.to_thread(self._discard_exemplar, match, str(fallback))
+
+            examples = await asyncio.to_thread(self.exemplars.similar, vector) if self.exemplars is not None else []
+            pipeline_llm_calls = 0
+            if (mode or CHATBOT_MODE) == "pipeline":
+                try:
+                    run = await self.pipeline.arun(user_input, examples=self._shots(examples))
+                    await asyncio.to_thread(self._record_exemplar, user_input, vector, run.cypher, run.rows)
+                    return self._store_answer(user_input, vector, version, self._pipeline_answer(user_input, run))
+                except PipelineFallback as fallback:
+                    pipeline_llm_calls = fallback.llm_calls
+
+            print(f"[API_LOG] Processing question: {user_input}")
+            final_messages = self._messages(user_input, examples)
+            response = await self.agent_executor.ainvoke(
+                {"messages": final_messages},
+                {"callbacks": [ToolExecutionLogger()]}
+            )
+            await asyncio.to_thread(self._record_agent_exemplar, user_input, vector, response['messages'][len(final_messages):])
+            result = self._answer(user_input, response, len(final_messages), pipeline_llm_calls)
+            return self._store_answer(user_input, vector, version, result)
+
+        except Exception as e:
+            return self._error(user_input, e)
+
+    def _messages(self, user_input: str, examples: Sequence[Tuple[Exemplar, float]] = ()) -> list:
+        # Prepare messages following the notebook pattern
+        message = [
+            HumanMessage(f"This is the question: {user_input}"),
+            AIMessage("Understood. I will follow the workflow to answer the question."),
+            HumanMessage("Use the search result from RAG to enrich your Cypher query generation. Because the question may not be directly mapped to the database schema."),
+            AIMessage("Got it. I will enrich the context using RAG results."),
+            HumanMessage("You can use or lookup into a graph database schema from schema_linking tool to determine nodes, properties, and relationships."),
+            AIMessage("Understood. I will refer to the schema as needed."),
+            HumanMessage("Detect what language is the question input. Answer the question from the workflow using the same language as the input question."),
+            AIMessage("Got it. I will answer in the same language as the input question."),
+        ]
+        if examples:
+            shots = "\n\n".join(f"Question: {text}\nCypher: {cypher}" for text, cypher in self._shots(examples))
+            message += [
+                HumanMessage(f"These similar questions were answered correctly before with these Cypher queries:\n{shots}"),
+                AIMessage("Understood. I will use them as examples when I write the Cypher query."),
+            ]
+        
+        # Combine base chat history with current message
+        return self.base_chat_history + message
+
+    def _answer(self, user_input: str, response: Dict[str, Any], input_count: int = 0,
+                pipeline_llm_calls: int = 0) -> Dict[str, Any]:
+        # Extract raw content from response
+        raw_content = response['messages'][-1].content
+        
+        # Clean the response
+        final_output = self.clean_llm_response(raw_content)
+        
+        return {
+            "answer": final_output,
+            "status": "success",
+            "metadata": {
+                "raw_response": raw_content,
+                "input_question": user_input,
+                "tools_used": len(self.tools),
+                "cypher_queries": self._executed_cypher(response['messages']),
+                "mode": "pipeline_fallback" if pipeline_llm_calls else "agent",
+                "llm_calls": pipeline_llm_calls + self._agent_llm_calls(response['messages'][input_count:]),
             }
-            
+        }
+
+    def _pipeline_answer(self, user_input: str, result: PipelineResult) -> Dict[str, Any]:
+        return {
+            "answer": self.clean_llm_response(result.raw_answer),
+            "status": "success",
+            "metadata": {
+                "raw_response": result.raw_answer,
+                "input_question": user_input,
+                "tools_used": 3,
+                "cypher_queries": [result.cypher],
+                "mode": "pipeline",
+                "llm_calls": result.llm_calls,
+                "timings_ms": result.timings_ms,
+            }
+        }
+
+    def _exemplar_answer(self, user_input: str, match: ExemplarMatch, result: PipelineResult) -> Dict[str, Any]:
+        print(f"[API_LOG] Reused the Cypher of exemplar {match.exemplar.id} ({match.similarity:.3f}): {match.exemplar.question}")
+        self.exemplars.mark_used(match.exemplar.id)
+        answer = self._pipeline_answer(user_input, result)
+        answer["metadata"].update({
+            "tools_used": 1,
+            "mode": "exemplar",
+            "cypher_params": match.params,
+            "exemplar": {
+                "id": match.exemplar.id,
+                "question": match.exemplar.question,
+                "similarity": round(match.similarity, 4),
+            },
+        })
+        return answer
+
+    def _discard_exemplar(self, match: ExemplarMatch, output: str):
+        # An empty result only means the new literal is not in the graph; a failing query is stale
+        if query_failed(output):
+            print(f"[API_LOG] Exemplar {match.exemplar.id} no longer runs, forgetting it")
+            self.exemplars.forget(match.exemplar.id)
+
+    @staticmethod
+    def _shots(examples: Sequence[Tuple[Exemplar, float]]) -> List[Tuple[str, str]]:
+        return [(exemplar.question, exemplar.cypher) for exemplar, _ in examples]
+
+    def _record_exemplar(self, user_input: str, vector: Optional[List[float]], cypher: str, output: str):
+        if self.exemplars is None or vector is None or not cypher:
+            return
+        try:
+            self.exemplars.record(user_input, vector, cypher, output)
         except Exception as e:
-            return {
-                "answer": f"Sorry, I encountered an error while processing your question: {str(e)}",
-                "status": "error",
-                "metadata": {
-                    "error": str(e),
-                    "input_question": user_input
-                }
+            print(f"[API_LOG] Recording the exemplar failed: {e}")
+
+    def _record_agent_exemplar(self, user_input: str, vector: Optional[List[float]], new_messages):
+        """Record the last Cypher the agent executed, with its tool output."""
+        queries = {
+            call.get("id"): call["args"].get("cypher_query")
+            for message in new_messages
+            for call in (getattr(message, "tool_calls", None) or [])
+            if call.get("name") == "execute_cypher"
+        }
+        for message in reversed(new_messages):
+            if isinstance(message, ToolMessage) and message.tool_call_id in queries:
+                if isinstance(message.content, str):
+                    self._record_exemplar(user_input, vector, queries[message.tool_call_id], message.content)
+                return
+
+    @staticmethod
+    def _agent_llm_calls(new_messages) -> int:
+        """Model turns of an agent run plus the LLM call inside each entity_extraction."""
+        turns = sum(1 for message in new_messages if isinstance(message, AIMessage))
+        extractions = sum(
+            1 for message in new_messages
+            for call in (getattr(message, "tool_calls", None) or [])
+            if call.get("name") == "entity_extraction"
+        )
+        return turns + extractions
+
+    @staticmethod
+    def _executed_cypher(messages) -> List[str]:
+        """Cypher the agent ran through execute_cypher, in order."""
+        return [
+            call["args"].get("cypher_query")
+            for message in messages
+            for call in (getattr(message, "tool_calls", None) or [])
+            if call.get("name") == "execute_cypher"
+        ]
+
+    def _embeds_questions(self) -> bool:
+        return self.answer_cache is not None or self.exemplars is not None
+
+    @staticmethod
+    def _embed_question(user_input: str) -> Optional[List[float]]:
+        try:
+            return get_embedding_model().embed_query(user_input)
+        except Exception as e:
+            print(f"[API_LOG] Question embedding failed, answer cache and exemplars skipped: {e}")
+            return None
+
+    @staticmethod
+    async def _aembed_question(user_input: str) -> Optional[List[float]]:
+        try:
+            return await get_embedding_model().aembed_query(user_input)
+        except Exception as e:
+            print(f"[API_LOG] Question embedding failed, answer cache and exemplars skipped: {e}")
+            return None
+
+    def _cached_answer(self, user_input: str, vector: Optional[List[float]], version: int) -> Optional[Dict[str, Any]]:
+        if vector is None:
+            return None
+        hit = self.answer_cache.get(vector, version=version, guard=question_guard(user_input))
+        if hit is None:
+            return None
+        print(f"[API_LOG] Answer cache hit ({hit.similarity:.3f}), cached question: {hit.text}")
+        return {
+            **hit.value,
+            "metadata": {
+                **hit.value["metadata"],
+                "input_question": user_input,
+                "cache": {
+                    "hit": True,
+                    "similarity": round(hit.similarity, 4),
+                    "cached_question": hit.text,
+                    "age_seconds": round(hit.age_seconds, 1),
+                },
+            },
+        }
+
+    def _store_answer(self, user_input: str, vector: Optional[List[float]], version: Optional[int],
+                      result: Dict[str, Any]) -> Dict[str, Any]:
+        # Tagged with the version seen before the agent ran, so answers racing a data change go stale
+        if self.answer_cache is not None and vector is not None and result["status"] == "success":
+            self.answer_cache.set(vector, result, text=user_input, version=version, guard=question_guard(user_input))
+        return result
+
+    @staticmethod
+    def _error(user_input: str, error: Exception) -> Dict[str, Any]:
+        return {
+            "answer": f"Sorry, I encountered an error while processing your question: {str(error)}",
+            "status": "error",
+            "metadata": {
+                "error": str(error),
+                "input_question": user_input
             }
+        }
+
+    def _stream_agent(self, messages, callbacks, emit: Emit) -> Dict[str, Any]:
+        """Run the agent in streaming mode, emitting model tokens; returns the final agent state."""
+        splitter = ThinkingSplitter(emit)
+        state = {"messages": messages}
+        for mode, payload in self.agent_executor.stream(
+            {"messages": messages},
+            {"callbacks": callbacks},
+            stream_mode=["messages", "values"],
+        ):
+            if mode == "values":
+                state = payload
+                continue
+            chunk, metadata = payload
+            # Only model output; tool results are reported by tool_end events
+            if metadata.get("langgraph_node") == "model" and isinstance(chunk.content, str):
+                splitter.feed(chunk.content)
+        return state
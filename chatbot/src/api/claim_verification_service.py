@@ -1,73 +1,43 @@
 import sys
 import os
+import asyncio
+import json
+import math
 import re
-from typing import Dict, Any
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Iterator, List, Optional
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
 
+from chatbot.src.config import VERIFY_BATCH_WORKERS
+from chatbot.src.database import db
+from chatbot.src.graph_version import graph_version
+from chatbot.src.reference_data import reference_data
+from chatbot.src.verification_store import asave_verification, context_fingerprint, save_verification
 from chatbot.src.tool.execute_chyper import ExecuteCypherTool
+from chatbot.src.api.repository import HealthcareRepository
+from chatbot.src.api.streaming import Emit, EventCallbackHandler, ThinkingSplitter
+from chatbot.src.api.verification_engine import (
+    ENGINE_VERSION,
+    FINAL_STATUSES,
+    build_form_context,
+    aload_claim_context,
+    load_claim_context,
+    evaluate_claim,
+    summarize_verdict,
+    verdict_metadata,
+)
 from langchain_core.messages import SystemMessage, AIMessage, HumanMessage
 from langchain_openai import ChatOpenAI
 from langchain.agents import create_agent
 from langchain_core.callbacks import BaseCallbackHandler
 
 
-class ToolExecutionPrinter(BaseCallbackHandler):
-    """Custom callback handler to log tool executions during claim verification."""
-    
-    def on_tool_start(self, serialized, input_str, **kwargs):
-        """Run when a tool starts running."""
-        tool_name = serialized.get("name")
-        print(f"[VERIFY_LOG] 🛠️  Agent is entering tool: {tool_name}")
-        print(f"[VERIFY_LOG]    Input args: {input_str}")
-
-    def on_tool_end(self, output, **kwargs):
-        """Run when a tool ends running."""
-        print(f"[VERIFY_LOG] ✅ Tool execution finished.")
-
-
-class ClaimVerificationService:
-    def __init__(self):
-        """Initialize the claim verification service with model, tools, and agent."""
-        # Initialize the LLM model (same configuration as notebook)
-        self.model = ChatOpenAI(
-            model="qwen3-8B", 
-            base_url="http://127.0.0.1:1234/v1", 
-            api_key=""
-        )
-        
-        # Initialize tools (same as notebook)
-        self.tools = [ExecuteCypherTool()]
-        
-        # Create agent executor
-        self.agent_executor = create_agent(self.model, self.tools)
-        
-        # Define system message and chat history (exact copy from notebook)
-        self.base_chat_history = [
-            SystemMessage(
-                """
-                You are an expert Medical Fraud Detection AI Agent powered by a Knowledge Graph.
-                Your goal is to validate insurance claims against medical rules.
-
-                You have 1 tools to help you analyze the claim is Fraudlent or not.
-                1. execute_cypher: Executes Cypher queries against the graph database
-
-                Rule : 
-                1. When the claim data from the graph database already has a Status (FRAUD / NORMAL). It means it has been validated before. You should return the existing Status without re-validation.
-                2. Use Indonesian language for all responses.
-
-                Output Formaat: 
-                Claim ID: <claim_id>
-                Validation Result: <FRAUD/NORMAL>
-                Confidence Score: <0-100%>
-                Detail Claim Data: <detailed claim data>
-                Explanation: <detailed explanation of the validation>
-                """,
-            ),
-        ]
-        
-        # Golden Cypher queries from the notebook
-        self.golden_cypher_for_get_claim_data = """
+# Golden Cypher queries from the notebooks (placeholders are filled in by the agent)
+GOLDEN_CLAIM_DATA_QUERY = """
 MATCH (c:Claim {id: <claim_id>})
 OPTIONAL MATCH (c)-[:HAS_PATIENT]->(patient:Patient)
 OPTIONAL MATCH (c)-[:HAS_PRIMARY_PROCEDURE]->(pp:Procedure)
@@ -86,8 +56,8 @@ RETURN c.id, c.total_cost, c.status,
        note.primary_diagnosis_text,
        note.secondary_diagnosis_text
         """
-        
-        self.golden_cypher_to_get_price_procedure_diagnose_based_on_claim_id = """
+
+GOLDEN_COST_GROUND_TRUTH_QUERY = """
 MATCH (c:Claim {id: <claim_id>})
 OPTIONAL MATCH (c)-[:HAS_PRIMARY_PROCEDURE]->(pp:Procedure)
 OPTIONAL MATCH (c)-[:HAS_SECONDARY_PROCEDURE]->(sp:Procedure)
@@ -103,8 +73,8 @@ RETURN
     reduce(total = 0, proc IN primary_procs | total + COALESCE(proc.avg_cost, 0)) as primary_procs_total,
     reduce(total = 0, proc IN secondary_procs | total + COALESCE(proc.avg_cost, 0)) as secondary_procs_total
         """
-        
-        self.golden_query_to_get_diagnose_and_procedure_relation = """
+
+GOLDEN_DIAGNOSIS_PROCEDURE_RELATION_QUERY = """
 MATCH (d:Diagnosis {code: <diagnosis_id>})-[r]->(p:Procedure)
 WITH d, count(r) AS procedure_count,
      collect({procedure: p.name, relationship: type(r), cost: p.avg_cost}) AS procedures
@@ -115,15 +85,15 @@ RETURN d.code AS ICD10_Code,
        procedure_count AS Number_of_Procedures,
        procedures AS Associated_Procedures;
         """
-        
-        self.golden_query_get_specialisties_doctor = """
+
+GOLDEN_DOCTOR_SPECIALIZATION_QUERY = """
 MATCH (d:Doctor {id: <doctor_id>})
 RETURN d.id AS doctor_id,
        d.name AS doctor_name,
        d.specialization AS specialization;
         """
-        
-        self.golden_query_get_specialties_and_facilities_hospital = """
+
+GOLDEN_HOSPITAL_CAPABILITY_QUERY = """
 MATCH (h:Hospital {id: <hospital_id>})
 OPTIONAL MATCH (h)-[:HAS_SPECIALTY]->(s:Specialty)
 OPTIONAL MATCH (h)-[:HAS_FACILITY]->(f:Facility)
@@ -134,22 +104,131 @@ RETURN h.id AS hospital_id,
        collect(DISTINCT s.name) AS specialties,
        collect(DISTINCT f.name) AS facilities;
         """
-        
-        # Additional queries for form verification (from notebook)
-        self.golden_query_get_procedure_costs = """
+
+GOLDEN_PROCEDURE_COSTS_QUERY = """
 MATCH (p:Procedure)
 WHERE p.name IN ['<primary_procedure>', '<secondary_procedure>']
 RETURN p.name AS procedure_name,
        p.avg_cost AS avg_cost
         """
 
-        self.golden_query_get_diagnosis_cost = """
+GOLDEN_DIAGNOSIS_COST_QUERY = """
 MATCH (d:Diagnosis {code: '<diagnosis_id>'})
 RETURN d.code AS diagnosis_code,
        d.name AS diagnosis_name,
        d.avg_cost AS avg_cost
         """
 
+
+class VerificationStats:
+    """Counts how /claims/verify and /claims/verify-form requests were answered."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {
+            "requests": 0,
+            "stored_status_shortcut": 0,
+            "engine_verdicts": 0,
+            "llm_explanations": 0,
+            "agent_fallbacks": 0,
+            "not_found": 0,
+            "reused_verifications": 0,
+            "stored_verifications": 0,
+            "form_engine_verdicts": 0,
+            "form_agent_fallbacks": 0,
+        }
+
+    def record(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+        requests = counters["requests"]
+        counters["shortcut_rate"] = round(counters["stored_status_shortcut"] / requests, 4) if requests else 0.0
+        return counters
+
+
+verification_stats = VerificationStats()
+
+# model_id stored with verdicts whose explanation was not written by an LLM
+RULES_MODEL_ID = "rules"
+
+
+class ToolExecutionPrinter(BaseCallbackHandler):
+    """Custom callback handler to log tool executions during claim verification."""
+    
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        """Run when a tool starts running."""
+        tool_name = serialized.get("name")
+        print(f"[VERIFY_LOG] 🛠️  Agent is entering tool: {tool_name}")
+        print(f"[VERIFY_LOG]    Input args: {input_str}")
+
+    def on_tool_end(self, output, **kwargs):
+        """Run when a tool ends running."""
+        print(f"[VERIFY_LOG] ✅ Tool execution finished.")
+
+
+class ClaimVerificationService:
+    def __init__(self):
+        """Initialize the claim verification service with model, tools, and agent."""
+        # Initialize the LLM model (same configuration as notebook)
+        self.model = ChatOpenAI(
+            model="qwen3-8B", 
+            base_url="http://127.0.0.1:1234/v1", 
+            api_key=""
+        )
+        
+        # Initialize tools (same as notebook)
+        self.tools = [ExecuteCypherTool()]
+        
+        # Create agent executor
+        self.agent_executor = create_agent(self.model, self.tools)
+        
+        # Define system message and chat history (exact copy from notebook)
+        self.base_chat_history = [
+            SystemMessage(
+                """
+                You are an expert Medical Fraud Detection AI Agent powered by a Knowledge Graph.
+                Your goal is to validate insurance claims against medical rules.
+
+                You have 1 tools to help you analyze the claim is Fraudlent or not.
+                1. execute_cypher: Executes Cypher queries against the graph database
+
+                Rule : 
+                1. When the claim data from the graph database already has a Status (FRAUD / NORMAL). It means it has been validated before. You should return the existing Status without re-validation.
+                2. Use Indonesian language for all responses.
+
+                Output Formaat: 
+                Claim ID: <claim_id>
+                Validation Result: <FRAUD/NORMAL>
+                Confidence Score: <0-100%>
+                Detail Claim Data: <detailed claim data>
+                Explanation: <detailed explanation of the validation>
+                """,
+            ),
+        ]
+        
+        # Golden Cypher queries from the notebook
+        self.golden_cypher_for_get_claim_data = GOLDEN_CLAIM_DATA_QUERY
+        
+        self.golden_cypher_to_get_price_procedure_diagnose_based_on_claim_id = GOLDEN_COST_GROUND_TRUTH_QUERY
+        
+        self.golden_query_to_get_diagnose_and_procedure_relation = GOLDEN_DIAGNOSIS_PROCEDURE_RELATION_QUERY
+        
+        self.golden_query_get_specialisties_doctor = GOLDEN_DOCTOR_SPECIALIZATION_QUERY
+        
+        self.golden_query_get_specialties_and_facilities_hospital = GOLDEN_HOSPITAL_CAPABILITY_QUERY
+        
+        # Shared pool for batch verification, bounded to what the LLM backend can serve
+        self._batch_executor = ThreadPoolExecutor(max_workers=VERIFY_BATCH_WORKERS, thread_name_prefix="verify-batch")
+
+        # Additional queries for form verification (from notebook)
+        self.golden_query_get_procedure_costs = GOLDEN_PROCEDURE_COSTS_QUERY
+
+        self.golden_query_get_diagnosis_cost = GOLDEN_DIAGNOSIS_COST_QUERY
+
     def clean_llm_response(self, content: str) -> str:
         """Clean LLM response by removing thinking tags and unwanted content."""
         
@@ -172,17 +251,82 @@ RETURN d.code AS diagnosis_code,
 
     def verify_form_data(self, form_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Verify form input data using the exact logic from dani-verify-claim-form.ipynb notebook.
-        
+        Verify form input data with the rule engine against the in-memory reference tables.
+
+        Diagnosis, procedure, doctor and hospital data come from the reference snapshot,
+        so a form is checked without a database or LLM round trip. If the snapshot cannot
+        be loaded, the notebook's agent flow is used instead.
+
         Args:
             form_data: Dictionary containing form input data
-            
+
         Returns:
             Dictionary containing the verification result and metadata
         """
+        start = time.perf_counter()
+        try:
+            snapshot = reference_data.get()
+        except Exception as e:
+            print(f"[VERIFY_LOG] Reference data unavailable, falling back to agent: {e}")
+            verification_stats.record("form_agent_fallbacks")
+            return self._verify_form_with_agent(form_data)
+
+        return self._form_engine_result(form_data, snapshot, start)
+
+    async def averify_form_data(self, form_data: Dict[str, Any]) -> Dict[str, Any]:
+        """verify_form_data() on the event loop; the agent fallback runs with ainvoke."""
+        start = time.perf_counter()
         try:
-            # Format form input for display (exact copy from notebook)
-            form_summary = f"""
+            # Usually an in-memory read; a reload after a graph change uses the sync driver
+            snapshot = await asyncio.to_thread(reference_data.get)
+        except Exception as e:
+            print(f"[VERIFY_LOG] Reference data unavailable, falling back to agent: {e}")
+            verification_stats.record("form_agent_fallbacks")
+            return await self._averify_form_with_agent(form_data)
+
+        return self._form_engine_result(form_data, snapshot, start)
+
+    def _form_engine_result(self, form_data: Dict[str, Any], snapshot, start: float) -> Dict[str, Any]:
+        form_summary = self._form_summary(form_data)
+        context, unresolved = build_form_context(snapshot, form_data)
+        verdict = evaluate_claim(context)
+        verification_stats.record("form_engine_verdicts")
+
+        detail_analysis = "\n".join(
+            f"- {check.name}: {'LOLOS' if check.passed else ('GAGAL' if check.passed is False else 'TIDAK DAPAT DINILAI')} - {check.detail}"
+            for check in verdict.checks
+        )
+        if unresolved:
+            detail_analysis += f"\n- Data form tidak ditemukan di referensi: {', '.join(unresolved)}."
+        print(f"[VERIFY_LOG] Form verdict: {verdict.validation_result} ({(time.perf_counter() - start) * 1000:.2f} ms)")
+        return {
+            "form_data_summary": form_summary.strip(),
+            "validation_result": verdict.validation_result,
+            "confidence_score": verdict.confidence_score,
+            "detail_analysis": detail_analysis,
+            "explanation": summarize_verdict("baru", verdict),
+            "status": "success",
+            "metadata": {
+                "input_form_data": form_data,
+                "engine": verdict_metadata(verdict),
+                "resolved": {
+                    "diagnosis": context["diagnosis"],
+                    "primary_procedures": context["primary_procedures"],
+                    "secondary_procedures": context["secondary_procedures"],
+                    "doctor": context["doctor"],
+                    "hospital": context["hospital"],
+                },
+                "unresolved_fields": unresolved,
+                "reference_version": snapshot.version,
+                "llm_calls": 0,
+                "total_ms": round((time.perf_counter() - start) * 1000, 3),
+            }
+        }
+
+    @staticmethod
+    def _form_summary(form_data: Dict[str, Any]) -> str:
+        # Format form input for display (exact copy from notebook)
+        return f"""
 Hospital ID: {form_data['hospital_id']}
 Doctor ID: {form_data['doctor_id']}
 Diagnosis ID: {form_data['diagnosa_id']}
@@ -192,10 +336,64 @@ Secondary Procedure: {form_data.get('secondary_procedure', 'None')}
 Diagnosis Text: {form_data['diagnosis_text']}
 """
 
-            # Prepare messages following the notebook pattern (exact copy from notebook)
-            message = [
-                HumanMessage(f"This is a medical claim form with the following data: {form_summary}"),
-                HumanMessage(f"""
+    def _verify_form_with_agent(self, form_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Verify form input data using the exact logic from dani-verify-claim-form.ipynb notebook.
+        
+        Args:
+            form_data: Dictionary containing form input data
+            
+        Returns:
+            Dictionary containing the verification result and metadata
+        """
+        try:
+            form_summary, final_messages = self._form_agent_messages(form_data)
+            
+            # Create callback handler instance
+            callback_handler = ToolExecutionPrinter()
+            
+            # Execute the agent with logging
+            print(f"[VERIFY_LOG] Processing form data verification")
+            response = self.agent_executor.invoke(
+                {"messages": final_messages},
+                config={"callbacks": [callback_handler]}
+            )
+            
+            # Extract raw content from response
+            raw_content = response['messages'][-1].content
+            
+            # Clean the response
+            final_output = self.clean_llm_response(raw_content)
+            
+            # Parse the structured output to extract components
+            return self._parse_form_verification_output(final_output, form_data, raw_content, form_summary)
+            
+        except Exception as e:
+            return self._form_error(form_data, e)
+
+    async def _averify_form_with_agent(self, form_data: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            form_summary, final_messages = self._form_agent_messages(form_data)
+            print(f"[VERIFY_LOG] Processing form data verification")
+            response = await self.agent_executor.ainvoke(
+                {"messages": final_messages},
+                config={"callbacks": [ToolExecutionPrinter()]}
+            )
+            raw_content = response['messages'][-1].content
+            final_output = self.clean_llm_response(raw_content)
+            return self._parse_form_verification_output(final_output, form_data, raw_content, form_summary)
+
+        except Exception as e:
+            return self._form_error(form_data, e)
+
+    def _form_agent_messages(self, form_data: Dict[str, Any]):
+        """(form summary, agent messages) for the notebook's form verification prompt."""
+        form_summary = self._form_summary(form_data)
+
+        # Prepare messages following the notebook pattern (exact copy from notebook)
+        message = [
+            HumanMessage(f"This is a medical claim form with the following data: {form_summary}"),
+            HumanMessage(f"""
 
     Please validate this claim form data following these steps. Be objective and allow for reasonable operational variances.
 
@@ -288,19 +486,415 @@ Diagnosis Text: {form_data['diagnosis_text']}
        - **Explanation**: You MUST explicitly state the cost deviation percentage in your explanation (e.g., "Cost is 4.5% higher, which is within the acceptable 20% variance").
 
     """)
-            ]
+        ]
+        
+        # Combine base chat history with current message
+        return form_summary, self.base_chat_history + message
+
+    @staticmethod
+    def _form_error(form_data: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        return {
+            "form_data_summary": f"Error processing form data: {form_data}",
+            "validation_result": "ERROR",
+            "confidence_score": 0,
+            "detail_analysis": f"Error during verification: {str(error)}",
+            "explanation": f"Error during verification: {str(error)}",
+            "status": "error",
+            "metadata": {
+                "error": str(error),
+                "input_form_data": form_data
+            }
+        }
+
+    def verify_claim(self, claim_id: str, verdict_only: bool = False, emit: Optional[Emit] = None) -> Dict[str, Any]:
+        """
+        Verify a claim by claim ID with the deterministic verification engine.
+
+        Claims that already have a FRAUD/NORMAL status are answered from one indexed lookup
+        with confidence 100, without running any checks or LLM call. Otherwise the golden queries
+        are fetched as one bundle and the cost deviation, procedure consistency, doctor
+        specialization and hospital capability checks are computed in Python. The LLM
+        is only asked to write the Indonesian explanation, and not at all when verdict_only is set.
+        If the engine cannot evaluate the claim, the agent-based verification is used instead.
+
+        Verdicts are stored on the claim (Verification node) and reused while the claim's
+        verification data is unchanged.
+
+        Args:
+            claim_id: The claim ID to verify
+            verdict_only: Skip the LLM and explain the verdict with the check details only
+            emit: Optional event sink for streaming; receives the engine verdict as soon as
+                  it is known, then the explanation tokens (or the agent's tool events)
+
+        Returns:
+            Dictionary containing the verification result and metadata
+        """
+        start = time.perf_counter()
+        verification_stats.record("requests")
+        context = None
+        fingerprint = None
+        try:
+            with db.get_session() as session:
+                # Already labelled claims are answered from one indexed lookup
+                stored = HealthcareRepository(session).get_claim_status(claim_id)
+                if stored is not None and str(stored.get("status")).upper() not in FINAL_STATUSES:
+                    context = load_claim_context(session, claim_id)
+
+            early = self._unverified_result(claim_id, stored, context, verdict_only, start)
+            if early is not None:
+                return early
+
+            stored_verification = context.pop("stored_verification", None)
+            fingerprint = context_fingerprint(context, ENGINE_VERSION)
+            reused = self._reuse_verification(claim_id, context, stored_verification, fingerprint, verdict_only, start)
+            if reused is not None:
+                return reused
+
+            verdict = evaluate_claim(context)
+        except Exception as e:
+            print(f"[VERIFY_LOG] Verification engine failed for {claim_id}, falling back to agent: {e}")
+            verification_stats.record("agent_fallbacks")
+            result = self._verify_claim_with_agent(claim_id, emit=emit)
+            if fingerprint is not None and result.get("validation_result") in FINAL_STATUSES:
+                self._store_verification(claim_id, result, fingerprint, source="agent", model_id=self._model_id())
+            return result
+
+        verification_stats.record("engine_verdicts")
+
+        engine_ms = (time.perf_counter() - start) * 1000
+        print(f"[VERIFY_LOG] Engine verdict for {claim_id}: {verdict.validation_result} ({engine_ms:.1f} ms)")
+        if emit is not None:
+            emit("verdict", {
+                "claim_id": claim_id,
+                "validation_result": verdict.validation_result,
+                "confidence_score": verdict.confidence_score,
+                "engine": verdict_metadata(verdict),
+            })
+
+        explanation = summarize_verdict(claim_id, verdict)
+        llm_calls = 0
+        if not verdict_only and verdict.source == "rules":
+            try:
+                explanation = self._explain_verdict(claim_id, context, verdict, emit=emit)
+                llm_calls = 1
+                verification_stats.record("llm_explanations")
+            except Exception as e:
+                print(f"[VERIFY_LOG] Explanation LLM call failed, using rule summary: {e}")
+
+        result = self._engine_result(claim_id, context, verdict, explanation, llm_calls, verdict_only, engine_ms, start)
+        self._store_verification(
+            claim_id, result, fingerprint, source="rules",
+            model_id=self._model_id() if llm_calls else RULES_MODEL_ID,
+        )
+        return result
+
+    async def averify_claim(self, claim_id: str, verdict_only: bool = False) -> Dict[str, Any]:
+        """
+        verify_claim() on the event loop: the bundle query and the verdict write use the
+        async Neo4j driver, the explanation (or agent fallback) is awaited with ainvoke.
+        Returns the same result as verify_claim.
+        """
+        start = time.perf_counter()
+        verification_stats.record("requests")
+        context = None
+        fingerprint = None
+        try:
+            async with db.get_async_session() as session:
+                stored = await HealthcareRepository(session).aget_claim_status(claim_id)
+                if stored is not None and str(stored.get("status")).upper() not in FINAL_STATUSES:
+                    context = await aload_claim_context(session, claim_id)
+
+            early = self._unverified_result(claim_id, stored, context, verdict_only, start)
+            if early is not None:
+                return early
+
+            stored_verification = context.pop("stored_verification", None)
+            fingerprint = context_fingerprint(context, ENGINE_VERSION)
+            reused = self._reuse_verification(claim_id, context, stored_verification, fingerprint, verdict_only, start)
+            if reused is not None:
+                return reused
+
+            verdict = evaluate_claim(context)
+        except Exception as e:
+            print(f"[VERIFY_LOG] Verification engine failed for {claim_id}, falling back to agent: {e}")
+            verification_stats.record("agent_fallbacks")
+            result = await self._averify_claim_with_agent(claim_id)
+            if fingerprint is not None and result.get("validation_result") in FINAL_STATUSES:
+                await self._astore_verification(claim_id, result, fingerprint, source="agent", model_id=self._model_id())
+            return result
+
+        verification_stats.record("engine_verdicts")
+
+        engine_ms = (time.perf_counter() - start) * 1000
+        print(f"[VERIFY_LOG] Engine verdict for {claim_id}: {verdict.validation_result} ({engine_ms:.1f} ms)")
+
+        explanation = summarize_verdict(claim_id, verdict)
+        llm_calls = 0
+        if not verdict_only and verdict.source == "rules":
+            try:
+                response = await self.model.ainvoke(self._explanation_messages(claim_id, context, verdict))
+                explanation = self.clean_llm_response(response.content)
+                llm_calls = 1
+                verification_stats.record("llm_explanations")
+            except Exception as e:
+                print(f"[VERIFY_LOG] Explanation LLM call failed, using rule summary: {e}")
+
+        result = self._engine_result(claim_id, context, verdict, explanation, llm_calls, verdict_only, engine_ms, start)
+        await self._astore_verification(
+            claim_id, result, fingerprint, source="rules",
+            model_id=self._model_id() if llm_calls else RULES_MODEL_ID,
+        )
+        return result
+
+    @staticmethod
+    def _unverified_result(claim_id: str, stored: Optional[Dict[str, Any]], context: Optional[Dict[str, Any]],
+                           verdict_only: bool, start: float) -> Optional[Dict[str, Any]]:
+        """Response for a claim that is already labelled or does not exist; None if it needs verifying."""
+        if stored is not None and context is None:
+            verification_stats.record("stored_status_shortcut")
+            status = str(stored["status"]).upper()
+            print(f"[VERIFY_LOG] Claim {claim_id} already labelled {status}, skipping verification")
+            return {
+                "claim_id": claim_id,
+                "validation_result": status,
+                "confidence_score": 100,
+                "detail_claim_data": stored,
+                "explanation": f"Klaim {claim_id} sudah divalidasi sebelumnya dengan status {status}.",
+                "status": "success",
+                "metadata": {
+                    "input_claim_id": claim_id,
+                    "engine": {"source": "stored_status"},
+                    "verdict_only": verdict_only,
+                    "llm_calls": 0,
+                    "total_ms": round((time.perf_counter() - start) * 1000, 2),
+                }
+            }
+        if context is None:
+            verification_stats.record("not_found")
+            return {
+                "claim_id": claim_id,
+                "validation_result": "ERROR",
+                "confidence_score": 0,
+                "detail_claim_data": {},
+                "explanation": f"Klaim {claim_id} tidak ditemukan di database.",
+                "status": "error",
+                "metadata": {"input_claim_id": claim_id, "error": "claim not found"}
+            }
+        return None
+
+    @staticmethod
+    def _engine_result(claim_id: str, context: Dict[str, Any], verdict, explanation: str, llm_calls: int,
+                       verdict_only: bool, engine_ms: float, start: float) -> Dict[str, Any]:
+        return {
+            "claim_id": claim_id,
+            "validation_result": verdict.validation_result,
+            "confidence_score": verdict.confidence_score,
+            "detail_claim_data": context,
+            "explanation": explanation,
+            "status": "success",
+            "metadata": {
+                "input_claim_id": claim_id,
+                "engine": verdict_metadata(verdict),
+                "verdict_only": verdict_only,
+                "llm_calls": llm_calls,
+                "engine_ms": round(engine_ms, 2),
+                "total_ms": round((time.perf_counter() - start) * 1000, 2),
+            }
+        }
+
+    def _model_id(self) -> str:
+        return getattr(self.model, "model_name", None) or "unknown"
+
+    def _reuse_verification(self, claim_id: str, context: Dict[str, Any], stored: Any,
+                            fingerprint: str, verdict_only: bool, start: float) -> Any:
+        """Build a response from the stored verification if it was computed from the same data."""
+        if not stored or stored.get("data_fingerprint") != fingerprint:
+            return None
+        # An LLM-written explanation is only reused for the same model; verdict_only takes any verdict
+        if not verdict_only and stored.get("model_id") != self._model_id():
+            return None
+
+        verification_stats.record("reused_verifications")
+        print(f"[VERIFY_LOG] Reusing stored verification for {claim_id} ({stored.get('validation_result')})")
+        return {
+            "claim_id": claim_id,
+            "validation_result": stored["validation_result"],
+            "confidence_score": stored["confidence_score"],
+            "detail_claim_data": context,
+            "explanation": stored.get("explanation") or "",
+            "status": "success",
+            "metadata": {
+                "input_claim_id": claim_id,
+                "engine": {"source": "stored_verification", "verified_by": stored.get("source")},
+                "model_id": stored.get("model_id"),
+                "verified_at": stored.get("created_at"),
+                "graph_version": stored.get("graph_version"),
+                "verdict_only": verdict_only,
+                "llm_calls": 0,
+                "total_ms": round((time.perf_counter() - start) * 1000, 2),
+            }
+        }
+
+    def _store_verification(self, claim_id: str, result: Dict[str, Any], fingerprint: str,
+                            source: str, model_id: str):
+        """Persist a verdict on the claim; failures only cost the reuse, never the response."""
+        try:
+            properties = self._verification_properties(result, fingerprint, source, model_id, graph_version.current())
+            with db.get_session() as session:
+                save_verification(session, claim_id, properties)
+            verification_stats.record("stored_verifications")
+        except Exception as e:
+            print(f"[VERIFY_LOG] Could not store verification for {claim_id}: {e}")
+
+    async def _astore_verification(self, claim_id: str, result: Dict[str, Any], fingerprint: str,
+                                   source: str, model_id: str):
+        try:
+            properties = self._verification_properties(result, fingerprint, source, model_id,
+                                                       await graph_version.acurrent())
+            async with db.get_async_session() as session:
+                await asave_verification(session, claim_id, properties)
+            verification_stats.record("stored_verifications")
+        except Exception as e:
+            print(f"[VERIFY_LOG] Could not store verification for {claim_id}: {e}")
+
+    @staticmethod
+    def _verification_properties(result: Dict[str, Any], fingerprint: str, source: str, model_id: str,
+                                 version: int) -> Dict[str, Any]:
+        return {
+            "validation_result": result["validation_result"],
+            "confidence_score": int(result.get("confidence_score") or 0),
+            "explanation": result.get("explanation") or "",
+            "source": source,
+            "model_id": model_id,
+            "engine_version": ENGINE_VERSION,
+            "data_fingerprint": fingerprint,
+            "graph_version": version,
+            "checks_json": json.dumps((result.get("metadata") or {}).get("engine", {}), default=str),
+        }
+
+    def verify_claims_batch(self, claim_ids: List[str], verdict_only: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Verify many claims on the shared worker pool and yield each result as soon as it is ready.
+
+        Results are yielded in completion order as {"type": "result", "latency_ms": ..., **result};
+        the last item is {"type": "summary", ...} with throughput and latency statistics.
+        Pending claims are cancelled if the consumer stops iterating (e.g. client disconnect).
+        """
+        start = time.perf_counter()
+
+        def timed(claim_id: str) -> Dict[str, Any]:
+            began = time.perf_counter()
+            result = self.verify_claim(claim_id, verdict_only=verdict_only)
+            return {"type": "result", "latency_ms": round((time.perf_counter() - began) * 1000, 2), **result}
+
+        futures = {self._batch_executor.submit(timed, claim_id): claim_id for claim_id in claim_ids}
+        latencies = []
+        verdicts: Dict[str, int] = {}
+        errors = 0
+        try:
+            for future in as_completed(futures):
+                try:
+                    item = future.result()
+                except Exception as e:
+                    item = {
+                        "type": "result",
+                        "claim_id": futures[future],
+                        "validation_result": "ERROR",
+                        "confidence_score": 0,
+                        "explanation": f"Error during verification: {str(e)}",
+                        "status": "error",
+                    }
+                if item.get("status") == "error":
+                    errors += 1
+                if "latency_ms" in item:
+                    latencies.append(item["latency_ms"])
+                verdicts[item["validation_result"]] = verdicts.get(item["validation_result"], 0) + 1
+                yield item
+        finally:
+            for future in futures:
+                future.cancel()
+
+        elapsed = time.perf_counter() - start
+        ordered = sorted(latencies)
+        yield {
+            "type": "summary",
+            "total": len(claim_ids),
+            "succeeded": len(claim_ids) - errors,
+            "errors": errors,
+            "verdicts": verdicts,
+            "workers": VERIFY_BATCH_WORKERS,
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "throughput_per_s": round(len(claim_ids) / elapsed, 3) if elapsed > 0 else None,
+            "latency_ms": {
+                "mean": round(statistics.mean(ordered), 2),
+                "p50": round(statistics.median(ordered), 2),
+                "p95": ordered[max(0, math.ceil(len(ordered) * 0.95) - 1)],  # nearest rank
+                "max": ordered[-1],
+            } if ordered else None,
+        }
+
+    def _explain_verdict(self, claim_id: str, context: Dict[str, Any], verdict, emit: Optional[Emit] = None) -> str:
+        """Ask the LLM for an Indonesian explanation of an already decided verdict (single call, no tools)."""
+        messages = self._explanation_messages(claim_id, context, verdict)
+        if emit is None:
+            response = self.model.invoke(messages)
+            return self.clean_llm_response(response.content)
+
+        splitter = ThinkingSplitter(emit)
+        content = []
+        for chunk in self.model.stream(messages):
+            if isinstance(chunk.content, str):
+                splitter.feed(chunk.content)
+                content.append(chunk.content)
+        return self.clean_llm_response("".join(content))
+
+    @staticmethod
+    def _explanation_messages(claim_id: str, context: Dict[str, Any], verdict) -> list:
+        diagnosis = context.get("diagnosis") or {}
+        facts = "\n".join(
+            f"- {check.name}: {'LOLOS' if check.passed else ('GAGAL' if check.passed is False else 'TIDAK DAPAT DINILAI')} - {check.detail}"
+            for check in verdict.checks
+        )
+        return [
+            SystemMessage(
+                "You are a medical claim auditor. The verdict below was computed by deterministic rules "
+                "and is final. Do not change it or recompute any numbers. "
+                "Write a concise explanation in Indonesian language, and state the cost deviation percentage explicitly."
+            ),
+            HumanMessage(f"""
+Claim ID: {claim_id}
+Diagnosis: {diagnosis.get('name')} ({diagnosis.get('code')})
+Validation Result: {verdict.validation_result}
+Confidence Score: {verdict.confidence_score}%
+Check results:
+{facts}
+"""),
+        ]
+
+    def _verify_claim_with_agent(self, claim_id: str, emit: Optional[Emit] = None) -> Dict[str, Any]:
+        """
+        Verify a claim by claim ID using the exact logic from the notebook.
+        
+        Args:
+            claim_id: The claim ID to verify
+            emit: Optional event sink that receives the agent's tool_start/tool_end events
             
-            # Combine base chat history with current message
-            final_messages = self.base_chat_history + message
+        Returns:
+            Dictionary containing the verification result and metadata
+        """
+        try:
+            final_messages = self._claim_agent_messages(claim_id)
             
             # Create callback handler instance
-            callback_handler = ToolExecutionPrinter()
+            callbacks = [ToolExecutionPrinter()]
+            if emit is not None:
+                callbacks.append(EventCallbackHandler(emit))
             
             # Execute the agent with logging
-            print(f"[VERIFY_LOG] Processing form data verification")
+            print(f"[VERIFY_LOG] Processing claim verification for: {claim_id}")
             response = self.agent_executor.invoke(
                 {"messages": final_messages},
-                config={"callbacks": [callback_handler]}
+                config={"callbacks": callbacks}
             )
             
             # Extract raw content from response
@@ -310,37 +904,30 @@ Diagnosis Text: {form_data['diagnosis_text']}
             final_output = self.clean_llm_response(raw_content)
             
             # Parse the structured output to extract components
-            return self._parse_form_verification_output(final_output, form_data, raw_content, form_summary)
+            return self._parse_verification_output(final_output, claim_id, raw_content)
             
         except Exception as e:
-            return {
-                "form_data_summary": f"Error processing form data: {form_data}",
-                "validation_result": "ERROR",
-                "confidence_score": 0,
-                "detail_analysis": f"Error during verification: {str(e)}",
-                "explanation": f"Error during verification: {str(e)}",
-                "status": "error",
-                "metadata": {
-                    "error": str(e),
-                    "input_form_data": form_data
-                }
-            }
+            return self._claim_agent_error(claim_id, e)
 
-    def verify_claim(self, claim_id: str) -> Dict[str, Any]:
-        """
-        Verify a claim by claim ID using the exact logic from the notebook.
-        
-        Args:
-            claim_id: The claim ID to verify
-            
-        Returns:
-            Dictionary containing the verification result and metadata
-        """
+    async def _averify_claim_with_agent(self, claim_id: str) -> Dict[str, Any]:
         try:
-            # Prepare messages following the notebook pattern
-            message = [
-                HumanMessage(f"This is Claim ID: {claim_id}"),
-                HumanMessage(f"""
+            print(f"[VERIFY_LOG] Processing claim verification for: {claim_id}")
+            response = await self.agent_executor.ainvoke(
+                {"messages": self._claim_agent_messages(claim_id)},
+                config={"callbacks": [ToolExecutionPrinter()]}
+            )
+            raw_content = response['messages'][-1].content
+            final_output = self.clean_llm_response(raw_content)
+            return self._parse_verification_output(final_output, claim_id, raw_content)
+
+        except Exception as e:
+            return self._claim_agent_error(claim_id, e)
+
+    def _claim_agent_messages(self, claim_id: str) -> list:
+        # Prepare messages following the notebook pattern
+        message = [
+            HumanMessage(f"This is Claim ID: {claim_id}"),
+            HumanMessage(f"""
     Please follow these steps to analyze the claim. Be objective and allow for reasonable operational variances.
 
     1. **Data Retrieval**: 
@@ -382,43 +969,25 @@ Diagnosis Text: {form_data['diagnosis_text']}
        - **Explanation**: You MUST explicitly state the cost deviation percentage in your explanation (e.g., "Cost is 4.5% higher, which is within the acceptable 20% variance").
        - Use Indonesian Langauge for all responses.
     """)
-            ]
-            
-            # Combine base chat history with current message
-            final_messages = self.base_chat_history + message
-            
-            # Create callback handler instance
-            callback_handler = ToolExecutionPrinter()
-            
-            # Execute the agent with logging
-            print(f"[VERIFY_LOG] Processing claim verification for: {claim_id}")
-            response = self.agent_executor.invoke(
-                {"messages": final_messages},
-                config={"callbacks": [callback_handler]}
-            )
-            
-            # Extract raw content from response
-            raw_content = response['messages'][-1].content
-            
-            # Clean the response
-            final_output = self.clean_llm_response(raw_content)
-            
-            # Parse the structured output to extract components
-            return self._parse_verification_output(final_output, claim_id, raw_content)
-            
-        except Exception as e:
-            return {
-                "claim_id": claim_id,
-                "validation_result": "ERROR",
-                "confidence_score": 0,
-                "detail_claim_data": {},
-                "explanation": f"Error during verification: {str(e)}",
-                "status": "error",
-                "metadata": {
-                    "error": str(e),
-                    "input_claim_id": claim_id
-                }
+        ]
+        
+        # Combine base chat history with current message
+        return self.base_chat_history + message
+
+    @staticmethod
+    def _claim_agent_error(claim_id: str, error: Exception) -> Dict[str, Any]:
+        return {
+            "claim_id": claim_id,
+            "validation_result": "ERROR",
+            "confidence_score": 0,
+            "detail_claim_data": {},
+            "explanation": f"Error during verification: {str(error)}",
+            "status": "error",
+            "metadata": {
+                "error": str(error),
+                "input_claim_id": claim_id
             }
+        }
 
     def _parse_verification_output(self, output: str, claim_id: str, raw_content: str) -> Dict[str, Any]:
         """
@@ -0,0 +1,245 @@
+import sys
+import os
+import json
+import logging
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from typing import Any, Callable, Dict, List, Optional
+from chatbot.src.config import JOB_QUEUE_DB_PATH, JOB_WORKERS, JOB_POLL_INTERVAL, JOB_LEASE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    owner TEXT,
+    lease_expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+"""
+
+# Columns added after the first release, for queue files created before them
+LEASE_COLUMNS = {"owner": "TEXT", "lease_expires_at": "REAL"}
+
+# Queued jobs, and running jobs whose owner stopped renewing the lease (crashed or
+# stopped process). Rows without a lease predate leases and count as expired.
+CLAIMABLE = "(status = 'queued' OR (status = 'running' AND coalesce(lease_expires_at, 0) < ?))"
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue processed by a local pool of worker threads.
+
+    Jobs are rows in a SQLite file, so queued and finished jobs survive an API restart.
+    A claimed job is leased to the claiming process (owner) for lease_seconds, and a
+    heartbeat thread renews the leases of the jobs it is running. Several processes can
+    share the file: a job is only claimed again after its lease has expired, so a
+    restarting worker never takes over jobs that another live worker is running.
+    Handlers are registered per job kind and receive the job payload (a dict); their
+    return value is stored as the job result, and an exception marks the job failed.
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_DB_PATH, workers: int = JOB_WORKERS,
+                 poll_interval: float = JOB_POLL_INTERVAL, lease_seconds: float = JOB_LEASE_SECONDS):
+        self.path = path
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+        self._claim_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection per operation (commits on success, always closed)."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        if self._initialized:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in LEASE_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        self._initialized = True
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        self._handlers[kind] = handler
+
+    def start(self):
+        """Start the worker threads and the lease heartbeat (no-op if already running)."""
+        if self._threads:
+            return
+        self._init_db()
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the workers; a job that is still running is claimed again once its lease expires."""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self._init_db()
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, kind, json.dumps(payload), time.time()),
+            )
+        self._wakeup.set()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._init_db()
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def retry(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Queue a failed job again. Returns None for unknown jobs; raises ValueError if not failed."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job["status"] != "failed":
+            raise ValueError(f"Only failed jobs can be retried (job is {job['status']})")
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', error = NULL, result = NULL, started_at = NULL, "
+                "finished_at = NULL WHERE id = ? AND status = 'failed'",
+                (job_id,),
+            )
+        self._wakeup.set()
+        return self.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        self._init_db()
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, count(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return {"jobs": counts, "workers": self.workers if self._threads else 0, "owner": self.owner}
+
+    def _claim_next(self) -> Optional[Dict[str, Any]]:
+        # One claimer at a time inside this process; repeating the claimable check in
+        # the UPDATE keeps the claim safe when another process shares the file
+        with self._claim_lock, self._connect() as conn:
+            now = time.time()
+            row = conn.execute(
+                f"SELECT id FROM jobs WHERE {CLAIMABLE} ORDER BY created_at LIMIT 1", (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            updated = conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, owner = ?, lease_expires_at = ?, "
+                f"attempts = attempts + 1 WHERE id = ? AND {CLAIMABLE}",
+                (now, self.owner, now + self.lease_seconds, row["id"], now),
+            ).rowcount
+        return self.get(row["id"]) if updated else None
+
+    def _renew_leases(self) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE owner = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, self.owner),
+            ).rowcount
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                self._renew_leases()
+            except sqlite3.Error as e:
+                logger.warning(f"Renewing job leases failed: {e}")
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str]):
+        # Only the current lease holder records the outcome (a job whose lease expired
+        # may already run in another process)
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_expires_at = NULL "
+                "WHERE id = ? AND owner = ? AND status = 'running'",
+                (status, json.dumps(result, default=str) if result is not None else None, error, time.time(),
+                 job_id, self.owner),
+            ).rowcount
+        if not updated:
+            logger.warning(f"Job {job_id} was claimed by another worker after its lease expired; result discarded")
+
+    def _work(self):
+        while not self._stop.is_set():
+            job = self._claim_next()
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            handler = self._handlers.get(job["kind"])
+            try:
+                if handler is None:
+                    raise ValueError(f"No handler registered for job kind {job['kind']}")
+                self._finish(job["job_id"], "succeeded", handler(job["payload"]), None)
+            except Exception as e:
+                logger.warning(f"Job {job['job_id']} ({job['kind']}) failed: {e}")
+                self._finish(job["job_id"], "failed", None, str(e))
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        started, finished = row["started_at"], row["finished_at"]
+        return {
+            "job_id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "payload": json.loads(row["payload"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "started_at": started,
+            "finished_at": finished,
+            "queue_ms": round((started - row["created_at"]) * 1000, 2) if started else None,
+            "run_ms": round((finished - started) * 1000, 2) if started and finished else None,
+        }
+
+
+job_queue = JobQueue()
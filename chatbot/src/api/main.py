@@ -1,3 +1,4 @@
+import json
 import logging
 import sys
 import os
@@ -6,14 +7,26 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from typing import Optional, AsyncGenerator
 
 # Imports
-from chatbot.src.database import db
+from chatbot.src.config import VERIFY_BATCH_MAX_CLAIMS, ENTITY_SEARCH_BACKEND
+from chatbot.src.database import db, close_all, close_all_async
+from chatbot.src.embeddings import embedding_cache_stats
+from chatbot.src.entity_index import entity_index
+from chatbot.src.entity_resolver import entity_resolver
+from chatbot.src.graph_schema import graph_schema
+from chatbot.src.graph_version import graph_version
+from chatbot.src.reference_data import reference_data
+from chatbot.src.vector_store import vector_stores
+from chatbot.src.tool.execute_chyper import result_cache, plan_guard
 from .repository import HealthcareRepository
-from .schemas import HospitalResponse, DoctorResponse, ClaimResponse, DiagnosisResponse, QuestionRequest, ChatbotResponse, ClaimVerificationRequest, ClaimVerificationResponse, ClaimFormVerificationRequest, ClaimFormVerificationResponse, HospitalAnalysisResponse
-from .chatbot_service import ChatbotService
-from .claim_verification_service import ClaimVerificationService
+from .schemas import HospitalResponse, DoctorResponse, ClaimResponse, ClaimDetailResponse, DiagnosisResponse, QuestionRequest, ChatbotResponse, ClaimVerificationRequest, ClaimVerificationResponse, ClaimBatchVerificationRequest, JobResponse, ClaimFormVerificationRequest, ClaimFormVerificationResponse, HospitalAnalysisResponse
+from .chatbot_service import ChatbotService, answer_cache, exemplar_store
+from .claim_verification_service import ClaimVerificationService, verification_stats
+from .job_queue import job_queue
+from .streaming import SSE_HEADERS, stream_events
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,11 +40,34 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     """
     logger.info("Starting up...")
     db.connect()
+    try:
+        reference_data.load()
+    except Exception as e:
+        # verify-form retries the load on first use and falls back to the agent meanwhile
+        logger.warning(f"Reference data not loaded at startup: {e}")
+    try:
+        entity_resolver.load()
+    except Exception as e:
+        # RAG search retries the load on first use and uses vector search meanwhile
+        logger.warning(f"Entity catalogs not loaded at startup: {e}")
+    # Introspect the graph schema before the first chatbot question (falls back to the static text)
+    graph_schema.load()
+    if ENTITY_SEARCH_BACKEND == "local":
+        # In-process entity index, rebuilt when the graph version changes
+        entity_index.warm()
+    elif ENTITY_SEARCH_BACKEND == "neo4j":
+        # One Neo4jVector per entity index, shared by all RAG searches
+        vector_stores.warm()
+    job_queue.register("verify_claim", run_verify_claim_job)
+    job_queue.start()
     
     yield
     
     logger.info("Shutting down...")
-    db.close()
+    job_queue.stop()
+    vector_stores.close()
+    await close_all_async()
+    close_all()
 
 # --- App Definition ---
 app = FastAPI(
@@ -88,12 +124,41 @@ def get_verification_service():
         _verification_service = ClaimVerificationService()
     return _verification_service
 
+def run_verify_claim_job(payload: dict) -> dict:
+    """Job handler: verify one claim; a verification error fails the job so it can be retried."""
+    result = get_verification_service().verify_claim(payload["claim_id"], verdict_only=payload.get("verdict_only", False))
+    if result.get("status") == "error":
+        raise RuntimeError(result.get("explanation") or "verification failed")
+    return result
+
 # --- Routes ---
 
 @app.get("/", tags=["Health"])
 def read_root():
     return {"message": "BPJS-JKB API", "version": "1.0.0"}
 
+@app.get("/metrics", tags=["Health"])
+def get_metrics():
+    """
+    Runtime metrics for capacity planning (connection pool usage, cache hit rates).
+    """
+    return {
+        "graph_version": graph_version.current(),
+        "neo4j_pool": db.pool_metrics(),
+        "cypher_result_cache": result_cache.stats(),
+        "cypher_plan_guard": plan_guard.stats(),
+        "chatbot_answer_cache": answer_cache.stats(),
+        "chatbot_exemplars": exemplar_store.stats(),
+        "claim_verification": verification_stats.stats(),
+        "job_queue": job_queue.stats(),
+        "reference_data": reference_data.stats(),
+        "graph_schema": graph_schema.stats(),
+        "vector_stores": vector_stores.stats(),
+        "entity_index": entity_index.stats(),
+        "entity_resolver": entity_resolver.stats(),
+        "embedding_cache": embedding_cache_stats(),
+    }
+
 @app.get("/hospitals", response_model=HospitalResponse, tags=["Hospitals"])
 def get_hospitals(
     class_type: Optional[str] = Query(None, description="Filter by hospital class type"),
@@ -122,6 +187,23 @@ def get_claims(
     results = repo.get_claims(status, hospital_id, doctor_id)
     return {"data": results}
 
+@app.get("/claims/{claim_id}", response_model=ClaimDetailResponse, tags=["Claims"])
+def get_claim_detail(
+    claim_id: str,
+    repo: HealthcareRepository = Depends(get_repository)
+):
+    """
+    Claim detail bundle: claim data, diagnosis with its REQUIRES/TYPICALLY_TREATED_WITH
+    procedures, claimed procedures with average costs, the doctor's specialization and the
+    hospital's specialties/facilities, fetched in a single query.
+    """
+    from fastapi import HTTPException
+
+    bundle = repo.get_claim_bundle(claim_id)
+    if bundle is None:
+        raise HTTPException(status_code=404, detail=f"Claim {claim_id} not found")
+    return {"data": bundle}
+
 @app.get("/diagnoses", response_model=DiagnosisResponse, tags=["Diagnoses"])
 def get_diagnoses(
     severity_level: Optional[str] = Query(None, description="Filter by severity level (High/Medium/Low)"),
@@ -179,7 +261,7 @@ def analyze_hospital_claiming_behavior(
     }
 
 @app.post("/chatbot/ask", response_model=ChatbotResponse, tags=["Chatbot"])
-def ask_chatbot(
+async def ask_chatbot(
     request: QuestionRequest,
     chatbot_service: ChatbotService = Depends(get_chatbot_service)
 ):
@@ -189,20 +271,41 @@ def ask_chatbot(
     This endpoint replicates the functionality from the dani-chatbot.ipynb notebook,
     using the same agent-based approach with entity extraction, RAG search, 
     context building, schema linking, and Cypher query execution.
+
+    The agent runs on the event loop (async LLM calls, async Neo4j driver in the tools),
+    so concurrent questions do not each hold a worker thread while waiting.
     """
-    result = chatbot_service.process_question(request.question)
+    result = await chatbot_service.aprocess_question(request.question)
     return ChatbotResponse(**result)
 
+@app.post("/chatbot/ask/stream", tags=["Chatbot"])
+def ask_chatbot_stream(
+    request: QuestionRequest,
+    chatbot_service: ChatbotService = Depends(get_chatbot_service)
+):
+    """
+    Same as /chatbot/ask, streamed as server-sent events while the agent runs.
+
+    Events: `start` (sent immediately), `tool_start` / `tool_end` for every tool call,
+    `token` for the model's answer text and `thinking` for its <think> reasoning as they
+    are generated, then `result` with the /chatbot/ask response body (or `error`).
+    """
+    return StreamingResponse(
+        stream_events(lambda emit: chatbot_service.process_question(request.question, emit=emit)),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
 @app.post("/claims/verify", response_model=ClaimVerificationResponse, tags=["Claims"])
-def verify_claim(
+async def verify_claim(
     request: ClaimVerificationRequest,
     verification_service: ClaimVerificationService = Depends(get_verification_service)
 ):
     """
     Verify a claim for fraud detection using AI-powered medical knowledge graph analysis.
     
-    This endpoint replicates the functionality from the dani-verify-claim-id.ipynb notebook,
-    implementing the same multi-step validation process:
+    This endpoint implements the multi-step validation process from the
+    dani-verify-claim-id.ipynb notebook with a deterministic rule engine:
     
     1. Data Retrieval: Fetches claim data from Neo4j knowledge graph
     2. Validation Logic: 
@@ -212,21 +315,124 @@ def verify_claim(
        - Hospital capability verification
     3. Final Verdict: Returns FRAUD/NORMAL with confidence score and detailed explanation
     
-    The validation follows medical rules and allows for reasonable operational variances.
+    The verdict is computed without the LLM; the LLM only writes the Indonesian explanation.
+    Set `verdict_only` to skip the LLM and get the rule summary as explanation.
     """
-    result = verification_service.verify_claim(request.claim_id)
+    result = await verification_service.averify_claim(request.claim_id, verdict_only=request.verdict_only)
     return ClaimVerificationResponse(**result)
 
+@app.post("/claims/verify/stream", tags=["Claims"])
+def verify_claim_stream(
+    request: ClaimVerificationRequest,
+    verification_service: ClaimVerificationService = Depends(get_verification_service)
+):
+    """
+    Same as /claims/verify, streamed as server-sent events.
+
+    Events: `start` (sent immediately), `verdict` with the rule engine result as soon as
+    it is computed, `token` / `thinking` while the LLM writes the explanation (`tool_start` /
+    `tool_end` if the agent fallback runs), then `result` with the /claims/verify response
+    body (or `error`). Labelled claims and reused verdicts go straight to `result`.
+    """
+    return StreamingResponse(
+        stream_events(lambda emit: verification_service.verify_claim(
+            request.claim_id, verdict_only=request.verdict_only, emit=emit
+        )),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+@app.post("/claims/verify/batch", tags=["Claims"])
+def verify_claims_batch(
+    request: ClaimBatchVerificationRequest,
+    verification_service: ClaimVerificationService = Depends(get_verification_service)
+):
+    """
+    Verify many claims concurrently and stream the results as NDJSON (one JSON object per line).
+
+    Claims are selected by `claim_ids` or by a filter (`status`, where "NULL" means claims
+    without a label, `hospital_id`, `doctor_id`, `limit`). Verifications run on a worker
+    pool of `VERIFY_BATCH_WORKERS` threads and each result line is sent as soon as it is ready,
+    in completion order. The last line is a summary with verdict counts, throughput and
+    latency percentiles.
+
+    Example:
+    {"status": "NULL", "limit": 20, "verdict_only": true}
+    """
+    from fastapi import HTTPException
+
+    if request.claim_ids:
+        claim_ids = list(dict.fromkeys(request.claim_ids))
+    else:
+        session = db.get_session()
+        try:
+            limit = min(request.limit or VERIFY_BATCH_MAX_CLAIMS, VERIFY_BATCH_MAX_CLAIMS)
+            claim_ids = HealthcareRepository(session).get_claim_ids(
+                request.status, request.hospital_id, request.doctor_id, limit
+            )
+        finally:
+            session.close()
+
+    if len(claim_ids) > VERIFY_BATCH_MAX_CLAIMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch has {len(claim_ids)} claims; the maximum is {VERIFY_BATCH_MAX_CLAIMS}"
+        )
+
+    def ndjson():
+        for item in verification_service.verify_claims_batch(claim_ids, verdict_only=request.verdict_only):
+            yield json.dumps(item, default=str) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@app.post("/jobs/verify", response_model=JobResponse, status_code=202, tags=["Jobs"])
+def submit_verification_job(request: ClaimVerificationRequest):
+    """
+    Queue a claim verification and return the job immediately.
+
+    The job is stored in a SQLite queue (`JOB_QUEUE_DB_PATH`) and processed by
+    `JOB_WORKERS` background workers; poll `GET /jobs/{job_id}` for the result.
+    Queued jobs survive an API restart.
+    """
+    return job_queue.submit("verify_claim", {"claim_id": request.claim_id, "verdict_only": request.verdict_only})
+
+@app.get("/jobs/{job_id}", response_model=JobResponse, tags=["Jobs"])
+def get_job(job_id: str):
+    """
+    Status, result and timing (queue and run time) of a job.
+    """
+    from fastapi import HTTPException
+
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@app.post("/jobs/{job_id}/retry", response_model=JobResponse, status_code=202, tags=["Jobs"])
+def retry_job(job_id: str):
+    """
+    Queue a failed job again.
+    """
+    from fastapi import HTTPException
+
+    try:
+        job = job_queue.retry(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
 @app.post("/claims/verify-form", response_model=ClaimFormVerificationResponse, tags=["Claims"])
-def verify_claim_form(
+async def verify_claim_form(
     request: ClaimFormVerificationRequest,
     verification_service: ClaimVerificationService = Depends(get_verification_service)
 ):
     """
     Verify new claim form data for fraud detection using AI-powered medical knowledge graph analysis.
     
-    This endpoint replicates the functionality from the dani-verify-claim-form.ipynb notebook,
-    implementing the same multi-step validation process for raw form input data:
+    This endpoint applies the validation steps from the dani-verify-claim-form.ipynb notebook
+    with the rule engine, using reference tables held in memory (no database or LLM call):
     
     1. Procedure Consistency: Validates procedures are appropriate for the diagnosis
     2. Cost Analysis: Applies 20% variance rule comparing form cost vs ground truth
@@ -259,5 +465,5 @@ def verify_claim_form(
         "diagnosis_text": request.diagnosis_text
     }
     
-    result = verification_service.verify_form_data(form_data)
+    result = await verification_service.averify_form_data(form_data)
     return ClaimFormVerificationResponse(**result)
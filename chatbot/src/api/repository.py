@@ -2,6 +2,43 @@ from typing import List, Dict, Optional
 from neo4j import Session
 from fastapi import HTTPException
 
+# Everything needed to verify one claim in a single round trip. Pattern comprehensions
+# anchored on the claim replace the chained OPTIONAL MATCH fan-out, so procedures,
+# rules, specialties and facilities are never multiplied against each other.
+CLAIM_BUNDLE_QUERY = """
+MATCH (c:Claim {id: $claim_id})
+WITH c,
+     head([(c)-[:CODED_AS]->(d:Diagnosis) | d]) AS diagnosis,
+     head([(c)-[:SUBMITTED_BY]->(doc:Doctor) | doc]) AS doctor,
+     head([(c)-[:SUBMITTED_AT]->(h:Hospital) | h]) AS hospital
+RETURN c.id AS claim_id,
+       c.total_cost AS total_cost,
+       CASE WHEN c.status IS NULL OR toString(c.status) IN ['NaN', ''] THEN null ELSE c.status END AS status,
+       head([(c)-[:HAS_PATIENT]->(p:Patient) | p.name]) AS patient_name,
+       head([(c)-[:HAS_CLINICAL_NOTE]->(n:ClinicalNote) | n {.primary_diagnosis_text, .secondary_diagnosis_text}]) AS clinical_note,
+       doctor.id AS doctor_id,
+       hospital.id AS hospital_id,
+       diagnosis {.code, .name, .avg_cost, .severity} AS diagnosis,
+       [(c)-[:HAS_PRIMARY_PROCEDURE]->(pp:Procedure) | pp {.code, .name, .avg_cost}] AS primary_procedures,
+       [(c)-[:HAS_SECONDARY_PROCEDURE]->(sp:Procedure) | sp {.code, .name, .avg_cost}] AS secondary_procedures,
+       [(c)-[:CODED_AS]->(:Diagnosis)-[r]->(rp:Procedure) | {code: rp.code, name: rp.name, relationship: type(r)}] AS diagnosis_rules,
+       doctor {.id, .name, .specialization} AS doctor,
+       hospital {
+           .id, .name, .class,
+           specialties: [(hospital)-[:HAS_SPECIALTY]->(s:Specialty) | s.name],
+           facilities: [(hospital)-[:HAS_FACILITY]->(f:Facility) | f.name]
+       } AS hospital,
+       head([(c)-[:HAS_VERIFICATION]->(v:Verification) | v {.*}]) AS stored_verification
+"""
+
+# Unique-constraint lookup of an already validated claim (no traversal)
+CLAIM_STATUS_QUERY = """
+MATCH (c:Claim {id: $claim_id})
+RETURN c.id AS claim_id,
+       c.total_cost AS total_cost,
+       CASE WHEN c.status IS NULL OR toString(c.status) IN ['NaN', ''] THEN null ELSE c.status END AS status
+"""
+
 class HealthcareRepository:
     def __init__(self, session: Session):
         self.session = session
@@ -16,6 +53,17 @@ class HealthcareRepository:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+    async def arun_query(self, query: str, params: Dict = None) -> List[Dict]:
+        """run_query() for a repository constructed with an async session."""
+        async def read(tx):
+            result = await tx.run(query, params or {})
+            return [record.data() async for record in result]
+
+        try:
+            return await self.session.execute_read(read)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
     def get_hospitals(self, class_type: Optional[str], specialty: Optional[str]) -> List[Dict]:
         query = """
         MATCH (h:Hospital)
@@ -168,6 +216,58 @@ class HealthcareRepository:
         """
         return self.run_query(query, {"diagnosis_id": diagnosis_id})
 
+    def get_claim_ids(self, status: Optional[str], hospital_id: Optional[str],
+                      doctor_id: Optional[str], limit: int) -> List[str]:
+        """Claim IDs matching a batch filter; status "NULL" selects claims without a label."""
+        query = "MATCH (c:Claim)"
+        conditions = []
+        params = {"limit": limit}
+
+        if status and status.upper() == "NULL":
+            conditions.append("(c.status IS NULL OR toString(c.status) IN ['NaN', ''])")
+        elif status:
+            conditions.append("c.status = $status")
+            params["status"] = status.upper()
+        if hospital_id:
+            conditions.append("EXISTS { (c)-[:SUBMITTED_AT]->(:Hospital {id: $hospital_id}) }")
+            params["hospital_id"] = hospital_id
+        if doctor_id:
+            conditions.append("EXISTS { (c)-[:SUBMITTED_BY]->(:Doctor {id: $doctor_id}) }")
+            params["doctor_id"] = doctor_id
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        query += """
+        RETURN c.id AS claim_id
+        ORDER BY c.id
+        LIMIT $limit
+        """
+        return [row["claim_id"] for row in self.run_query(query, params)]
+
+    def get_claim_status(self, claim_id: str) -> Optional[Dict]:
+        """Stored status and cost of a claim, or None when the claim does not exist."""
+        results = self.run_query(CLAIM_STATUS_QUERY, {"claim_id": claim_id})
+        return results[0] if results else None
+
+    def get_claim_bundle(self, claim_id: str) -> Optional[Dict]:
+        """
+        Claim data, cost ground truth inputs, diagnosis->procedure rules, doctor
+        specialization, hospital specialties/facilities and the stored verification
+        (if any) in one query.
+        Returns None when the claim does not exist.
+        """
+        results = self.run_query(CLAIM_BUNDLE_QUERY, {"claim_id": claim_id})
+        return results[0] if results else None
+
+    async def aget_claim_status(self, claim_id: str) -> Optional[Dict]:
+        results = await self.arun_query(CLAIM_STATUS_QUERY, {"claim_id": claim_id})
+        return results[0] if results else None
+
+    async def aget_claim_bundle(self, claim_id: str) -> Optional[Dict]:
+        results = await self.arun_query(CLAIM_BUNDLE_QUERY, {"claim_id": claim_id})
+        return results[0] if results else None
+
     def analyze_hospital_claiming_behavior(self, hospital_id: str) -> Dict:
         """Analyze hospital behavior on claiming using normal distribution."""
         query = """
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional, Any
 
 class Location(BaseModel):
@@ -37,6 +37,35 @@ class Claim(BaseModel):
 class ClaimResponse(BaseModel):
     data: List[Claim]
 
+class ProcedureRef(BaseModel):
+    code: Optional[Any] = None  # seeded procedure codes are stored as numbers (e.g. 89.52)
+    name: Optional[str] = None
+    avg_cost: Optional[float] = None
+
+class DiagnosisRule(BaseModel):
+    code: Optional[Any] = None
+    name: Optional[str] = None
+    relationship: str
+
+class ClaimDetail(BaseModel):
+    claim_id: str
+    total_cost: Optional[float] = None
+    status: Optional[str] = None
+    patient_name: Optional[str] = None
+    clinical_note: Optional[dict] = None
+    doctor_id: Optional[str] = None
+    hospital_id: Optional[str] = None
+    diagnosis: Optional[dict] = None
+    primary_procedures: List[ProcedureRef] = []
+    secondary_procedures: List[ProcedureRef] = []
+    diagnosis_rules: List[DiagnosisRule] = []
+    doctor: Optional[dict] = None
+    hospital: Optional[dict] = None
+    stored_verification: Optional[dict] = None
+
+class ClaimDetailResponse(BaseModel):
+    data: ClaimDetail
+
 class Diagnosis(BaseModel):
     diagnosis_id: str
     icd10_code: str
@@ -59,6 +88,7 @@ class ChatbotResponse(BaseModel):
 # Claim Verification schemas
 class ClaimVerificationRequest(BaseModel):
     claim_id: str = Field(..., description="The claim ID to verify", min_length=1)
+    verdict_only: bool = Field(default=False, description="Return the rule-based verdict without an LLM-written explanation")
 
 class ClaimVerificationResponse(BaseModel):
     claim_id: str = Field(..., description="The verified claim ID")
@@ -67,6 +97,36 @@ class ClaimVerificationResponse(BaseModel):
     detail_claim_data: dict = Field(..., description="Detailed claim data from the database")
     explanation: str = Field(..., description="Detailed explanation of the validation")
     status: str = Field(default="success", description="Response status")
+    metadata: Optional[dict] = Field(default=None, description="Check results and timing of the verification")
+
+class ClaimBatchVerificationRequest(BaseModel):
+    claim_ids: Optional[List[str]] = Field(default=None, description="Claim IDs to verify")
+    status: Optional[str] = Field(default=None, description="Filter: claim status (NORMAL/FRAUD), or NULL for claims without a label")
+    hospital_id: Optional[str] = Field(default=None, description="Filter: hospital ID")
+    doctor_id: Optional[str] = Field(default=None, description="Filter: doctor ID")
+    limit: Optional[int] = Field(default=None, description="Max claims selected by the filter", gt=0)
+    verdict_only: bool = Field(default=False, description="Return rule-based verdicts without LLM-written explanations")
+
+    @model_validator(mode="after")
+    def require_claims_or_filter(self):
+        if not self.claim_ids and not (self.status or self.hospital_id or self.doctor_id):
+            raise ValueError("Provide claim_ids or at least one filter (status, hospital_id, doctor_id)")
+        return self
+
+# Verification job schemas
+class JobResponse(BaseModel):
+    job_id: str = Field(..., description="Job ID")
+    kind: str = Field(..., description="Job type, e.g. verify_claim")
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    payload: dict = Field(..., description="Job input")
+    result: Optional[dict] = Field(default=None, description="Job output once succeeded")
+    error: Optional[str] = Field(default=None, description="Error message once failed")
+    attempts: int = Field(..., description="Number of times the job was started")
+    created_at: float = Field(..., description="Submission time (unix seconds)")
+    started_at: Optional[float] = Field(default=None, description="Start time of the last attempt (unix seconds)")
+    finished_at: Optional[float] = Field(default=None, description="Finish time of the last attempt (unix seconds)")
+    queue_ms: Optional[float] = Field(default=None, description="Time spent waiting in the queue")
+    run_ms: Optional[float] = Field(default=None, description="Time spent running the last attempt")
 
 # Form Verification schemas
 class ClaimFormVerificationRequest(BaseModel):
@@ -0,0 +1,102 @@
+import sys
+import os
+import json
+import queue
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from typing import Any, Callable, Dict, Iterator
+from chatbot.src.config import STREAM_HEARTBEAT_INTERVAL
+from langchain_core.callbacks import BaseCallbackHandler
+
+# emit(event, data) - how services report progress to a stream
+Emit = Callable[[str, Dict[str, Any]], None]
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+_DONE = object()
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """One server-sent event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class EventCallbackHandler(BaseCallbackHandler):
+    """Forwards the agent's tool start/end callbacks to a stream as events."""
+
+    def __init__(self, emit: Emit):
+        self.emit = emit
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        """Run when a tool starts running."""
+        self.emit("tool_start", {"tool": (serialized or {}).get("name"), "input": input_str})
+
+    def on_tool_end(self, output, **kwargs):
+        """Run when a tool ends running."""
+        content = getattr(output, "content", output)
+        self.emit("tool_end", {"tool": kwargs.get("name"), "output_chars": len(str(content))})
+
+
+class ThinkingSplitter:
+    """
+    Routes streamed model text to "token" events, and text inside <think>...</think>
+    to "thinking" events, so clients can show or hide the model's reasoning.
+    """
+
+    def __init__(self, emit: Emit):
+        self.emit = emit
+        self.thinking = False
+
+    def feed(self, text: str):
+        while text:
+            tag = "</think>" if self.thinking else "<think>"
+            index = text.find(tag)
+            part = text if index < 0 else text[:index]
+            if part:
+                self.emit("thinking" if self.thinking else "token", {"text": part})
+            if index < 0:
+                return
+            self.thinking = not self.thinking
+            text = text[index + len(tag):]
+
+
+def stream_events(work: Callable[[Emit], Dict[str, Any]],
+                  heartbeat_interval: float = STREAM_HEARTBEAT_INTERVAL) -> Iterator[str]:
+    """
+    Run work(emit) on a worker thread and yield SSE frames as it emits events.
+
+    A "start" event is sent immediately, then every emitted event in order, and finally
+    "result" with the value work returned (or "error" if it raised). Keep-alive comments
+    are sent while the worker is quiet. If the client disconnects, the worker finishes
+    in the background and its remaining events are dropped.
+    """
+    events: "queue.Queue" = queue.Queue()
+    closed = threading.Event()
+
+    def emit(event: str, data: Dict[str, Any]):
+        if not closed.is_set():
+            events.put((event, data))
+
+    def run():
+        try:
+            events.put(("result", work(emit)))
+        except Exception as e:
+            events.put(("error", {"error": str(e)}))
+        finally:
+            events.put(_DONE)
+
+    yield format_sse("start", {})
+    threading.Thread(target=run, name="sse-worker", daemon=True).start()
+    try:
+        while True:
+            try:
+                item = events.get(timeout=heartbeat_interval)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if item is _DONE:
+                return
+            yield format_sse(*item)
+    finally:
+        closed.set()
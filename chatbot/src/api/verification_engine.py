@@ -0,0 +1,330 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from chatbot.src.api.repository import HealthcareRepository
+
+# Bump when the rules change so stored verdicts computed by older rules are not reused
+ENGINE_VERSION = "1"
+
+# The 20% rule: claim cost may exceed diagnosis + procedure averages by at most this much
+COST_DEVIATION_THRESHOLD = 0.20
+
+# Statuses that mean the claim was already validated
+FINAL_STATUSES = ("FRAUD", "NORMAL")
+
+# GPs and internists may diagnose, consult and order standard scans for any condition
+GENERALIST_SPECIALIZATIONS = ("gp", "general practitioner", "dokter umum", "internal medicine", "internist")
+
+# ICD-10 prefixes each specialist may treat as attending doctor for High severity diagnoses.
+# Specializations that are not listed are not judged (no hard contradiction can be shown).
+SPECIALIZATION_SCOPES = {
+    "cardiolog": ("I", "R07"),
+    "orthop": ("S", "M"),
+    "surgeon": ("K", "S", "O", "C", "I7"),
+    "pediatric": ("A", "B", "J", "R", "U", "E", "K29", "N39"),
+    "radiolog": (),
+    "ophthalmolog": ("H",),
+    "neurolog": ("I6", "G", "R40"),
+    "oncolog": ("C",),
+    "obstetric": ("O", "N"),
+    "gynecolog": ("O", "N"),
+}
+
+# Procedures only specific specialists may perform; the first matching keyword group wins
+SPECIALIST_PROCEDURES = [
+    (("pci", "angiography", "stent"), ("cardiolog",)),
+    (("chemotherapy",), ("oncolog",)),
+    (("orif", "fracture"), ("orthop", "surgeon")),
+    (("phacoemulsification", "cataract"), ("ophthalmolog",)),
+    (("caesarean",), ("obstetric", "gynecolog", "surgeon")),
+    (("mastectomy",), ("surgeon", "oncolog")),
+    (("surgery", "ectomy", "repair"), ("surgeon",)),
+]
+
+# Imaging and lab work count as standard diagnostic tools for any diagnosis
+DIAGNOSTIC_PROCEDURE_KEYWORDS = ("scan", "mri", "x-ray", "ekg", "blood count", "test", "culture", "usg")
+
+# Broad keywords that show a hospital can handle a diagnosis group (matched on specialties + facilities)
+CAPABILITY_KEYWORDS = [
+    (("I2",), ("cardio", "heart", "jantung", "cath", "cvcu", "icu")),
+    (("I6", "R40"), ("neuro", "brain", "stroke", "icu", "internal medicine", "ct scan", "ct-scan", "mri")),
+    (("C",), ("oncolog", "chemo", "cancer", "onkologi")),
+    (("S",), ("ortho", "surg", "bedah", "x-ray", "radiolog", "operating", "trauma")),
+    (("K35", "K40", "K80"), ("surg", "bedah", "operating", "icu")),
+    (("O",), ("obstetric", "gynecolog", "kebidanan", "surg", "operating", "icu")),
+    (("N18",), ("hemodialysis", "dialysis", "renal", "internal medicine")),
+    (("H25",), ("cataract", "ophthalm", "eye", "mata")),
+]
+
+
+class CheckResult(NamedTuple):
+    name: str
+    passed: Optional[bool]  # None when the data needed for the check is missing
+    detail: str
+
+
+class EngineVerdict(NamedTuple):
+    validation_result: str
+    confidence_score: int
+    source: str  # "stored_status" or "rules"
+    checks: List[CheckResult]
+    cost_deviation: Optional[float]
+    ground_truth_cost: Optional[float]
+
+
+def load_claim_context(session, claim_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch the facts the checks need for one claim (a single bundle query),
+    or None when the claim does not exist.
+    """
+    return HealthcareRepository(session).get_claim_bundle(claim_id)
+
+
+async def aload_claim_context(session, claim_id: str) -> Optional[Dict[str, Any]]:
+    """load_claim_context() with an async session."""
+    return await HealthcareRepository(session).aget_claim_bundle(claim_id)
+
+
+def build_form_context(reference, form_data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Claim context for a not yet submitted form, resolved against an in-memory
+    ReferenceSnapshot instead of the database. Returns (context, unresolved fields);
+    an unknown procedure is treated like an uncodified one (cost 0), as the loader does.
+    """
+    unresolved = []
+    diagnosis = reference.diagnosis(form_data["diagnosa_id"])
+    doctor = reference.doctor(form_data["doctor_id"])
+    hospital = reference.hospital(form_data["hospital_id"])
+    for field, found in (("diagnosa_id", diagnosis), ("doctor_id", doctor), ("hospital_id", hospital)):
+        if found is None:
+            unresolved.append(field)
+
+    procedures = {}
+    for field in ("primary_procedure", "secondary_procedure"):
+        text = (form_data.get(field) or "").strip()
+        if not text:
+            procedures[field] = []
+            continue
+        found = reference.procedure(text)
+        if found is None:
+            unresolved.append(field)
+            found = {"code": "UNCODIFIED", "name": text, "avg_cost": 0.0}
+        procedures[field] = [found]
+
+    context = {
+        "claim_id": None,
+        "total_cost": form_data["total_cost"],
+        "status": None,
+        "diagnosis": diagnosis,
+        "primary_procedures": procedures["primary_procedure"],
+        "secondary_procedures": procedures["secondary_procedure"],
+        "diagnosis_rules": reference.rules(diagnosis["code"]) if diagnosis else [],
+        "doctor": doctor,
+        "hospital": hospital,
+    }
+    return context, unresolved
+
+
+def _rupiah(value: float) -> str:
+    return "Rp " + f"{value:,.0f}".replace(",", ".")
+
+
+def _is_uncodified(procedure: Dict[str, Any]) -> bool:
+    return not procedure.get("code") or str(procedure["code"]).startswith("UNCODIFIED")
+
+
+def _stored_status(status: Any) -> Optional[str]:
+    # Unlabelled claims are stored as null or NaN
+    if isinstance(status, str) and status.strip().upper() in FINAL_STATUSES:
+        return status.strip().upper()
+    return None
+
+
+def check_cost(total_cost: Optional[float], diagnosis: Optional[Dict[str, Any]],
+               procedures: List[Dict[str, Any]]) -> CheckResult:
+    """Compare claim cost with diagnosis avg cost + procedure avg costs (the 20% rule)."""
+    if total_cost is None or not diagnosis or diagnosis.get("avg_cost") is None:
+        return CheckResult("cost", None, "Biaya klaim atau biaya rata-rata diagnosis tidak tersedia.")
+
+    ground_truth = float(diagnosis["avg_cost"]) + sum(float(p.get("avg_cost") or 0) for p in procedures)
+    if ground_truth <= 0:
+        return CheckResult("cost", None, "Ground truth biaya bernilai 0, deviasi tidak dapat dihitung.")
+
+    deviation = (float(total_cost) - ground_truth) / ground_truth
+    direction = "lebih tinggi" if deviation >= 0 else "lebih rendah"
+    detail = (
+        f"Biaya klaim {_rupiah(total_cost)} {direction} {abs(deviation) * 100:.1f}% dari ground truth "
+        f"{_rupiah(ground_truth)} (rata-rata diagnosis + prosedur)"
+    )
+    if deviation > COST_DEVIATION_THRESHOLD:
+        return CheckResult("cost", False, detail + f", melebihi toleransi {COST_DEVIATION_THRESHOLD:.0%}.")
+    return CheckResult("cost", True, detail + f", masih dalam toleransi {COST_DEVIATION_THRESHOLD:.0%}.")
+
+
+def check_procedure_consistency(diagnosis: Optional[Dict[str, Any]], procedures: List[Dict[str, Any]],
+                                diagnosis_rules: List[Dict[str, Any]]) -> CheckResult:
+    """Primary procedures must be REQUIRES/TYPICALLY_TREATED_WITH targets of the diagnosis."""
+    primary = [p for p in procedures if p.get("role", "primary") == "primary"]
+    if not diagnosis or not primary:
+        return CheckResult("procedure_consistency", None, "Diagnosis atau prosedur utama tidak tersedia.")
+    if not diagnosis_rules:
+        return CheckResult(
+            "procedure_consistency", None,
+            f"Tidak ada aturan prosedur untuk diagnosis {diagnosis.get('code')}."
+        )
+
+    allowed = {str(rule["code"]) for rule in diagnosis_rules}
+    mismatched = []
+    for procedure in primary:
+        name = (procedure.get("name") or "").lower()
+        if _is_uncodified(procedure) or str(procedure["code"]) in allowed:
+            continue
+        if any(keyword in name for keyword in DIAGNOSTIC_PROCEDURE_KEYWORDS):
+            continue
+        mismatched.append(procedure.get("name"))
+
+    if mismatched:
+        return CheckResult(
+            "procedure_consistency", False,
+            f"Prosedur {', '.join(mismatched)} tidak sesuai dengan diagnosis {diagnosis.get('name')} "
+            f"(tidak termasuk REQUIRES/TYPICALLY_TREATED_WITH)."
+        )
+    return CheckResult(
+        "procedure_consistency", True,
+        f"Prosedur utama sesuai dengan diagnosis {diagnosis.get('name')}."
+    )
+
+
+def check_doctor_specialization(doctor: Optional[Dict[str, Any]], diagnosis: Optional[Dict[str, Any]],
+                                procedures: List[Dict[str, Any]]) -> CheckResult:
+    """Flag only hard contradictions; GPs and internists are valid for diagnosis and standard scans."""
+    if not doctor or not doctor.get("specialization"):
+        return CheckResult("doctor_specialization", None, "Spesialisasi dokter tidak tersedia.")
+
+    specialization = doctor["specialization"].lower()
+    label = f"{doctor.get('name') or doctor.get('id')} ({doctor['specialization']})"
+
+    for procedure in procedures:
+        if procedure.get("role", "primary") != "primary":
+            continue
+        name = (procedure.get("name") or "").lower()
+        for keywords, allowed in SPECIALIST_PROCEDURES:
+            if any(keyword in name for keyword in keywords):
+                if not any(spec in specialization for spec in allowed):
+                    return CheckResult(
+                        "doctor_specialization", False,
+                        f"Dokter {label} tidak berwenang melakukan prosedur {procedure.get('name')}."
+                    )
+                break
+
+    if any(spec in specialization for spec in GENERALIST_SPECIALIZATIONS):
+        return CheckResult("doctor_specialization", True, f"Dokter {label} valid (pengecualian dokter umum/penyakit dalam).")
+
+    code = (diagnosis or {}).get("code") or ""
+    severity = ((diagnosis or {}).get("severity") or "").lower()
+    if severity == "high":
+        for spec, prefixes in SPECIALIZATION_SCOPES.items():
+            if spec in specialization and not any(code.startswith(prefix) for prefix in prefixes):
+                return CheckResult(
+                    "doctor_specialization", False,
+                    f"Dokter {label} menangani diagnosis berat {diagnosis.get('name')} di luar bidangnya."
+                )
+    return CheckResult("doctor_specialization", True, f"Tidak ada kontradiksi spesialisasi untuk dokter {label}.")
+
+
+def check_hospital_capability(hospital: Optional[Dict[str, Any]], diagnosis: Optional[Dict[str, Any]]) -> CheckResult:
+    """Broad keyword match between the diagnosis group and hospital specialties/facilities."""
+    if not hospital:
+        return CheckResult("hospital_capability", None, "Data rumah sakit tidak tersedia.")
+
+    code = (diagnosis or {}).get("code") or ""
+    required = next((keywords for prefixes, keywords in CAPABILITY_KEYWORDS
+                     if any(code.startswith(prefix) for prefix in prefixes)), None)
+    if required is None:
+        return CheckResult(
+            "hospital_capability", True,
+            f"Diagnosis {code} tidak memerlukan fasilitas khusus di {hospital.get('name')}."
+        )
+
+    capabilities = [c for c in (hospital.get("specialties") or []) + (hospital.get("facilities") or []) if c]
+    matched = [c for c in capabilities if any(keyword in c.lower() for keyword in required)]
+    if matched:
+        return CheckResult(
+            "hospital_capability", True,
+            f"{hospital.get('name')} memiliki fasilitas/spesialisasi yang relevan: {', '.join(matched)}."
+        )
+    return CheckResult(
+        "hospital_capability", False,
+        f"{hospital.get('name')} tidak memiliki fasilitas/spesialisasi yang relevan untuk diagnosis {code}."
+    )
+
+
+def _confidence(checks: List[CheckResult], cost_deviation: Optional[float]) -> int:
+    failed = [check for check in checks if check.passed is False]
+    unknown = sum(1 for check in checks if check.passed is None)
+    if failed:
+        score = 75 + 10 * (len(failed) - 1)
+        if cost_deviation is not None and cost_deviation > COST_DEVIATION_THRESHOLD:
+            score += min(15, int((cost_deviation - COST_DEVIATION_THRESHOLD) * 100 / 4))
+        return min(99, score)
+    score = 95 - 10 * unknown
+    if cost_deviation is not None and cost_deviation > COST_DEVIATION_THRESHOLD / 2:
+        score -= 10
+    return max(50, score)
+
+
+def evaluate_claim(context: Dict[str, Any]) -> EngineVerdict:
+    """
+    Deterministic verdict for a claim context (as returned by load_claim_context).
+
+    A stored FRAUD/NORMAL status is returned as-is with confidence 100; otherwise the
+    claim is FRAUD when any of the four checks fails.
+    """
+    stored = _stored_status(context.get("status"))
+    if stored:
+        return EngineVerdict(stored, 100, "stored_status", [], None, None)
+
+    procedures = (
+        [{**p, "role": "primary"} for p in context.get("primary_procedures") or [] if p and p.get("name")]
+        + [{**p, "role": "secondary"} for p in context.get("secondary_procedures") or [] if p and p.get("name")]
+    )
+    diagnosis = context.get("diagnosis")
+
+    cost = check_cost(context.get("total_cost"), diagnosis, procedures)
+    checks = [
+        cost,
+        check_procedure_consistency(diagnosis, procedures, context.get("diagnosis_rules") or []),
+        check_doctor_specialization(context.get("doctor"), diagnosis, procedures),
+        check_hospital_capability(context.get("hospital"), diagnosis),
+    ]
+
+    ground_truth = None
+    deviation = None
+    if cost.passed is not None:
+        ground_truth = float(diagnosis["avg_cost"]) + sum(float(p.get("avg_cost") or 0) for p in procedures)
+        deviation = (float(context["total_cost"]) - ground_truth) / ground_truth
+
+    result = "FRAUD" if any(check.passed is False for check in checks) else "NORMAL"
+    return EngineVerdict(result, _confidence(checks, deviation), "rules", checks, deviation, ground_truth)
+
+
+def summarize_verdict(claim_id: str, verdict: EngineVerdict) -> str:
+    """Plain Indonesian explanation built from the check details (no LLM)."""
+    if verdict.source == "stored_status":
+        return f"Klaim {claim_id} sudah divalidasi sebelumnya dengan status {verdict.validation_result}."
+    lines = [f"Klaim {claim_id} dinilai {verdict.validation_result} berdasarkan pemeriksaan berikut:"]
+    for check in verdict.checks:
+        mark = "LOLOS" if check.passed else ("GAGAL" if check.passed is False else "TIDAK DAPAT DINILAI")
+        lines.append(f"- [{mark}] {check.detail}")
+    return "\n".join(lines)
+
+
+def verdict_metadata(verdict: EngineVerdict) -> Dict[str, Any]:
+    return {
+        "source": verdict.source,
+        "cost_deviation_pct": round(verdict.cost_deviation * 100, 2) if verdict.cost_deviation is not None else None,
+        "ground_truth_cost": verdict.ground_truth_cost,
+        "checks": [check._asdict() for check in verdict.checks],
+    }
@@ -3,4 +3,92 @@ import os
 NEO4J_URI = os.getenv("NEO4J_URI", "neo4j://localhost:7687")
 NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "12345678")
-NEO4J_AUTH = (NEO4J_USERNAME, NEO4J_PASSWORD)
\ No newline at end of file
+NEO4J_AUTH = (NEO4J_USERNAME, NEO4J_PASSWORD)
+
+# Connection pool settings for the shared Neo4j driver (seconds for time values)
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "60"))
+
+# Graph data version polling (seconds between checks for writes made by other processes)
+GRAPH_VERSION_CHECK_INTERVAL = float(os.getenv("GRAPH_VERSION_CHECK_INTERVAL", "5"))
+
+# Graph schema introspection: relationships sampled per type to find the labels each type connects
+SCHEMA_RELATIONSHIP_SAMPLE = int(os.getenv("SCHEMA_RELATIONSHIP_SAMPLE", "1000"))
+
+# execute_cypher result cache
+CYPHER_CACHE_SIZE = int(os.getenv("CYPHER_CACHE_SIZE", "512"))
+CYPHER_CACHE_TTL = float(os.getenv("CYPHER_CACHE_TTL", "600"))
+# Rewrite inline literals in agent Cypher into $parameters for plan cache reuse
+CYPHER_PARAMETERIZE_LITERALS = os.getenv("CYPHER_PARAMETERIZE_LITERALS", "true").lower() == "true"
+
+# EXPLAIN pre-flight guard for execute_cypher
+CYPHER_PLAN_GUARD_ENABLED = os.getenv("CYPHER_PLAN_GUARD_ENABLED", "true").lower() == "true"
+CYPHER_MAX_ESTIMATED_ROWS = float(os.getenv("CYPHER_MAX_ESTIMATED_ROWS", "1000000"))
+CYPHER_MAX_LABEL_SCAN_ROWS = float(os.getenv("CYPHER_MAX_LABEL_SCAN_ROWS", "200000"))
+CYPHER_PLAN_CACHE_SIZE = int(os.getenv("CYPHER_PLAN_CACHE_SIZE", "1024"))
+
+# execute_cypher result bounds and encoding ("table" or "json")
+CYPHER_MAX_ROWS = int(os.getenv("CYPHER_MAX_ROWS", "50"))
+CYPHER_MAX_BYTES = int(os.getenv("CYPHER_MAX_BYTES", "16000"))
+CYPHER_MAX_COUNTED_ROWS = int(os.getenv("CYPHER_MAX_COUNTED_ROWS", "100000"))
+CYPHER_RESULT_FORMAT = os.getenv("CYPHER_RESULT_FORMAT", "table")
+
+# Batch claim verification: concurrent verifications (size to the LLM backend) and max claims per batch
+VERIFY_BATCH_WORKERS = int(os.getenv("VERIFY_BATCH_WORKERS", "4"))
+VERIFY_BATCH_MAX_CLAIMS = int(os.getenv("VERIFY_BATCH_MAX_CLAIMS", "1000"))
+
+# Verification job queue (SQLite file, worker threads, idle poll interval in seconds)
+JOB_QUEUE_DB_PATH = os.getenv("JOB_QUEUE_DB_PATH", "jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+# Seconds a claimed job stays leased to its process without a heartbeat; expired jobs are run again
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+# Server-sent event streams: seconds without events before a keep-alive comment is sent
+STREAM_HEARTBEAT_INTERVAL = float(os.getenv("STREAM_HEARTBEAT_INTERVAL", "15"))
+
+# Embedding model (OpenAI-compatible endpoint) used for the vector indexes, RAG search and the answer cache
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-qwen3-embedding-4b")
+EMBEDDING_BASE_URL = os.getenv("EMBEDDING_BASE_URL", "http://127.0.0.1:1234/v1")
+
+# Embedding cache keyed by (model, normalized text): in-process LRU in front of a SQLite index plus a
+# memory-mapped float32 matrix file that several API workers and the data scripts share
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3")
+EMBEDDING_CACHE_READONLY = os.getenv("EMBEDDING_CACHE_READONLY", "false").lower() == "true"
+EMBEDDING_CACHE_MEMORY_SIZE = int(os.getenv("EMBEDDING_CACHE_MEMORY_SIZE", "4096"))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+
+# Entity name resolution for rag_enhanced_search and assess_entity_risk: "neo4j" (a vector index query per term),
+# "neo4j_multi" (all vector searches of a RAG step in one query) or "local" (in-process index of the node
+# embeddings, rebuilt when the graph version changes)
+ENTITY_SEARCH_BACKEND = os.getenv("ENTITY_SEARCH_BACKEND", "neo4j").lower()
+# Local entity index: directory of the memory-mapped matrix files, "float32" or "int8" rows,
+# "exact" or "hnsw" search (hnsw needs the optional hnswlib package)
+ENTITY_INDEX_PATH = os.getenv("ENTITY_INDEX_PATH", "entity_index")
+ENTITY_INDEX_QUANTIZATION = os.getenv("ENTITY_INDEX_QUANTIZATION", "float32").lower()
+ENTITY_INDEX_ALGORITHM = os.getenv("ENTITY_INDEX_ALGORITHM", "exact").lower()
+
+# Exact ID/code, normalized-name and trigram lookup before vector search in rag_enhanced_search
+# (trigram matches need at least this Jaccard similarity)
+ENTITY_RESOLVER_ENABLED = os.getenv("ENTITY_RESOLVER_ENABLED", "true").lower() == "true"
+ENTITY_RESOLVER_TRIGRAM_THRESHOLD = float(os.getenv("ENTITY_RESOLVER_TRIGRAM_THRESHOLD", "0.6"))
+
+# Semantic answer cache for /chatbot/ask: questions whose embeddings reach the cosine threshold share an answer
+CHATBOT_CACHE_ENABLED = os.getenv("CHATBOT_CACHE_ENABLED", "true").lower() == "true"
+CHATBOT_CACHE_SIZE = int(os.getenv("CHATBOT_CACHE_SIZE", "256"))
+CHATBOT_CACHE_TTL = float(os.getenv("CHATBOT_CACHE_TTL", "3600"))
+CHATBOT_CACHE_THRESHOLD = float(os.getenv("CHATBOT_CACHE_THRESHOLD", "0.92"))
+
+# /chatbot/ask workflow: "agent" (ReAct agent picks each tool) or "pipeline" (fixed steps, agent only after Cypher errors)
+CHATBOT_MODE = os.getenv("CHATBOT_MODE", "agent").lower()
+
+# Question->Cypher exemplar store (SQLite file): few-shot examples per Cypher prompt, and reuse of a
+# stored query for questions that only differ in entity literals
+EXEMPLAR_ENABLED = os.getenv("EXEMPLAR_ENABLED", "true").lower() == "true"
+EXEMPLAR_DB_PATH = os.getenv("EXEMPLAR_DB_PATH", "exemplars.sqlite3")
+EXEMPLAR_MAX_ENTRIES = int(os.getenv("EXEMPLAR_MAX_ENTRIES", "2000"))
+EXEMPLAR_FEW_SHOT = int(os.getenv("EXEMPLAR_FEW_SHOT", "3"))
+EXEMPLAR_MIN_SIMILARITY = float(os.getenv("EXEMPLAR_MIN_SIMILARITY", "0.7"))
+EXEMPLAR_REUSE_SIMILARITY = float(os.getenv("EXEMPLAR_REUSE_SIMILARITY", "0.85"))
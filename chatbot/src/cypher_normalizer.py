@@ -0,0 +1,177 @@
+import re
+from typing import Any, Dict, List, NamedTuple
+
+# Agent-generated Cypher inlines literals (claim IDs, ICD-10 codes, names), so every
+# question produces a query text Neo4j has never planned before. Lifting the literals
+# into parameters makes structurally identical queries share one cached plan.
+
+PARAM_PREFIX = "lit_"
+
+# Literals after these tokens stay inline: LIMIT/SKIP values keep row estimates exact,
+# CYPHER takes version/options, and numbers in variable-length relationship patterns
+# ([:REL*1..3]) cannot be parameters at all.
+_KEEP_AFTER_KEYWORDS = {"LIMIT", "SKIP", "CYPHER"}
+_KEEP_AFTER_SYMBOLS = {"*", ".."}
+
+_NUMBER = re.compile(r'0[xX][0-9a-fA-F]+|(?:\d+\.\d+|\.\d+|\d+)(?:[eE][+-]?\d+)?')
+_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_DIGITS = re.compile(r'\d+')
+_WHITESPACE = re.compile(r'\s+')
+_ESCAPES = {
+    "\\": "\\", "'": "'", '"': '"', "n": "\n", "t": "\t",
+    "r": "\r", "b": "\b", "f": "\f",
+}
+
+
+class ParameterizedQuery(NamedTuple):
+    text: str
+    params: Dict[str, Any]
+
+
+def _read_string(query: str, start: int):
+    """Read a quoted Cypher string starting at `start`; return (value, end_index)."""
+    quote = query[start]
+    chars: List[str] = []
+    i = start + 1
+    while i < len(query):
+        ch = query[i]
+        if ch == "\\" and i + 1 < len(query):
+            nxt = query[i + 1]
+            if nxt == "u" and i + 5 < len(query):
+                chars.append(chr(int(query[i + 2:i + 6], 16)))
+                i += 6
+                continue
+            chars.append(_ESCAPES.get(nxt, "\\" + nxt))
+            i += 2
+            continue
+        if ch == quote:
+            return "".join(chars), i + 1
+        chars.append(ch)
+        i += 1
+    raise ValueError("Unterminated string literal")
+
+
+def _parse_number(token: str):
+    if token.lower().startswith("0x"):
+        return int(token, 16)
+    if any(c in token for c in ".eE"):
+        return float(token)
+    return int(token)
+
+
+def parameterize_cypher(query: str) -> ParameterizedQuery:
+    """
+    Replace string and number literals with `$lit_N` parameters.
+
+    Also drops comments and collapses whitespace, so the returned text is a stable
+    "query shape". Queries the tokenizer cannot read are returned unchanged with no
+    parameters and Neo4j reports the error as before.
+    """
+    try:
+        return _parameterize(query)
+    except (ValueError, IndexError):
+        return ParameterizedQuery(query.strip(), {})
+
+
+def _parameterize(query: str) -> ParameterizedQuery:
+    out: List[str] = []
+    params: Dict[str, Any] = {}
+    previous = ""  # last significant token, used to decide if a literal must stay inline
+    bracket_depth = 0  # inside [...] a '*' starts a variable-length pattern, not a product
+    i = 0
+    n = len(query)
+
+    def add_param(value: Any) -> str:
+        name = f"{PARAM_PREFIX}{len(params)}"
+        while f"${name}" in query:
+            name = f"_{name}"
+        params[name] = value
+        return f"${name}"
+
+    while i < n:
+        ch = query[i]
+
+        if ch.isspace():
+            match = _WHITESPACE.match(query, i)
+            if out and out[-1] != " ":
+                out.append(" ")
+            i = match.end()
+            continue
+
+        # Comments
+        if query.startswith("//", i):
+            end = query.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        if query.startswith("/*", i):
+            end = query.find("*/", i + 2)
+            if end == -1:
+                raise ValueError("Unterminated comment")
+            if out and out[-1] != " ":
+                out.append(" ")
+            i = end + 2
+            continue
+
+        # String literals
+        if ch in ("'", '"'):
+            value, end = _read_string(query, i)
+            if previous.upper() in _KEEP_AFTER_KEYWORDS:
+                out.append(query[i:end])
+            else:
+                out.append(add_param(value))
+            previous = "<literal>"
+            i = end
+            continue
+
+        # Escaped identifiers are copied verbatim
+        if ch == "`":
+            end = query.index("`", i + 1) + 1
+            out.append(query[i:end])
+            previous = query[i:end]
+            i = end
+            continue
+
+        # Existing parameters ($name or $0)
+        if ch == "$":
+            match = _IDENTIFIER.match(query, i + 1) or _DIGITS.match(query, i + 1)
+            end = match.end() if match else i + 1
+            out.append(query[i:end])
+            previous = query[i:end]
+            i = end
+            continue
+
+        if _IDENTIFIER.match(query, i):
+            match = _IDENTIFIER.match(query, i)
+            out.append(match.group())
+            previous = match.group()
+            i = match.end()
+            continue
+
+        if query.startswith("..", i):
+            out.append("..")
+            previous = ".."
+            i += 2
+            continue
+
+        number = _NUMBER.match(query, i)
+        if number:
+            token = number.group()
+            in_pattern_range = bracket_depth > 0 and previous in _KEEP_AFTER_SYMBOLS
+            if previous.upper() in _KEEP_AFTER_KEYWORDS or in_pattern_range:
+                out.append(token)
+            else:
+                out.append(add_param(_parse_number(token)))
+            previous = "<literal>"
+            i = number.end()
+            continue
+
+        if ch == "[":
+            bracket_depth += 1
+        elif ch == "]":
+            bracket_depth = max(0, bracket_depth - 1)
+        out.append(ch)
+        previous = ch
+        i += 1
+
+    text = "".join(out).strip().rstrip(";").strip()
+    return ParameterizedQuery(text, params)
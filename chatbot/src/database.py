@@ -1,36 +1,232 @@
 import logging
 import sys
 import os
+import threading
+import time
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from neo4j import GraphDatabase
-from chatbot.src.config import NEO4J_URI, NEO4J_AUTH
+from typing import Dict, Optional, Tuple
+from neo4j import AsyncGraphDatabase, GraphDatabase
+from chatbot.src.config import (
+    NEO4J_URI,
+    NEO4J_AUTH,
+    NEO4J_MAX_POOL_SIZE,
+    NEO4J_MAX_CONNECTION_LIFETIME,
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+)
 
 logger = logging.getLogger(__name__)
 
+
+class _TrackedSession:
+    """Thin proxy around a driver session that reports open/close to the pool metrics."""
+
+    def __init__(self, session, database: "Neo4jDatabase"):
+        self._session = session
+        self._database = database
+        self._closed = False
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._session.close()
+            self._database._on_session_closed()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+class _TrackedAsyncSession:
+    """Async counterpart of _TrackedSession for sessions of the async driver."""
+
+    def __init__(self, session, database: "Neo4jDatabase"):
+        self._session = session
+        self._database = database
+        self._closed = False
+
+    async def close(self):
+        if not self._closed:
+            self._closed = True
+            await self._session.close()
+            self._database._on_session_closed()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
 class Neo4jDatabase:
-    def __init__(self):
+    def __init__(
+        self,
+        uri: str = NEO4J_URI,
+        auth: Tuple[str, str] = NEO4J_AUTH,
+        max_connection_pool_size: int = NEO4J_MAX_POOL_SIZE,
+        max_connection_lifetime: float = NEO4J_MAX_CONNECTION_LIFETIME,
+        connection_acquisition_timeout: float = NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+    ):
+        self._uri = uri
+        self._auth = auth
+        self._max_connection_pool_size = max_connection_pool_size
+        self._max_connection_lifetime = max_connection_lifetime
+        self._connection_acquisition_timeout = connection_acquisition_timeout
         self._driver = None
+        self._async_driver = None
+        self._lock = threading.Lock()
+        self._metrics = {
+            "drivers_created": 0,
+            "sessions_opened": 0,
+            "sessions_active": 0,
+            "peak_sessions_active": 0,
+        }
+        self._connected_at: Optional[float] = None
 
     def connect(self):
-        """Initialize the Neo4j driver."""
-        try:
-            self._driver = GraphDatabase.driver(NEO4J_URI, auth=NEO4J_AUTH)
-            logger.info("Connected to Neo4j Database.")
-        except Exception as e:
-            logger.error(f"Failed to connect to Neo4j: {e}")
-            raise
+        """Initialize the Neo4j driver (no-op when the pooled driver already exists)."""
+        with self._lock:
+            if self._driver is not None:
+                return
+            try:
+                self._driver = GraphDatabase.driver(
+                    self._uri,
+                    auth=self._auth,
+                    max_connection_pool_size=self._max_connection_pool_size,
+                    max_connection_lifetime=self._max_connection_lifetime,
+                    connection_acquisition_timeout=self._connection_acquisition_timeout,
+                )
+                self._metrics["drivers_created"] += 1
+                self._connected_at = time.time()
+                logger.info("Connected to Neo4j Database.")
+            except Exception as e:
+                logger.error(f"Failed to connect to Neo4j: {e}")
+                raise
 
     def close(self):
         """Close the Neo4j driver."""
-        if self._driver:
-            self._driver.close()
-            logger.info("Neo4j connection closed.")
+        with self._lock:
+            if self._driver:
+                self._driver.close()
+                self._driver = None
+                self._connected_at = None
+                logger.info("Neo4j connection closed.")
 
-    def get_session(self):
-        """Helper to get a session. Useful for dependency injection."""
+    async def close_async(self):
+        """Close the async Neo4j driver (call from the event loop that used it)."""
+        with self._lock:
+            driver, self._async_driver = self._async_driver, None
+        if driver:
+            await driver.close()
+            logger.info("Neo4j async connection closed.")
+
+    def get_driver(self):
+        """Return the pooled driver, connecting lazily on first use."""
         if not self._driver:
             self.connect()
-        return self._driver.session()
+        return self._driver
+
+    def get_async_driver(self):
+        """
+        Return the pooled async driver, created on first use with the same pool settings.
+
+        Async request handlers use it so a slow query waits on the event loop instead of
+        holding one of the server's worker threads.
+        """
+        with self._lock:
+            if self._async_driver is None:
+                self._async_driver = AsyncGraphDatabase.driver(
+                    self._uri,
+                    auth=self._auth,
+                    max_connection_pool_size=self._max_connection_pool_size,
+                    max_connection_lifetime=self._max_connection_lifetime,
+                    connection_acquisition_timeout=self._connection_acquisition_timeout,
+                )
+                self._metrics["drivers_created"] += 1
+                logger.info("Created Neo4j async driver.")
+            return self._async_driver
+
+    def get_session(self, **kwargs):
+        """Helper to get a session. Useful for dependency injection."""
+        session = self.get_driver().session(**kwargs)
+        self._on_session_opened()
+        return _TrackedSession(session, self)
+
+    def get_async_session(self, **kwargs):
+        """Async session from the async driver; use with `async with`."""
+        session = self.get_async_driver().session(**kwargs)
+        self._on_session_opened()
+        return _TrackedAsyncSession(session, self)
+
+    def _on_session_opened(self):
+        with self._lock:
+            self._metrics["sessions_opened"] += 1
+            self._metrics["sessions_active"] += 1
+            self._metrics["peak_sessions_active"] = max(
+                self._metrics["peak_sessions_active"], self._metrics["sessions_active"]
+            )
+
+    def _on_session_closed(self):
+        with self._lock:
+            self._metrics["sessions_active"] -= 1
+
+    def pool_metrics(self) -> Dict:
+        """Return pool configuration and session counters for monitoring."""
+        with self._lock:
+            return {
+                "uri": self._uri,
+                "connected": self._driver is not None,
+                "async_driver": self._async_driver is not None,
+                "uptime_seconds": round(time.time() - self._connected_at, 1) if self._connected_at else 0.0,
+                "max_connection_pool_size": self._max_connection_pool_size,
+                "max_connection_lifetime": self._max_connection_lifetime,
+                "connection_acquisition_timeout": self._connection_acquisition_timeout,
+                **self._metrics,
+            }
+
+
+# --- Driver Registry ---
+# One pooled driver per (uri, user) for the whole process. Tools, services and
+# data scripts all go through get_database() instead of GraphDatabase.driver().
+_registry: Dict[Tuple[str, str], Neo4jDatabase] = {}
+_registry_lock = threading.Lock()
+
+
+def get_database(uri: Optional[str] = None, auth: Optional[Tuple[str, str]] = None) -> Neo4jDatabase:
+    """Return the process-wide Neo4jDatabase for the given connection details."""
+    uri = uri or NEO4J_URI
+    auth = tuple(auth) if auth else NEO4J_AUTH
+    key = (uri, auth[0])
+    with _registry_lock:
+        database = _registry.get(key)
+        if database is None:
+            database = Neo4jDatabase(uri, auth)
+            _registry[key] = database
+        return database
+
+
+def close_all():
+    """Close every pooled driver in the registry."""
+    with _registry_lock:
+        databases = list(_registry.values())
+    for database in databases:
+        database.close()
+
+
+async def close_all_async():
+    """Close every async driver in the registry."""
+    with _registry_lock:
+        databases = list(_registry.values())
+    for database in databases:
+        await database.close_async()
+
 
-db = Neo4jDatabase()
+db = get_database()
@@ -0,0 +1,301 @@
+import asyncio
+import sys
+import os
+import logging
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matrices (
+    model TEXT PRIMARY KEY,
+    dim INTEGER NOT NULL,
+    rows INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    text TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    PRIMARY KEY (model, text)
+);
+"""
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_BATCH = 500
+
+
+def _stored_rows(conn, model: str, texts: Sequence[str]) -> List[Tuple[str, int]]:
+    rows = []
+    for start in range(0, len(texts), _LOOKUP_BATCH):
+        batch = list(texts[start:start + _LOOKUP_BATCH])
+        rows += conn.execute(
+            f"SELECT text, row FROM embeddings WHERE model = ? AND text IN ({','.join('?' * len(batch))})",
+            [model, *batch],
+        ).fetchall()
+    return rows
+
+
+def normalize_text(text: str) -> str:
+    """Cache key text: Unicode NFC with whitespace collapsed (case is kept; it changes embeddings)."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+class EmbeddingStore:
+    """
+    On-disk embeddings shared by processes: a SQLite index of (model, text) -> row and,
+    per model, a float32 matrix file read through np.memmap.
+
+    A writer appends vectors to the matrix file and flushes them before the SQLite
+    transaction that publishes their rows commits, so a reader in another process never
+    sees a row whose vector is not written yet. With readonly=True (e.g. API workers
+    reading what data/setup_indicies.py stored) nothing is written.
+    """
+
+    def __init__(self, path: str, readonly: bool = False, max_entries: int = 100_000):
+        self.path = path
+        self.readonly = readonly
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._maps: Dict[str, np.memmap] = {}
+        self._dims: Dict[str, int] = {}
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection per operation (commits on success, always closed)."""
+        if self.readonly:
+            conn = sqlite3.connect(f"file:{os.path.abspath(self.path)}?mode=ro", uri=True, timeout=30)
+        else:
+            conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self) -> bool:
+        if self._initialized:
+            return True
+        if self.readonly:
+            self._initialized = os.path.exists(self.path)
+            return self._initialized
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        self._initialized = True
+        return True
+
+    def matrix_path(self, model: str) -> str:
+        base = self.path[:-len(".sqlite3")] if self.path.endswith(".sqlite3") else self.path
+        return f"{base}.{re.sub(r'[^A-Za-z0-9._-]+', '_', model)}.f32"
+
+    def _matrix(self, model: str, rows_needed: int) -> Optional[np.memmap]:
+        """The model's matrix mapped with at least rows_needed rows (remapped when another process grew it)."""
+        mapped = self._maps.get(model)
+        if mapped is not None and mapped.shape[0] >= rows_needed:
+            return mapped
+        dim = self._dims.get(model)
+        path = self.matrix_path(model)
+        if not dim or not os.path.exists(path):
+            return None
+        rows = os.path.getsize(path) // (dim * 4)
+        if rows < rows_needed:
+            return None
+        mapped = np.memmap(path, dtype=np.float32, mode="r", shape=(rows, dim))
+        self._maps[model] = mapped
+        return mapped
+
+    def get_many(self, model: str, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Stored vectors for the texts that have one."""
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            if not texts or not self._init_db():
+                return found
+            with self._connect() as conn:
+                if model not in self._dims:
+                    record = conn.execute("SELECT dim FROM matrices WHERE model = ?", (model,)).fetchone()
+                    if record is None:
+                        return found
+                    self._dims[model] = record[0]
+                rows = _stored_rows(conn, model, texts)
+            if not rows:
+                return found
+            matrix = self._matrix(model, max(row for _, row in rows) + 1)
+            if matrix is None:
+                return found
+            for text, row in rows:
+                found[text] = np.array(matrix[row])
+        return found
+
+    def put_many(self, model: str, items: Dict[str, np.ndarray]):
+        """Append vectors for new texts (texts another process stored meanwhile are skipped)."""
+        if self.readonly or not items:
+            return
+        with self._lock:
+            self._init_db()
+            dim = len(next(iter(items.values())))
+            with self._connect() as conn:
+                # Take the write lock first: rows are allocated and written by one process at a time
+                conn.execute("BEGIN IMMEDIATE")
+                record = conn.execute("SELECT dim, rows FROM matrices WHERE model = ?", (model,)).fetchone()
+                if record is None:
+                    conn.execute("INSERT INTO matrices (model, dim, rows) VALUES (?, ?, 0)", (model, dim))
+                    record = (dim, 0)
+                if record[0] != dim:
+                    logger.warning(f"Embedding dimension of {model} changed ({record[0]} -> {dim}); not stored")
+                    return
+                rows = record[1]
+                stored = {text for text, _ in _stored_rows(conn, model, list(items))}
+                new = [text for text in items if text not in stored][:max(self.max_entries - rows, 0)]
+                if not new:
+                    return
+                block = np.vstack([np.asarray(items[text], dtype=np.float32) for text in new])
+                with open(self.matrix_path(model), "ab") as matrix:
+                    matrix.truncate(rows * dim * 4)  # drop a partial append left by a crashed writer
+                    matrix.write(block.tobytes())
+                    matrix.flush()
+                conn.executemany(
+                    "INSERT INTO embeddings (model, text, row) VALUES (?, ?, ?)",
+                    [(model, text, rows + i) for i, text in enumerate(new)],
+                )
+                conn.execute("UPDATE matrices SET rows = ? WHERE model = ?", (rows + len(new), model))
+            self._dims[model] = dim
+
+    def size(self, model: str) -> int:
+        with self._lock:
+            if not self._init_db():
+                return 0
+            with self._connect() as conn:
+                record = conn.execute("SELECT rows FROM matrices WHERE model = ?", (model,)).fetchone()
+            return record[0] if record else 0
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings client with an in-process LRU in front of an optional EmbeddingStore.
+
+    Texts are keyed by (model, normalize_text(text)). Only texts found in neither cache
+    are sent to the embedding server, in one embed_documents request per call.
+    """
+
+    def __init__(self, embeddings: Embeddings, model: str, store: Optional[EmbeddingStore] = None,
+                 memory_size: int = 4096):
+        self.embeddings = embeddings
+        self.model = model
+        self.store = store
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"texts": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0,
+                          "calls": 0, "server_calls": 0, "saved_calls": 0}
+
+    def _from_memory(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+        return found
+
+    def _remember(self, vectors: Dict[str, np.ndarray]):
+        if self.memory_size <= 0:
+            return
+        with self._lock:
+            for key, vector in vectors.items():
+                self._memory[key] = vector
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, texts: Sequence[str]) -> Tuple[List[str], Dict[str, np.ndarray], List[str]]:
+        """(keys per text, cached vectors by key, distinct keys still to embed)"""
+        keys = [normalize_text(text) for text in texts]
+        unique = list(dict.fromkeys(keys))
+        found = self._from_memory(unique)
+        memory_hits = len(found)
+        disk: Dict[str, np.ndarray] = {}
+        missing = [key for key in unique if key not in found]
+        if missing and self.store is not None:
+            try:
+                disk = self.store.get_many(self.model, missing)
+            except Exception as e:
+                logger.warning(f"Embedding cache read failed: {e}")
+            found.update(disk)
+            self._remember(disk)
+            missing = [key for key in missing if key not in disk]
+        with self._lock:
+            self._counters["texts"] += len(unique)
+            self._counters["memory_hits"] += memory_hits
+            self._counters["disk_hits"] += len(disk)
+            self._counters["misses"] += len(missing)
+            self._counters["calls"] += 1
+            if missing:
+                self._counters["server_calls"] += 1
+            else:
+                self._counters["saved_calls"] += 1
+        return keys, found, missing
+
+    def _store(self, missing: List[str], embedded: List[List[float]], found: Dict[str, np.ndarray]):
+        vectors = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(missing, embedded)}
+        found.update(vectors)
+        self._remember(vectors)
+        if self.store is not None:
+            try:
+                self.store.put_many(self.model, vectors)
+            except Exception as e:
+                logger.warning(f"Embedding cache write failed: {e}")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = self._lookup(texts)
+        if missing:
+            self._store(missing, self.embeddings.embed_documents(missing), found)
+        return [found[key].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        # The store reads and writes SQLite and the matrix file, so it is used from a worker thread
+        if self.store is None:
+            keys, found, missing = self._lookup(texts)
+        else:
+            keys, found, missing = await asyncio.to_thread(self._lookup, texts)
+        if missing:
+            embedded = await self.embeddings.aembed_documents(missing)
+            if self.store is None:
+                self._store(missing, embedded, found)
+            else:
+                await asyncio.to_thread(self._store, missing, embedded, found)
+        return [found[key].tolist() for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            counters = dict(self._counters)
+            memory_entries = len(self._memory)
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        return {
+            "model": self.model,
+            "memory_entries": memory_entries,
+            "memory_size": self.memory_size,
+            "disk_entries": self.store.size(self.model) if self.store is not None else None,
+            "readonly": self.store.readonly if self.store is not None else None,
+            **counters,
+            "hit_rate": round(hits / counters["texts"], 4) if counters["texts"] else None,
+        }
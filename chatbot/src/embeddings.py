@@ -0,0 +1,56 @@
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from typing import Any, Dict, Optional
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+from chatbot.src.config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_BASE_URL,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_READONLY,
+    EMBEDDING_CACHE_MEMORY_SIZE,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+)
+from chatbot.src.embedding_cache import CachedEmbeddings, EmbeddingStore
+
+_lock = threading.Lock()
+_embedding_model = None
+
+
+def create_embedding_model() -> OpenAIEmbeddings:
+    """A new client for the embedding model the vector indexes were built with."""
+    return OpenAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        openai_api_base=EMBEDDING_BASE_URL,
+        openai_api_key="",
+        check_embedding_ctx_length=False
+    )
+
+
+def get_embedding_model() -> Embeddings:
+    """
+    The process-wide embedding client (one HTTP connection pool for all callers),
+    behind the embedding cache unless EMBEDDING_CACHE_ENABLED is false.
+    """
+    global _embedding_model
+    if _embedding_model is None:
+        with _lock:
+            if _embedding_model is None:
+                client = create_embedding_model()
+                if EMBEDDING_CACHE_ENABLED:
+                    store = EmbeddingStore(
+                        EMBEDDING_CACHE_PATH, readonly=EMBEDDING_CACHE_READONLY, max_entries=EMBEDDING_CACHE_MAX_ENTRIES
+                    )
+                    client = CachedEmbeddings(client, EMBEDDING_MODEL, store, memory_size=EMBEDDING_CACHE_MEMORY_SIZE)
+                _embedding_model = client
+    return _embedding_model
+
+
+def embedding_cache_stats() -> Optional[Dict[str, Any]]:
+    """Hit rates and saved embedding-server calls (None while no client exists or the cache is off)."""
+    model = _embedding_model
+    return model.stats() if isinstance(model, CachedEmbeddings) else None
@@ -0,0 +1,268 @@
+import asyncio
+import json
+import logging
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from chatbot.src.config import ENTITY_INDEX_ALGORITHM, ENTITY_INDEX_PATH, ENTITY_INDEX_QUANTIZATION
+from chatbot.src.database import Neo4jDatabase, db
+from chatbot.src.graph_version import graph_version
+
+try:
+    import hnswlib
+except ImportError:  # optional: ENTITY_INDEX_ALGORITHM=hnsw falls back to exact search without it
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+# Vector index per searchable entity type: (index name, node label, text properties).
+# Built by data/setup_indicies.py; the local index reads the same node embeddings.
+ENTITY_INDEXES = {
+    "diagnosis": ("diagnosis_rules_index", "Diagnosis", ["name", "code"]),
+    "procedure": ("procedure_concept_index", "Procedure", ["name", "code"]),
+    "hospital": ("hospital_entity_index", "Hospital", ["name", "id"]),
+    "doctor": ("doctor_entity_index", "Doctor", ["name", "id"]),
+}
+
+LOAD_QUERY = """
+MATCH (n:{label}) WHERE n.embedding IS NOT NULL
+RETURN n {{.*}} AS properties
+"""
+
+
+class EntityHit(NamedTuple):
+    """One search result, shaped like a Neo4jVector hit ("\\nname: X\\ncode: Y" text, remaining properties)."""
+    text: str
+    metadata: Dict[str, Any]
+    score: float  # (1 + cosine) / 2, the score Neo4j's cosine vector indexes return
+
+
+class IndexSnapshot(NamedTuple):
+    version: int
+    loaded_at: float
+    texts: List[str]
+    metadata: List[Dict[str, Any]]
+    matrix: np.ndarray  # L2-normalized rows: float32, or int8 scaled by `scales`
+    scales: Optional[np.ndarray]
+    hnsw: Any
+
+
+def entity_text(properties: Dict[str, Any], text_properties: Sequence[str]) -> str:
+    return "".join(f"\n{key}: {'' if properties.get(key) is None else properties[key]}" for key in text_properties)
+
+
+def quantize(matrix: np.ndarray):
+    """int8 rows and the per-row scale that maps them back (row ~= int8 row * scale)."""
+    scales = np.abs(matrix).max(axis=1, initial=0) / 127
+    scales[scales == 0] = 1.0
+    return np.round(matrix / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+
+class EntityIndex:
+    """
+    In-process nearest-neighbour search over the node embeddings of the entity catalog
+    (hospitals, doctors, diagnoses, procedures), as an alternative to a vector index
+    query per term over Bolt (ENTITY_SEARCH_BACKEND=local).
+
+    Each entity type is read from Neo4j once per graph version into an L2-normalized
+    float32 (or int8) matrix. The matrix is written under ENTITY_INDEX_PATH and memory-
+    mapped, so workers of the same graph version share one copy and skip the read.
+    Search is an exact matrix-vector product, or an HNSW graph when hnswlib is installed
+    and ENTITY_INDEX_ALGORITHM is "hnsw".
+    """
+
+    def __init__(self, database: Neo4jDatabase = db, path: str = ENTITY_INDEX_PATH,
+                 quantization: str = ENTITY_INDEX_QUANTIZATION, algorithm: str = ENTITY_INDEX_ALGORITHM):
+        self._database = database
+        self.path = path
+        self.quantization = quantization
+        self.algorithm = algorithm
+        if algorithm == "hnsw" and hnswlib is None:
+            logger.warning("hnswlib is not installed; the entity index uses exact search")
+            self.algorithm = "exact"
+        self._snapshots: Dict[str, IndexSnapshot] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.disk_loads = 0
+        self.failures = 0
+        self.searches = 0
+
+    def _files(self, entity_type: str, version: int):
+        """(sidecar, matrix, scales) paths; files are never rewritten, a new graph version gets new ones."""
+        index_name = ENTITY_INDEXES[entity_type][0]
+        base = os.path.join(self.path, f"{index_name}.{self.quantization}.v{version}")
+        return f"{base}.json", f"{base}.npy", f"{base}.scales.npy"
+
+    def _read_graph(self, entity_type: str):
+        _, label, text_properties = ENTITY_INDEXES[entity_type]
+        texts, metadata, vectors = [], [], []
+        with self._database.get_session() as session:
+            for record in session.run(LOAD_QUERY.format(label=label)):
+                properties = record["properties"]
+                vectors.append(properties["embedding"])
+                texts.append(entity_text(properties, text_properties))
+                # Same metadata as Neo4jVector: node properties minus embedding, id and text properties
+                metadata.append({key: value for key, value in properties.items()
+                                 if key not in ("embedding", "id", *text_properties)})
+        # An empty catalog gets a matrix with no rows, so its snapshot is cached and searches return []
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1) if vectors else np.zeros((0, 0), np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return texts, metadata, matrix / np.where(norms > 0, norms, 1.0)
+
+    def _write(self, entity_type: str, version: int, texts, metadata, matrix, scales):
+        """Write the files under temporary names and move them in place, the sidecar last."""
+        meta_path, matrix_path, scales_path = self._files(entity_type, version)
+        os.makedirs(self.path, exist_ok=True)
+        suffix = f".{os.getpid()}.tmp"
+        with open(matrix_path + suffix, "wb") as f:
+            np.save(f, matrix)
+        os.replace(matrix_path + suffix, matrix_path)
+        if scales is not None:
+            with open(scales_path + suffix, "wb") as f:
+                np.save(f, scales)
+            os.replace(scales_path + suffix, scales_path)
+        with open(meta_path + suffix, "w") as f:
+            json.dump({"version": version, "rows": len(texts), "texts": texts, "metadata": metadata}, f, default=str)
+        os.replace(meta_path + suffix, meta_path)
+        self._remove_old_files(entity_type, version)
+
+    def _remove_old_files(self, entity_type: str, version: int):
+        """Delete the files of older graph versions (processes that mapped them keep their copy)."""
+        prefix = f"{ENTITY_INDEXES[entity_type][0]}.{self.quantization}.v"
+        current = os.path.basename(self._files(entity_type, version)[0])[:-len(".json")]
+        for name in os.listdir(self.path):
+            if name.startswith(prefix) and not name.startswith(current + ".") and not name.endswith(".tmp"):
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError:
+                    pass
+
+    def _read_files(self, entity_type: str, version: int):
+        """(texts, metadata, matrix, scales) written for this graph version, or None."""
+        meta_path, matrix_path, scales_path = self._files(entity_type, version)
+        # Version 0 means the graph has no version yet, so a file could be from other data
+        if version <= 0 or not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        matrix = np.load(matrix_path, mmap_mode="r")
+        if matrix.shape[0] != meta["rows"]:
+            return None
+        scales = np.load(scales_path) if self.quantization == "int8" else None
+        return meta["texts"], meta["metadata"], matrix, scales
+
+    def load(self, entity_type: str, version: Optional[int] = None) -> IndexSnapshot:
+        """Build the index of one entity type for the current graph version."""
+        version = graph_version.current() if version is None else version
+        try:
+            stored = self._read_files(entity_type, version)
+            if stored is not None:
+                texts, metadata, matrix, scales = stored
+                self.disk_loads += 1
+            else:
+                texts, metadata, matrix = self._read_graph(entity_type)
+                scales = None
+                if self.quantization == "int8":
+                    matrix, scales = quantize(matrix)
+                self._write(entity_type, version, texts, metadata, matrix, scales)
+                matrix = np.load(self._files(entity_type, version)[1], mmap_mode="r")
+                self.loads += 1
+        except Exception:
+            self.failures += 1
+            raise
+        hnsw = self._build_hnsw(matrix, scales) if self.algorithm == "hnsw" and len(texts) else None
+        snapshot = IndexSnapshot(version, time.time(), texts, metadata, matrix, scales, hnsw)
+        self._snapshots[entity_type] = snapshot
+        logger.info(f"Entity index for {entity_type} v{version}: {len(texts)} rows ({self.quantization}, {self.algorithm})")
+        return snapshot
+
+    @staticmethod
+    def _build_hnsw(matrix: np.ndarray, scales: Optional[np.ndarray]):
+        vectors = np.asarray(matrix, dtype=np.float32)
+        if scales is not None:
+            vectors = vectors * scales[:, None]
+        index = hnswlib.Index(space="ip", dim=vectors.shape[1])
+        index.init_index(max_elements=vectors.shape[0], ef_construction=200, M=16)
+        index.add_items(vectors)
+        index.set_ef(64)
+        return index
+
+    def get(self, entity_type: str, version: Optional[int] = None) -> IndexSnapshot:
+        """The index of one entity type for the current graph version, rebuilt after data changes."""
+        version = graph_version.current() if version is None else version
+        snapshot = self._snapshots.get(entity_type)
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshots.get(entity_type)
+            if snapshot is not None and snapshot.version == version:
+                return snapshot
+            return self.load(entity_type, version)
+
+    def search(self, entity_type: str, vector: Sequence[float], k: int = 1) -> List[EntityHit]:
+        """The k entities closest to the vector by cosine similarity, best first."""
+        return self._search(self.get(entity_type), vector, k)
+
+    async def asearch(self, entity_type: str, vector: Sequence[float], k: int = 1) -> List[EntityHit]:
+        """search() for the event loop: the version check and a rebuild run in a worker thread."""
+        version = await graph_version.acurrent()
+        snapshot = self._snapshots.get(entity_type)
+        if snapshot is None or snapshot.version != version:
+            snapshot = await asyncio.to_thread(self.get, entity_type, version)
+        return self._search(snapshot, vector, k)
+
+    def _search(self, snapshot: IndexSnapshot, vector: Sequence[float], k: int) -> List[EntityHit]:
+        self.searches += 1
+        rows = len(snapshot.texts)
+        if not rows:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query = query / norm
+        k = min(k, rows)
+        if snapshot.hnsw is not None:
+            labels, distances = snapshot.hnsw.knn_query(query, k=k)
+            best, cosines = labels[0], 1 - distances[0]  # "ip" distance is 1 - inner product
+        else:
+            cosines = snapshot.matrix @ query
+            if snapshot.scales is not None:
+                cosines = cosines * snapshot.scales
+            best = np.argpartition(-cosines, k - 1)[:k] if k < rows else np.arange(rows)
+            best = best[np.argsort(-cosines[best], kind="stable")]
+            cosines = cosines[best]
+        return [EntityHit(snapshot.texts[i], snapshot.metadata[i], float((1 + cosine) / 2))
+                for i, cosine in zip(best, cosines)]
+
+    def warm(self):
+        """Build every entity type now so the first questions do not pay for it."""
+        for entity_type in ENTITY_INDEXES:
+            try:
+                self.get(entity_type)
+            except Exception as e:
+                # Searches build the index on first use instead
+                logger.warning(f"Entity index for {entity_type} not built at startup: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "algorithm": self.algorithm,
+            "quantization": self.quantization,
+            "loads": self.loads,
+            "disk_loads": self.disk_loads,
+            "failures": self.failures,
+            "searches": self.searches,
+            "indexes": {
+                entity_type: {"version": snapshot.version, "rows": len(snapshot.texts), "bytes": int(snapshot.matrix.nbytes)}
+                for entity_type, snapshot in self._snapshots.items()
+            },
+        }
+
+
+entity_index = EntityIndex()
@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import re
+import sys
+import os
+import threading
+import time
+import unicodedata
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from collections import Counter
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+from chatbot.src.config import ENTITY_RESOLVER_TRIGRAM_THRESHOLD
+from chatbot.src.database import Neo4jDatabase, db
+from chatbot.src.entity_index import ENTITY_INDEXES, entity_text
+from chatbot.src.graph_version import graph_version
+
+logger = logging.getLogger(__name__)
+
+# Embeddings are not needed here, so they are left out of the rows
+CATALOG_QUERY = """
+MATCH (n:{label})
+RETURN n {{.*, embedding: null}} AS properties
+"""
+
+# Name words shared by more than this share of an entity type's names ("rs", "rumah",
+# "sakit", "dr") do not identify an entity
+DISTINCTIVE_TOKEN_MAX_SHARE = 0.2
+
+
+def code_key(value: Any) -> str:
+    """ID/code lookup key: upper-cased without spaces, dots or dashes ("i21.9" and "I219" -> "I219")."""
+    return re.sub(r"[\s.\-]", "", str(value)).upper() if value is not None else ""
+
+
+def normalize_name(value: Any) -> str:
+    """Name lookup key: accents, case and punctuation removed ("RSUP Dr. Hasan-Sadikin" -> "rsup dr hasan sadikin")."""
+    if value is None:
+        return ""
+    text = unicodedata.normalize("NFKD", str(value))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", text.lower()).split())
+
+
+def trigrams(name: str) -> Set[str]:
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class EntityMatch(NamedTuple):
+    """A catalog entry found without vector search, shaped like a vector search hit."""
+    text: str
+    metadata: Dict[str, Any]
+    score: float  # 1.0 for exact matches, trigram Jaccard similarity otherwise
+    tier: str  # "exact", "name" or "trigram"
+
+
+class EntityCatalog(NamedTuple):
+    """The searchable entities of one type at one graph version."""
+    entries: List[Tuple[str, Dict[str, Any]]]  # (text, metadata) per node
+    codes: Dict[str, int]  # code_key(id or code) -> entry
+    names: Dict[str, int]  # normalize_name(name) -> entry
+    grams: List[Set[str]]  # trigrams of each entry's name
+    postings: Dict[str, List[int]]  # trigram -> entries whose name contains it
+    name_tokens: FrozenSet[str]  # words that identify an entry ("santosa", "sadikin")
+
+    def lookup(self, term: str, threshold: float) -> Optional[EntityMatch]:
+        position = self.codes.get(code_key(term))
+        if position is not None:
+            return self._match(position, 1.0, "exact")
+        name = normalize_name(term)
+        position = self.names.get(name)
+        if position is not None:
+            return self._match(position, 1.0, "name")
+        query = trigrams(name) if name else set()
+        shared = Counter(position for gram in query for position in self.postings.get(gram, ()))
+        best, best_score = None, 0.0
+        for position, count in shared.items():
+            score = count / (len(query) + len(self.grams[position]) - count)
+            if score > best_score:
+                best, best_score = position, score
+        if best is not None and best_score >= threshold:
+            return self._match(best, round(best_score, 4), "trigram")
+        return None
+
+    def _match(self, position: int, score: float, tier: str) -> EntityMatch:
+        text, metadata = self.entries[position]
+        return EntityMatch(text, metadata, score, tier)
+
+
+def build_catalog(rows: Iterable[Dict[str, Any]], text_properties: List[str]) -> EntityCatalog:
+    entries, codes, names, grams, postings = [], {}, {}, [], {}
+    for properties in rows:
+        position = len(entries)
+        entries.append((
+            entity_text(properties, text_properties),
+            # Same metadata as the vector search hits: properties minus embedding, id and text properties
+            {key: value for key, value in properties.items() if key not in ("embedding", "id", *text_properties)},
+        ))
+        for key in text_properties:
+            if key != "name" and properties.get(key) is not None:
+                codes.setdefault(code_key(properties[key]), position)
+        name = normalize_name(properties.get("name"))
+        if name:
+            names.setdefault(name, position)
+        grams.append(trigrams(name) if name else set())
+        for gram in grams[-1]:
+            postings.setdefault(gram, []).append(position)
+    words = Counter(word for name in names for word in set(name.split()) if len(word) >= 3)
+    name_tokens = frozenset(word for word, count in words.items() if count <= max(1, DISTINCTIVE_TOKEN_MAX_SHARE * len(names)))
+    return EntityCatalog(entries, codes, names, grams, postings, name_tokens)
+
+
+class ResolverSnapshot(NamedTuple):
+    version: int
+    loaded_at: float
+    catalogs: Dict[str, EntityCatalog]
+
+
+class EntityResolver:
+    """
+    Resolves entity terms without embeddings before RAG search falls back to vectors:
+    an exact ID/code lookup ("HOS001", "I21.9"), then the normalized name, then trigram
+    similarity of the name. The catalogs are held in memory and reloaded when the graph
+    data version changes, like ReferenceData.
+    """
+
+    def __init__(self, database: Neo4jDatabase = db, threshold: float = ENTITY_RESOLVER_TRIGRAM_THRESHOLD):
+        self._database = database
+        self.threshold = threshold
+        self._snapshot: Optional[ResolverSnapshot] = None
+        self._lock = threading.Lock()
+        self.loads = 0
+        self._counters = {"terms": 0, "exact": 0, "name": 0, "trigram": 0, "vector": 0,
+                          "embedding_requests_avoided": 0}
+
+    def load(self, version: Optional[int] = None) -> ResolverSnapshot:
+        """Read the catalog of every entity type now (one session)."""
+        version = graph_version.current() if version is None else version
+        catalogs = {}
+        with self._database.get_session() as session:
+            for entity_type, (_, label, text_properties) in ENTITY_INDEXES.items():
+                rows = [row["properties"] for row in session.run(CATALOG_QUERY.format(label=label)).data()]
+                catalogs[entity_type] = build_catalog(rows, text_properties)
+        snapshot = ResolverSnapshot(version, time.time(), catalogs)
+        self._snapshot = snapshot
+        self.loads += 1
+        logger.info(f"Loaded entity catalogs v{version}: "
+                    + ", ".join(f"{len(catalog.entries)} {entity_type}" for entity_type, catalog in catalogs.items()))
+        return snapshot
+
+    def get(self, version: Optional[int] = None) -> ResolverSnapshot:
+        """Return the catalogs for the current graph version, reloading them if the data changed."""
+        version = graph_version.current() if version is None else version
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == version:
+                return snapshot
+            return self.load(version)
+
+    async def aget(self) -> ResolverSnapshot:
+        """get() for the event loop: the version check and a reload run in a worker thread."""
+        version = await graph_version.acurrent()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        return await asyncio.to_thread(self.get, version)
+
+    def resolve(self, snapshot: ResolverSnapshot, searches: Iterable[Tuple[str, List[str]]]) -> Dict[Tuple[str, str], EntityMatch]:
+        """Matches by (entity type, term) for (entity type, terms) searches; other terms need vector search."""
+        matches = {}
+        tiers = Counter()
+        for entity_type, terms in searches:
+            catalog = snapshot.catalogs.get(entity_type)
+            for term in terms:
+                if not term.strip() or (entity_type, term) in matches:
+                    continue
+                match = catalog.lookup(term, self.threshold) if catalog else None
+                tiers["terms"] += 1
+                tiers[match.tier if match else "vector"] += 1
+                if match:
+                    matches[(entity_type, term)] = match
+        with self._lock:
+            for tier, count in tiers.items():
+                self._counters[tier] += count
+        return matches
+
+    def mentioned_names(self, text: str) -> FrozenSet[str]:
+        """
+        Words of the text that identify a catalog entity, from the last loaded catalogs
+        (never reloads, so it adds no database call; empty before the first load).
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return frozenset()
+        words = set(normalize_name(text).split())
+        return frozenset(word for catalog in snapshot.catalogs.values() for word in words & catalog.name_tokens)
+
+    def count_avoided_request(self):
+        """Record an embedding request that was skipped because every term was resolved here."""
+        with self._lock:
+            self._counters["embedding_requests_avoided"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        snapshot = self._snapshot
+        resolved = counters["terms"] - counters["vector"]
+        return {
+            "loaded": snapshot is not None,
+            "loads": self.loads,
+            "version": snapshot.version if snapshot else None,
+            "entries": {entity_type: len(catalog.entries) for entity_type, catalog in snapshot.catalogs.items()} if snapshot else {},
+            **counters,
+            # Every resolved term is one text the embedding model did not have to embed
+            "embeddings_avoided": resolved,
+            "hit_rate": round(resolved / counters["terms"], 4) if counters["terms"] else None,
+        }
+
+
+entity_resolver = EntityResolver()
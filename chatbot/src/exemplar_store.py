@@ -0,0 +1,365 @@
+import sys
+import os
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from chatbot.src.config import (
+    EXEMPLAR_DB_PATH,
+    EXEMPLAR_MAX_ENTRIES,
+    EXEMPLAR_FEW_SHOT,
+    EXEMPLAR_MIN_SIMILARITY,
+    EXEMPLAR_REUSE_SIMILARITY,
+)
+from chatbot.src.cypher_normalizer import parameterize_cypher
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS exemplars (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    question TEXT NOT NULL,
+    cypher TEXT NOT NULL,
+    template TEXT NOT NULL,
+    params TEXT NOT NULL,
+    slots TEXT NOT NULL,
+    columns TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    uses INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+"""
+
+# execute_cypher outputs that are not a usable result
+_UNUSABLE_OUTPUT_PREFIXES = ("Cypher Execution Error", "Cypher Plan Rejected", "Query executed successfully but returned no results")
+
+
+class Exemplar(NamedTuple):
+    id: int
+    question: str
+    cypher: str                      # as executed, literals inline (shown as a few-shot example)
+    template: str                    # parameterized Cypher ($lit_N)
+    params: Dict[str, Any]           # template parameters of the recorded question
+    slots: Dict[str, Dict[str, str]]  # parameter -> {"text": literal as written in the question, "case": ...}
+    columns: List[str]               # result shape
+    uses: int
+
+
+class ExemplarMatch(NamedTuple):
+    exemplar: Exemplar
+    similarity: float
+    params: Dict[str, Any]  # template parameters bound to the new question's literals
+
+
+def result_columns(output: str) -> Optional[List[str]]:
+    """Column names of an execute_cypher output (table header line or JSON objects)."""
+    first_line = output.split("\n", 1)[0]
+    try:
+        header = json.loads(first_line)
+    except json.JSONDecodeError:
+        header = None
+    if isinstance(header, list) and all(isinstance(name, str) for name in header):
+        return header
+    try:
+        rows = json.loads(output)
+        return list(rows[0].keys()) if rows and isinstance(rows[0], dict) else None
+    except (json.JSONDecodeError, AttributeError, KeyError, IndexError):
+        return None
+
+
+def _case_of(value: str, text: str) -> Optional[str]:
+    """How the query literal is derived from the question text, if it is."""
+    for case, transform in (("same", str), ("upper", str.upper), ("lower", str.lower), ("title", str.title)):
+        if transform(text) == value:
+            return case
+    return None
+
+
+_CASES = {"same": str, "upper": str.upper, "lower": str.lower, "title": str.title}
+
+
+def question_slots(question: str, params: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    """Query parameters whose literal is written in the question (as a whole token)."""
+    slots = {}
+    taken: List[Tuple[int, int]] = []
+    for name, value in params.items():
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            continue
+        literal = str(value)
+        if len(literal.strip()) < 2:
+            continue
+        found = re.search(rf"(?<!\w){re.escape(literal)}(?!\w)", question, flags=re.IGNORECASE)
+        if not found or any(found.start() < end and start < found.end() for start, end in taken):
+            continue
+        text = found.group(0)
+        case = "same" if not isinstance(value, str) else _case_of(value, text)
+        if case is None:
+            continue
+        taken.append(found.span())
+        slots[name] = {"text": text, "case": case}
+    return slots
+
+
+def _shape_regex(literal: str) -> str:
+    """Regex for literals shaped like this one: letter runs, digit runs and separators."""
+    parts = []
+    for run in re.finditer(r"[^\W\d_]+|\d+|\s+|.", literal):
+        token = run.group(0)
+        if token.isdigit():
+            parts.append(r"\d+")
+        elif token.isspace():
+            parts.append(r"\s+")
+        elif token.isalpha():
+            parts.append(r"[^\W\d_]+")
+        else:
+            parts.append(re.escape(token))
+    return "".join(parts)
+
+
+def _text_regex(text: str) -> str:
+    words = text.split()
+    if not words:
+        return r"\s*" if text else ""
+    regex = r"\s+".join(re.escape(word) for word in words)
+    if text[0].isspace():
+        regex = r"\s+" + regex
+    if text[-1].isspace():
+        regex += r"\s+"
+    return regex
+
+
+def question_pattern(question: str, slots: Dict[str, Dict[str, str]]) -> re.Pattern:
+    """
+    Regex matching questions that differ from this one only in the slot literals.
+    A slot only accepts a literal of the same shape (e.g. "C1001" -> "C1002", not a hospital name).
+    """
+    question = question.strip().rstrip("?.! ")
+    spans = []
+    for name, slot in slots.items():
+        found = re.search(rf"(?<!\w){re.escape(slot['text'])}(?!\w)", question)
+        if found:
+            spans.append((found.start(), found.end(), name, slot["text"]))
+    parts, position = [], 0
+    for start, end, name, literal in sorted(spans):
+        parts.append(_text_regex(question[position:start]))
+        parts.append(f"(?P<{name}>{_shape_regex(literal)})")
+        position = end
+    parts.append(_text_regex(question[position:]))
+    return re.compile(r"\s*" + "".join(parts) + r"[\s?.!]*", flags=re.IGNORECASE)
+
+
+def _bind(value: Any, text: str, case: str) -> Any:
+    if isinstance(value, bool):
+        raise ValueError("not a slot")
+    if isinstance(value, int):
+        return int(text)
+    if isinstance(value, float):
+        return float(text)
+    return _CASES[case](text)
+
+
+class ExemplarStore:
+    """
+    Successful (question, Cypher, result shape) triples with their question embeddings.
+
+    Rows live in a SQLite file; vectors are also kept normalized in one in-memory matrix,
+    so nearest exemplars are found with a single matrix-vector product. similar() returns
+    few-shot examples for Cypher generation; match() finds a stored question that only
+    differs from the new one in entity literals (IDs, codes, names, numbers that appear in
+    both the question and the query) and binds the new literals to the stored
+    parameterized Cypher, so no LLM generation turn is needed.
+    """
+
+    def __init__(self, path: str = EXEMPLAR_DB_PATH, max_entries: int = EXEMPLAR_MAX_ENTRIES,
+                 few_shot: int = EXEMPLAR_FEW_SHOT, min_similarity: float = EXEMPLAR_MIN_SIMILARITY,
+                 reuse_similarity: float = EXEMPLAR_REUSE_SIMILARITY):
+        self.path = path
+        self.max_entries = max_entries
+        self.few_shot = few_shot
+        self.min_similarity = min_similarity
+        self.reuse_similarity = reuse_similarity
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._exemplars: List[Exemplar] = []
+        self._patterns: List[re.Pattern] = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._counters = {
+            "recorded": 0, "duplicates": 0, "few_shot_lookups": 0,
+            "template_matches": 0, "template_reuses": 0, "forgotten": 0,
+        }
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection per operation (commits on success, always closed)."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _load(self):
+        if self._loaded:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            rows = conn.execute("SELECT * FROM exemplars ORDER BY id").fetchall()
+        vectors = []
+        for row in rows:
+            exemplar = Exemplar(
+                row["id"], row["question"], row["cypher"], row["template"], json.loads(row["params"]),
+                json.loads(row["slots"]), json.loads(row["columns"]), row["uses"],
+            )
+            self._exemplars.append(exemplar)
+            self._patterns.append(question_pattern(exemplar.question, exemplar.slots))
+            vectors.append(np.frombuffer(row["vector"], dtype=np.float32))
+        if vectors:
+            self._matrix = np.vstack(vectors)
+        self._loaded = True
+        logger.info(f"Loaded {len(rows)} question/Cypher exemplars from {self.path}")
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> Optional[np.ndarray]:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm > 0 else None
+
+    def _similarities(self, vector: Sequence[float]) -> Optional[np.ndarray]:
+        query = self._normalize(vector)
+        if query is None or not self._exemplars or self._matrix.shape[1] != query.shape[0]:
+            return None
+        return self._matrix @ query
+
+    def record(self, question: str, vector: Optional[Sequence[float]], cypher: str, output: str) -> Optional[int]:
+        """Store a question whose Cypher returned rows. Returns the exemplar id (None if skipped)."""
+        row = self._normalize(vector) if vector is not None else None
+        columns = result_columns(output) if not output.startswith(_UNUSABLE_OUTPUT_PREFIXES) else None
+        if row is None or columns is None or self.max_entries <= 0:
+            return None
+        parameterized = parameterize_cypher(cypher)
+        slots = question_slots(question, parameterized.params)
+        now = time.time()
+        with self._lock:
+            self._load()
+            for exemplar, pattern in zip(self._exemplars, self._patterns):
+                if exemplar.template == parameterized.text and pattern.fullmatch(question):
+                    self._counters["duplicates"] += 1
+                    return exemplar.id
+            if self._matrix.size and self._matrix.shape[1] != row.shape[0]:
+                # The embedding model changed; stored vectors are not comparable anymore
+                self._clear()
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    "INSERT INTO exemplars (question, cypher, template, params, slots, columns, vector, created_at, last_used_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (question, cypher, parameterized.text, json.dumps(parameterized.params, default=str),
+                     json.dumps(slots), json.dumps(columns), row.tobytes(), now, now),
+                )
+            exemplar = Exemplar(cursor.lastrowid, question, cypher, parameterized.text,
+                                parameterized.params, slots, columns, 0)
+            self._exemplars.append(exemplar)
+            self._patterns.append(question_pattern(question, slots))
+            self._matrix = np.vstack([self._matrix, row[None, :]]) if self._matrix.size else row[None, :].copy()
+            self._counters["recorded"] += 1
+            self._evict()
+            return exemplar.id
+
+    def similar(self, vector: Optional[Sequence[float]], k: Optional[int] = None) -> List[Tuple[Exemplar, float]]:
+        """Nearest exemplars at or above min_similarity, most similar first."""
+        if vector is None:
+            return []
+        with self._lock:
+            self._load()
+            similarities = self._similarities(vector)
+            if similarities is None:
+                return []
+            self._counters["few_shot_lookups"] += 1
+            order = np.argsort(-similarities)[:k or self.few_shot]
+            return [(self._exemplars[i], float(similarities[i])) for i in order if similarities[i] >= self.min_similarity]
+
+    def match(self, question: str, vector: Optional[Sequence[float]]) -> Optional[ExemplarMatch]:
+        """A stored question that differs from this one only in its literals, with the new literals bound."""
+        if vector is None:
+            return None
+        with self._lock:
+            self._load()
+            similarities = self._similarities(vector)
+            if similarities is None:
+                return None
+            for i in np.argsort(-similarities):
+                if similarities[i] < self.reuse_similarity:
+                    break
+                exemplar = self._exemplars[i]
+                found = self._patterns[i].fullmatch(question)
+                if not found:
+                    continue
+                try:
+                    params = dict(exemplar.params)
+                    for name, slot in exemplar.slots.items():
+                        params[name] = _bind(exemplar.params[name], found.group(name).strip(), slot["case"])
+                except (ValueError, KeyError):
+                    continue
+                self._counters["template_matches"] += 1
+                return ExemplarMatch(exemplar, float(similarities[i]), params)
+            return None
+
+    def mark_used(self, exemplar_id: int):
+        """Count a reuse (least used exemplars are evicted first)."""
+        with self._lock:
+            self._counters["template_reuses"] += 1
+            with self._connect() as conn:
+                conn.execute("UPDATE exemplars SET uses = uses + 1, last_used_at = ? WHERE id = ?", (time.time(), exemplar_id))
+
+    def forget(self, exemplar_id: int):
+        """Drop an exemplar whose Cypher stopped working (e.g. after a schema change)."""
+        with self._lock:
+            self._load()
+            self._counters["forgotten"] += 1
+            self._delete([i for i, exemplar in enumerate(self._exemplars) if exemplar.id == exemplar_id])
+
+    def _evict(self):
+        excess = len(self._exemplars) - self.max_entries
+        if excess <= 0:
+            return
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id FROM exemplars ORDER BY uses ASC, last_used_at ASC LIMIT ?", (excess,)
+            ).fetchall()
+        evicted = {row["id"] for row in rows}
+        self._delete([i for i, exemplar in enumerate(self._exemplars) if exemplar.id in evicted])
+
+    def _delete(self, indexes: List[int]):
+        if not indexes:
+            return
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM exemplars WHERE id = ?", [(self._exemplars[i].id,) for i in indexes])
+        keep = [i for i in range(len(self._exemplars)) if i not in set(indexes)]
+        self._exemplars = [self._exemplars[i] for i in keep]
+        self._patterns = [self._patterns[i] for i in keep]
+        self._matrix = self._matrix[keep] if keep else np.zeros((0, 0), dtype=np.float32)
+
+    def _clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM exemplars")
+        self._exemplars, self._patterns = [], []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._exemplars), "loaded": self._loaded, **self._counters}
+
+
+exemplar_store = ExemplarStore()
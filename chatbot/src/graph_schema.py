@@ -0,0 +1,380 @@
+import asyncio
+import logging
+import re
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+from chatbot.src.config import SCHEMA_RELATIONSHIP_SAMPLE
+from chatbot.src.database import Neo4jDatabase, db
+from chatbot.src.graph_version import graph_version
+
+logger = logging.getLogger(__name__)
+
+# Hand-written schema. Its descriptions and example values annotate the introspected
+# schema, and it is served as is while the database cannot be introspected.
+GRAPH_SCHEMA = """
+        BPJS GRAPH DATABASE SCHEMA
+        ==========================
+        Enhanced medical insurance claims database with structured medical resume data.
+
+        CORE NODES & PROPERTIES:
+        ------------------------
+        
+        1. Claim (Primary Entity)
+           - id (String): "C1001", "C1002"
+           - total_cost (Float): 65000000.0
+           - status (String): "NORMAL", "FRAUD", null
+           - date (Date): Claim submission date
+
+        2. Patient (From medical_resume_json)
+           - name (String): "Budi Santoso", "Siti Aminah"
+           
+        3. Hospital (Infrastructure)
+           - id (String): "HOS001", "HOS002"
+           - name (String): "RSUP Dr. Hasan Sadikin (RSHS)"
+           - class (String): "Class A (National Referral)"
+           - location (Point): Geospatial coordinates
+
+        4. Doctor (Medical Staff)
+           - id (String): "DOC001", "DOC002"  
+           - name (String): "Dr. Budi Hartono"
+           - specialization (String): "Cardiologist", "Surgeon"
+
+        5. Diagnosis (ICD-10 Codes)
+           - code (String): "I21.9", "K35.80", "A90"
+           - name (String): "Acute Myocardial Infarction"
+           - avg_cost (Float): Expected treatment cost
+           - severity (String): "High", "Medium", "Low"
+
+        6. Procedure (Medical Procedures)
+           - code (String): "89.52", "37.22", "UNCODIFIED"
+           - name (String): "PCI (Angiography/Stent)", "IV Heparin"
+           - avg_cost (Float): Procedure cost
+           * UNCODIFIED: New procedures from medical resume text
+
+        7. ClinicalNote (Medical Documentation)
+           - primary_diagnosis_text (String): Clinical primary diagnosis
+           - secondary_diagnosis_text (String): Supporting clinical findings
+
+        8. Specialty (Hospital Capabilities)
+           - name (String): "Cardiology", "Oncology"
+
+        9. Facility (Hospital Equipment)
+           - name (String): "ICU", "CT Scan", "MRI"
+
+        RELATIONSHIP STRUCTURE:
+        ----------------------
+        
+        CLAIM RELATIONSHIPS:
+        (:Claim)-[:SUBMITTED_AT]->(:Hospital)           // Where claim filed
+        (:Claim)-[:SUBMITTED_BY]->(:Doctor)             // Submitting doctor
+        (:Claim)-[:CODED_AS]->(:Diagnosis)              // Primary ICD-10 code
+        (:Claim)-[:HAS_PATIENT]->(:Patient)             // Patient info
+        (:Claim)-[:HAS_PRIMARY_PROCEDURE]->(:Procedure) // Main procedures
+        (:Claim)-[:HAS_SECONDARY_PROCEDURE]->(:Procedure) // Support procedures
+        (:Claim)-[:HAS_CLINICAL_NOTE]->(:ClinicalNote)  // Clinical docs
+
+        INFRASTRUCTURE:
+        (:Doctor)-[:WORKS_AT]->(:Hospital)
+        (:Hospital)-[:HAS_SPECIALTY]->(:Specialty)
+        (:Hospital)-[:HAS_FACILITY]->(:Facility)
+
+        MEDICAL RULES:
+        (:Diagnosis)-[:REQUIRES]->(:Procedure)
+        (:Diagnosis)-[:TYPICALLY_TREATED_WITH]->(:Procedure)
+
+        KEY QUERIES FOR MEDICAL RESUME DATA:
+        -----------------------------------
+        
+        1. GET COMPLETE MEDICAL RESUME FOR CLAIM:
+        MATCH (c:Claim {id: "C1001"})
+        OPTIONAL MATCH (c)-[:HAS_PATIENT]->(patient:Patient)
+        OPTIONAL MATCH (c)-[:HAS_PRIMARY_PROCEDURE]->(pp:Procedure)
+        OPTIONAL MATCH (c)-[:HAS_SECONDARY_PROCEDURE]->(sp:Procedure)  
+        OPTIONAL MATCH (c)-[:HAS_CLINICAL_NOTE]->(note:ClinicalNote)
+        OPTIONAL MATCH (c)-[:SUBMITTED_AT]->(hospital:Hospital)
+        OPTIONAL MATCH (c)-[:SUBMITTED_BY]->(doctor:Doctor)
+        OPTIONAL MATCH (c)-[:CODED_AS]->(diagnosis:Diagnosis)
+        RETURN c.id, c.total_cost, c.status,
+               patient.name as patient_name,
+               hospital.name as hospital_name,
+               doctor.name as doctor_name,
+               diagnosis.name as diagnosis_name,
+               collect(DISTINCT pp.name) as primary_procedures,
+               collect(DISTINCT sp.name) as secondary_procedures,
+               note.primary_diagnosis_text,
+               note.secondary_diagnosis_text
+
+        2. GET ALL PROCEDURES (PRIMARY + SECONDARY):
+        MATCH (c:Claim {id: "C1001"})-[r:HAS_PRIMARY_PROCEDURE|HAS_SECONDARY_PROCEDURE]->(p:Procedure)
+        RETURN type(r) as procedure_type, p.name, p.code, p.avg_cost
+        ORDER BY procedure_type, p.name
+
+        3. FIND CLAIMS BY PROCEDURE:
+        MATCH (c:Claim)-[r:HAS_PRIMARY_PROCEDURE|HAS_SECONDARY_PROCEDURE]->(p:Procedure)
+        WHERE p.name CONTAINS "PCI"
+        RETURN c.id, c.status, type(r) as procedure_type, p.name
+
+        4. MEDICAL COMPLIANCE CHECK:
+        MATCH (c:Claim)-[:CODED_AS]->(d:Diagnosis)
+        MATCH (c)-[:HAS_PRIMARY_PROCEDURE]->(actual:Procedure)
+        OPTIONAL MATCH (d)-[:REQUIRES]->(required:Procedure)
+        RETURN c.id, d.name, actual.name, required.name
+        WHERE required IS NOT NULL AND actual.name <> required.name
+        """
+
+# Labels, property keys and property types from the schema procedures (no data scan)
+NODE_PROPERTIES_QUERY = """
+CALL db.schema.nodeTypeProperties()
+YIELD nodeLabels, propertyName, propertyTypes
+RETURN nodeLabels, propertyName, propertyTypes
+"""
+
+RELATIONSHIP_PROPERTIES_QUERY = """
+CALL db.schema.relTypeProperties()
+YIELD relType, propertyName, propertyTypes
+RETURN relType, propertyName, propertyTypes
+"""
+
+RELATIONSHIP_TYPES_QUERY = """
+CALL db.relationshipTypes()
+YIELD relationshipType
+RETURN relationshipType AS type
+"""
+
+# Which labels one relationship type connects, from a bounded sample of its relationships
+# (a relationship type scan that stops after $sample rows, not a read of the whole graph).
+# One part per type is joined with UNION into a single query.
+RELATIONSHIP_SAMPLE_QUERY = """
+MATCH (a)-[r:`{type}`]->(b)
+WITH a, r, b LIMIT $sample
+UNWIND labels(a) AS from_label
+UNWIND labels(b) AS to_label
+RETURN DISTINCT from_label, type(r) AS type, to_label
+"""
+
+# Bookkeeping labels and vector index properties the chatbot never queries
+HIDDEN_LABELS = {"GraphMeta"}
+HIDDEN_PROPERTIES = {"embedding"}
+
+# Seconds before a failed introspection is tried again (the static schema is served meanwhile)
+FALLBACK_RETRY_SECONDS = 60.0
+
+_TYPE_NAMES = {"Double": "Float", "Long": "Integer"}
+
+_NODE_HEADER = re.compile(r"^\s*\d+\.\s+(\w+)(?:\s+\((.*)\))?")
+_PROPERTY_LINE = re.compile(r"^\s*-\s+(\w+)\s+\([^)]*\)(?::\s*(.*))?")
+_RELATIONSHIP_LINE = re.compile(r"\(:(\w+)\)-\[:(\w+)\]->\(:(\w+)\)\s*(?://\s*(.*))?")
+
+
+class SchemaHints(NamedTuple):
+    """Descriptions taken from the hand-written schema."""
+    order: List[str]                                # labels in the hand-written order
+    descriptions: Dict[str, str]                    # label -> "(Primary Entity)" text
+    properties: Dict[str, Dict[str, str]]           # label -> property -> example values / meaning
+    notes: Dict[str, List[str]]                     # label -> "* ..." lines
+    relationships: Dict[tuple, str]                 # (from, type, to) -> comment
+
+
+def schema_hints(schema: str = GRAPH_SCHEMA) -> SchemaHints:
+    hints = SchemaHints([], {}, {}, {}, {})
+    label = None
+    for line in schema.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("KEY QUERIES"):
+            break
+        relationship = _RELATIONSHIP_LINE.search(line)
+        if relationship:
+            hints.relationships[relationship.group(1, 2, 3)] = relationship.group(4) or ""
+            continue
+        header = _NODE_HEADER.match(line)
+        if header:
+            label = header.group(1)
+            hints.order.append(label)
+            hints.descriptions[label] = header.group(2) or ""
+            hints.properties[label] = {}
+            hints.notes[label] = []
+        elif label and _PROPERTY_LINE.match(line):
+            found = _PROPERTY_LINE.match(line)
+            hints.properties[label][found.group(1)] = (found.group(2) or "").strip()
+        elif label and stripped.startswith("*"):
+            hints.notes[label].append(stripped)
+        elif not stripped:
+            label = None
+    return hints
+
+
+def relationship_patterns_query(relationship_types: Iterable[str]) -> str:
+    return "UNION".join(RELATIONSHIP_SAMPLE_QUERY.format(type=rel_type.replace("`", "``"))
+                        for rel_type in relationship_types)
+
+
+def _type_name(property_types: Optional[List[str]]) -> str:
+    names = []
+    for name in property_types or []:
+        if name.endswith("Array"):
+            name = f"List<{_TYPE_NAMES.get(name[:-5], name[:-5])}>"
+        names.append(_TYPE_NAMES.get(name, name))
+    return "|".join(names) or "Any"
+
+
+def build_schema_text(node_properties: Iterable[Dict[str, Any]], relationship_patterns: Iterable[Dict[str, Any]],
+                      relationship_properties: Iterable[Dict[str, Any]] = (), version: int = 0,
+                      hints: Optional[SchemaHints] = None) -> str:
+    """
+    Schema text in the layout of GRAPH_SCHEMA (numbered node sections, relationship
+    patterns grouped by start label), so prune_schema() works on it unchanged.
+    """
+    hints = hints or schema_hints()
+    labels: Dict[str, Dict[str, str]] = {}
+    for row in node_properties:
+        for label in row["nodeLabels"] or []:
+            if label in HIDDEN_LABELS:
+                continue
+            properties = labels.setdefault(label, {})
+            if row["propertyName"] and row["propertyName"] not in HIDDEN_PROPERTIES:
+                properties[row["propertyName"]] = _type_name(row["propertyTypes"])
+
+    rel_properties: Dict[str, List[str]] = {}
+    for row in relationship_properties:
+        if row["propertyName"]:
+            rel_type = row["relType"].strip(":`")
+            rel_properties.setdefault(rel_type, []).append(f"{row['propertyName']}: {_type_name(row['propertyTypes'])}")
+
+    known = {label: i for i, label in enumerate(hints.order)}
+    ordered = sorted(labels, key=lambda label: (known.get(label, len(known)), label))
+
+    lines = [
+        "BPJS GRAPH DATABASE SCHEMA",
+        "==========================",
+        f"Introspected from the database (graph version {version}).",
+        "",
+        "CORE NODES & PROPERTIES:",
+        "------------------------",
+        "",
+    ]
+    for number, label in enumerate(ordered, start=1):
+        description = hints.descriptions.get(label)
+        lines.append(f"{number}. {label} ({description})" if description else f"{number}. {label}")
+        for name, type_name in labels[label].items():
+            hint = hints.properties.get(label, {}).get(name)
+            lines.append(f"   - {name} ({type_name}): {hint}" if hint else f"   - {name} ({type_name})")
+        lines.extend(f"   {note}" for note in hints.notes.get(label, []))
+        lines.append("")
+
+    lines += ["RELATIONSHIP STRUCTURE:", "----------------------", ""]
+    group = None
+    for row in relationship_patterns:
+        start, rel_type, end = row["from_label"], row["type"], row["to_label"]
+        if start in HIDDEN_LABELS or end in HIDDEN_LABELS:
+            continue
+        if start != group:
+            if group is not None:
+                lines.append("")
+            lines.append(f"{start.upper()} RELATIONSHIPS:")
+            group = start
+        pattern = f"(:{start})-[:{rel_type}]->(:{end})"
+        if rel_properties.get(rel_type):
+            pattern = f"(:{start})-[:{rel_type} {{{', '.join(rel_properties[rel_type])}}}]->(:{end})"
+        comment = hints.relationships.get((start, rel_type, end))
+        lines.append(f"{pattern}  // {comment}" if comment else pattern)
+    return "\n".join(lines) + "\n"
+
+
+class SchemaSnapshot(NamedTuple):
+    version: int
+    loaded_at: float
+    text: str
+    labels: List[str]
+    relationship_types: List[str]
+    introspected: bool  # False: the database could not be read and GRAPH_SCHEMA is served
+
+
+class GraphSchema:
+    """
+    Holds the schema text for the current graph version, introspected from the
+    database and rebuilt only when the graph data version changes.
+    """
+
+    def __init__(self, database: Neo4jDatabase = db, sample_size: int = SCHEMA_RELATIONSHIP_SAMPLE):
+        self._database = database
+        self.sample_size = sample_size
+        self._snapshot: Optional[SchemaSnapshot] = None
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.failures = 0
+
+    def load(self, version: Optional[int] = None) -> SchemaSnapshot:
+        """Introspect the database now (four schema queries in one session)."""
+        version = graph_version.current() if version is None else version
+        try:
+            with self._database.get_session() as session:
+                # Auto-commit reads: no retry loop, so an unreachable database fails fast
+                # and the static schema is served
+                def rows(query, **params):
+                    return session.run(query, **params).data()
+                node_properties = rows(NODE_PROPERTIES_QUERY)
+                relationship_properties = rows(RELATIONSHIP_PROPERTIES_QUERY)
+                relationship_types = sorted(row["type"] for row in rows(RELATIONSHIP_TYPES_QUERY))
+                relationship_patterns = sorted(
+                    rows(relationship_patterns_query(relationship_types), sample=self.sample_size) if relationship_types else [],
+                    key=lambda row: (row["from_label"], row["type"], row["to_label"]),
+                )
+            text = build_schema_text(node_properties, relationship_patterns, relationship_properties, version)
+            labels = sorted({label for row in node_properties for label in row["nodeLabels"] or []} - HIDDEN_LABELS)
+            snapshot = SchemaSnapshot(version, time.time(), text, labels, relationship_types, True)
+            self.loads += 1
+            logger.info(f"Introspected graph schema v{version}: {len(labels)} labels, {len(text)} characters")
+        except Exception as e:
+            logger.warning(f"Schema introspection failed, serving the static schema: {e}")
+            self.failures += 1
+            snapshot = SchemaSnapshot(version, time.time(), GRAPH_SCHEMA, [], [], False)
+        self._snapshot = snapshot
+        return snapshot
+
+    @staticmethod
+    def _is_current(snapshot: Optional[SchemaSnapshot], version: int) -> bool:
+        if snapshot is None or snapshot.version != version:
+            return False
+        return snapshot.introspected or time.time() - snapshot.loaded_at < FALLBACK_RETRY_SECONDS
+
+    def get(self, version: Optional[int] = None) -> SchemaSnapshot:
+        """Return the schema for the current graph version, introspecting it if the data changed."""
+        version = graph_version.current() if version is None else version
+        snapshot = self._snapshot
+        if self._is_current(snapshot, version):
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if self._is_current(snapshot, version):
+                return snapshot
+            return self.load(version)
+
+    async def aget(self) -> SchemaSnapshot:
+        """get() for the event loop: the version check and an introspection run in a worker thread."""
+        version = await graph_version.acurrent()
+        snapshot = self._snapshot
+        if self._is_current(snapshot, version):
+            return snapshot
+        return await asyncio.to_thread(self.get, version)
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"loaded": False, "loads": self.loads, "failures": self.failures}
+        return {
+            "loaded": True,
+            "loads": self.loads,
+            "failures": self.failures,
+            "version": snapshot.version,
+            "introspected": snapshot.introspected,
+            "labels": len(snapshot.labels),
+            "characters": len(snapshot.text),
+        }
+
+
+graph_schema = GraphSchema()
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from typing import Callable, List, Optional
+from chatbot.src.config import GRAPH_VERSION_CHECK_INTERVAL
+from chatbot.src.database import Neo4jDatabase, db
+
+logger = logging.getLogger(__name__)
+
+# The graph data version lives in the database so that writers in other processes
+# (the data/ scripts) are seen by the API. It is a millisecond timestamp that only
+# moves forward, so it keeps increasing even after a full database reload.
+BUMP_GRAPH_VERSION_QUERY = """
+MERGE (m:GraphMeta {key: 'graph'})
+SET m.version = CASE
+        WHEN timestamp() > coalesce(m.version, 0) THEN timestamp()
+        ELSE m.version + 1
+    END,
+    m.updated_at = datetime(),
+    m.reason = $reason
+RETURN m.version AS version
+"""
+
+GET_GRAPH_VERSION_QUERY = """
+MATCH (m:GraphMeta {key: 'graph'})
+RETURN m.version AS version
+"""
+
+
+def bump_graph_version(session, reason: str = "") -> int:
+    """Mark the graph data as changed. Call after any write that affects query results."""
+    record = session.run(BUMP_GRAPH_VERSION_QUERY, reason=reason).single()
+    version = record["version"] if record else 0
+    graph_version.notify_local_change(version)
+    return version
+
+
+class GraphVersionTracker:
+    """
+    Caches the graph data version and tells subscribers when it changes.
+
+    The database is polled at most once per check interval, so callers can ask for
+    the current version on every request without adding a round trip each time.
+    """
+
+    def __init__(self, database: Neo4jDatabase = db, check_interval: float = GRAPH_VERSION_CHECK_INTERVAL):
+        self._database = database
+        self.check_interval = check_interval
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._listeners: List[Callable[[int], None]] = []
+
+    def subscribe(self, callback: Callable[[int], None]):
+        """Register a callback invoked with the new version whenever it changes."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def _due(self) -> bool:
+        return time.monotonic() - self._checked_at >= self.check_interval
+
+    def current(self) -> int:
+        """Return the graph version, refreshing it from the database when due."""
+        if self._due():
+            # One caller reads the database; the others wait for it and reuse its result
+            with self._refresh_lock:
+                if self._due():
+                    self.refresh()
+        return self._version or 0
+
+    async def acurrent(self) -> int:
+        """
+        current() for the event loop: the database read runs in a worker thread. While
+        another caller is already refreshing, the last known version is returned.
+        """
+        if not self._due():
+            return self._version or 0
+        if self._version is not None and self._refresh_lock.locked():
+            return self._version
+        return await asyncio.to_thread(self.current)
+
+    def refresh(self) -> int:
+        """Read the version from the database now."""
+        try:
+            with self._database.get_session() as session:
+                record = session.run(GET_GRAPH_VERSION_QUERY).single()
+            self._set_version(record["version"] if record else 0)
+        except Exception as e:
+            # Keep serving with the last known version; caches still expire by TTL.
+            logger.warning(f"Failed to read graph version: {e}")
+        self._checked_at = time.monotonic()
+        return self._version or 0
+
+    def notify_local_change(self, version: int):
+        """Apply a version bump made by this process without waiting for the next poll."""
+        self._set_version(version)
+        self._checked_at = time.monotonic()
+
+    def _set_version(self, version: int):
+        with self._lock:
+            changed = self._version is not None and version != self._version
+            self._version = version
+            listeners = list(self._listeners)
+        if changed:
+            logger.info(f"Graph data version changed to {version}")
+            for callback in listeners:
+                try:
+                    callback(version)
+                except Exception as e:
+                    logger.error(f"Graph version listener failed: {e}")
+
+
+graph_version = GraphVersionTracker()
@@ -0,0 +1,141 @@
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from typing import Any, Dict, List, NamedTuple, Optional
+from chatbot.src.config import (
+    CYPHER_MAX_ESTIMATED_ROWS,
+    CYPHER_MAX_LABEL_SCAN_ROWS,
+    CYPHER_PLAN_CACHE_SIZE,
+    CYPHER_CACHE_TTL,
+)
+from chatbot.src.cache import TTLCache
+from chatbot.src.graph_version import graph_version
+
+# Operators that are never acceptable in agent-generated queries
+REJECTED_OPERATORS = {
+    "CartesianProduct": "joins disconnected patterns as a cartesian product; connect them with a relationship or filter each side by id first",
+    "AllNodesScan": "scans every node in the graph; add a label and an id/code filter",
+}
+
+
+class PlanVerdict(NamedTuple):
+    allowed: bool
+    diagnosis: str
+    estimated_rows: float
+    operators: List[str]
+
+
+def _operator_name(plan: Dict[str, Any]) -> str:
+    # Neo4j 5 suffixes operator names with the runtime ("NodeByLabelScan@neo4j")
+    return plan.get("operatorType", "").split("@")[0]
+
+
+def _walk(plan: Dict[str, Any]):
+    yield plan
+    for child in plan.get("children", []) or []:
+        yield from _walk(child)
+
+
+def inspect_plan(
+    plan: Dict[str, Any],
+    max_estimated_rows: float = CYPHER_MAX_ESTIMATED_ROWS,
+    max_label_scan_rows: float = CYPHER_MAX_LABEL_SCAN_ROWS,
+) -> PlanVerdict:
+    """Judge an EXPLAIN plan against the row budget and the rejected operator list."""
+    problems = []
+    operators = []
+    peak_rows = 0.0
+
+    for op in _walk(plan):
+        name = _operator_name(op)
+        arguments = op.get("arguments", {}) or {}
+        rows = float(arguments.get("EstimatedRows", 0) or 0)
+        details = arguments.get("Details", "")
+        operators.append(f"{name}({details})~{rows:,.0f}" if details else f"{name}~{rows:,.0f}")
+        peak_rows = max(peak_rows, rows)
+
+        if name in REJECTED_OPERATORS:
+            label = f"{name} {details}" if details else name
+            problems.append(f"{label}: {REJECTED_OPERATORS[name]}")
+        elif name == "NodeByLabelScan" and rows > max_label_scan_rows:
+            problems.append(
+                f"full label scan {details} over ~{rows:,.0f} nodes; "
+                "anchor the MATCH on an indexed property (Claim.id, Diagnosis.code, Hospital.id, Doctor.id)"
+            )
+
+    if peak_rows > max_estimated_rows:
+        problems.append(
+            f"estimated {peak_rows:,.0f} intermediate rows exceeds the budget of {max_estimated_rows:,.0f}; "
+            "filter earlier or aggregate with count()/avg() instead of returning rows"
+        )
+
+    if not problems:
+        return PlanVerdict(True, "", peak_rows, operators)
+
+    diagnosis = (
+        "Cypher Plan Rejected (query was not executed). Problems: "
+        + " | ".join(problems)
+        + f". Plan: {' <- '.join(operators[:6])}"
+        + ". Rewrite the query cheaply and retry."
+    )
+    return PlanVerdict(False, diagnosis, peak_rows, operators)
+
+
+class CypherPlanGuard:
+    """Runs EXPLAIN before agent queries and caches the verdict per query shape."""
+
+    def __init__(self, max_size: int = CYPHER_PLAN_CACHE_SIZE, ttl_seconds: float = CYPHER_CACHE_TTL):
+        self.verdicts = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+        self.rejected = 0
+        graph_version.subscribe(lambda version: self.verdicts.clear())
+
+    def check(self, session, cypher_query: str, params: Optional[Dict[str, Any]] = None) -> PlanVerdict:
+        """Return the (cached) verdict for this query shape; unknown shapes are EXPLAINed once."""
+        key, verdict = self._lookup(cypher_query, graph_version.current())
+        if verdict is None:
+            try:
+                summary = session.execute_read(
+                    lambda tx: tx.run(f"EXPLAIN {cypher_query}", params or {}).consume()
+                )
+                verdict = inspect_plan(summary.plan or {})
+            except Exception:
+                # Syntax and similar errors surface when the query itself runs
+                return PlanVerdict(True, "", 0.0, [])
+            self.verdicts.set(key, verdict)
+        return self._counted(verdict)
+
+    async def acheck(self, session, cypher_query: str, params: Optional[Dict[str, Any]] = None) -> PlanVerdict:
+        """check() with a session of the async driver."""
+        key, verdict = self._lookup(cypher_query, await graph_version.acurrent())
+        if verdict is None:
+            async def explain(tx):
+                result = await tx.run(f"EXPLAIN {cypher_query}", params or {})
+                return await result.consume()
+
+            try:
+                summary = await session.execute_read(explain)
+                verdict = inspect_plan(summary.plan or {})
+            except Exception:
+                return PlanVerdict(True, "", 0.0, [])
+            self.verdicts.set(key, verdict)
+        return self._counted(verdict)
+
+    def _lookup(self, cypher_query: str, version: int):
+        # Queries that already carry a prefix are passed through without a plan check
+        head = cypher_query.lstrip().split(None, 1)[0].upper() if cypher_query.strip() else ""
+        if head in ("EXPLAIN", "PROFILE", "CYPHER"):
+            return None, PlanVerdict(True, "", 0.0, [])
+        key = (version, cypher_query)
+        return key, self.verdicts.get(key)
+
+    def _counted(self, verdict: PlanVerdict) -> PlanVerdict:
+        if not verdict.allowed:
+            with self._lock:
+                self.rejected += 1
+        return verdict
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.verdicts.stats(), "rejected_queries": self.rejected}
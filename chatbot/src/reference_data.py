@@ -0,0 +1,171 @@
+import logging
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from typing import Any, Dict, List, NamedTuple, Optional
+from chatbot.src.database import Neo4jDatabase, db
+from chatbot.src.graph_version import graph_version
+
+logger = logging.getLogger(__name__)
+
+# Reference tables used by form verification. They are small (tens to thousands of rows)
+# and only change when the data/ loaders run, so the API keeps them in memory and reloads
+# them when the graph data version moves.
+REFERENCE_DIAGNOSES_QUERY = """
+MATCH (d:Diagnosis)
+RETURN d.code AS code, d.name AS name, d.avg_cost AS avg_cost, d.severity AS severity,
+       [(d)-[r:REQUIRES|TYPICALLY_TREATED_WITH]->(p:Procedure) | {code: p.code, name: p.name, relationship: type(r)}] AS rules
+"""
+
+# Uncodified procedures are per-claim placeholders with no reference cost
+REFERENCE_PROCEDURES_QUERY = """
+MATCH (p:Procedure)
+WHERE NOT toString(p.code) STARTS WITH 'UNCODIFIED'
+RETURN p.code AS code, p.name AS name, p.avg_cost AS avg_cost
+"""
+
+REFERENCE_DOCTORS_QUERY = """
+MATCH (d:Doctor)
+RETURN d.id AS id, d.name AS name, d.specialization AS specialization
+"""
+
+REFERENCE_HOSPITALS_QUERY = """
+MATCH (h:Hospital)
+RETURN h.id AS id, h.name AS name, h.class AS class,
+       [(h)-[:HAS_SPECIALTY]->(s:Specialty) | s.name] AS specialties,
+       [(h)-[:HAS_FACILITY]->(f:Facility) | f.name] AS facilities
+"""
+
+
+def _key(value: Any) -> str:
+    return str(value).strip().lower() if value is not None else ""
+
+
+class ReferenceSnapshot(NamedTuple):
+    """Immutable view of the reference tables at one graph version."""
+    version: int
+    loaded_at: float
+    diagnoses: Dict[str, Dict[str, Any]]
+    diagnosis_rules: Dict[str, List[Dict[str, Any]]]
+    procedures: Dict[str, Dict[str, Any]]
+    doctors: Dict[str, Dict[str, Any]]
+    hospitals: Dict[str, Dict[str, Any]]
+    diagnoses_by_name: Dict[str, Dict[str, Any]]
+    procedures_by_name: Dict[str, Dict[str, Any]]
+    procedure_names: List[str]  # lower-cased, shortest first, for partial matches
+
+    def diagnosis(self, code_or_name: str) -> Optional[Dict[str, Any]]:
+        """Look up by ICD-10 code, name, or a category code such as 'I63' for 'I63.9'."""
+        key = _key(code_or_name)
+        found = self.diagnoses.get(key) or self.diagnoses_by_name.get(key)
+        if found or not key:
+            return found
+        return next((self.diagnoses[code] for code in sorted(self.diagnoses) if code.startswith(key + ".")), None)
+
+    def procedure(self, code_or_name: str) -> Optional[Dict[str, Any]]:
+        """Look up by code or name; free text such as 'CT Scan' matches the shortest name containing it."""
+        key = _key(code_or_name)
+        found = self.procedures.get(key) or self.procedures_by_name.get(key)
+        if found or not key:
+            return found
+        name = next((name for name in self.procedure_names if key in name), None)
+        return self.procedures_by_name[name] if name else None
+
+    def rules(self, diagnosis_code: Any) -> List[Dict[str, Any]]:
+        """REQUIRES/TYPICALLY_TREATED_WITH procedures of a diagnosis."""
+        return self.diagnosis_rules.get(_key(diagnosis_code), [])
+
+    def doctor(self, doctor_id: str) -> Optional[Dict[str, Any]]:
+        return self.doctors.get(_key(doctor_id))
+
+    def hospital(self, hospital_id: str) -> Optional[Dict[str, Any]]:
+        return self.hospitals.get(_key(hospital_id))
+
+
+def build_snapshot(version: int, diagnoses: List[Dict[str, Any]], procedures: List[Dict[str, Any]],
+                   doctors: List[Dict[str, Any]], hospitals: List[Dict[str, Any]]) -> ReferenceSnapshot:
+    """Index query rows by lower-cased id/code and name."""
+    diagnosis_rules = {_key(row["code"]): row.pop("rules", None) or [] for row in diagnoses}
+    procedures_by_name = {_key(row["name"]): row for row in procedures if row.get("name")}
+    return ReferenceSnapshot(
+        version=version,
+        loaded_at=time.time(),
+        diagnoses={_key(row["code"]): row for row in diagnoses},
+        diagnosis_rules=diagnosis_rules,
+        procedures={_key(row["code"]): row for row in procedures},
+        doctors={_key(row["id"]): row for row in doctors},
+        hospitals={_key(row["id"]): row for row in hospitals},
+        diagnoses_by_name={_key(row["name"]): row for row in diagnoses if row.get("name")},
+        procedures_by_name=procedures_by_name,
+        procedure_names=sorted(procedures_by_name, key=len),
+    )
+
+
+class ReferenceData:
+    """
+    Holds the current ReferenceSnapshot and reloads it when the graph version changes.
+
+    Readers get the snapshot object and never see a half-built index: a reload builds
+    a new snapshot and swaps the reference. The version check uses the tracker's cached
+    value, so get() only reaches the database when the data actually changed.
+    """
+
+    def __init__(self, database: Neo4jDatabase = db):
+        self._database = database
+        self._snapshot: Optional[ReferenceSnapshot] = None
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def load(self) -> ReferenceSnapshot:
+        """Read all reference tables now (one session, four queries)."""
+        version = graph_version.current()
+        with self._database.get_session() as session:
+            def rows(query):
+                return session.execute_read(lambda tx: [record.data() for record in tx.run(query)])
+            snapshot = build_snapshot(
+                version,
+                rows(REFERENCE_DIAGNOSES_QUERY),
+                rows(REFERENCE_PROCEDURES_QUERY),
+                rows(REFERENCE_DOCTORS_QUERY),
+                rows(REFERENCE_HOSPITALS_QUERY),
+            )
+        self._snapshot = snapshot
+        self.loads += 1
+        logger.info(
+            f"Loaded reference data v{version}: {len(snapshot.diagnoses)} diagnoses, "
+            f"{len(snapshot.procedures)} procedures, {len(snapshot.doctors)} doctors, "
+            f"{len(snapshot.hospitals)} hospitals"
+        )
+        return snapshot
+
+    def get(self) -> ReferenceSnapshot:
+        """Return the snapshot for the current graph version, reloading it if the data changed."""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == graph_version.current():
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == graph_version.current():
+                return snapshot
+            return self.load()
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"loaded": False, "loads": self.loads}
+        return {
+            "loaded": True,
+            "loads": self.loads,
+            "version": snapshot.version,
+            "loaded_at": snapshot.loaded_at,
+            "diagnoses": len(snapshot.diagnoses),
+            "procedures": len(snapshot.procedures),
+            "doctors": len(snapshot.doctors),
+            "hospitals": len(snapshot.hospitals),
+        }
+
+
+reference_data = ReferenceData()
@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+
+class SemanticHit(NamedTuple):
+    value: Any
+    similarity: float
+    text: str  # text the cached value was stored for
+    age_seconds: float
+
+
+class _Entry(NamedTuple):
+    value: Any
+    text: str
+    version: int
+    guard: Hashable
+    created_at: float
+    expires_at: float
+
+
+class SemanticCache:
+    """
+    Thread-safe LRU cache with a time-to-live, looked up by embedding similarity.
+
+    get() returns the entry whose vector is most similar (cosine) to the query vector,
+    if it reaches the threshold, was stored for the same graph version and has the same
+    guard. Vectors are normalized on insert and kept as rows of one matrix, so a lookup
+    is a single matrix-vector product over all entries.
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 3600.0, threshold: float = 0.92):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._active = np.zeros(max(max_size, 0), dtype=bool)
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()  # slot -> entry, LRU order
+        self._slots: Dict[tuple, int] = {}  # (text, guard) -> slot
+        self._free: List[int] = list(range(max_size - 1, -1, -1))
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._hit_similarity = 0.0
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> Optional[np.ndarray]:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm > 0 else None
+
+    def get(self, vector: Sequence[float], version: int = 0, guard: Hashable = None) -> Optional[SemanticHit]:
+        """Return the most similar live entry at or above the threshold, or None on miss."""
+        query = self._normalize(vector)
+        with self._lock:
+            if query is None or self._matrix is None or not self._entries or query.shape[0] != self._matrix.shape[1]:
+                self._misses += 1
+                return None
+
+            similarities = self._matrix @ query
+            similarities[~self._active] = -np.inf
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            now = time.monotonic()
+            for slot in candidates[np.argsort(-similarities[candidates])]:
+                slot = int(slot)
+                entry = self._entries[slot]
+                if entry.expires_at < now:
+                    self._remove(slot)
+                    self._expirations += 1
+                    continue
+                if entry.version != version:
+                    self._remove(slot)
+                    continue
+                if entry.guard != guard:
+                    continue
+                self._entries.move_to_end(slot)
+                self._hits += 1
+                similarity = float(similarities[slot])
+                self._hit_similarity += similarity
+                return SemanticHit(entry.value, similarity, entry.text, now - entry.created_at)
+
+            self._misses += 1
+            return None
+
+    def set(self, vector: Sequence[float], value: Any, text: str = "", version: int = 0, guard: Hashable = None):
+        """Insert or replace the entry for text, evicting the least recently used one when full."""
+        if self.max_size <= 0:
+            return
+        row = self._normalize(vector)
+        if row is None:
+            return
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != row.shape[0]:
+                # First entry, or the embedding model changed: start over with the new dimension
+                self._reset()
+                self._matrix = np.zeros((self.max_size, row.shape[0]), dtype=np.float32)
+
+            slot = self._slots.get((text, guard))
+            if slot is None:
+                if not self._free:
+                    self._remove(next(iter(self._entries)))
+                    self._evictions += 1
+                slot = self._free.pop()
+                self._slots[(text, guard)] = slot
+
+            now = time.monotonic()
+            self._matrix[slot] = row
+            self._active[slot] = True
+            self._entries[slot] = _Entry(value, text, version, guard, now, now + self.ttl_seconds)
+            self._entries.move_to_end(slot)
+
+    def clear(self):
+        """Drop every entry (e.g. after the graph data changed)."""
+        with self._lock:
+            if self._entries:
+                self._invalidations += 1
+            self._reset()
+
+    def _remove(self, slot: int):
+        entry = self._entries.pop(slot)
+        del self._slots[(entry.text, entry.guard)]
+        self._active[slot] = False
+        self._free.append(slot)
+
+    def _reset(self):
+        self._entries.clear()
+        self._slots.clear()
+        self._active[:] = False
+        self._free = list(range(self.max_size - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """Hit/miss counters for sizing the cache and tuning the threshold."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "threshold": self.threshold,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+                "mean_hit_similarity": round(self._hit_similarity / self._hits, 4) if self._hits else None,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
@@ -1,14 +1,16 @@
 from typing import Type, Literal, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from langchain_core.tools import BaseTool
-from langchain_community.vectorstores import Neo4jVector
-from langchain_openai import OpenAIEmbeddings
-from neo4j import GraphDatabase
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
 
-from chatbot.src.config import NEO4J_URI, NEO4J_AUTH
+from chatbot.src.config import NEO4J_URI, NEO4J_AUTH, ENTITY_RESOLVER_ENABLED, ENTITY_SEARCH_BACKEND
+from chatbot.src.database import get_database
+from chatbot.src.embeddings import get_embedding_model
+from chatbot.src.entity_index import entity_index
+from chatbot.src.entity_resolver import entity_resolver
+from chatbot.src.vector_store import vector_stores
 
 # --- 1. Input Schema ---
 class EntityRiskInput(BaseModel):
@@ -37,35 +39,47 @@ class AssessEntityRiskTool(BaseTool):
     def _resolve_name_via_vector(self, entity_type: str, query: str) -> str:
         """Uses Vector Search to find the exact node name (e.g., 'Budi' -> 'Dr. Budi Hartono')."""
         try:
-            index_map = {"Doctor": "doctor_entity_index", "Hospital": "hospital_entity_index"}
+            index_map = {"Doctor": "doctor", "Hospital": "hospital"}
             if entity_type not in index_map:
                 return query # Claims don't need vector resolution usually
 
-            vector_store = Neo4jVector.from_existing_index(
-                OpenAIEmbeddings(),
-                url=self.URI,
-                username=self.AUTH[0],
-                password=self.AUTH[1],
-                index_name=index_map[entity_type]
-            )
-            
-            results = vector_store.similarity_search(query, k=1)
-            if not results:
+            entity_key = index_map[entity_type]
+            contents = self._lookup_name(entity_key, query)
+            if not contents:
+                vector = get_embedding_model().embed_query(query)
+                if ENTITY_SEARCH_BACKEND == "local":
+                    contents = [hit.text for hit in entity_index.search(entity_key, vector, k=1)]
+                else:
+                    results = vector_stores.get(entity_key).similarity_search_by_vector(vector, k=1)
+                    contents = [doc.page_content for doc in results]
+            if not contents:
                 return query # Fallback to original string
             
-            # Extract exact name (assuming format "name: X\n...")
-            return results[0].page_content.split("\n")[0].replace("name: ", "").strip()
+            # Extract exact name (format "\nname: X\nid: Y")
+            for line in contents[0].strip().split("\n"):
+                if line.startswith("name: "):
+                    return line.replace("name: ", "").strip()
+            return query
         except:
             return query
 
+    @staticmethod
+    def _lookup_name(entity_key: str, query: str) -> list:
+        """ID/code, name or trigram match of the query (no embedding needed); empty if none."""
+        if not ENTITY_RESOLVER_ENABLED:
+            return []
+        try:
+            match = entity_resolver.resolve(entity_resolver.get(), [(entity_key, [query])]).get((entity_key, query))
+            return [match.text] if match else []
+        except Exception:
+            return []
+
     def _run(self, entity_type: str, query: str) -> str:
-        driver = None
         try:
             # 1. Resolve Ambiguous Names
             search_term = self._resolve_name_via_vector(entity_type, query)
             
-            driver = GraphDatabase.driver(self.URI, auth=self.AUTH)
-            with driver.session() as session:
+            with get_database(self.URI, self.AUTH).get_session() as session:
                 
                 # ==========================================
                 # SCENARIO A: DOCTOR RISK PROFILE
@@ -163,8 +177,6 @@ class AssessEntityRiskTool(BaseTool):
 
         except Exception as e:
             return f"Analysis Error: {str(e)}"
-        finally:
-            if driver: driver.close()
 
     # --- 3. Helper Methods for Formatting (The "Analyst" Logic) ---
     
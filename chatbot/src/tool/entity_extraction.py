@@ -51,13 +51,14 @@ class EntityExtractionTool(BaseTool):
         # If no JSON pattern found, return the content as-is
         return content
 
-    def _run(self, user_query: str) -> str:
-        llm = ChatOpenAI(
+    def _llm(self):
+        return ChatOpenAI(
             model="qwen3-8B", 
             base_url="http://127.0.0.1:1234/v1", 
             api_key=""
         )
-        
+
+    def _messages(self, user_query: str):
         system_instruction = """
         You are an expert medical entity extractor. Your goal is to analyze medical and insurance queries and extract structured information.
         
@@ -90,15 +91,30 @@ class EntityExtractionTool(BaseTool):
         5. Do not use <think> tags or any other XML-style tags in your response.
         """
 
-        messages = [
+        return [
             SystemMessage(content=system_instruction),
             HumanMessage(content=f"Analyze this query: {user_query}")
         ]
 
+    def _run(self, user_query: str) -> str:
+        try:
+            response = self._llm().invoke(self._messages(user_query))
+        except Exception as e:
+            return self._error(user_query, e)
+        return self._parse(user_query, response)
+
+    async def _arun(self, user_query: str) -> str:
         try:
-            response = llm.invoke(messages)
-            content = response.content.strip()
-            content = self._clean_llm_response(content)
+            response = await self._llm().ainvoke(self._messages(user_query))
+        except Exception as e:
+            return self._error(user_query, e)
+        return self._parse(user_query, response)
+
+    def _parse(self, user_query: str, response) -> str:
+        """Turn the LLM response into the entities JSON (or the keyword fallback)."""
+        content = response.content
+        try:
+            content = self._clean_llm_response(content.strip())
             json_content = self._extract_json(content)
             print(f"[ENTITY_EXTRACTION] Extracted JSON Content: {json_content}")
             
@@ -120,15 +136,18 @@ class EntityExtractionTool(BaseTool):
                 "query_intent": "general query",
                 "language": "auto-detect",
                 "keywords": [user_query],
-                "raw_llm_response": response.content if 'response' in locals() else "Error",
+                "raw_llm_response": response.content,
                 "parsing_error": str(e)
             }
             return json.dumps(fallback, indent=2)
                 
         except Exception as e:
-            error_response = {
-                "error": f"Entity extraction failed: {str(e)}",
-                "fallback_keywords": [user_query],
-                "language": "auto-detect"
-            }
-            return json.dumps(error_response, indent=2)
+            return self._error(user_query, e)
+
+    def _error(self, user_query: str, error: Exception) -> str:
+        error_response = {
+            "error": f"Entity extraction failed: {str(error)}",
+            "fallback_keywords": [user_query],
+            "language": "auto-detect"
+        }
+        return json.dumps(error_response, indent=2)
@@ -1,23 +1,43 @@
 import json
+import re
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
 
-from neo4j import GraphDatabase
 from langchain.tools import tool
 from pydantic import BaseModel, Field
-from typing import Type, List, Any
+from typing import Type, List, Any, AsyncIterable, Dict, Iterable, NamedTuple, Optional, Tuple
 from langchain_core.tools import BaseTool
-from chatbot.src.config import NEO4J_URI, NEO4J_AUTH
+from chatbot.src.config import (
+    CYPHER_CACHE_SIZE,
+    CYPHER_CACHE_TTL,
+    CYPHER_PARAMETERIZE_LITERALS,
+    CYPHER_PLAN_GUARD_ENABLED,
+    CYPHER_MAX_ROWS,
+    CYPHER_MAX_BYTES,
+    CYPHER_MAX_COUNTED_ROWS,
+    CYPHER_RESULT_FORMAT,
+)
+from chatbot.src.database import db
+from chatbot.src.cache import TTLCache
+from chatbot.src.graph_version import graph_version
+from chatbot.src.cypher_normalizer import parameterize_cypher
+from chatbot.src.plan_guard import CypherPlanGuard
 
-# 1. Neo4j Connection Details (imported from config)
-URI = NEO4J_URI
-AUTH = NEO4J_AUTH
+# 1. Neo4j Connection: the process-wide pooled driver from chatbot.src.database
+
+# Result cache shared by every ExecuteCypherTool instance (chatbot and claim verification
+# agents). Entries are keyed by graph version and dropped as soon as the version changes.
+result_cache = TTLCache(max_size=CYPHER_CACHE_SIZE, ttl_seconds=CYPHER_CACHE_TTL)
+graph_version.subscribe(lambda version: result_cache.clear())
+
+# EXPLAIN pre-flight check; verdicts are cached per query shape
+plan_guard = CypherPlanGuard()
 
 # 2. Define the Input Schema
 class CypherInput(BaseModel):
     """Input schema for the execute_cypher tool."""
-    
+
     cypher_query: str = Field(
         description="The exact Cypher query to execute. Ensure it is a READ-ONLY query (MATCH, RETURN, etc)."
     )
@@ -36,49 +56,277 @@ def neo4j_json_serializer(o: Any) -> Any:
         return list(o)
     return str(o)
 
-# 4. Define the Tool
+_WHITESPACE_OUTSIDE_STRINGS = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")|\s+""")
+
+def normalize_cypher_text(cypher_query: str) -> str:
+    """Collapse whitespace and trailing semicolons so formatting differences share a cache key.
+    Only used for the key: the query itself is sent to Neo4j untouched."""
+    collapsed = _WHITESPACE_OUTSIDE_STRINGS.sub(lambda m: m.group(1) or ' ', cypher_query)
+    return collapsed.strip().rstrip(';').strip()
+
+def _cache_key(version: int, cypher_query: str, params: Dict[str, Any]) -> tuple:
+    return (version, cypher_query, json.dumps(params, sort_keys=True, default=str))
+
+# 4. Helper: Bounded result collection and compact encoding
+class CollectedRows(NamedTuple):
+    columns: List[str]
+    rows: List[List[Any]]
+    total: int
+    total_is_exact: bool
+    truncated_by: Optional[str]
+
+def _encoded_size(row: List[Any]) -> int:
+    return len(json.dumps(row, default=neo4j_json_serializer, separators=(",", ":"))) + 1
+
+def _shorten(value: Any, limit: int) -> Any:
+    """Cut lists and strings longer than limit, with a marker saying how much was left out."""
+    if isinstance(value, str) and len(value) > limit:
+        return value[:limit] + f"... ({len(value) - limit:,} more characters)"
+    if isinstance(value, (list, tuple)):
+        items = [_shorten(item, limit) for item in value[:limit]]
+        if len(value) > limit:
+            items.append(f"... ({len(value) - limit:,} more items)")
+        return items
+    if isinstance(value, dict):
+        return {key: _shorten(item, limit) for key, item in value.items()}
+    return value
+
+def _fit_row(row: List[Any], max_bytes: int) -> Tuple[List[Any], int]:
+    """The row with its long values cut until it fits max_bytes, or a "row too large" note."""
+    limit = 1000
+    while limit >= 1:
+        shortened = [_shorten(value, limit) for value in row]
+        size = _encoded_size(shortened)
+        if size <= max_bytes:
+            return shortened, size
+        limit //= 4
+    note = [f"(row too large: {_encoded_size(row):,} bytes)"] + [None] * (len(row) - 1)
+    return note, _encoded_size(note)
+
+class _RowCollector:
+    """Row/byte-capped accumulator shared by the sync and async readers."""
+
+    def __init__(self, columns: List[str], max_rows: int, max_bytes: int, max_counted: int):
+        self.columns = columns
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_counted = max_counted
+        self.rows: List[List[Any]] = []
+        self.used_bytes = 0
+        self.total = 0
+        self.total_is_exact = True
+        self.truncated_by: Optional[str] = None
+
+    def add(self, record: Any) -> bool:
+        """Take one record; returns False once counting can stop."""
+        self.total += 1
+        if self.truncated_by:
+            if self.total >= self.max_counted:
+                self.total_is_exact = False
+                return False
+            return True
+        if len(self.rows) >= self.max_rows:
+            self.truncated_by = "row limit"
+            return True
+        # record.data() automatically converts Nodes and Relationships to dicts
+        data = record.data()
+        row = [data.get(column) for column in self.columns]
+        size = _encoded_size(row)
+        if self.used_bytes + size > self.max_bytes:
+            self.truncated_by = "size limit"
+            if self.rows:
+                return True
+            # A single row (e.g. a large collect()) is shortened instead of sent whole
+            row, size = _fit_row(row, self.max_bytes)
+        self.rows.append(row)
+        self.used_bytes += size
+        return True
+
+    def collected(self) -> CollectedRows:
+        return CollectedRows(self.columns, self.rows, self.total, self.total_is_exact, self.truncated_by)
+
+def collect_rows(
+    records: Iterable[Any],
+    columns: List[str],
+    max_rows: int = CYPHER_MAX_ROWS,
+    max_bytes: int = CYPHER_MAX_BYTES,
+    max_counted: int = CYPHER_MAX_COUNTED_ROWS,
+) -> CollectedRows:
+    """
+    Keep rows while the stream is read, stopping at the row or byte cap.
+
+    Records past the cap are only counted (never converted), up to max_counted,
+    so the caller can report "showing 50 of 12,004 rows" without holding them.
+    """
+    collector = _RowCollector(columns, max_rows, max_bytes, max_counted)
+    for record in records:
+        if not collector.add(record):
+            break
+    return collector.collected()
+
+async def acollect_rows(
+    records: AsyncIterable[Any],
+    columns: List[str],
+    max_rows: int = CYPHER_MAX_ROWS,
+    max_bytes: int = CYPHER_MAX_BYTES,
+    max_counted: int = CYPHER_MAX_COUNTED_ROWS,
+) -> CollectedRows:
+    """collect_rows() for an async driver result."""
+    collector = _RowCollector(columns, max_rows, max_bytes, max_counted)
+    async for record in records:
+        if not collector.add(record):
+            break
+    return collector.collected()
+
+def format_rows(collected: CollectedRows, result_format: str = CYPHER_RESULT_FORMAT) -> str:
+    """
+    Encode collected rows for the LLM.
+
+    "table" (default): one JSON array of column names, then one JSON array per row.
+    "json": the previous pretty-printed list of objects.
+    """
+    if result_format == "json":
+        data = [dict(zip(collected.columns, row)) for row in collected.rows]
+        body = json.dumps(data, default=neo4j_json_serializer, indent=2)
+    else:
+        lines = [json.dumps(collected.columns, separators=(",", ":"))]
+        lines.extend(
+            json.dumps(row, default=neo4j_json_serializer, separators=(",", ":"))
+            for row in collected.rows
+        )
+        body = "\n".join(lines)
+
+    if collected.truncated_by:
+        total = f"{collected.total:,}" if collected.total_is_exact else f"more than {collected.total:,}"
+        body += (
+            f"\n(showing {len(collected.rows):,} of {total} rows; truncated at the {collected.truncated_by}. "
+            "Aggregate, filter or add ORDER BY ... LIMIT to see the rows you need.)"
+        )
+    return body
+
+# 5. Define the Tool
 class ExecuteCypherTool(BaseTool):
     name: str = "execute_cypher"
     description: str = """
     Use this tool to execute a Cypher query against the graph database and retrieve the results.
     Input should be a valid Cypher string.
     Useful for answering questions like "How many...", "Find the path...", or "List all...".
+    Results are returned as a JSON array of column names followed by one JSON array per row.
+    Large results are truncated and the total row count is reported.
     """
     args_schema: Type[BaseModel] = CypherInput
 
     def _run(self, cypher_query: str) -> str:
         print(f"[EXECUTE_CYPHER] Executing query: {cypher_query}")
-        driver = None
+        normalized = self._parameterized(cypher_query)
+        if normalized is None:
+            return self.execute(cypher_query, {})
+
+        output = self.execute(normalized.text, normalized.params)
+        if output.startswith("Cypher Execution Error"):
+            # The rewrite must never turn a valid query into a failing one
+            return self.execute(cypher_query, {})
+        return output
+
+    async def _arun(self, cypher_query: str) -> str:
+        print(f"[EXECUTE_CYPHER] Executing query (async): {cypher_query}")
+        normalized = self._parameterized(cypher_query)
+        if normalized is None:
+            return await self.aexecute(cypher_query, {})
+
+        output = await self.aexecute(normalized.text, normalized.params)
+        if output.startswith("Cypher Execution Error"):
+            return await self.aexecute(cypher_query, {})
+        return output
+
+    @staticmethod
+    def _parameterized(cypher_query: str):
+        """Lift inline literals into parameters so Neo4j reuses the cached plan (None if nothing to lift)."""
+        if not CYPHER_PARAMETERIZE_LITERALS:
+            return None
+        normalized = parameterize_cypher(cypher_query)
+        if not normalized.params:
+            return None
+        print(f"[EXECUTE_CYPHER] Parameterized {len(normalized.params)} literals")
+        return normalized
+
+    def execute(self, cypher_query: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Run a read query through the result cache and return the formatted output."""
+        params = params or {}
+        key = _cache_key(graph_version.current(), normalize_cypher_text(cypher_query), params)
+        cached = result_cache.get(key)
+        if cached is not None:
+            print(f"[EXECUTE_CYPHER] Served from result cache")
+            return cached
+
         try:
-            # 1. Connect to the Database
-            driver = GraphDatabase.driver(URI, auth=AUTH)
-            
-            with driver.session() as session:
-                # 2. Execute the query using a read transaction
-                # We wrap it in a lambda to use the retry logic of execute_read
-                result = session.execute_read(
-                    lambda tx: list(tx.run(cypher_query))
-                )
-                
-                # 3. Process Results
-                if not result:
-                    print(f"[EXECUTE_CYPHER] Query returned no results")
-                    return "Query executed successfully but returned no results."
-
-                # Convert Neo4j records to native Python dictionaries
-                # record.data() automatically converts Nodes and Relationships to dicts
-                data = [record.data() for record in result]
-                
-                print(f"[EXECUTE_CYPHER] Query returned {len(data)} results")
-                
-                # 4. Return formatted JSON
-                # We use the custom serializer to handle Dates and Points safely
-                return json.dumps(data, default=neo4j_json_serializer, indent=2)
+            # 1. Borrow a session from the shared connection pool
+            with db.get_session() as session:
+                # 2. Reject queries whose plan would scan or join far too many rows
+                if CYPHER_PLAN_GUARD_ENABLED:
+                    verdict = plan_guard.check(session, cypher_query, params)
+                    if not verdict.allowed:
+                        print(f"[EXECUTE_CYPHER] Query rejected by plan guard")
+                        return verdict.diagnosis
+
+                # 3. Execute the query using a read transaction, streaming rows
+                # under the row/byte caps instead of materializing the whole result
+                def read_bounded(tx):
+                    result = tx.run(cypher_query, params)
+                    collected = collect_rows(result, list(result.keys()))
+                    result.consume()
+                    return collected
+
+                collected = session.execute_read(read_bounded)
+                return self._output(key, collected)
 
         except Exception as e:
             # Return the error message so the Agent knows the query failed and can retry
+            # (errors are never cached)
             return f"Cypher Execution Error: {str(e)}"
-            
-        finally:
-            if driver:
-                driver.close()
+
+    async def aexecute(self, cypher_query: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """execute() on the async driver: waits for Neo4j without holding a thread."""
+        params = params or {}
+        key = _cache_key(await graph_version.acurrent(), normalize_cypher_text(cypher_query), params)
+        cached = result_cache.get(key)
+        if cached is not None:
+            print(f"[EXECUTE_CYPHER] Served from result cache")
+            return cached
+
+        try:
+            async with db.get_async_session() as session:
+                if CYPHER_PLAN_GUARD_ENABLED:
+                    verdict = await plan_guard.acheck(session, cypher_query, params)
+                    if not verdict.allowed:
+                        print(f"[EXECUTE_CYPHER] Query rejected by plan guard")
+                        return verdict.diagnosis
+
+                async def read_bounded(tx):
+                    result = await tx.run(cypher_query, params)
+                    collected = await acollect_rows(result, list(await result.keys()))
+                    await result.consume()
+                    return collected
+
+                collected = await session.execute_read(read_bounded)
+                return self._output(key, collected)
+
+        except Exception as e:
+            return f"Cypher Execution Error: {str(e)}"
+
+    @staticmethod
+    def _output(key: tuple, collected: CollectedRows) -> str:
+        """Format collected rows for the agent and cache the output."""
+        if not collected.total:
+            print(f"[EXECUTE_CYPHER] Query returned no results")
+            output = "Query executed successfully but returned no results."
+            result_cache.set(key, output)
+            return output
+
+        print(f"[EXECUTE_CYPHER] Query returned {collected.total} results ({len(collected.rows)} kept)")
+
+        # Return compact rows
+        # We use the custom serializer to handle Dates and Points safely
+        output = format_rows(collected)
+        result_cache.set(key, output)
+        return output
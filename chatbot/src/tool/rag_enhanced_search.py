@@ -1,17 +1,43 @@
+import asyncio
 import json
-from typing import Type, Dict, List, Any, Optional
+import threading
+from typing import Type, Dict, Iterable, List, Any, NamedTuple, Optional, Tuple
 from pydantic import BaseModel, Field
 from langchain_core.tools import BaseTool
-from langchain_community.vectorstores import Neo4jVector
-from langchain_openai import OpenAIEmbeddings
-from neo4j import GraphDatabase
 import numpy as np
 
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
 
-from chatbot.src.config import NEO4J_URI, NEO4J_AUTH
+from chatbot.src.config import ENTITY_RESOLVER_ENABLED, ENTITY_SEARCH_BACKEND
+from chatbot.src.database import db
+from chatbot.src.embeddings import get_embedding_model
+from chatbot.src.entity_index import ENTITY_INDEXES, entity_index
+from chatbot.src.entity_resolver import entity_resolver
+from chatbot.src.graph_schema import graph_schema
+from chatbot.src.vector_store import vector_stores
+
+# Used by the async path, which queries the index directly with the async driver.
+# Returns the same text/metadata shape as the shared Neo4jVector stores.
+VECTOR_SEARCH_QUERY = """
+CALL db.index.vector.queryNodes($index_name, $k, $embedding) YIELD node, score
+RETURN reduce(text = '', key IN $text_properties | text + '\\n' + key + ': ' + coalesce(toString(node[key]), '')) AS text,
+       node {.*} AS properties,
+       score
+"""
+
+# ENTITY_SEARCH_BACKEND=neo4j_multi: every (entity type, term) vector search of one RAG
+# step in a single query, tagged with the entity type and term it belongs to
+MULTI_VECTOR_SEARCH_QUERY = """
+UNWIND $searches AS search
+CALL db.index.vector.queryNodes(search.index_name, search.k, search.embedding) YIELD node, score
+RETURN search.entity_type AS entity_type,
+       search.term AS term,
+       reduce(text = '', key IN search.text_properties | text + '\\n' + key + ': ' + coalesce(toString(node[key]), '')) AS text,
+       node {.*, embedding: null} AS properties,
+       score
+"""
 
 class RagSearchInput(BaseModel):
     """Input schema for the RAG enhanced search tool."""
@@ -19,60 +45,115 @@ class RagSearchInput(BaseModel):
         description="JSON string containing extracted entities from the entity extraction tool"
     )
 
+# Used when the graph schema could not be introspected
+FALLBACK_RELATIONSHIPS = [":WORKS_AT", ":HAS_SPECIALTY", ":SUBMITTED_AT", ":CODED_AS", ":REQUIRES"]
+
+
+class RelationshipIndex(NamedTuple):
+    """Relationship types of the graph with their normalized name embeddings (one row each)."""
+    relationships: List[str]
+    matrix: np.ndarray
+
+
+def _relationship_text(relationship: str) -> str:
+    """Relationship name as embedded ("HAS_SPECIALTY" -> "has specialty")."""
+    return relationship.replace(":", "").replace("_", " ").lower()
+
+
+def _normalized(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        norm = np.linalg.norm(matrix)
+        return matrix / norm if norm > 0 else matrix
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
 class SemanticRelationshipMapper:
-    """Maps extracted relationships to graph database relationships using semantic similarity."""
+    """
+    Maps extracted relationships to graph database relationships using semantic similarity.
+
+    The relationship type names are embedded once and kept as a normalized matrix, so
+    mapping a relation costs one embedding of the relation and one matrix-vector product.
+    The types come from the introspected graph schema; the matrix is rebuilt only when
+    the set of types changes, not on every data write.
+    """
     
     def __init__(self, embedding_model):
         self.embedding_model = embedding_model
-        self._relationship_cache = {}
+        self._index: Optional[RelationshipIndex] = None
+        self._lock = threading.Lock()
+        self._async_lock = asyncio.Lock()
     
     def get_graph_relationships(self) -> List[str]:
-        """Discover all relationship types from the graph database."""
-        if self._relationship_cache:
-            return self._relationship_cache.get("relationships", [])
-            
-        try:
-            driver = GraphDatabase.driver(NEO4J_URI, auth=NEO4J_AUTH)
-            with driver.session() as session:
-                result = session.run("MATCH ()-[r]->() RETURN DISTINCT type(r) as rel_type")
-                relationships = [record["rel_type"] for record in result]
-                self._relationship_cache["relationships"] = relationships
-                return relationships
-        except Exception as e:
-            print(f"Failed to discover graph relationships: {e}")
-            return [":WORKS_AT", ":HAS_SPECIALTY", ":SUBMITTED_AT", ":CODED_AS", ":REQUIRES"]
-    
+        """Relationship types of the graph, from the introspected schema (no relationship scan)."""
+        snapshot = graph_schema.get()
+        return list(snapshot.relationship_types) if snapshot.introspected else list(FALLBACK_RELATIONSHIPS)
+
+    async def aget_graph_relationships(self) -> List[str]:
+        """get_graph_relationships() for the event loop."""
+        snapshot = await graph_schema.aget()
+        return list(snapshot.relationship_types) if snapshot.introspected else list(FALLBACK_RELATIONSHIPS)
+
+    def relationship_index(self) -> RelationshipIndex:
+        """The relationship matrix, re-embedded only when the relationship types change."""
+        relationships = self.get_graph_relationships()
+        index = self._index
+        if index is not None and index.relationships == relationships:
+            return index
+        with self._lock:
+            if self._index is None or self._index.relationships != relationships:
+                vectors = self.embedding_model.embed_documents([_relationship_text(rel) for rel in relationships]) if relationships else []
+                self._index = RelationshipIndex(relationships, _normalized(vectors))
+            return self._index
+
+    async def arelationship_index(self) -> RelationshipIndex:
+        """relationship_index() with async embeddings; concurrent callers share one rebuild."""
+        relationships = await self.aget_graph_relationships()
+        index = self._index
+        if index is not None and index.relationships == relationships:
+            return index
+        async with self._async_lock:
+            if self._index is None or self._index.relationships != relationships:
+                vectors = await self.embedding_model.aembed_documents([_relationship_text(rel) for rel in relationships]) if relationships else []
+                self._index = RelationshipIndex(relationships, _normalized(vectors))
+            return self._index
+
+    @staticmethod
+    def rank(index: RelationshipIndex, relation_vector, threshold: float) -> List[str]:
+        """Relationships whose cosine similarity to the relation reaches the threshold, best first."""
+        if not index.relationships:
+            return []
+        similarities = index.matrix @ _normalized(relation_vector)
+        order = np.argsort(-similarities, kind="stable")
+        return [index.relationships[i] for i in order if similarities[i] >= threshold]
+
     def map_relationship(self, extracted_relation: str, threshold: float = 0.6) -> List[str]:
         """Map extracted relationship to graph relationships using semantic similarity."""
-        graph_relationships = self.get_graph_relationships()
-        
         if not extracted_relation:
             return []
         
         try:
-            # Get embedding for extracted relation
-            extracted_embedding = self.embedding_model.embed_query(extracted_relation)
-            
-            similarities = []
-            for graph_rel in graph_relationships:
-                # Clean relationship name for embedding (remove : prefix)
-                clean_rel = graph_rel.replace(":", "").replace("_", " ").lower()
-                graph_embedding = self.embedding_model.embed_query(clean_rel)
-                
-                # Calculate cosine similarity
-                similarity = np.dot(extracted_embedding, graph_embedding) / (
-                    np.linalg.norm(extracted_embedding) * np.linalg.norm(graph_embedding)
-                )
-                similarities.append((graph_rel, similarity))
-            
-            # Return relationships above threshold, sorted by similarity
-            matched_relations = [rel for rel, sim in similarities if sim >= threshold]
-            return sorted(matched_relations, key=lambda x: next(sim for rel, sim in similarities if rel == x), reverse=True)
+            index = self.relationship_index()
+            return self.rank(index, self.embedding_model.embed_query(extracted_relation), threshold)
             
         except Exception as e:
             print(f"Semantic relationship mapping failed: {e}")
             return []
 
+    async def amap_relationship(self, extracted_relation: str, threshold: float = 0.6) -> List[str]:
+        """map_relationship() with async embeddings."""
+        if not extracted_relation:
+            return []
+
+        try:
+            index = await self.arelationship_index()
+            return self.rank(index, await self.embedding_model.aembed_query(extracted_relation), threshold)
+
+        except Exception as e:
+            print(f"Semantic relationship mapping failed: {e}")
+            return []
+
 
 class RagEnhancedSearchTool(BaseTool):
     name: str = "rag_enhanced_search"
@@ -84,12 +165,7 @@ class RagEnhancedSearchTool(BaseTool):
     
     def _get_embedding_model(self):
         """Get the embedding model instance"""
-        return OpenAIEmbeddings(
-            model="text-embedding-qwen3-embedding-4b",
-            openai_api_base="http://127.0.0.1:1234/v1",
-            openai_api_key="",
-            check_embedding_ctx_length=False
-        )
+        return get_embedding_model()
     
     def _get_relationship_mapper(self):
         """Get the relationship mapper instance"""
@@ -97,151 +173,231 @@ class RagEnhancedSearchTool(BaseTool):
             self._relationship_mapper = SemanticRelationshipMapper(self._get_embedding_model())
         return self._relationship_mapper
 
-    def _search_diagnosis_entities(self, query_terms: List[str]) -> List[Dict]:
-        """Search for diagnosis entities using existing vector index"""
+    @staticmethod
+    def _unique_terms(terms: Iterable[str]) -> List[str]:
+        return list(dict.fromkeys(term for term in terms if term.strip()))
+
+    def _embed_terms(self, terms: Iterable[str]) -> Dict[str, List[float]]:
+        """Embed the distinct search terms in one request (term -> vector)"""
+        unique = self._unique_terms(terms)
+        if not unique:
+            return {}
         try:
-            vector_store = Neo4jVector.from_existing_graph(
-                embedding=self._get_embedding_model(),
-                url=NEO4J_URI,
-                username=NEO4J_AUTH[0],
-                password=NEO4J_AUTH[1],
-                index_name="diagnosis_rules_index",
-                node_label="Diagnosis",
-                text_node_properties=["name", "code"],
-                embedding_node_property="embedding",
-            )
+            return dict(zip(unique, self._get_embedding_model().embed_documents(unique)))
+        except Exception as e:
+            print(f"[RAG Search] Embedding {len(unique)} search terms failed: {e}")
+            return {}
+
+    async def _aembed_terms(self, terms: Iterable[str]) -> Dict[str, List[float]]:
+        unique = self._unique_terms(terms)
+        if not unique:
+            return {}
+        try:
+            return dict(zip(unique, await self._get_embedding_model().aembed_documents(unique)))
+        except Exception as e:
+            print(f"[RAG Search] Embedding {len(unique)} search terms failed: {e}")
+            return {}
+
+    @staticmethod
+    def _term_vectors(entity_type: str, query_terms: List[str], vectors: Dict[str, List[float]]):
+        """(term, vector) pairs of the non-empty terms, and an error entry per term that was not embedded"""
+        terms = [term for term in query_terms if term.strip()]
+        missing = [{"error": f"{entity_type.capitalize()} search failed: no embedding for {term!r}"}
+                   for term in terms if term not in vectors]
+        return [(term, vectors[term]) for term in terms if term in vectors], missing
+
+    def _search_entities(self, entity_type: str, query_terms: List[str], vectors: Dict[str, List[float]]) -> List[Dict]:
+        """Search one entity type using its existing vector index and precomputed term vectors"""
+        term_vectors, results = self._term_vectors(entity_type, query_terms, vectors)
+        if not term_vectors:
+            return results
+        if ENTITY_SEARCH_BACKEND == "local":
+            return self._search_local(entity_type, term_vectors, results)
+        try:
+            # Created once per index and shared across requests
+            vector_store = vector_stores.get(entity_type)
             
-            results = []
-            for term in query_terms:
-                if term.strip():
-                    search_results = vector_store.similarity_search_with_score(term, k=1)
-                    for doc, score in search_results:
-                        results.append({
-                            "entity_type": "diagnosis",
-                            "search_term": term,
-                            "content": doc.page_content,
-                            "metadata": doc.metadata,
-                            "similarity_score": score,
-                            "relevance": "high" if score > 0.8 else "medium" if score > 0.6 else "low"
-                        })
+            for term, vector in term_vectors:
+                search_results = vector_store.similarity_search_with_score_by_vector(vector, k=1)
+                for doc, score in search_results:
+                    results.append(self._search_hit(entity_type, term, doc.page_content, doc.metadata, score))
             
             return results
             
         except Exception as e:
-            return [{"error": f"Diagnosis search failed: {str(e)}"}]
+            return [{"error": f"{entity_type.capitalize()} search failed: {str(e)}"}]
 
-    def _search_procedure_entities(self, query_terms: List[str]) -> List[Dict]:
-        """Search for procedure entities using existing procedure_concept_index"""
+    async def _asearch_entities(self, entity_type: str, query_terms: List[str], vectors: Dict[str, List[float]]) -> List[Dict]:
+        """_search_entities() with the async Neo4j driver"""
+        index_name, _, text_properties = ENTITY_INDEXES[entity_type]
+        term_vectors, results = self._term_vectors(entity_type, query_terms, vectors)
+        if not term_vectors:
+            return results
+        if ENTITY_SEARCH_BACKEND == "local":
+            return await self._asearch_local(entity_type, term_vectors, results)
         try:
-            vector_store = Neo4jVector.from_existing_graph(
-                embedding=self._get_embedding_model(),
-                url=NEO4J_URI,
-                username=NEO4J_AUTH[0],
-                password=NEO4J_AUTH[1],
-                index_name="procedure_concept_index",
-                node_label="Procedure",
-                text_node_properties=["name", "code"],
-                embedding_node_property="embedding",
-            )
-            
-            results = []
-            for term in query_terms:
-                if term.strip():
-                    search_results = vector_store.similarity_search_with_score(term, k=1)
-                    for doc, score in search_results:
-                        results.append({
-                            "entity_type": "procedure",
-                            "search_term": term,
-                            "content": doc.page_content,
-                            "metadata": doc.metadata,
-                            "similarity_score": score,
-                            "relevance": "high" if score > 0.8 else "medium" if score > 0.6 else "low"
-                        })
-            
+            async with db.get_async_session() as session:
+                for term, vector in term_vectors:
+                    result = await session.run(
+                        VECTOR_SEARCH_QUERY,
+                        index_name=index_name, k=1, embedding=vector, text_properties=text_properties,
+                    )
+                    async for record in result:
+                        # Same metadata as Neo4jVector: node properties minus embedding, id and text properties
+                        metadata = {
+                            key: value for key, value in record["properties"].items()
+                            if key not in ("embedding", "id", *text_properties)
+                        }
+                        results.append(self._search_hit(entity_type, term, record["text"], metadata, record["score"]))
             return results
-            
+
         except Exception as e:
-            return [{"error": f"Procedure search failed: {str(e)}"}]
+            return [{"error": f"{entity_type.capitalize()} search failed: {str(e)}"}]
 
-    def _search_hospital_entities(self, query_terms: List[str]) -> List[Dict]:
-        """Search for hospital entities using existing hospital_entity_index"""
+    def _search_local(self, entity_type: str, term_vectors, results: List[Dict]) -> List[Dict]:
+        """_search_entities() against the in-process entity index (ENTITY_SEARCH_BACKEND=local)"""
         try:
-            vector_store = Neo4jVector.from_existing_graph(
-                embedding=self._get_embedding_model(),
-                url=NEO4J_URI,
-                username=NEO4J_AUTH[0],
-                password=NEO4J_AUTH[1],
-                index_name="hospital_entity_index",
-                node_label="Hospital",
-                text_node_properties=["name", "id"],
-                embedding_node_property="embedding",
-            )
-            
-            results = []
-            for term in query_terms:
-                if term.strip():
-                    search_results = vector_store.similarity_search_with_score(term, k=1)
-                    for doc, score in search_results:
-                        results.append({
-                            "entity_type": "hospital",
-                            "search_term": term,
-                            "content": doc.page_content,
-                            "metadata": doc.metadata,
-                            "similarity_score": score,
-                            "relevance": "high" if score > 0.8 else "medium" if score > 0.6 else "low"
-                        })
-            
+            for term, vector in term_vectors:
+                for hit in entity_index.search(entity_type, vector, k=1):
+                    results.append(self._search_hit(entity_type, term, hit.text, hit.metadata, hit.score))
             return results
-            
         except Exception as e:
-            return [{"error": f"Hospital search failed: {str(e)}"}]
+            return [{"error": f"{entity_type.capitalize()} search failed: {str(e)}"}]
 
-    def _search_doctor_entities(self, query_terms: List[str]) -> List[Dict]:
-        """Search for doctor entities using existing doctor_entity_index"""
+    async def _asearch_local(self, entity_type: str, term_vectors, results: List[Dict]) -> List[Dict]:
         try:
-            vector_store = Neo4jVector.from_existing_graph(
-                embedding=self._get_embedding_model(),
-                url=NEO4J_URI,
-                username=NEO4J_AUTH[0],
-                password=NEO4J_AUTH[1],
-                index_name="doctor_entity_index",
-                node_label="Doctor",
-                text_node_properties=["name", "id"],
-                embedding_node_property="embedding",
-            )
-            
-            results = []
-            for term in query_terms:
-                if term.strip():
-                    search_results = vector_store.similarity_search_with_score(term, k=1)
-                    for doc, score in search_results:
-                        results.append({
-                            "entity_type": "doctor",
-                            "search_term": term,
-                            "content": doc.page_content,
-                            "metadata": doc.metadata,
-                            "similarity_score": score,
-                            "relevance": "high" if score > 0.8 else "medium" if score > 0.6 else "low"
-                        })
-            
+            for term, vector in term_vectors:
+                for hit in await entity_index.asearch(entity_type, vector, k=1):
+                    results.append(self._search_hit(entity_type, term, hit.text, hit.metadata, hit.score))
             return results
-            
         except Exception as e:
-            return [{"error": f"Doctor search failed: {str(e)}"}]
-
-    def _search_entity_with_filters(self, entity_type: str, search_terms: List[str], min_similarity: float = 0.6) -> List[Dict]:
-        """Generic entity search with similarity filtering"""
-        if entity_type == "diagnosis":
-            results = self._search_diagnosis_entities(search_terms)
-        elif entity_type == "procedure":
-            results = self._search_procedure_entities(search_terms)
-        elif entity_type == "hospital":
-            results = self._search_hospital_entities(search_terms)
-        elif entity_type == "doctor":
-            results = self._search_doctor_entities(search_terms)
-        else:
+            return [{"error": f"{entity_type.capitalize()} search failed: {str(e)}"}]
+
+    @staticmethod
+    def _search_hit(entity_type: str, term: str, content: str, metadata: Dict, score: float) -> Dict:
+        return {
+            "entity_type": entity_type,
+            "search_term": term,
+            "content": content,
+            "metadata": metadata,
+            "similarity_score": score,
+            "relevance": "high" if score > 0.8 else "medium" if score > 0.6 else "low"
+        }
+
+    def _search_entity_with_filters(self, entity_type: str, search_terms: List[str], vectors: Dict[str, List[float]],
+                                    min_similarity: float = 0.6, resolved: Optional[Dict] = None) -> List[Dict]:
+        """Generic entity search with similarity filtering (terms in `resolved` skip the vector search)"""
+        if entity_type not in ENTITY_INDEXES:
             return []
-        
+        found, remaining = self._split_resolved(entity_type, search_terms, resolved)
+        return self._filter_results(found + self._search_entities(entity_type, remaining, vectors), min_similarity)
+
+    async def _asearch_entity_with_filters(self, entity_type: str, search_terms: List[str], vectors: Dict[str, List[float]],
+                                           min_similarity: float = 0.6, resolved: Optional[Dict] = None) -> List[Dict]:
+        if entity_type not in ENTITY_INDEXES:
+            return []
+        found, remaining = self._split_resolved(entity_type, search_terms, resolved)
+        return self._filter_results(found + await self._asearch_entities(entity_type, remaining, vectors), min_similarity)
+
+    @staticmethod
+    def _split_resolved(entity_type: str, search_terms: List[str], resolved: Optional[Dict]):
+        """(hits of the terms already resolved by lookup or the multi-index query, terms left to search)"""
+        resolved = resolved or {}
+        found = [hit for term in search_terms if (entity_type, term) in resolved for hit in resolved[(entity_type, term)]]
+        return found, [term for term in search_terms if (entity_type, term) not in resolved]
+
+    def _resolved_hits(self, matches: Dict) -> Dict[Tuple[str, str], List[Dict]]:
+        return {
+            (entity_type, term): [self._search_hit(entity_type, term, match.text, match.metadata, match.score)]
+            for (entity_type, term), match in matches.items()
+        }
+
+    def _resolve_terms(self, searches: List[Tuple[str, List[str]]]) -> Dict[Tuple[str, str], List[Dict]]:
+        """Hits found by ID/code, name or trigram lookup, by (entity type, term); these terms are not embedded"""
+        if not ENTITY_RESOLVER_ENABLED:
+            return {}
+        try:
+            return self._resolved_hits(entity_resolver.resolve(entity_resolver.get(), searches))
+        except Exception as e:
+            print(f"[RAG Search] Entity lookup failed, using vector search: {e}")
+            return {}
+
+    async def _aresolve_terms(self, searches: List[Tuple[str, List[str]]]) -> Dict[Tuple[str, str], List[Dict]]:
+        if not ENTITY_RESOLVER_ENABLED:
+            return {}
+        try:
+            return self._resolved_hits(entity_resolver.resolve(await entity_resolver.aget(), searches))
+        except Exception as e:
+            print(f"[RAG Search] Entity lookup failed, using vector search: {e}")
+            return {}
+
+    @staticmethod
+    def _multi_searches(searches: List[Tuple[str, List[str]]], vectors: Dict[str, List[float]], resolved: Dict) -> List[Dict]:
+        """Query parameters per distinct (entity type, term) that still needs a vector search"""
+        rows, seen = [], set()
+        for entity_type, terms in searches:
+            if entity_type not in ENTITY_INDEXES:
+                continue
+            index_name, _, text_properties = ENTITY_INDEXES[entity_type]
+            for term in terms:
+                if (entity_type, term) in seen or (entity_type, term) in resolved or term not in vectors:
+                    continue
+                seen.add((entity_type, term))
+                rows.append({"entity_type": entity_type, "term": term, "index_name": index_name, "k": 1,
+                             "embedding": vectors[term], "text_properties": text_properties})
+        return rows
+
+    def _multi_hits(self, rows: List[Dict], records: List[Dict]) -> Dict[Tuple[str, str], List[Dict]]:
+        """Hits per (entity type, term); terms without a hit map to [] so they are not searched again"""
+        found = {(row["entity_type"], row["term"]): [] for row in rows}
+        for record in records:
+            entity_type, term = record["entity_type"], record["term"]
+            text_properties = ENTITY_INDEXES[entity_type][2]
+            # Same metadata as Neo4jVector: node properties minus embedding, id and text properties
+            metadata = {key: value for key, value in record["properties"].items()
+                        if key not in ("embedding", "id", *text_properties)}
+            found[(entity_type, term)].append(self._search_hit(entity_type, term, record["text"], metadata, record["score"]))
+        return found
+
+    def _search_all_indexes(self, searches: List[Tuple[str, List[str]]], vectors: Dict[str, List[float]],
+                            resolved: Dict) -> Dict[Tuple[str, str], List[Dict]]:
+        """ENTITY_SEARCH_BACKEND=neo4j_multi: all vector searches of the step in one database round trip"""
+        rows = self._multi_searches(searches, vectors, resolved)
+        if not rows:
+            return {}
+        try:
+            with db.get_session() as session:
+                records = session.run(MULTI_VECTOR_SEARCH_QUERY, searches=rows).data()
+            return self._multi_hits(rows, records)
+        except Exception as e:
+            print(f"[RAG Search] Multi-index vector search failed, searching per entity type: {e}")
+            return {}
+
+    async def _asearch_all_indexes(self, searches: List[Tuple[str, List[str]]], vectors: Dict[str, List[float]],
+                                   resolved: Dict) -> Dict[Tuple[str, str], List[Dict]]:
+        rows = self._multi_searches(searches, vectors, resolved)
+        if not rows:
+            return {}
+        try:
+            async with db.get_async_session() as session:
+                result = await session.run(MULTI_VECTOR_SEARCH_QUERY, searches=rows)
+                records = await result.data()
+            return self._multi_hits(rows, records)
+        except Exception as e:
+            print(f"[RAG Search] Multi-index vector search failed, searching per entity type: {e}")
+            return {}
+
+    def _terms_to_embed(self, searches: List[Tuple[str, List[str]]], resolved: Dict, vectors: Optional[Dict] = None) -> List[str]:
+        """Terms that still need a vector search and are not embedded yet"""
+        vectors = vectors or {}
+        pending = [term for _, terms in searches for term in terms if term.strip() and term not in vectors]
+        terms = self._unique_terms(term for entity_type, terms in searches for term in terms
+                                   if (entity_type, term) not in resolved and term not in vectors)
+        if resolved and pending and not terms:
+            entity_resolver.count_avoided_request()
+        return terms
+
+    def _filter_results(self, results: List[Dict], min_similarity: float) -> List[Dict]:
         # Filter by minimum similarity and remove errors
         filtered_results = []
         for result in results:
@@ -263,6 +419,52 @@ class RagEnhancedSearchTool(BaseTool):
                 return line.replace('name: ', '').strip()
         return content.strip()
 
+    def _search_plan(self, entities: Dict, keywords: List[str]) -> List[Tuple[str, str, List[str]]]:
+        """(result key, entity type, terms) for every entity type the question mentions."""
+        plan = []
+        
+        # Search hospitals if specified
+        if entities.get("hospitals"):
+            hospital_terms = entities["hospitals"] + [kw for kw in keywords if "hospital" in kw.lower() or "rumah sakit" in kw.lower()]
+            plan.append(("hospitals", "hospital", hospital_terms))
+        
+        # Search diagnoses if specified
+        if entities.get("diagnoses"):
+            plan.append(("diagnoses", "diagnosis", entities["diagnoses"]))
+        
+        # Search procedures if specified
+        if entities.get("procedures"):
+            plan.append(("procedures", "procedure", entities["procedures"]))
+        
+        # Search doctors if specified
+        if entities.get("doctors"):
+            plan.append(("doctors", "doctor", entities["doctors"]))
+        
+        # Search specialties as doctors if specified
+        if entities.get("specialties"):
+            plan.append(("doctors", "doctor", entities["specialties"]))
+        return plan
+
+    @staticmethod
+    def _related_doctor_keywords(relationship: Dict, search_results: Dict, keywords: List[str]) -> List[str]:
+        """Doctor keywords to search when a relationship links found hospitals to doctors."""
+        if "hospitals" not in search_results or "doctor" not in (relationship.get("object") or "").lower():
+            return []
+        return [kw for kw in keywords if "dokter" in kw.lower() or "doctor" in kw.lower()]
+
+    def _final_results(self, search_results: Dict[str, List[Dict]]) -> str:
+        # Clean output structure - only return what was found
+        final_results = {}
+        for entity_type, results in search_results.items():
+            if results:  # Only include non-empty results
+                # Sort by similarity score and take top 1 (most similar only)
+                sorted_results = sorted(results, key=lambda x: x.get("similarity_score", 0), reverse=True)[:1]
+                final_results[entity_type] = sorted_results
+        
+        print(f"[RAG Search] Simplified search result: {json.dumps(final_results, indent=2)}")
+        
+        return json.dumps(final_results, indent=2)
+
     def _run(self, extracted_entities: str) -> str:
         try:
             # Parse the extracted entities JSON
@@ -271,60 +473,41 @@ class RagEnhancedSearchTool(BaseTool):
             relationships = entities_data.get("relationships", [])
             keywords = entities_data.get("keywords", [])
             
-            # Smart search: Only search entity types that have content
+            # Smart search: Only search entity types that have content.
+            # IDs, codes and names are looked up first; the remaining terms are embedded
+            # in one batch before the vector queries.
+            plan = self._search_plan(entities, keywords)
+            searches = [(entity_type, terms) for _, entity_type, terms in plan]
+            resolved = self._resolve_terms(searches)
+            vectors = self._embed_terms(self._terms_to_embed(searches, resolved))
+            if ENTITY_SEARCH_BACKEND == "neo4j_multi":
+                resolved.update(self._search_all_indexes(searches, vectors, resolved))
             search_results = {}
-            
-            # Search hospitals if specified
-            if entities.get("hospitals"):
-                hospital_terms = entities["hospitals"] + [kw for kw in keywords if "hospital" in kw.lower() or "rumah sakit" in kw.lower()]
-                search_results["hospitals"] = self._search_entity_with_filters("hospital", hospital_terms)
-            
-            # Search diagnoses if specified
-            if entities.get("diagnoses"):
-                search_results["diagnoses"] = self._search_entity_with_filters("diagnosis", entities["diagnoses"])
-            
-            # Search procedures if specified
-            if entities.get("procedures"):
-                search_results["procedures"] = self._search_entity_with_filters("procedure", entities["procedures"])
-            
-            # Search doctors if specified
-            if entities.get("doctors"):
-                search_results["doctors"] = self._search_entity_with_filters("doctor", entities["doctors"])
-            
-            # Search specialties as doctors if specified
-            if entities.get("specialties"):
-                search_results["doctors"] = search_results.get("doctors", []) + self._search_entity_with_filters("doctor", entities["specialties"])
+            for key, entity_type, terms in plan:
+                search_results[key] = search_results.get(key, []) + self._search_entity_with_filters(
+                    entity_type, terms, vectors, resolved=resolved
+                )
             
             # Handle relationships for secondary searches
             for relationship in relationships:
-                subject = relationship.get("subject")
-                relation = relationship.get("relation")
-                obj = relationship.get("object")
-                
-                if relation and subject and obj:
+                if relationship.get("relation") and relationship.get("subject") and relationship.get("object"):
                     # Use semantic relationship mapper
-                    mapped_relations = self._get_relationship_mapper().map_relationship(relation)
+                    mapped_relations = self._get_relationship_mapper().map_relationship(relationship["relation"])
                     
                     # If we found hospitals and relationship mentions doctors, search for related doctors
-                    if "hospitals" in search_results and "doctor" in obj.lower() and mapped_relations:
+                    doctor_keywords = self._related_doctor_keywords(relationship, search_results, keywords)
+                    if mapped_relations and doctor_keywords:
                         # Add doctors related through the semantic relationship
-                        doctor_keywords = [kw for kw in keywords if "dokter" in kw.lower() or "doctor" in kw.lower()]
-                        if doctor_keywords:
-                            related_doctors = self._search_entity_with_filters("doctor", doctor_keywords)
-                            if related_doctors:
-                                search_results.setdefault("related_doctors", []).extend(related_doctors)
-            
-            # Clean output structure - only return what was found
-            final_results = {}
-            for entity_type, results in search_results.items():
-                if results:  # Only include non-empty results
-                    # Sort by similarity score and take top 1 (most similar only)
-                    sorted_results = sorted(results, key=lambda x: x.get("similarity_score", 0), reverse=True)[:1]
-                    final_results[entity_type] = sorted_results
+                        doctor_searches = [("doctor", doctor_keywords)]
+                        resolved.update(self._resolve_terms(doctor_searches))
+                        vectors.update(self._embed_terms(self._terms_to_embed(doctor_searches, resolved, vectors)))
+                        if ENTITY_SEARCH_BACKEND == "neo4j_multi":
+                            resolved.update(self._search_all_indexes(doctor_searches, vectors, resolved))
+                        related_doctors = self._search_entity_with_filters("doctor", doctor_keywords, vectors, resolved=resolved)
+                        if related_doctors:
+                            search_results.setdefault("related_doctors", []).extend(related_doctors)
             
-            print(f"[RAG Search] Simplified search result: {json.dumps(final_results, indent=2)}")
-            
-            return json.dumps(final_results, indent=2)
+            return self._final_results(search_results)
             
         except json.JSONDecodeError:
             return json.dumps({
@@ -334,3 +517,50 @@ class RagEnhancedSearchTool(BaseTool):
             return json.dumps({
                 "error": f"RAG enhanced search failed: {str(e)}"
             })
+
+    async def _arun(self, extracted_entities: str) -> str:
+        try:
+            entities_data = json.loads(extracted_entities)
+            entities = entities_data.get("entities", {})
+            relationships = entities_data.get("relationships", [])
+            keywords = entities_data.get("keywords", [])
+
+            # Lookups first, one embedding batch for the other terms, then the entity types are searched concurrently
+            plan = self._search_plan(entities, keywords)
+            searches = [(entity_type, terms) for _, entity_type, terms in plan]
+            resolved = await self._aresolve_terms(searches)
+            vectors = await self._aembed_terms(self._terms_to_embed(searches, resolved))
+            if ENTITY_SEARCH_BACKEND == "neo4j_multi":
+                resolved.update(await self._asearch_all_indexes(searches, vectors, resolved))
+            found = await asyncio.gather(
+                *(self._asearch_entity_with_filters(entity_type, terms, vectors, resolved=resolved)
+                  for _, entity_type, terms in plan)
+            )
+            search_results = {}
+            for (key, _, _), results in zip(plan, found):
+                search_results[key] = search_results.get(key, []) + results
+
+            for relationship in relationships:
+                if relationship.get("relation") and relationship.get("subject") and relationship.get("object"):
+                    mapped_relations = await self._get_relationship_mapper().amap_relationship(relationship["relation"])
+                    doctor_keywords = self._related_doctor_keywords(relationship, search_results, keywords)
+                    if mapped_relations and doctor_keywords:
+                        doctor_searches = [("doctor", doctor_keywords)]
+                        resolved.update(await self._aresolve_terms(doctor_searches))
+                        vectors.update(await self._aembed_terms(self._terms_to_embed(doctor_searches, resolved, vectors)))
+                        if ENTITY_SEARCH_BACKEND == "neo4j_multi":
+                            resolved.update(await self._asearch_all_indexes(doctor_searches, vectors, resolved))
+                        related_doctors = await self._asearch_entity_with_filters("doctor", doctor_keywords, vectors, resolved=resolved)
+                        if related_doctors:
+                            search_results.setdefault("related_doctors", []).extend(related_doctors)
+
+            return self._final_results(search_results)
+
+        except json.JSONDecodeError:
+            return json.dumps({
+                "error": "Invalid JSON in extracted_entities parameter"
+            })
+        except Exception as e:
+            return json.dumps({
+                "error": f"RAG enhanced search failed: {str(e)}"
+            })
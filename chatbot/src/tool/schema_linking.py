@@ -1,123 +1,120 @@
 import json
-from typing import Type
-from pydantic import BaseModel, Field
+import re
+import sys
+import os
+from typing import Any, Dict, Iterable, Set
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
 from langchain_core.tools import BaseTool
+from chatbot.src.graph_schema import GRAPH_SCHEMA, graph_schema
+
+# Node labels implied by each entity list of entity_extraction
+ENTITY_LABELS = {
+    "diagnoses": ["Diagnosis"],
+    "procedures": ["Procedure"],
+    "hospitals": ["Hospital"],
+    "doctors": ["Doctor"],
+    "specialties": ["Doctor", "Specialty", "Hospital"],
+}
+
+# Node labels implied by words in the question or the extracted keywords (English and Indonesian)
+KEYWORD_LABELS = {
+    "Hospital": ("hospital", "rumah sakit", "rs ", "rsup", "rsud"),
+    "Doctor": ("doctor", "dokter", "dr."),
+    "Diagnosis": ("diagnos", "penyakit", "icd"),
+    "Procedure": ("procedure", "prosedur", "tindakan"),
+    "Patient": ("patient", "pasien"),
+    "Facility": ("facilit", "fasilitas", "equipment", "alat"),
+    "Specialty": ("specialt", "spesialis", "poli"),
+    "ClinicalNote": ("clinical note", "catatan", "resume"),
+}
+
+_NODE_HEADER = re.compile(r"^\s*\d+\.\s+(\w+)")
+_RELATIONSHIP = re.compile(r"\(:(\w+)\)-\[:\w+\]->\(:(\w+)\)")
+
+
+def schema_labels(question: str, entities_data: Dict[str, Any]) -> Set[str]:
+    """Node labels a question is about (Claim is always included)."""
+    labels = {"Claim"}
+    for key, names in ENTITY_LABELS.items():
+        if (entities_data.get("entities") or {}).get(key):
+            labels.update(names)
+    text = " ".join([question] + [str(keyword) for keyword in entities_data.get("keywords") or []]).lower()
+    for label, words in KEYWORD_LABELS.items():
+        if any(word in text for word in words):
+            labels.add(label)
+    return labels
+
+
+def prune_schema(labels: Iterable[str], schema: str = GRAPH_SCHEMA) -> str:
+    """
+    The node sections and relationship patterns of the schema that only involve
+    the given labels (example queries are dropped). Keeps prompts short when the
+    schema is inlined instead of fetched by the agent.
+    """
+    labels = set(labels)
+    kept = []
+    node = None         # "keep" / "skip" while inside a node section
+    relationships = False
+    group = []          # relationship group heading, kept with its first matching pattern
+    for line in schema.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("KEY QUERIES"):
+            break
+        if not stripped:
+            node = None
+            if kept and kept[-1].strip():
+                kept.append("")
+            continue
+        header = _NODE_HEADER.match(line)
+        if header:
+            node = "keep" if header.group(1) in labels else "skip"
+        if node is not None:
+            if node == "keep":
+                kept.append(line)
+            continue
+        if stripped.startswith("RELATIONSHIP STRUCTURE"):
+            relationships = True
+        relationship = _RELATIONSHIP.search(line)
+        if relationship:
+            if relationship.group(1) in labels and relationship.group(2) in labels:
+                kept.extend(group)
+                group = []
+                kept.append(line)
+        elif relationships and stripped.endswith(":") and not stripped.startswith("RELATIONSHIP"):
+            group = [line]
+        else:
+            kept.append(line)
+    return "\n".join(kept).rstrip() + "\n"
+
+
+def linked_schema(question: str) -> str:
+    """
+    The current graph schema pruned to the labels of a question, or of an
+    entity_extraction JSON output. The whole schema if nothing beyond Claim is implied.
+    """
+    try:
+        entities_data = json.loads(question)
+    except (json.JSONDecodeError, TypeError):
+        entities_data = None
+    if not isinstance(entities_data, dict):
+        entities_data = {}
+    labels = schema_labels("" if entities_data else question, entities_data)
+    schema = graph_schema.get().text
+    return schema if labels == {"Claim"} else prune_schema(labels, schema)
 
 
 class SchemaLinkingTool(BaseTool):
     name: str = "schema_linking"
     description: str = """
       Provides the graph database schema definition, including nodes, properties, and relationship paths.
+      Input the user question (or the entity_extraction output) to get only the part of the schema it involves.
     """
 
-    def _run(self, question: str) -> str:
-        return """
-        BPJS GRAPH DATABASE SCHEMA
-        ==========================
-        Enhanced medical insurance claims database with structured medical resume data.
-
-        CORE NODES & PROPERTIES:
-        ------------------------
-        
-        1. Claim (Primary Entity)
-           - id (String): "C1001", "C1002"
-           - total_cost (Float): 65000000.0
-           - status (String): "NORMAL", "FRAUD", null
-           - date (Date): Claim submission date
-
-        2. Patient (From medical_resume_json)
-           - name (String): "Budi Santoso", "Siti Aminah"
-           
-        3. Hospital (Infrastructure)
-           - id (String): "HOS001", "HOS002"
-           - name (String): "RSUP Dr. Hasan Sadikin (RSHS)"
-           - class (String): "Class A (National Referral)"
-           - location (Point): Geospatial coordinates
-
-        4. Doctor (Medical Staff)
-           - id (String): "DOC001", "DOC002"  
-           - name (String): "Dr. Budi Hartono"
-           - specialization (String): "Cardiologist", "Surgeon"
-
-        5. Diagnosis (ICD-10 Codes)
-           - code (String): "I21.9", "K35.80", "A90"
-           - name (String): "Acute Myocardial Infarction"
-           - avg_cost (Float): Expected treatment cost
-           - severity (String): "High", "Medium", "Low"
-
-        6. Procedure (Medical Procedures)
-           - code (String): "89.52", "37.22", "UNCODIFIED"
-           - name (String): "PCI (Angiography/Stent)", "IV Heparin"
-           - avg_cost (Float): Procedure cost
-           * UNCODIFIED: New procedures from medical resume text
+    async def _arun(self, question: str) -> str:
+        # Cached per graph version; only an introspection goes to a worker thread
+        await graph_schema.aget()
+        return linked_schema(question)
 
-        7. ClinicalNote (Medical Documentation)
-           - primary_diagnosis_text (String): Clinical primary diagnosis
-           - secondary_diagnosis_text (String): Supporting clinical findings
-
-        8. Specialty (Hospital Capabilities)
-           - name (String): "Cardiology", "Oncology"
-
-        9. Facility (Hospital Equipment)
-           - name (String): "ICU", "CT Scan", "MRI"
-
-        RELATIONSHIP STRUCTURE:
-        ----------------------
-        
-        CLAIM RELATIONSHIPS:
-        (:Claim)-[:SUBMITTED_AT]->(:Hospital)           // Where claim filed
-        (:Claim)-[:SUBMITTED_BY]->(:Doctor)             // Submitting doctor
-        (:Claim)-[:CODED_AS]->(:Diagnosis)              // Primary ICD-10 code
-        (:Claim)-[:HAS_PATIENT]->(:Patient)             // Patient info
-        (:Claim)-[:HAS_PRIMARY_PROCEDURE]->(:Procedure) // Main procedures
-        (:Claim)-[:HAS_SECONDARY_PROCEDURE]->(:Procedure) // Support procedures
-        (:Claim)-[:HAS_CLINICAL_NOTE]->(:ClinicalNote)  // Clinical docs
-
-        INFRASTRUCTURE:
-        (:Doctor)-[:WORKS_AT]->(:Hospital)
-        (:Hospital)-[:HAS_SPECIALTY]->(:Specialty)
-        (:Hospital)-[:HAS_FACILITY]->(:Facility)
-
-        MEDICAL RULES:
-        (:Diagnosis)-[:REQUIRES]->(:Procedure)
-        (:Diagnosis)-[:TYPICALLY_TREATED_WITH]->(:Procedure)
-
-        KEY QUERIES FOR MEDICAL RESUME DATA:
-        -----------------------------------
-        
-        1. GET COMPLETE MEDICAL RESUME FOR CLAIM:
-        MATCH (c:Claim {id: "C1001"})
-        OPTIONAL MATCH (c)-[:HAS_PATIENT]->(patient:Patient)
-        OPTIONAL MATCH (c)-[:HAS_PRIMARY_PROCEDURE]->(pp:Procedure)
-        OPTIONAL MATCH (c)-[:HAS_SECONDARY_PROCEDURE]->(sp:Procedure)  
-        OPTIONAL MATCH (c)-[:HAS_CLINICAL_NOTE]->(note:ClinicalNote)
-        OPTIONAL MATCH (c)-[:SUBMITTED_AT]->(hospital:Hospital)
-        OPTIONAL MATCH (c)-[:SUBMITTED_BY]->(doctor:Doctor)
-        OPTIONAL MATCH (c)-[:CODED_AS]->(diagnosis:Diagnosis)
-        RETURN c.id, c.total_cost, c.status,
-               patient.name as patient_name,
-               hospital.name as hospital_name,
-               doctor.name as doctor_name,
-               diagnosis.name as diagnosis_name,
-               collect(DISTINCT pp.name) as primary_procedures,
-               collect(DISTINCT sp.name) as secondary_procedures,
-               note.primary_diagnosis_text,
-               note.secondary_diagnosis_text
-
-        2. GET ALL PROCEDURES (PRIMARY + SECONDARY):
-        MATCH (c:Claim {id: "C1001"})-[r:HAS_PRIMARY_PROCEDURE|HAS_SECONDARY_PROCEDURE]->(p:Procedure)
-        RETURN type(r) as procedure_type, p.name, p.code, p.avg_cost
-        ORDER BY procedure_type, p.name
-
-        3. FIND CLAIMS BY PROCEDURE:
-        MATCH (c:Claim)-[r:HAS_PRIMARY_PROCEDURE|HAS_SECONDARY_PROCEDURE]->(p:Procedure)
-        WHERE p.name CONTAINS "PCI"
-        RETURN c.id, c.status, type(r) as procedure_type, p.name
-
-        4. MEDICAL COMPLIANCE CHECK:
-        MATCH (c:Claim)-[:CODED_AS]->(d:Diagnosis)
-        MATCH (c)-[:HAS_PRIMARY_PROCEDURE]->(actual:Procedure)
-        OPTIONAL MATCH (d)-[:REQUIRES]->(required:Procedure)
-        RETURN c.id, d.name, actual.name, required.name
-        WHERE required IS NOT NULL AND actual.name <> required.name
-        """
+    def _run(self, question: str) -> str:
+        return linked_schema(question)
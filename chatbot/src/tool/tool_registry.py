@@ -18,3 +18,6 @@ class ToolRegistry:
     
     def get_tools(self):
         return list(self._tools.values())
+
+    def get_tool_map(self):
+        return dict(self._tools)
@@ -0,0 +1,94 @@
+import logging
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from typing import Any, Dict
+from langchain_community.vectorstores import Neo4jVector
+from chatbot.src.config import NEO4J_URI, NEO4J_AUTH
+from chatbot.src.embeddings import get_embedding_model
+from chatbot.src.entity_index import ENTITY_INDEXES
+
+logger = logging.getLogger(__name__)
+
+
+class VectorStores:
+    """
+    One long-lived Neo4jVector per entity index, shared by every search.
+
+    Neo4jVector.from_existing_graph opens a driver, checks the index and embeds nodes
+    that have no embedding yet; that now happens once per index and process (at startup
+    via warm(), or on first use) instead of on every search. A store that could not be
+    created is not cached, so the next search tries again.
+    """
+
+    def __init__(self):
+        self._stores: Dict[str, Neo4jVector] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.failures = 0
+        self.create_ms: Dict[str, float] = {}
+
+    def get(self, entity_type: str) -> Neo4jVector:
+        store = self._stores.get(entity_type)
+        if store is not None:
+            return store
+        with self._lock:
+            store = self._stores.get(entity_type)
+            if store is None:
+                store = self._create(entity_type)
+                self._stores[entity_type] = store
+            return store
+
+    def _create(self, entity_type: str) -> Neo4jVector:
+        index_name, node_label, text_properties = ENTITY_INDEXES[entity_type]
+        started = time.perf_counter()
+        try:
+            store = Neo4jVector.from_existing_graph(
+                embedding=get_embedding_model(),
+                url=NEO4J_URI,
+                username=NEO4J_AUTH[0],
+                password=NEO4J_AUTH[1],
+                index_name=index_name,
+                node_label=node_label,
+                text_node_properties=text_properties,
+                embedding_node_property="embedding",
+            )
+        except Exception:
+            self.failures += 1
+            raise
+        self.created += 1
+        self.create_ms[entity_type] = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(f"Vector store for {index_name} ready in {self.create_ms[entity_type]} ms")
+        return store
+
+    def warm(self):
+        """Create every store now so the first questions do not pay for it."""
+        for entity_type in ENTITY_INDEXES:
+            try:
+                self.get(entity_type)
+            except Exception as e:
+                # Searches create the store on first use instead
+                logger.warning(f"Vector store for {entity_type} not created at startup: {e}")
+
+    def close(self):
+        """Close the stores' drivers (each Neo4jVector holds its own)."""
+        with self._lock:
+            for store in self._stores.values():
+                driver = getattr(store, "_driver", None)
+                if driver is not None:
+                    driver.close()
+            self._stores.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "stores": sorted(self._stores),
+            "created": self.created,
+            "failures": self.failures,
+            "create_ms": dict(self.create_ms),
+        }
+
+
+vector_stores = VectorStores()
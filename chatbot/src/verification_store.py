@@ -0,0 +1,92 @@
+import hashlib
+import json
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from typing import Any, Dict, Iterable, Optional
+
+# Verdicts are stored as (:Claim)-[:HAS_VERIFICATION]->(:Verification). A stored verdict is
+# valid while the fingerprint of the claim's verification context (claim, diagnosis and
+# its rules, procedures, doctor, hospital) is unchanged; loaders also delete verdicts of
+# claims whose data they rewrite.
+SAVE_VERIFICATION_QUERY = """
+MATCH (c:Claim {id: $claim_id})
+OPTIONAL MATCH (c)-[:HAS_VERIFICATION]->(old:Verification)
+DETACH DELETE old
+WITH DISTINCT c
+CREATE (c)-[:HAS_VERIFICATION]->(v:Verification)
+SET v = $properties, v.created_at = timestamp()
+RETURN v.created_at AS created_at
+"""
+
+INVALIDATE_VERIFICATIONS_QUERY = """
+MATCH (c:Claim)-[:HAS_VERIFICATION]->(v:Verification)
+WHERE c.id IN $claim_ids
+   OR EXISTS { (c)-[:CODED_AS]->(d:Diagnosis) WHERE d.code IN $diagnosis_codes }
+   OR EXISTS { (c)-[:HAS_PRIMARY_PROCEDURE|HAS_SECONDARY_PROCEDURE]->(p:Procedure) WHERE p.code IN $procedure_codes }
+   OR EXISTS { (c)-[:SUBMITTED_BY]->(doc:Doctor) WHERE doc.id IN $doctor_ids }
+   OR EXISTS { (c)-[:SUBMITTED_AT]->(h:Hospital) WHERE h.id IN $hospital_ids }
+DETACH DELETE v
+RETURN count(*) AS invalidated
+"""
+
+# Keys of a claim context that are not verification inputs
+_NON_INPUT_KEYS = ("stored_verification",)
+
+
+def _canonical(value: Any) -> Any:
+    # Pattern comprehensions do not guarantee list order, so lists are sorted
+    if isinstance(value, dict):
+        return {key: _canonical(item) for key, item in sorted(value.items())}
+    if isinstance(value, list):
+        items = [_canonical(item) for item in value]
+        return sorted(items, key=lambda item: json.dumps(item, sort_keys=True, default=str))
+    return value
+
+
+def context_fingerprint(context: Dict[str, Any], engine_version: str = "") -> str:
+    """Stable hash of the data a verdict was computed from."""
+    inputs = {key: value for key, value in context.items() if key not in _NON_INPUT_KEYS}
+    payload = json.dumps([engine_version, _canonical(inputs)], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def save_verification(session, claim_id: str, properties: Dict[str, Any]) -> Optional[int]:
+    """Replace the stored verification of a claim. Properties must be Neo4j-storable values."""
+    record = session.execute_write(
+        lambda tx: tx.run(SAVE_VERIFICATION_QUERY, claim_id=claim_id, properties=properties).single()
+    )
+    return record["created_at"] if record else None
+
+
+async def asave_verification(session, claim_id: str, properties: Dict[str, Any]) -> Optional[int]:
+    """save_verification() with an async session."""
+    async def write(tx):
+        result = await tx.run(SAVE_VERIFICATION_QUERY, claim_id=claim_id, properties=properties)
+        return await result.single()
+
+    record = await session.execute_write(write)
+    return record["created_at"] if record else None
+
+
+def invalidate_verifications(
+    session,
+    claim_ids: Iterable[Any] = (),
+    diagnosis_codes: Iterable[Any] = (),
+    procedure_codes: Iterable[Any] = (),
+    doctor_ids: Iterable[Any] = (),
+    hospital_ids: Iterable[Any] = (),
+) -> int:
+    """Delete stored verdicts of claims that use any of the given entities. Returns the count."""
+    params = {
+        "claim_ids": list(claim_ids),
+        "diagnosis_codes": list(diagnosis_codes),
+        "procedure_codes": list(procedure_codes),
+        "doctor_ids": list(doctor_ids),
+        "hospital_ids": list(hospital_ids),
+    }
+    if not any(params.values()):
+        return 0
+    record = session.run(INVALIDATE_VERIFICATIONS_QUERY, params).single()
+    return record["invalidated"] if record else 0
@@ -0,0 +1,63 @@
+import sys
+import os
+import asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from langchain_core.messages import AIMessage
+from chatbot.src.tool.execute_chyper import acollect_rows, collect_rows
+from tests.test_result_format import _records
+from tests.test_verification_engine import _context
+
+
+class _AsyncRecords:
+    """Async iterator over records, like an AsyncResult."""
+
+    def __init__(self, records):
+        self._records = iter(records)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._records)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class TestAsyncPath:
+    """Test that the async paths return the same results as the sync ones"""
+
+    def test_acollect_rows_matches_collect_rows(self):
+        """The same row cap applies to async results"""
+        records = _records(120)
+        collected = asyncio.run(acollect_rows(_AsyncRecords(records), ["id", "total_cost"], max_rows=50, max_bytes=100000))
+        assert collected == collect_rows(_records(120), ["id", "total_cost"], max_rows=50, max_bytes=100000)
+        assert not records[80].data.called
+
+    def test_averify_claim(self):
+        """averify_claim reads through the async driver and awaits the explanation"""
+        from chatbot.src.api import claim_verification_service as module
+        service = module.ClaimVerificationService.__new__(module.ClaimVerificationService)
+        service.model = MagicMock(model_name="qwen3-8B")
+        service.model.ainvoke = AsyncMock(return_value=AIMessage("<think>cek</think>Klaim wajar."))
+
+        with patch.object(module, 'db'), \
+             patch.object(module, 'asave_verification', new_callable=AsyncMock) as save, \
+             patch.object(module.graph_version, 'acurrent', new_callable=AsyncMock, return_value=1), \
+             patch.object(module.graph_version, 'current') as current, \
+             patch.object(module.HealthcareRepository, 'aget_claim_status',
+                          new_callable=AsyncMock, return_value={"claim_id": "C2001", "status": None}), \
+             patch.object(module, 'aload_claim_context', new_callable=AsyncMock, return_value=_context()):
+            result = asyncio.run(service.averify_claim("C2001"))
+
+        assert result["validation_result"] == "NORMAL"
+        assert result["explanation"] == "Klaim wajar."
+        assert result["metadata"]["llm_calls"] == 1
+        save.assert_awaited_once()
+        assert save.await_args.args[2]["graph_version"] == 1
+        # The version check on the event loop never reads Neo4j synchronously
+        current.assert_not_called()
+        service.model.invoke.assert_not_called()
@@ -0,0 +1,67 @@
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.api.claim_verification_service import ClaimVerificationService
+
+
+class TestBatchVerification:
+    """Test bounded, streaming batch verification"""
+
+    def _service(self, workers, verify):
+        service = ClaimVerificationService.__new__(ClaimVerificationService)
+        service._batch_executor = ThreadPoolExecutor(max_workers=workers)
+        service.verify_claim = verify
+        return service
+
+    def test_results_stream_in_completion_order(self):
+        """A slow claim does not hold back the results that finish first"""
+        def verify(claim_id, verdict_only=False):
+            time.sleep(0.3 if claim_id == "C1" else 0.01)
+            return {"claim_id": claim_id, "validation_result": "NORMAL", "status": "success"}
+
+        items = list(self._service(2, verify).verify_claims_batch(["C1", "C2", "C3"]))
+
+        assert [item["claim_id"] for item in items[:-1]] == ["C2", "C3", "C1"]
+        summary = items[-1]
+        assert summary["type"] == "summary"
+        assert summary["total"] == 3
+        assert summary["verdicts"] == {"NORMAL": 3}
+        assert summary["latency_ms"]["max"] >= 300 * 0.9
+        # Nearest-rank p95 of 3 latencies is the slowest one
+        assert summary["latency_ms"]["p95"] == summary["latency_ms"]["max"]
+
+    def test_concurrency_is_bounded(self):
+        """No more than the pool size verifications run at once"""
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def verify(claim_id, verdict_only=False):
+            with lock:
+                running[0] += 1
+                running[1] = max(running[1], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return {"claim_id": claim_id, "validation_result": "FRAUD", "status": "success"}
+
+        list(self._service(3, verify).verify_claims_batch([f"C{i}" for i in range(12)]))
+        assert running[1] <= 3
+
+    def test_failures_are_reported_per_claim(self):
+        """An exception in one verification becomes an error line, not a failed batch"""
+        def verify(claim_id, verdict_only=False):
+            if claim_id == "C2":
+                raise RuntimeError("boom")
+            return {"claim_id": claim_id, "validation_result": "NORMAL", "status": "success", "verdict_only": verdict_only}
+
+        items = list(self._service(2, verify).verify_claims_batch(["C1", "C2"], verdict_only=True))
+
+        errors = [item for item in items if item.get("status") == "error"]
+        assert errors[0]["claim_id"] == "C2"
+        assert items[-1]["errors"] == 1
+        assert items[-1]["succeeded"] == 1
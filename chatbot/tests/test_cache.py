@@ -0,0 +1,127 @@
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.cache import TTLCache
+from chatbot.src.tool import execute_chyper
+from chatbot.src.tool.execute_chyper import ExecuteCypherTool, normalize_cypher_text, result_cache
+
+
+class TestTTLCache:
+    """Test the LRU + TTL cache"""
+
+    def test_hit_and_miss_counters(self):
+        """Lookups are counted as hits or misses"""
+        cache = TTLCache(max_size=4, ttl_seconds=60)
+        assert cache.get("q") is None
+        cache.set("q", "rows")
+        assert cache.get("q") == "rows"
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self):
+        """Least recently used entry is evicted first"""
+        cache = TTLCache(max_size=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_expired_entries_are_misses(self):
+        """Entries older than the TTL are dropped on access"""
+        cache = TTLCache(max_size=2, ttl_seconds=10)
+        with patch('chatbot.src.cache.time.monotonic', return_value=100.0):
+            cache.set("a", 1)
+        with patch('chatbot.src.cache.time.monotonic', return_value=111.0):
+            assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_clear(self):
+        """clear() empties the cache and counts an invalidation"""
+        cache = TTLCache()
+        cache.set("a", 1)
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["invalidations"] == 1
+
+
+class TestCypherResultCache:
+    """Test result caching inside ExecuteCypherTool"""
+
+    def setup_method(self):
+        result_cache.clear()
+        self._guard_patch = patch.object(execute_chyper, 'CYPHER_PLAN_GUARD_ENABLED', False)
+        self._guard_patch.start()
+
+    def teardown_method(self):
+        self._guard_patch.stop()
+
+    def _mock_session(self, rows):
+        record = MagicMock()
+        record.data.return_value = rows
+        result = MagicMock()
+        result.keys.return_value = list(rows)
+        result.__iter__.side_effect = lambda: iter([record])
+        tx = MagicMock()
+        tx.run.return_value = result
+        session = MagicMock()
+        session.__enter__.return_value = session
+        session.execute_read.side_effect = lambda work: work(tx)
+        return session
+
+    def test_normalize_keeps_string_literals(self):
+        """Whitespace is collapsed outside string literals only"""
+        query = "MATCH (h:Hospital {name: 'RS  A'})\n   RETURN  h;"
+        assert normalize_cypher_text(query) == "MATCH (h:Hospital {name: 'RS  A'}) RETURN h"
+
+    def test_repeated_query_served_from_cache(self):
+        """Formatting variants of the same query only hit Neo4j once"""
+        session = self._mock_session({"total": 3})
+        with patch.object(execute_chyper, 'db') as mock_db, \
+             patch.object(execute_chyper.graph_version, 'current', return_value=1):
+            mock_db.get_session.return_value = session
+            tool = ExecuteCypherTool()
+
+            first = tool._run("MATCH (c:Claim) RETURN count(c) AS total")
+            second = tool._run("MATCH (c:Claim)\n  RETURN count(c) AS total;")
+
+        assert first == second
+        assert session.execute_read.call_count == 1
+
+    def test_version_change_bypasses_cache(self):
+        """A new graph version never reuses results from the old one"""
+        session = self._mock_session({"total": 3})
+        with patch.object(execute_chyper, 'db') as mock_db, \
+             patch.object(execute_chyper.graph_version, 'current', side_effect=[1, 2]):
+            mock_db.get_session.return_value = session
+            tool = ExecuteCypherTool()
+
+            tool._run("MATCH (c:Claim) RETURN count(c) AS total")
+            tool._run("MATCH (c:Claim) RETURN count(c) AS total")
+
+        assert session.execute_read.call_count == 2
+
+    def test_errors_are_not_cached(self):
+        """Failed queries go back to the database on retry"""
+        session = MagicMock()
+        session.__enter__.return_value = session
+        session.execute_read.side_effect = Exception("syntax error")
+        with patch.object(execute_chyper, 'db') as mock_db, \
+             patch.object(execute_chyper.graph_version, 'current', return_value=1):
+            mock_db.get_session.return_value = session
+            tool = ExecuteCypherTool()
+
+            assert tool._run("MATCH (c:Claim RETURN c").startswith("Cypher Execution Error")
+            tool._run("MATCH (c:Claim RETURN c")
+
+        assert session.execute_read.call_count == 2
@@ -0,0 +1,72 @@
+import sys
+import os
+import json
+import pytest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from langchain_core.messages import AIMessage
+from chatbot.src.api.chatbot_pipeline import ChatbotPipeline, PipelineFallback, extract_cypher, schema_labels
+from chatbot.src.graph_schema import GRAPH_SCHEMA
+from chatbot.src.tool.schema_linking import prune_schema
+
+ENTITIES = {"entities": {"hospitals": ["RSHS"], "diagnoses": []}, "keywords": ["klaim fraud"]}
+
+
+def _pipeline(rows):
+    tools = {
+        "entity_extraction": MagicMock(**{"_run.return_value": json.dumps(ENTITIES)}),
+        "rag_enhanced_search": MagicMock(**{"_run.return_value": '{"hospitals": [{"name": "RSUP Dr. Hasan Sadikin (RSHS)"}]}'}),
+        "execute_cypher": MagicMock(**{"_run.return_value": rows}),
+    }
+    model = MagicMock()
+    model.invoke.side_effect = [
+        AIMessage("<think>hitung klaim</think>```cypher\nMATCH (c:Claim)-[:SUBMITTED_AT]->(h:Hospital {id: 'HOS001'}) WHERE c.status = 'FRAUD' RETURN count(c)\n```"),
+        AIMessage("Ada 3 klaim fraud di RSHS."),
+    ]
+    return ChatbotPipeline(model, tools), tools, model
+
+
+@pytest.fixture(autouse=True)
+def static_schema(monkeypatch):
+    # Serve the hand-written schema instead of introspecting Neo4j
+    schema = MagicMock(**{"get.return_value.text": GRAPH_SCHEMA})
+    monkeypatch.setattr("chatbot.src.api.chatbot_pipeline.graph_schema", schema)
+    return schema
+
+
+class TestChatbotPipeline:
+    """Test the fixed-step chatbot workflow"""
+
+    def test_prune_schema(self):
+        """Only the sections and relationships of the question's labels are inlined"""
+        schema = prune_schema(schema_labels("berapa klaim fraud di RSHS", ENTITIES))
+        assert "(:Claim)-[:SUBMITTED_AT]->(:Hospital)" in schema
+        assert "3. Hospital" in schema
+        assert "Procedure" not in schema
+        assert "KEY QUERIES" not in schema
+
+    def test_extract_cypher(self):
+        """Cypher is taken from a fenced block or from its first clause"""
+        assert extract_cypher("<think>x</think>```cypher\nMATCH (n) RETURN n\n```") == "MATCH (n) RETURN n"
+        assert extract_cypher("Here is the query: MATCH (h:Hospital) RETURN h.name") == "MATCH (h:Hospital) RETURN h.name"
+
+    def test_three_llm_calls(self):
+        """Extraction, Cypher generation and summary; schema_linking is never called"""
+        pipeline, tools, model = _pipeline('["count(c)"]\n[3]')
+        result = pipeline.run("berapa klaim fraud di RSHS")
+
+        assert result.llm_calls == 3
+        assert result.raw_answer == "Ada 3 klaim fraud di RSHS."
+        assert result.cypher.startswith("MATCH (c:Claim)")
+        tools["execute_cypher"]._run.assert_called_once_with(result.cypher)
+        assert model.invoke.call_count == 2
+
+    def test_cypher_error_falls_back(self):
+        """A failing query hands the question to the agent without a summary call"""
+        pipeline, _, model = _pipeline("Cypher Execution Error: Invalid input 'RETUR'")
+        with pytest.raises(PipelineFallback) as fallback:
+            pipeline.run("berapa klaim fraud di RSHS")
+        assert fallback.value.llm_calls == 2
+        assert model.invoke.call_count == 1
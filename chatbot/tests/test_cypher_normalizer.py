@@ -0,0 +1,55 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.cypher_normalizer import parameterize_cypher
+
+
+class TestParameterizeCypher:
+    """Test literal-to-parameter rewriting of agent Cypher"""
+
+    def test_string_and_number_literals(self):
+        """Claim IDs and costs become parameters"""
+        result = parameterize_cypher("MATCH (c:Claim {id: 'C1001'}) WHERE c.total_cost > 5000000 RETURN c")
+        assert result.text == "MATCH (c:Claim {id: $lit_0}) WHERE c.total_cost > $lit_1 RETURN c"
+        assert result.params == {"lit_0": "C1001", "lit_1": 5000000}
+
+    def test_same_shape_for_different_literals(self):
+        """Structurally identical queries share one query text"""
+        first = parameterize_cypher("MATCH (d:Diagnosis {code: 'I21.9'}) RETURN d.name")
+        second = parameterize_cypher('MATCH (d:Diagnosis {code: "K35.80"})\n  RETURN d.name;')
+        assert first.text == second.text
+        assert first.params["lit_0"] == "I21.9"
+        assert second.params["lit_0"] == "K35.80"
+
+    def test_types_are_preserved(self):
+        """Integers, floats and escaped strings keep their values"""
+        result = parameterize_cypher("RETURN 3, 2.5, 1e3, 'it\\'s', -7")
+        assert result.text == "RETURN $lit_0, $lit_1, $lit_2, $lit_3, -$lit_4"
+        assert result.params == {"lit_0": 3, "lit_1": 2.5, "lit_2": 1000.0, "lit_3": "it's", "lit_4": 7}
+
+    def test_limit_skip_and_pattern_ranges_stay_inline(self):
+        """Literals that must remain inline are not rewritten"""
+        result = parameterize_cypher(
+            "MATCH (h:Hospital)-[:HAS_SPECIALTY*1..2]-(x) RETURN h.name, h.rank * 2 SKIP 5 LIMIT 10"
+        )
+        assert result.text == (
+            "MATCH (h:Hospital)-[:HAS_SPECIALTY*1..2]-(x) RETURN h.name, h.rank * $lit_0 SKIP 5 LIMIT 10"
+        )
+        assert result.params == {"lit_0": 2}
+
+    def test_identifiers_parameters_and_comments(self):
+        """Identifiers with digits, backticks and existing parameters are untouched; comments dropped"""
+        result = parameterize_cypher(
+            "// top claims\nMATCH (d:Diagnosis) WHERE d.icd10_code = $code RETURN d.`avg cost 2` /* note */ AS cost"
+        )
+        assert result.text == "MATCH (d:Diagnosis) WHERE d.icd10_code = $code RETURN d.`avg cost 2` AS cost"
+        assert result.params == {}
+
+    def test_unreadable_query_returned_unchanged(self):
+        """Unterminated strings are left for Neo4j to report"""
+        query = "MATCH (n {name: 'oops}) RETURN n"
+        result = parameterize_cypher(query)
+        assert result.text == query
+        assert result.params == {}
@@ -0,0 +1,75 @@
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.database import Neo4jDatabase, get_database, db
+
+
+class TestDriverRegistry:
+    """Test the process-wide driver registry"""
+
+    def test_default_database_is_shared(self):
+        """get_database() without arguments returns the module-level instance"""
+        assert get_database() is db
+
+    def test_same_connection_details_share_instance(self):
+        """Same uri/user pair resolves to one pooled database"""
+        first = get_database("neo4j://example:7687", ("reader", "secret"))
+        second = get_database("neo4j://example:7687", ("reader", "secret"))
+        other = get_database("neo4j://example:7687", ("writer", "secret"))
+        assert first is second
+        assert first is not other
+
+
+class TestPooledSessions:
+    """Test driver reuse and pool metrics"""
+
+    def test_driver_created_once_for_many_sessions(self):
+        """Sessions reuse the pooled driver instead of creating new ones"""
+        with patch('chatbot.src.database.GraphDatabase.driver') as mock_driver:
+            mock_driver.return_value = MagicMock()
+            database = Neo4jDatabase("neo4j://localhost:7687", ("neo4j", "pw"), max_connection_pool_size=7)
+
+            for _ in range(5):
+                with database.get_session():
+                    pass
+
+            mock_driver.assert_called_once()
+            assert mock_driver.call_args.kwargs["max_connection_pool_size"] == 7
+            metrics = database.pool_metrics()
+            assert metrics["drivers_created"] == 1
+            assert metrics["sessions_opened"] == 5
+            assert metrics["sessions_active"] == 0
+            assert metrics["peak_sessions_active"] == 1
+
+    def test_active_sessions_tracked(self):
+        """Open sessions are counted until closed, double close is harmless"""
+        with patch('chatbot.src.database.GraphDatabase.driver') as mock_driver:
+            mock_driver.return_value = MagicMock()
+            database = Neo4jDatabase()
+
+            first = database.get_session()
+            second = database.get_session()
+            assert database.pool_metrics()["sessions_active"] == 2
+
+            first.close()
+            first.close()
+            second.close()
+            metrics = database.pool_metrics()
+            assert metrics["sessions_active"] == 0
+            assert metrics["peak_sessions_active"] == 2
+
+    def test_close_allows_reconnect(self):
+        """Closing the driver lets the next session reconnect lazily"""
+        with patch('chatbot.src.database.GraphDatabase.driver') as mock_driver:
+            mock_driver.return_value = MagicMock()
+            database = Neo4jDatabase()
+
+            database.get_session().close()
+            database.close()
+            assert database.pool_metrics()["connected"] is False
+
+            database.get_session().close()
+            assert mock_driver.call_count == 2
@@ -0,0 +1,81 @@
+import sys
+import os
+import asyncio
+import threading
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.embedding_cache import CachedEmbeddings, EmbeddingStore, normalize_text
+
+
+def _server():
+    server = MagicMock()
+    server.embed_documents.side_effect = lambda texts: [[float(len(text)), 1.0, 0.5] for text in texts]
+    server.aembed_documents = AsyncMock(side_effect=lambda texts: [[float(len(text)), 1.0, 0.5] for text in texts])
+    return server
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "embedding_cache.sqlite3")
+
+
+class TestCachedEmbeddings:
+    """Test the in-process and on-disk embedding caches"""
+
+    def test_only_misses_reach_the_server(self, path):
+        server = _server()
+        embeddings = CachedEmbeddings(server, "qwen3", EmbeddingStore(path))
+
+        first = embeddings.embed_documents(["stroke", "CT Scan", "stroke"])
+        second = embeddings.embed_documents(["  CT   Scan ", "RSHS"])
+
+        assert first[0] == first[2] == [6.0, 1.0, 0.5]
+        assert second[0] == first[1]
+        assert [call.args[0] for call in server.embed_documents.call_args_list] == [["stroke", "CT Scan"], ["RSHS"]]
+        stats = embeddings.stats()
+        assert stats["memory_hits"] == 1 and stats["misses"] == 3
+        assert stats["server_calls"] == 2 and stats["disk_entries"] == 3
+
+    def test_workers_share_the_disk_store(self, path):
+        CachedEmbeddings(_server(), "qwen3", EmbeddingStore(path)).embed_documents(["Santosa Hospital", "I63.9"])
+
+        server = _server()
+        worker = CachedEmbeddings(server, "qwen3", EmbeddingStore(path, readonly=True))
+        assert asyncio.run(worker.aembed_query("Santosa Hospital")) == [16.0, 1.0, 0.5]
+        assert worker.embed_query("I63.9") == [5.0, 1.0, 0.5]
+        server.aembed_documents.assert_not_awaited()
+        assert worker.stats()["disk_hits"] == 2
+        assert worker.stats()["saved_calls"] == 2
+
+        # A readonly worker embeds new texts but never writes them
+        worker.embed_query("Dr. Budi")
+        assert EmbeddingStore(path).size("qwen3") == 2
+
+    def test_async_store_access_leaves_the_event_loop(self, path):
+        store = EmbeddingStore(path)
+        threads = []
+        for name in ("get_many", "put_many"):
+            method = getattr(store, name)
+            setattr(store, name, lambda *args, method=method: threads.append(threading.get_ident()) or method(*args))
+        embeddings = CachedEmbeddings(_server(), "qwen3", store)
+
+        assert asyncio.run(embeddings.aembed_documents(["stroke", "RSHS"])) == [[6.0, 1.0, 0.5], [4.0, 1.0, 0.5]]
+        assert len(threads) == 2 and threading.get_ident() not in threads
+        assert store.size("qwen3") == 2
+
+    def test_reader_sees_rows_appended_later(self, path):
+        reader = EmbeddingStore(path)
+        writer = EmbeddingStore(path)
+        writer.put_many("qwen3", {"a": [1.0, 0.0], "b": [0.0, 1.0]})
+        assert set(reader.get_many("qwen3", ["a", "b"])) == {"a", "b"}
+
+        writer.put_many("qwen3", {"c": [0.5, 0.5]})
+        assert reader.get_many("qwen3", ["c"])["c"].tolist() == [0.5, 0.5]
+        assert reader.get_many("other-model", ["a"]) == {}
+
+    def test_normalize_text(self):
+        assert normalize_text("  Santosa\n Hospital ") == "Santosa Hospital"
+        assert normalize_text("RSHS") != normalize_text("rshs")
@@ -0,0 +1,93 @@
+import sys
+import os
+import asyncio
+import numpy as np
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.entity_index import EntityIndex, quantize
+
+HOSPITALS = [
+    {"name": "RSUP Dr. Hasan Sadikin", "id": "H001", "class": "A", "embedding": [1.0, 0.0, 0.0]},
+    {"name": "RS Santosa", "id": "H002", "class": "B", "embedding": [0.0, 2.0, 0.0]},
+    {"name": "RS Immanuel", "id": "H003", "class": "B", "embedding": [0.0, 0.6, 0.8]},
+]
+
+
+def _index(tmp_path, **kwargs):
+    session = MagicMock()
+    session.run.side_effect = lambda query: [{"properties": dict(node)} for node in HOSPITALS]
+    database = MagicMock()
+    database.get_session.return_value.__enter__.return_value = session
+    return EntityIndex(database=database, path=str(tmp_path), **kwargs), session
+
+
+class TestEntityIndex:
+    """Test the in-process entity index"""
+
+    def test_search_matches_neo4j_hit_shape(self, tmp_path):
+        index, _ = _index(tmp_path)
+        with patch("chatbot.src.entity_index.graph_version.current", return_value=5):
+            hits = index.search("hospital", [0.1, 1.0, 0.0], k=2)
+
+        assert [hit.text for hit in hits] == ["\nname: RS Santosa\nid: H002", "\nname: RS Immanuel\nid: H003"]
+        assert hits[0].metadata == {"class": "B"}
+        # Neo4j cosine index scores: (1 + cosine) / 2
+        assert hits[0].score == pytest.approx((1 + 1 / np.sqrt(1.01)) / 2, rel=1e-5)
+
+    def test_rebuilt_for_new_graph_version(self, tmp_path):
+        index, session = _index(tmp_path)
+        with patch("chatbot.src.entity_index.graph_version.current", return_value=5):
+            index.search("hospital", [1.0, 0.0, 0.0])
+            index.search("hospital", [0.0, 1.0, 0.0])
+        assert session.run.call_count == 1
+        with patch("chatbot.src.entity_index.graph_version.current", return_value=6):
+            index.search("hospital", [1.0, 0.0, 0.0])
+        assert session.run.call_count == 2
+        # Only the files of the current version are kept
+        assert sorted(os.listdir(tmp_path)) == ["hospital_entity_index.float32.v6.json", "hospital_entity_index.float32.v6.npy"]
+
+    def test_other_process_reads_the_files(self, tmp_path):
+        writer, _ = _index(tmp_path)
+        reader, session = _index(tmp_path)
+        with patch("chatbot.src.entity_index.graph_version.current", return_value=5):
+            writer.search("hospital", [1.0, 0.0, 0.0])
+            hits = reader.search("hospital", [1.0, 0.0, 0.0])
+
+        session.run.assert_not_called()
+        assert reader.disk_loads == 1
+        assert isinstance(reader.get("hospital").matrix, np.memmap)
+        assert hits[0].text == "\nname: RSUP Dr. Hasan Sadikin\nid: H001"
+
+    def test_int8_matches_float32_ranking(self, tmp_path):
+        index, _ = _index(tmp_path, quantization="int8")
+        with patch("chatbot.src.entity_index.graph_version.current", return_value=5), \
+             patch("chatbot.src.entity_index.graph_version.acurrent", new_callable=AsyncMock, return_value=5):
+            hits = index.search("hospital", [0.0, 0.7, 0.7], k=3)
+            async_hits = asyncio.run(index.asearch("hospital", [0.0, 0.7, 0.7], k=3))
+        assert index.loads == 1
+
+        assert index.get("hospital").matrix.dtype == np.int8
+        assert [hit.text.split("\n")[1] for hit in hits] == ["name: RS Immanuel", "name: RS Santosa", "name: RSUP Dr. Hasan Sadikin"]
+        assert hits == async_hits
+
+    def test_quantize_round_trip(self):
+        matrix = np.array([[0.6, 0.8], [-1.0, 0.0]], dtype=np.float32)
+        rows, scales = quantize(matrix)
+        assert np.allclose(rows * scales[:, None], matrix, atol=1 / 127)
+
+    def test_empty_catalog(self, tmp_path):
+        index, session = _index(tmp_path, quantization="int8")
+        session.run.side_effect = lambda query: []
+        with patch("chatbot.src.entity_index.graph_version.current", return_value=5):
+            assert index.search("hospital", [1.0, 0.0, 0.0]) == []
+            assert index.search("hospital", [0.0, 1.0, 0.0]) == []
+            reader, _ = _index(tmp_path, quantization="int8")
+            assert reader.search("hospital", [1.0, 0.0, 0.0]) == []
+            assert index.get("hospital").matrix.shape[0] == 0
+
+        # The empty snapshot is kept instead of reading the graph again
+        assert session.run.call_count == 1
+        assert reader.disk_loads == 1
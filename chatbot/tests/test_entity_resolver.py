@@ -0,0 +1,88 @@
+import sys
+import os
+import asyncio
+from unittest.mock import patch, AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.entity_resolver import EntityResolver, build_catalog, code_key, normalize_name
+
+HOSPITALS = [
+    {"name": "RSUP Dr. Hasan Sadikin", "id": "HOS001", "class": "A"},
+    {"name": "RS Santosa Hospital Bandung", "id": "HOS002", "class": "B"},
+]
+DIAGNOSES = [
+    {"name": "Acute myocardial infarction, unspecified", "code": "I21.9", "severity": "high"},
+    {"name": "Cerebral infarction", "code": "I63.9", "severity": "high"},
+]
+
+
+class TestEntityCatalog:
+    """Test the lookup tiers of one entity type"""
+
+    def test_keys(self):
+        assert code_key(" i21.9 ") == code_key("I219") == "I219"
+        assert normalize_name("RSUP Dr. Hasan-Sadikin") == "rsup dr hasan sadikin"
+
+    def test_exact_code(self):
+        catalog = build_catalog(DIAGNOSES, ["name", "code"])
+        match = catalog.lookup("i21.9", 0.6)
+        assert match.tier == "exact"
+        assert match.text == "\nname: Acute myocardial infarction, unspecified\ncode: I21.9"
+        assert match.metadata == {"severity": "high"}
+
+    def test_name_and_trigram(self):
+        catalog = build_catalog(HOSPITALS, ["name", "id"])
+        assert catalog.lookup("rsup dr hasan sadikin", 0.6).tier == "name"
+        match = catalog.lookup("RS Santosa Hospital", 0.6)
+        assert match.tier == "trigram"
+        assert match.text.startswith("\nname: RS Santosa Hospital Bandung")
+        assert 0.6 <= match.score < 1.0
+
+    def test_miss_goes_to_vector_search(self):
+        catalog = build_catalog(DIAGNOSES, ["name", "code"])
+        assert catalog.lookup("stroke", 0.6) is None
+
+
+class TestEntityResolver:
+    """Test catalog loading by graph version and the tier counters"""
+
+    def _resolver(self):
+        session = MagicMock()
+        rows = {":Hospital": HOSPITALS, ":Diagnosis": DIAGNOSES}
+        session.run.side_effect = lambda query: MagicMock(data=MagicMock(return_value=[
+            {"properties": dict(row)} for label, table in rows.items() if label in query for row in table
+        ]))
+        database = MagicMock()
+        database.get_session.return_value.__enter__.return_value = session
+        return EntityResolver(database=database), database
+
+    def test_reload_on_version_change(self):
+        resolver, database = self._resolver()
+        with patch("chatbot.src.entity_resolver.graph_version.current", return_value=1):
+            resolver.get()
+            resolver.get()
+        with patch("chatbot.src.entity_resolver.graph_version.current", return_value=2):
+            assert resolver.get().version == 2
+        assert resolver.loads == 2
+        assert database.get_session.call_count == 2
+
+        with patch("chatbot.src.entity_resolver.graph_version.acurrent", new_callable=AsyncMock, side_effect=[2, 3]), \
+             patch("chatbot.src.entity_resolver.graph_version.current") as current:
+            assert asyncio.run(resolver.aget()).version == 2
+            assert asyncio.run(resolver.aget()).version == 3
+        current.assert_not_called()
+        assert resolver.loads == 3
+
+    def test_tier_counters(self):
+        resolver, _ = self._resolver()
+        with patch("chatbot.src.entity_resolver.graph_version.current", return_value=1):
+            matches = resolver.resolve(resolver.get(), [
+                ("hospital", ["HOS002", "RSUP Dr Hasan Sadikin", "RSHS"]),
+                ("diagnosis", ["I63.9", "stroke", ""]),
+            ])
+
+        assert set(matches) == {("hospital", "HOS002"), ("hospital", "RSUP Dr Hasan Sadikin"), ("diagnosis", "I63.9")}
+        stats = resolver.stats()
+        assert (stats["terms"], stats["exact"], stats["name"], stats["vector"]) == (5, 2, 1, 2)
+        assert stats["embeddings_avoided"] == 3
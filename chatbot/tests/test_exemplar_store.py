@@ -0,0 +1,169 @@
+import sys
+import os
+import asyncio
+import threading
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from langchain_core.messages import AIMessage, ToolMessage
+from chatbot.src.exemplar_store import ExemplarStore
+from chatbot.src.api.chatbot_pipeline import ChatbotPipeline, PipelineFallback
+
+CYPHER = "MATCH (c:Claim {id: 'C1001'}) RETURN c.total_cost AS total_cost"
+ROWS = '["total_cost"]\n[1250000]'
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ExemplarStore(path=str(tmp_path / "exemplars.sqlite3"), max_entries=10, few_shot=2,
+                         min_similarity=0.5, reuse_similarity=0.8)
+
+
+class TestExemplarStore:
+    """Test recording and reusing successful question/Cypher pairs"""
+
+    def test_literal_swap_reuses_template(self, store):
+        """A question that only differs in the claim ID binds the new ID to the stored query"""
+        store.record("Berapa total biaya klaim C1001?", [1.0, 0.0], CYPHER, ROWS)
+
+        match = store.match("berapa total biaya klaim C1044", [0.98, 0.1])
+        assert match is not None
+        assert match.params == {"lit_0": "C1044"}
+        assert "$lit_0" in match.exemplar.template
+        assert match.exemplar.columns == ["total_cost"]
+
+    def test_different_question_shape_is_not_reused(self, store):
+        """A literal of another shape, or other words, falls back to generation"""
+        store.record("Berapa total biaya klaim C1001?", [1.0, 0.0], CYPHER, ROWS)
+
+        assert store.match("Berapa total biaya klaim RSUP Dr. Hasan Sadikin?", [0.98, 0.1]) is None
+        assert store.match("Berapa rata-rata biaya klaim C1044?", [0.98, 0.1]) is None
+
+    def test_failed_or_empty_results_are_not_recorded(self, store):
+        assert store.record("q1", [1.0, 0.0], CYPHER, "Cypher Execution Error: Invalid input") is None
+        assert store.record("q2", [1.0, 0.0], CYPHER, "Query executed successfully but returned no results.") is None
+        assert store.stats()["size"] == 0
+
+    def test_similar_orders_by_similarity(self, store):
+        store.record("Berapa total biaya klaim C1001?", [1.0, 0.0], CYPHER, ROWS)
+        store.record("Siapa dokter di RS Santosa?", [0.0, 1.0],
+                     "MATCH (d:Doctor)-[:WORKS_AT]->(h:Hospital {name: 'RS Santosa'}) RETURN d.name AS name", '["name"]\n["dr. Andi"]')
+
+        examples = store.similar([0.6, 0.8])
+        assert [exemplar.question for exemplar, _ in examples] == ["Siapa dokter di RS Santosa?", "Berapa total biaya klaim C1001?"]
+        assert store.similar([-1.0, 0.0]) == []
+
+    def test_persists_and_forgets(self, store):
+        exemplar_id = store.record("Berapa total biaya klaim C1001?", [1.0, 0.0], CYPHER, ROWS)
+
+        reopened = ExemplarStore(path=store.path, reuse_similarity=0.8)
+        assert reopened.match("Berapa total biaya klaim C2002?", [1.0, 0.0]).params == {"lit_0": "C2002"}
+
+        reopened.forget(exemplar_id)
+        assert ExemplarStore(path=store.path).similar([1.0, 0.0]) == []
+
+
+class TestTemplateRun:
+    """Test answering with a stored query"""
+
+    def test_one_llm_call(self):
+        execute = MagicMock(**{"execute.return_value": ROWS})
+        model = MagicMock(**{"invoke.return_value": AIMessage("Total biaya klaim C1044 Rp1.250.000.")})
+        pipeline = ChatbotPipeline(model, {"entity_extraction": MagicMock(), "rag_enhanced_search": MagicMock(),
+                                           "execute_cypher": execute})
+
+        result = pipeline.run_template("Berapa total biaya klaim C1044?", "MATCH (c:Claim {id: $lit_0}) RETURN c", {"lit_0": "C1044"})
+
+        execute.execute.assert_called_once_with("MATCH (c:Claim {id: $lit_0}) RETURN c", {"lit_0": "C1044"})
+        assert result.llm_calls == 1
+        assert model.invoke.call_count == 1
+
+    def test_empty_result_falls_back(self):
+        execute = MagicMock(**{"execute.return_value": "Query executed successfully but returned no results."})
+        model = MagicMock()
+        pipeline = ChatbotPipeline(model, {"entity_extraction": MagicMock(), "rag_enhanced_search": MagicMock(),
+                                           "execute_cypher": execute})
+
+        with pytest.raises(PipelineFallback) as fallback:
+            pipeline.run_template("q", "MATCH (c:Claim {id: $lit_0}) RETURN c", {"lit_0": "C9999"})
+        assert fallback.value.llm_calls == 0
+        model.invoke.assert_not_called()
+
+
+class TestChatbotExemplars:
+    """Test that /chatbot/ask reuses the agent's Cypher for a question with another claim ID"""
+
+    def test_agent_query_is_reused(self, store):
+        # The chatbot tools need langchain_community's Neo4jVector
+        module = pytest.importorskip("chatbot.src.api.chatbot_service", exc_type=ImportError)
+        service = module.ChatbotService.__new__(module.ChatbotService)
+        service.tools = []
+        service.base_chat_history = []
+        service.answer_cache = None
+        service.exemplars = store
+        execute = MagicMock(**{"execute.return_value": '["total_cost"]\n[980000]'})
+        service.pipeline = ChatbotPipeline(
+            MagicMock(**{"invoke.return_value": AIMessage("Total biaya klaim C1044 Rp980.000.")}),
+            {"entity_extraction": MagicMock(), "rag_enhanced_search": MagicMock(), "execute_cypher": execute},
+        )
+        agent_turns = [
+            AIMessage("", tool_calls=[{"name": "execute_cypher", "args": {"cypher_query": CYPHER}, "id": "1"}]),
+            ToolMessage(ROWS, tool_call_id="1"),
+            AIMessage("Total biaya klaim C1001 Rp1.250.000."),
+        ]
+        service.agent_executor = MagicMock()
+        service.agent_executor.invoke.side_effect = lambda state, config: {"messages": state["messages"] + agent_turns}
+        vectors = {"Berapa total biaya klaim C1001?": [1.0, 0.0], "Berapa total biaya klaim C1044?": [0.99, 0.05]}
+
+        with pytest.MonkeyPatch.context() as patch:
+            patch.setattr(module.graph_version, "current", lambda: 1)
+            patch.setattr(module.ChatbotService, "_embed_question", staticmethod(lambda question: vectors[question]))
+            service.process_question("Berapa total biaya klaim C1001?")
+            second = service.process_question("Berapa total biaya klaim C1044?")
+
+        assert service.agent_executor.invoke.call_count == 1
+        assert second["metadata"]["mode"] == "exemplar"
+        assert second["metadata"]["llm_calls"] == 1
+        assert second["metadata"]["cypher_params"] == {"lit_0": "C1044"}
+
+    def test_async_path_uses_the_store_off_the_event_loop(self, store):
+        module = pytest.importorskip("chatbot.src.api.chatbot_service", exc_type=ImportError)
+        service = module.ChatbotService.__new__(module.ChatbotService)
+        service.tools = []
+        service.base_chat_history = []
+        service.answer_cache = None
+        service.exemplars = store
+        threads = []
+        for name in ("match", "similar", "record", "mark_used"):
+            method = getattr(store, name)
+            setattr(store, name, lambda *args, method=method: threads.append(threading.get_ident()) or method(*args))
+        execute = MagicMock()
+        execute.aexecute = AsyncMock(return_value='["total_cost"]\n[980000]')
+        model = MagicMock()
+        model.ainvoke = AsyncMock(return_value=AIMessage("Total biaya klaim C1044 Rp980.000."))
+        service.pipeline = ChatbotPipeline(
+            model, {"entity_extraction": MagicMock(), "rag_enhanced_search": MagicMock(), "execute_cypher": execute},
+        )
+        agent_turns = [
+            AIMessage("", tool_calls=[{"name": "execute_cypher", "args": {"cypher_query": CYPHER}, "id": "1"}]),
+            ToolMessage(ROWS, tool_call_id="1"),
+            AIMessage("Total biaya klaim C1001 Rp1.250.000."),
+        ]
+        service.agent_executor = MagicMock()
+        service.agent_executor.ainvoke = AsyncMock(side_effect=lambda state, config: {"messages": state["messages"] + agent_turns})
+        vectors = {"Berapa total biaya klaim C1001?": [1.0, 0.0], "Berapa total biaya klaim C1044?": [0.99, 0.05]}
+
+        async def embed(question):
+            return vectors[question]
+
+        with pytest.MonkeyPatch.context() as patch:
+            patch.setattr(module.graph_version, "acurrent", AsyncMock(return_value=1))
+            patch.setattr(module.ChatbotService, "_aembed_question", staticmethod(embed))
+            asyncio.run(service.aprocess_question("Berapa total biaya klaim C1001?"))
+            second = asyncio.run(service.aprocess_question("Berapa total biaya klaim C1044?"))
+
+        assert second["metadata"]["mode"] == "exemplar"
+        # match, similar and record for the first question; match and mark_used for the second
+        assert len(threads) == 5 and threading.get_ident() not in threads
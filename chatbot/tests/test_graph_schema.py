@@ -0,0 +1,116 @@
+import sys
+import os
+import asyncio
+from unittest.mock import patch, AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.graph_schema import GRAPH_SCHEMA, GraphSchema, build_schema_text, relationship_patterns_query
+from chatbot.src.tool.schema_linking import prune_schema, linked_schema
+
+NODE_PROPERTIES = [
+    {"nodeLabels": ["Claim"], "propertyName": "id", "propertyTypes": ["String"]},
+    {"nodeLabels": ["Claim"], "propertyName": "total_cost", "propertyTypes": ["Double"]},
+    {"nodeLabels": ["Hospital"], "propertyName": "name", "propertyTypes": ["String"]},
+    {"nodeLabels": ["Hospital"], "propertyName": "embedding", "propertyTypes": ["DoubleArray"]},
+    {"nodeLabels": ["ClinicalNote"], "propertyName": "text_raw", "propertyTypes": ["String"]},
+    {"nodeLabels": ["Procedure"], "propertyName": "code", "propertyTypes": ["String"]},
+    {"nodeLabels": ["GraphMeta"], "propertyName": "version", "propertyTypes": ["Long"]},
+]
+RELATIONSHIP_TYPES = [{"type": "SUBMITTED_AT"}, {"type": "HAS_CLINICAL_NOTE"}, {"type": "HAS_PRIMARY_PROCEDURE"}]
+RELATIONSHIP_PATTERNS = [
+    {"from_label": "Claim", "type": "HAS_CLINICAL_NOTE", "to_label": "ClinicalNote"},
+    {"from_label": "Claim", "type": "HAS_PRIMARY_PROCEDURE", "to_label": "Procedure"},
+    {"from_label": "Claim", "type": "SUBMITTED_AT", "to_label": "Hospital"},
+]
+
+
+class TestSchemaText:
+    """Test the schema text built from the schema procedures"""
+
+    def test_introspected_properties(self):
+        """Properties the loader writes appear; vector and bookkeeping data do not"""
+        schema = build_schema_text(NODE_PROPERTIES, RELATIONSHIP_PATTERNS, version=7)
+        assert "   - text_raw (String)" in schema
+        assert '   - id (String): "C1001", "C1002"' in schema
+        assert "   - total_cost (Float)" in schema
+        assert "embedding" not in schema
+        assert "GraphMeta" not in schema
+        assert "(:Claim)-[:SUBMITTED_AT]->(:Hospital)  // Where claim filed" in schema
+
+    def test_prune_introspected_schema(self):
+        """The introspected layout prunes like the static one"""
+        schema = prune_schema({"Claim", "Hospital"}, build_schema_text(NODE_PROPERTIES, RELATIONSHIP_PATTERNS))
+        assert "(:Claim)-[:SUBMITTED_AT]->(:Hospital)" in schema
+        assert "CLAIM RELATIONSHIPS:" in schema
+        assert "text_raw" not in schema
+        assert "HAS_PRIMARY_PROCEDURE" not in schema
+
+
+class TestGraphSchema:
+    """Test introspection caching by graph version"""
+
+    def _schema(self):
+        session = MagicMock()
+        session.run.return_value.data.side_effect = [NODE_PROPERTIES, [], RELATIONSHIP_TYPES, RELATIONSHIP_PATTERNS[::-1]] * 2
+        database = MagicMock()
+        database.get_session.return_value.__enter__.return_value = session
+        return GraphSchema(database=database), session
+
+    def test_reintrospect_on_version_change(self):
+        schema, session = self._schema()
+        version = {"value": 1}
+        with patch('chatbot.src.graph_schema.graph_version') as tracker:
+            tracker.current.side_effect = lambda: version["value"]
+            snapshot = schema.get()
+            schema.get()
+            assert session.run.call_count == 4
+            assert "text_raw" in snapshot.text
+            assert snapshot.relationship_types == ["HAS_CLINICAL_NOTE", "HAS_PRIMARY_PROCEDURE", "SUBMITTED_AT"]
+            # Patterns are grouped by start label whatever order the sample returns them in
+            assert snapshot.text.index("HAS_CLINICAL_NOTE") < snapshot.text.index("SUBMITTED_AT")
+
+            version["value"] = 2
+            assert schema.get().version == 2
+            assert session.run.call_count == 8
+
+    def test_relationship_patterns_are_sampled(self):
+        schema, session = self._schema()
+        with patch('chatbot.src.graph_schema.graph_version') as tracker:
+            tracker.current.return_value = 1
+            schema.get()
+        query, params = session.run.call_args_list[3].args[0], session.run.call_args_list[3].kwargs
+        assert query == relationship_patterns_query(["HAS_CLINICAL_NOTE", "HAS_PRIMARY_PROCEDURE", "SUBMITTED_AT"])
+        assert query.count("LIMIT $sample") == 3 and query.count("UNION") == 2
+        assert "MATCH (a)-[r:`SUBMITTED_AT`]->(b)" in query
+        assert params == {"sample": schema.sample_size}
+
+    def test_aget_checks_the_version_off_the_event_loop(self):
+        schema, session = self._schema()
+        with patch('chatbot.src.graph_schema.graph_version') as tracker:
+            tracker.acurrent = AsyncMock(return_value=1)
+            assert asyncio.run(schema.aget()).version == 1
+            assert asyncio.run(schema.aget()).version == 1
+        tracker.current.assert_not_called()
+        assert session.run.call_count == 4
+
+    def test_static_schema_when_introspection_fails(self):
+        schema, session = self._schema()
+        session.run.side_effect = Exception("Unable to retrieve routing information")
+        with patch('chatbot.src.graph_schema.graph_version') as tracker:
+            tracker.current.return_value = 1
+            snapshot = schema.get()
+        assert snapshot.text == GRAPH_SCHEMA
+        assert not snapshot.introspected
+        assert schema.stats()["failures"] == 1
+
+    def test_linked_schema_prunes_by_question(self):
+        schema, _ = self._schema()
+        with patch('chatbot.src.graph_schema.graph_version') as tracker, \
+             patch('chatbot.src.tool.schema_linking.graph_schema', schema):
+            tracker.current.return_value = 1
+            pruned = linked_schema("Berapa klaim di rumah sakit RSHS?")
+            full = linked_schema("Berapa total klaim?")
+        assert "(:Claim)-[:SUBMITTED_AT]->(:Hospital)" in pruned
+        assert "ClinicalNote" not in pruned
+        assert "ClinicalNote" in full
@@ -0,0 +1,61 @@
+import sys
+import os
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.graph_version import GraphVersionTracker
+
+
+def _tracker(version=7, delay=0.0):
+    threads = []
+
+    def run(query):
+        threads.append(threading.get_ident())
+        time.sleep(delay)
+        result = MagicMock()
+        result.single.return_value = {"version": version}
+        return result
+
+    session = MagicMock()
+    session.run.side_effect = run
+    database = MagicMock()
+    database.get_session.return_value.__enter__.return_value = session
+    return GraphVersionTracker(database=database, check_interval=60), threads
+
+
+class TestGraphVersionTracker:
+    """Test the cached graph data version"""
+
+    def test_acurrent_reads_off_the_event_loop(self):
+        tracker, threads = _tracker()
+        assert asyncio.run(tracker.acurrent()) == 7
+        assert asyncio.run(tracker.acurrent()) == 7
+        # One read, not on the thread running the event loop
+        assert len(threads) == 1 and threads[0] != threading.get_ident()
+
+    def test_concurrent_refreshes_read_once(self):
+        tracker, threads = _tracker(delay=0.05)
+
+        async def main():
+            return await asyncio.gather(*(tracker.acurrent() for _ in range(5)))
+
+        assert asyncio.run(main()) == [7] * 5
+        assert len(threads) == 1
+
+    def test_last_version_served_during_refresh(self):
+        tracker, threads = _tracker(version=8, delay=0.2)
+        tracker.notify_local_change(7)
+        tracker._checked_at = 0.0
+        refresh = threading.Thread(target=tracker.current)
+        refresh.start()
+        while not threads:
+            time.sleep(0.005)
+
+        # A slow refresh in another thread does not hold up the event loop
+        assert asyncio.run(tracker.acurrent()) == 7
+        refresh.join()
+        assert asyncio.run(tracker.acurrent()) == 8
@@ -0,0 +1,116 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.api.job_queue import JobQueue
+
+
+def _wait_for(queue, job_id, statuses=("succeeded", "failed"), timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish: {queue.get(job_id)}")
+
+
+class TestJobQueue:
+    """Test the SQLite-backed verification job queue"""
+
+    def test_submit_returns_immediately_and_completes(self, tmp_path):
+        """Jobs are queued at once and their result and timing are stored"""
+        queue = JobQueue(path=str(tmp_path / "jobs.sqlite3"), workers=1, poll_interval=0.05)
+        queue.register("verify_claim", lambda payload: {"claim_id": payload["claim_id"], "validation_result": "NORMAL"})
+
+        job = queue.submit("verify_claim", {"claim_id": "C1001"})
+        assert job["status"] == "queued"
+
+        queue.start()
+        try:
+            done = _wait_for(queue, job["job_id"])
+        finally:
+            queue.stop()
+
+        assert done["status"] == "succeeded"
+        assert done["result"]["validation_result"] == "NORMAL"
+        assert done["attempts"] == 1
+        assert done["run_ms"] is not None and done["queue_ms"] is not None
+
+    def test_failed_job_can_be_retried(self, tmp_path):
+        """Handler errors mark the job failed; retry queues it again"""
+        calls = []
+
+        def flaky(payload):
+            calls.append(payload)
+            if len(calls) == 1:
+                raise RuntimeError("LLM backend unavailable")
+            return {"ok": True}
+
+        queue = JobQueue(path=str(tmp_path / "jobs.sqlite3"), workers=1, poll_interval=0.05)
+        queue.register("verify_claim", flaky)
+        queue.start()
+        try:
+            job = queue.submit("verify_claim", {"claim_id": "C1002"})
+            failed = _wait_for(queue, job["job_id"])
+            assert failed["status"] == "failed"
+            assert "unavailable" in failed["error"]
+
+            queue.retry(job["job_id"])
+            done = _wait_for(queue, job["job_id"])
+        finally:
+            queue.stop()
+
+        assert done["status"] == "succeeded"
+        assert done["attempts"] == 2
+
+    def test_jobs_survive_restart(self, tmp_path):
+        """Queued and interrupted jobs are processed by the next process"""
+        path = str(tmp_path / "jobs.sqlite3")
+        first = JobQueue(path=path, workers=1)
+        first.register("verify_claim", lambda payload: {})
+        queued = first.submit("verify_claim", {"claim_id": "C1003"})
+        interrupted = first.submit("verify_claim", {"claim_id": "C1004"})
+        with first._connect() as conn:
+            conn.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time.time(), interrupted["job_id"]))
+
+        second = JobQueue(path=path, workers=2, poll_interval=0.05)
+        second.register("verify_claim", lambda payload: {"claim_id": payload["claim_id"]})
+        second.start()
+        try:
+            assert _wait_for(second, queued["job_id"])["status"] == "succeeded"
+            assert _wait_for(second, interrupted["job_id"])["result"] == {"claim_id": "C1004"}
+        finally:
+            second.stop()
+        assert second.stats()["jobs"]["succeeded"] == 2
+
+    def test_live_lease_is_not_taken_over(self, tmp_path):
+        """A worker starting on a shared file leaves jobs leased by a live worker alone"""
+        path = str(tmp_path / "jobs.sqlite3")
+        first = JobQueue(path=path, workers=1, lease_seconds=60)
+        first.register("verify_claim", lambda payload: {})
+        job = first.submit("verify_claim", {"claim_id": "C1005"})
+        assert first._claim_next()["job_id"] == job["job_id"]
+
+        second = JobQueue(path=path, workers=1, poll_interval=0.05)
+        second.register("verify_claim", lambda payload: {"by": "second"})
+        second.start()
+        try:
+            time.sleep(0.3)
+            assert second.get(job["job_id"])["status"] == "running"
+            assert second.get(job["job_id"])["attempts"] == 1
+
+            # The first worker dies: once its lease expires the job runs again
+            with first._connect() as conn:
+                conn.execute("UPDATE jobs SET lease_expires_at = ? WHERE id = ?", (time.time() - 1, job["job_id"]))
+            done = _wait_for(second, job["job_id"])
+        finally:
+            second.stop()
+        assert done["result"] == {"by": "second"}
+        assert done["attempts"] == 2
+
+        # The late result of the first worker is discarded
+        first._finish(job["job_id"], "failed", None, "late")
+        assert first.get(job["job_id"])["status"] == "succeeded"
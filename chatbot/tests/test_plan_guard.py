@@ -0,0 +1,76 @@
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.plan_guard import CypherPlanGuard, inspect_plan
+
+
+def _op(operator, rows, details="", children=None):
+    return {
+        "operatorType": f"{operator}@neo4j",
+        "arguments": {"EstimatedRows": rows, "Details": details},
+        "children": children or [],
+    }
+
+
+class TestInspectPlan:
+    """Test plan verdicts"""
+
+    def test_indexed_lookup_allowed(self):
+        """An anchored lookup passes the guard"""
+        plan = _op("ProduceResults", 1.0, children=[_op("NodeUniqueIndexSeek", 1.0, "UNIQUE c:Claim(id) WHERE id = $lit_0")])
+        verdict = inspect_plan(plan, max_estimated_rows=1000, max_label_scan_rows=100)
+        assert verdict.allowed
+        assert verdict.diagnosis == ""
+
+    def test_cartesian_product_rejected(self):
+        """Cartesian products are rejected with a retry hint"""
+        plan = _op("ProduceResults", 50.0, children=[
+            _op("CartesianProduct", 50.0, children=[_op("NodeByLabelScan", 5.0, "c:Claim"), _op("NodeByLabelScan", 10.0, "h:Hospital")])
+        ])
+        verdict = inspect_plan(plan, max_estimated_rows=1000, max_label_scan_rows=100)
+        assert not verdict.allowed
+        assert "CartesianProduct" in verdict.diagnosis
+        assert verdict.diagnosis.startswith("Cypher Plan Rejected")
+
+    def test_large_label_scan_rejected(self):
+        """The MATCH (all:Claim) pattern is rejected once the label is large"""
+        plan = _op("ProduceResults", 1.0, children=[_op("EagerAggregation", 1.0, children=[_op("NodeByLabelScan", 5_000_000.0, "all:Claim")])])
+        verdict = inspect_plan(plan, max_estimated_rows=10_000_000, max_label_scan_rows=100_000)
+        assert not verdict.allowed
+        assert "all:Claim" in verdict.diagnosis
+
+    def test_row_budget(self):
+        """Plans above the intermediate row budget are rejected"""
+        plan = _op("ProduceResults", 2_000_000.0, children=[_op("Expand(All)", 2_000_000.0)])
+        verdict = inspect_plan(plan, max_estimated_rows=1_000_000, max_label_scan_rows=100)
+        assert not verdict.allowed
+        assert verdict.estimated_rows == 2_000_000.0
+
+
+class TestCypherPlanGuard:
+    """Test verdict caching per query shape"""
+
+    def test_verdict_cached_per_shape(self):
+        """Repeated query shapes only run EXPLAIN once"""
+        summary = MagicMock()
+        summary.plan = _op("ProduceResults", 1.0)
+        session = MagicMock()
+        session.execute_read.return_value = summary
+
+        with patch('chatbot.src.plan_guard.graph_version.current', return_value=1):
+            guard = CypherPlanGuard()
+            query = "MATCH (c:Claim {id: $lit_0}) RETURN c"
+            assert guard.check(session, query, {"lit_0": "C1001"}).allowed
+            assert guard.check(session, query, {"lit_0": "C1002"}).allowed
+
+        assert session.execute_read.call_count == 1
+
+    def test_explain_failure_lets_query_through(self):
+        """EXPLAIN errors are left for the real execution to report"""
+        session = MagicMock()
+        session.execute_read.side_effect = Exception("Invalid input")
+        with patch('chatbot.src.plan_guard.graph_version.current', return_value=1):
+            assert CypherPlanGuard().check(session, "MATCH (c:Claim RETURN c").allowed
@@ -0,0 +1,242 @@
+import sys
+import os
+import json
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+# Needs langchain_community's Neo4jVector
+rag = pytest.importorskip("chatbot.src.tool.rag_enhanced_search", exc_type=ImportError)
+
+ENTITIES = json.dumps({
+    "entities": {"hospitals": ["RSHS"], "diagnoses": ["stroke", "hipertensi"], "doctors": ["Dr. Budi"],
+                 "specialties": ["stroke"]},
+    "relationships": [],
+    "keywords": [],
+})
+
+
+@pytest.fixture(autouse=True)
+def no_lookup_tier():
+    """Vector search only, unless a test enables the ID/code/name lookup"""
+    with patch.object(rag, "ENTITY_RESOLVER_ENABLED", False):
+        yield
+
+
+def _embeddings():
+    model = MagicMock()
+    model.embed_documents.side_effect = lambda texts: [[float(len(text)), 1.0] for text in texts]
+    model.aembed_documents = AsyncMock(side_effect=lambda texts: [[float(len(text)), 1.0] for text in texts])
+    return model
+
+
+class TestBatchedEmbedding:
+    """Test that one RAG search embeds all its terms in one request"""
+
+    def test_one_embedding_request(self):
+        model = _embeddings()
+        store = MagicMock()
+        store.similarity_search_with_score_by_vector.return_value = [(MagicMock(page_content="\nname: X", metadata={}), 0.9)]
+        tool = rag.RagEnhancedSearchTool()
+        with patch.object(rag, "get_embedding_model", return_value=model), \
+             patch.object(rag.vector_stores, "get", return_value=store):
+            output = json.loads(tool._run(ENTITIES))
+
+        model.embed_documents.assert_called_once_with(["RSHS", "stroke", "hipertensi", "Dr. Budi"])
+        model.embed_query.assert_not_called()
+        # "stroke" is searched as a diagnosis and as a specialty with the same vector
+        assert store.similarity_search_with_score_by_vector.call_count == 5
+        assert set(output) == {"hospitals", "diagnoses", "doctors"}
+
+    def test_async_one_embedding_request(self):
+        model = _embeddings()
+        tool = rag.RagEnhancedSearchTool()
+        searched = []
+
+        async def fake_search(entity_type, terms, vectors, min_similarity=0.6, resolved=None):
+            searched.append((entity_type, [vectors[term] for term in terms]))
+            return []
+
+        with patch.object(rag, "get_embedding_model", return_value=model), \
+             patch.object(tool, "_asearch_entity_with_filters", side_effect=fake_search):
+            asyncio.run(tool._arun(ENTITIES))
+
+        model.aembed_documents.assert_awaited_once()
+        assert ("diagnosis", [[6.0, 1.0], [10.0, 1.0]]) in searched
+
+
+class TestRelationshipMapper:
+    """Test the precomputed relationship matrix of SemanticRelationshipMapper"""
+
+    VECTORS = {"works at": [1.0, 0.0], "has specialty": [0.0, 1.0], "coded as": [0.6, 0.8],
+               "employed by": [0.9, 0.1], "coded": [0.6, 0.75]}
+
+    def _mapper(self):
+        model = MagicMock()
+        model.embed_documents.side_effect = lambda texts: [self.VECTORS[text] for text in texts]
+        model.embed_query.side_effect = lambda text: self.VECTORS[text]
+        mapper = rag.SemanticRelationshipMapper(model)
+        mapper.get_graph_relationships = MagicMock(return_value=["WORKS_AT", "HAS_SPECIALTY", "CODED_AS"])
+        return mapper, model
+
+    def test_relationships_embedded_once(self):
+        mapper, model = self._mapper()
+        assert mapper.map_relationship("employed by") == ["WORKS_AT", "CODED_AS"]
+        assert mapper.map_relationship("coded") == ["CODED_AS", "HAS_SPECIALTY", "WORKS_AT"]
+
+        model.embed_documents.assert_called_once_with(["works at", "has specialty", "coded as"])
+
+    def test_rebuilt_only_when_types_change(self):
+        mapper, model = self._mapper()
+        mapper.map_relationship("coded")
+        # A data write bumps the graph version but leaves the relationship types as they are
+        mapper.map_relationship("coded")
+        assert model.embed_documents.call_count == 1
+
+        mapper.get_graph_relationships.return_value = ["WORKS_AT", "CODED_AS"]
+        mapper.map_relationship("coded")
+        assert mapper.relationship_index().relationships == ["WORKS_AT", "CODED_AS"]
+        assert model.embed_documents.call_count == 2
+
+    def test_types_from_the_schema_snapshot(self):
+        mapper = rag.SemanticRelationshipMapper(MagicMock())
+        snapshot = MagicMock(relationship_types=["CODED_AS", "WORKS_AT"], introspected=True)
+        with patch.object(rag.graph_schema, "get", return_value=snapshot):
+            assert mapper.get_graph_relationships() == ["CODED_AS", "WORKS_AT"]
+            snapshot.introspected = False
+            assert mapper.get_graph_relationships() == rag.FALLBACK_RELATIONSHIPS
+
+    def test_concurrent_async_rebuilds_embed_once(self):
+        model = MagicMock()
+
+        async def aembed_documents(texts):
+            await asyncio.sleep(0.01)
+            return [self.VECTORS[text] for text in texts]
+
+        model.aembed_documents = AsyncMock(side_effect=aembed_documents)
+        mapper = rag.SemanticRelationshipMapper(model)
+        mapper.aget_graph_relationships = AsyncMock(return_value=["WORKS_AT", "HAS_SPECIALTY", "CODED_AS"])
+
+        async def main():
+            return await asyncio.gather(*(mapper.arelationship_index() for _ in range(4)))
+
+        indexes = asyncio.run(main())
+        assert all(index is indexes[0] for index in indexes)
+        assert model.aembed_documents.await_count == 1
+
+    def test_no_relationships(self):
+        mapper, model = self._mapper()
+        mapper.get_graph_relationships.return_value = []
+        assert mapper.map_relationship("coded") == []
+        model.embed_documents.assert_not_called()
+
+
+class TestLocalBackend:
+    """Test rag_enhanced_search with ENTITY_SEARCH_BACKEND=local"""
+
+    def test_searches_entity_index(self):
+        tool = rag.RagEnhancedSearchTool()
+        search = MagicMock(return_value=[MagicMock(text="\nname: RSHS\nid: H001", metadata={}, score=0.95)])
+        with patch.object(rag, "ENTITY_SEARCH_BACKEND", "local"), \
+             patch.object(rag.entity_index, "search", search), \
+             patch.object(rag.vector_stores, "get") as get_store:
+            results = tool._search_entity_with_filters("hospital", ["RSHS"], {"RSHS": [1.0, 0.0]})
+
+        get_store.assert_not_called()
+        search.assert_called_once_with("hospital", [1.0, 0.0], k=1)
+        assert results == [{"name": "RSHS", "similarity_score": 0.95, "metadata": {}, "search_term": "RSHS"}]
+
+
+class TestLookupTier:
+    """Test that terms resolved by ID/code or name lookup are not embedded"""
+
+    def _resolver(self):
+        session = MagicMock()
+        session.run.side_effect = lambda query: MagicMock(data=MagicMock(return_value=[
+            {"properties": {"name": "RSUP Dr. Hasan Sadikin", "id": "HOS001"}}
+        ] if ":Hospital" in query else []))
+        database = MagicMock()
+        database.get_session.return_value.__enter__.return_value = session
+        return rag.entity_resolver.__class__(database=database)
+
+    def test_resolved_terms_skip_embedding(self):
+        model = _embeddings()
+        store = MagicMock()
+        store.similarity_search_with_score_by_vector.return_value = [(MagicMock(page_content="\nname: Stroke", metadata={}), 0.9)]
+        entities = json.dumps({"entities": {"hospitals": ["HOS001"], "diagnoses": ["stroke"]}})
+        resolver = self._resolver()
+        with patch.object(rag, "ENTITY_RESOLVER_ENABLED", True), patch.object(rag, "entity_resolver", resolver), \
+             patch("chatbot.src.entity_resolver.graph_version.current", return_value=1), \
+             patch.object(rag, "get_embedding_model", return_value=model), \
+             patch.object(rag.vector_stores, "get", return_value=store):
+            output = json.loads(rag.RagEnhancedSearchTool()._run(entities))
+
+        model.embed_documents.assert_called_once_with(["stroke"])
+        assert output["hospitals"][0]["name"] == "RSUP Dr. Hasan Sadikin"
+        assert output["hospitals"][0]["similarity_score"] == 1.0
+        assert resolver.stats()["exact"] == 1
+
+    def test_embedding_request_avoided(self):
+        model = _embeddings()
+        entities = json.dumps({"entities": {"hospitals": ["rsup dr hasan sadikin"]}})
+        resolver = self._resolver()
+        with patch.object(rag, "ENTITY_RESOLVER_ENABLED", True), patch.object(rag, "entity_resolver", resolver), \
+             patch("chatbot.src.entity_resolver.graph_version.current", return_value=1), \
+             patch.object(rag, "get_embedding_model", return_value=model), \
+             patch.object(rag.vector_stores, "get") as get_store:
+            rag.RagEnhancedSearchTool()._run(entities)
+
+        model.embed_documents.assert_not_called()
+        get_store.assert_not_called()
+        assert resolver.stats()["embedding_requests_avoided"] == 1
+
+
+class TestMultiIndexBackend:
+    """Test ENTITY_SEARCH_BACKEND=neo4j_multi"""
+
+    RECORDS = [
+        {"entity_type": "hospital", "term": "RSHS", "text": "\nname: RSHS\nid: H001",
+         "properties": {"name": "RSHS", "id": "H001", "embedding": None, "class": "A"}, "score": 0.95},
+        {"entity_type": "diagnosis", "term": "stroke", "text": "\nname: Stroke\ncode: I63.9",
+         "properties": {"name": "Stroke", "code": "I63.9", "embedding": None}, "score": 0.9},
+    ]
+
+    def test_one_query_for_all_entity_types(self):
+        session = MagicMock()
+        session.run.return_value.data.return_value = self.RECORDS
+        with patch.object(rag, "ENTITY_SEARCH_BACKEND", "neo4j_multi"), \
+             patch.object(rag, "get_embedding_model", return_value=_embeddings()), \
+             patch.object(rag.db, "get_session") as get_session, \
+             patch.object(rag.vector_stores, "get") as get_store:
+            get_session.return_value.__enter__.return_value = session
+            output = json.loads(rag.RagEnhancedSearchTool()._run(ENTITIES))
+
+        session.run.assert_called_once()
+        searches = session.run.call_args.kwargs["searches"]
+        # "stroke" is searched once per index, although it is both a diagnosis and a specialty
+        assert [(row["index_name"], row["term"]) for row in searches] == [
+            ("hospital_entity_index", "RSHS"), ("diagnosis_rules_index", "stroke"),
+            ("diagnosis_rules_index", "hipertensi"), ("doctor_entity_index", "Dr. Budi"),
+            ("doctor_entity_index", "stroke"),
+        ]
+        get_store.assert_not_called()
+        assert output["hospitals"] == [{"name": "RSHS", "similarity_score": 0.95, "metadata": {"class": "A"}, "search_term": "RSHS"}]
+        assert output["diagnoses"][0]["name"] == "Stroke"
+        assert "doctors" not in output
+
+    def test_async_one_query(self):
+        result = MagicMock()
+        result.data = AsyncMock(return_value=self.RECORDS)
+        session = MagicMock()
+        session.run = AsyncMock(return_value=result)
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=None)
+        with patch.object(rag, "ENTITY_SEARCH_BACKEND", "neo4j_multi"), \
+             patch.object(rag, "get_embedding_model", return_value=_embeddings()), \
+             patch.object(rag.db, "get_async_session", return_value=session):
+            output = json.loads(asyncio.run(rag.RagEnhancedSearchTool()._arun(ENTITIES)))
+
+        session.run.assert_awaited_once()
+        assert output["diagnoses"][0]["name"] == "Stroke"
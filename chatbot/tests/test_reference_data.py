@@ -0,0 +1,126 @@
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.reference_data import ReferenceData, build_snapshot
+from chatbot.src.api.verification_engine import build_form_context
+
+
+def _snapshot(version=1):
+    return build_snapshot(
+        version,
+        diagnoses=[{
+            "code": "I63.9", "name": "Cerebral Infarction (Stroke)", "avg_cost": 55_000_000.0, "severity": "High",
+            "rules": [{"code": 88.91, "name": "MRI Head (Brain Scan)", "relationship": "REQUIRES"}],
+        }],
+        procedures=[
+            {"code": 88.91, "name": "MRI Head (Brain Scan)", "avg_cost": 5_500_000.0},
+            {"code": 87.03, "name": "CT Scan Head", "avg_cost": 3_200_000.0},
+        ],
+        doctors=[{"id": "DOC004", "name": "Dr. Sinta Bella", "specialization": "GP"}],
+        hospitals=[{"id": "HOS002", "name": "Santosa Hospital", "class": "Class A",
+                    "specialties": ["Santosa Brain Centre"], "facilities": ["MRI 1.5T"]}],
+    )
+
+
+def _form(**overrides):
+    form = {
+        "hospital_id": "HOS002",
+        "doctor_id": "DOC004",
+        "diagnosa_id": "I63",
+        "total_cost": 62_000_000.0,
+        "primary_procedure": "MRI Head (Brain Scan)",
+        "secondary_procedure": "ct scan",
+        "diagnosis_text": "Cerebral infarction",
+    }
+    form.update(overrides)
+    return form
+
+
+class TestReferenceSnapshot:
+    """Test the in-memory reference indexes"""
+
+    def test_lookups(self):
+        """Codes, ids and names are matched case-insensitively; float procedure codes by their text"""
+        snapshot = _snapshot()
+        assert snapshot.diagnosis("i63.9")["name"] == "Cerebral Infarction (Stroke)"
+        assert snapshot.diagnosis("I63")["code"] == "I63.9"
+        assert snapshot.diagnosis("cerebral infarction (stroke)")["code"] == "I63.9"
+        assert snapshot.procedure("88.91")["name"] == "MRI Head (Brain Scan)"
+        assert snapshot.procedure("CT Scan")["code"] == 87.03
+        assert snapshot.procedure("Heart Transplant") is None
+        assert snapshot.doctor("doc004")["specialization"] == "GP"
+        assert snapshot.hospital("HOS999") is None
+        assert snapshot.rules("I63.9")[0]["relationship"] == "REQUIRES"
+
+    def test_form_context(self):
+        """A form resolves to the same context shape as a stored claim bundle"""
+        context, unresolved = build_form_context(_snapshot(), _form(secondary_procedure="Oxygen Therapy"))
+        assert unresolved == ["secondary_procedure"]
+        assert context["diagnosis"]["code"] == "I63.9"
+        assert context["primary_procedures"][0]["avg_cost"] == 5_500_000.0
+        assert context["secondary_procedures"] == [{"code": "UNCODIFIED", "name": "Oxygen Therapy", "avg_cost": 0.0}]
+        assert context["diagnosis_rules"][0]["code"] == 88.91
+
+
+class TestReferenceData:
+    """Test snapshot reloading on graph version changes"""
+
+    def test_reload_on_version_change(self):
+        """The snapshot is reused while the graph version is unchanged"""
+        data = ReferenceData(database=MagicMock())
+        version = {"value": 1}
+
+        def fake_load():
+            data._snapshot = _snapshot(version["value"])
+            return data._snapshot
+
+        with patch('chatbot.src.reference_data.graph_version') as tracker, \
+             patch.object(data, 'load', side_effect=fake_load) as load:
+            tracker.current.side_effect = lambda: version["value"]
+            assert data.get().version == 1
+            assert data.get().version == 1
+            assert load.call_count == 1
+
+            version["value"] = 2
+            assert data.get().version == 2
+            assert load.call_count == 2
+
+
+class TestVerifyFormService:
+    """Test /claims/verify-form on the reference snapshot"""
+
+    def _service(self):
+        from chatbot.src.api import claim_verification_service as module
+        service = module.ClaimVerificationService.__new__(module.ClaimVerificationService)
+        service.model = MagicMock()
+        service.agent_executor = MagicMock()
+        return module, service
+
+    def test_form_verified_without_llm(self):
+        """The verdict comes from the engine; neither the agent nor the model is called"""
+        module, service = self._service()
+        with patch.object(module.reference_data, 'get', return_value=_snapshot()):
+            result = service.verify_form_data(_form())
+
+        assert result["validation_result"] == "NORMAL"
+        assert result["metadata"]["llm_calls"] == 0
+        assert result["metadata"]["unresolved_fields"] == []
+        assert result["metadata"]["resolved"]["secondary_procedures"][0]["code"] == 87.03
+        service.agent_executor.invoke.assert_not_called()
+        service.model.invoke.assert_not_called()
+
+        with patch.object(module.reference_data, 'get', return_value=_snapshot()):
+            fraud = service.verify_form_data(_form(total_cost=90_000_000.0))
+        assert fraud["validation_result"] == "FRAUD"
+        assert "cost: GAGAL" in fraud["detail_analysis"]
+
+    def test_falls_back_to_agent(self):
+        """Without reference data the notebook agent flow answers"""
+        module, service = self._service()
+        with patch.object(module.reference_data, 'get', side_effect=RuntimeError("neo4j down")), \
+             patch.object(service, '_verify_form_with_agent', return_value={"validation_result": "NORMAL"}) as agent:
+            assert service.verify_form_data(_form())["validation_result"] == "NORMAL"
+        agent.assert_called_once()
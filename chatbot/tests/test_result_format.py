@@ -0,0 +1,64 @@
+import sys
+import os
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.tool.execute_chyper import collect_rows, format_rows
+
+
+def _records(count):
+    records = []
+    for i in range(count):
+        record = MagicMock()
+        record.data.return_value = {"id": f"C{1001 + i}", "total_cost": 1000 * i}
+        records.append(record)
+    return records
+
+
+class TestBoundedResults:
+    """Test row/byte caps and the compact encoding of execute_cypher results"""
+
+    def test_small_result_is_complete(self):
+        """Results under the caps are returned whole without a truncation note"""
+        collected = collect_rows(_records(2), ["id", "total_cost"], max_rows=10, max_bytes=1000)
+        assert collected.total == 2
+        assert collected.truncated_by is None
+        assert format_rows(collected, "table") == '["id","total_cost"]\n["C1001",0]\n["C1002",1000]'
+
+    def test_row_limit_counts_remaining_rows(self):
+        """Rows past the limit are counted but never converted"""
+        records = _records(120)
+        collected = collect_rows(records, ["id", "total_cost"], max_rows=50, max_bytes=100000)
+        assert len(collected.rows) == 50
+        assert collected.total == 120
+        assert not records[80].data.called
+        assert "(showing 50 of 120 rows; truncated at the row limit." in format_rows(collected, "table")
+
+    def test_byte_limit(self):
+        """The byte budget stops collection before the row limit"""
+        collected = collect_rows(_records(20), ["id", "total_cost"], max_rows=50, max_bytes=60)
+        assert 0 < len(collected.rows) < 20
+        assert collected.truncated_by == "size limit"
+
+    def test_single_oversized_row_is_shortened(self):
+        """One huge collect() row is cut to the byte budget instead of sent whole"""
+        record = MagicMock()
+        record.data.return_value = {"hospital": "RSHS", "claims": list(range(200_000))}
+        collected = collect_rows([record], ["hospital", "claims"], max_rows=50, max_bytes=16000)
+        output = format_rows(collected, "table")
+        assert collected.truncated_by == "size limit"
+        assert len(output) < 16500
+        assert collected.rows[0][0] == "RSHS"
+        assert collected.rows[0][1][-1].endswith("more items)")
+
+    def test_counting_stops_at_cap(self):
+        """Huge results report a lower bound instead of an exact total"""
+        collected = collect_rows(_records(30), ["id", "total_cost"], max_rows=5, max_bytes=100000, max_counted=10)
+        assert collected.total == 10
+        assert "of more than 10 rows" in format_rows(collected, "table")
+
+    def test_json_format(self):
+        """The json format keeps the previous list-of-objects output"""
+        collected = collect_rows(_records(1), ["id", "total_cost"])
+        assert format_rows(collected, "json") == '[\n  {\n    "id": "C1001",\n    "total_cost": 0\n  }\n]'
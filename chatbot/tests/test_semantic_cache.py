@@ -0,0 +1,110 @@
+import sys
+import os
+import time
+import pytest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from langchain_core.messages import AIMessage
+from chatbot.src.entity_resolver import ResolverSnapshot, build_catalog
+from chatbot.src.semantic_cache import SemanticCache
+
+
+class TestSemanticCache:
+    """Test similarity lookup, guards, TTL, LRU eviction and version invalidation"""
+
+    def test_similar_vector_hits(self):
+        """A vector above the cosine threshold returns the stored value"""
+        cache = SemanticCache(max_size=4, threshold=0.9)
+        cache.set([1.0, 0.0, 0.0], {"answer": "12"}, text="berapa klaim fraud di RSHS")
+
+        hit = cache.get([0.95, 0.1, 0.0])
+        assert hit.value == {"answer": "12"}
+        assert hit.text == "berapa klaim fraud di RSHS"
+        assert hit.similarity > 0.99
+        assert cache.get([0.5, 0.8, 0.0]) is None
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_best_match_and_guard(self):
+        """The most similar entry with the same guard wins"""
+        cache = SemanticCache(max_size=4, threshold=0.8)
+        cache.set([1.0, 0.0], "C1001", text="klaim C1001", guard=frozenset({"c1001"}))
+        cache.set([0.99, 0.05], "C1002", text="klaim C1002", guard=frozenset({"c1002"}))
+
+        assert cache.get([1.0, 0.0], guard=frozenset({"c1002"})).value == "C1002"
+        assert cache.get([1.0, 0.0], guard=frozenset({"c1003"})) is None
+
+    def test_ttl_and_version(self):
+        """Expired entries and entries from another graph version are not returned"""
+        cache = SemanticCache(max_size=4, ttl_seconds=0.01, threshold=0.9)
+        cache.set([1.0, 0.0], "old", text="q", version=1)
+        time.sleep(0.02)
+        assert cache.get([1.0, 0.0], version=1) is None
+        assert cache.stats()["expirations"] == 1
+
+        cache.ttl_seconds = 60
+        cache.set([1.0, 0.0], "v1", text="q", version=1)
+        assert cache.get([1.0, 0.0], version=2) is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted when full"""
+        cache = SemanticCache(max_size=2, threshold=0.99)
+        cache.set([1.0, 0.0, 0.0], "a", text="a")
+        cache.set([0.0, 1.0, 0.0], "b", text="b")
+        cache.get([1.0, 0.0, 0.0])
+        cache.set([0.0, 0.0, 1.0], "c", text="c")
+
+        assert cache.get([0.0, 1.0, 0.0]) is None
+        assert cache.get([1.0, 0.0, 0.0]).value == "a"
+        assert cache.stats()["evictions"] == 1
+
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["invalidations"] == 1
+
+
+class TestChatbotAnswerCache:
+    """Test that /chatbot/ask answers a reworded question from the cache"""
+
+    def test_reworded_question_skips_agent(self):
+        # The chatbot tools need langchain_community's Neo4jVector
+        module = pytest.importorskip("chatbot.src.api.chatbot_service", exc_type=ImportError)
+        service = module.ChatbotService.__new__(module.ChatbotService)
+        service.tools = []
+        service.base_chat_history = []
+        service.answer_cache = SemanticCache(max_size=8, threshold=0.9)
+        service.exemplars = None
+        service.agent_executor = MagicMock()
+        service.agent_executor.invoke.return_value = {"messages": [
+            AIMessage("", tool_calls=[{"name": "execute_cypher", "args": {"cypher_query": "MATCH (c:Claim) RETURN count(c)"}, "id": "1"}]),
+            AIMessage("Ada 12 klaim fraud."),
+        ]}
+        vectors = {"berapa klaim fraud di RSHS": [1.0, 0.0], "jumlah klaim fraud yang diajukan di RSHS": [0.96, 0.2]}
+
+        with pytest.MonkeyPatch.context() as patch:
+            patch.setattr(module.graph_version, "current", lambda: 1)
+            patch.setattr(module.ChatbotService, "_embed_question", staticmethod(lambda question: vectors[question]))
+            first = service.process_question("berapa klaim fraud di RSHS")
+            second = service.process_question("jumlah klaim fraud yang diajukan di RSHS")
+
+        assert service.agent_executor.invoke.call_count == 1
+        assert second["answer"] == first["answer"] == "Ada 12 klaim fraud."
+        assert second["metadata"]["cypher_queries"] == ["MATCH (c:Claim) RETURN count(c)"]
+        assert second["metadata"]["cache"]["cached_question"] == "berapa klaim fraud di RSHS"
+        assert second["metadata"]["input_question"] == "jumlah klaim fraud yang diajukan di RSHS"
+
+    def test_different_entity_names_do_not_share(self):
+        """Questions naming different hospitals never share an answer, even with similar embeddings"""
+        module = pytest.importorskip("chatbot.src.api.chatbot_service", exc_type=ImportError)
+        assert module.question_guard("berapa klaim di RSHS?") != module.question_guard("berapa klaim di RS Santosa?")
+        assert module.question_guard("Berapa klaim di RSHS?") == module.question_guard("jumlah klaim RSHS")
+
+        catalog = {"hospital": build_catalog([{"name": "RS Santosa Hospital Bandung", "id": "HOS002"},
+                                              {"name": "RS Immanuel", "id": "HOS003"}], ["name", "id"])}
+        with pytest.MonkeyPatch.context() as patch:
+            patch.setattr(module.entity_resolver, "_snapshot", ResolverSnapshot(1, 0.0, catalog))
+            # Lower-case names are guarded through the entity catalog
+            assert "santosa" in module.question_guard("berapa klaim di rs santosa?")
+            assert module.question_guard("berapa klaim di rs santosa?") != module.question_guard("berapa klaim di rs immanuel?")
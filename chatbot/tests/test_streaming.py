@@ -0,0 +1,108 @@
+import sys
+import os
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain.agents import create_agent
+from chatbot.src.api.streaming import ThinkingSplitter, stream_events
+
+
+def _parse(frames):
+    """(event, data) pairs of SSE frames, skipping keep-alive comments."""
+    events = []
+    for frame in frames:
+        if frame.startswith(":"):
+            continue
+        lines = dict(line.split(": ", 1) for line in frame.strip().split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestStreamEvents:
+    """Test the SSE framing of a worker's events"""
+
+    def test_events_then_result(self):
+        """start is sent first, emitted events in order, the return value last"""
+        def work(emit):
+            emit("tool_start", {"tool": "execute_cypher"})
+            emit("token", {"text": "Halo"})
+            return {"answer": "Halo", "status": "success"}
+
+        events = _parse(stream_events(work))
+        assert [event for event, _ in events] == ["start", "tool_start", "token", "result"]
+        assert events[-1][1]["answer"] == "Halo"
+
+    def test_error_event(self):
+        """An exception in the worker ends the stream with an error event"""
+        def work(emit):
+            raise RuntimeError("LLM unavailable")
+
+        events = _parse(stream_events(work))
+        assert events[-1] == ("error", {"error": "LLM unavailable"})
+
+    def test_keep_alive(self):
+        """A quiet worker gets keep-alive comments instead of a silent connection"""
+        def work(emit):
+            import time
+            time.sleep(0.05)
+            return {}
+
+        frames = list(stream_events(work, heartbeat_interval=0.01))
+        assert ": keep-alive\n\n" in frames
+
+    def test_thinking_splitter(self):
+        """Text inside <think> tags is reported separately from the answer"""
+        events = []
+        splitter = ThinkingSplitter(lambda event, data: events.append((event, data["text"])))
+        for chunk in ["<think>", "cek biaya", "</think>Klaim ", "wajar."]:
+            splitter.feed(chunk)
+        assert events == [("thinking", "cek biaya"), ("token", "Klaim "), ("token", "wajar.")]
+
+
+class TestStreamingServices:
+    """Test the emit hooks of the chatbot and verification services"""
+
+    def test_chatbot_streams_tokens(self):
+        """The agent's answer tokens are emitted and the final answer is unchanged"""
+        # The chatbot tools need langchain_community's Neo4jVector
+        ChatbotService = pytest.importorskip("chatbot.src.api.chatbot_service", exc_type=ImportError).ChatbotService
+        service = ChatbotService.__new__(ChatbotService)
+        service.tools = []
+        service.base_chat_history = []
+        service.answer_cache = None
+        service.exemplars = None
+        service.agent_executor = create_agent(
+            GenericFakeChatModel(messages=iter([AIMessage("<think>hmm</think>Ada 12 klaim stroke.")])), []
+        )
+
+        events = []
+        result = service.process_question("Berapa klaim stroke?", emit=lambda event, data: events.append((event, data)))
+
+        assert result["answer"] == "Ada 12 klaim stroke."
+        assert "".join(data["text"] for event, data in events if event == "token").strip() == "Ada 12 klaim stroke."
+        assert "".join(data["text"] for event, data in events if event == "thinking") == "hmm"
+
+    def test_verify_claim_emits_verdict_first(self):
+        """The rule verdict is emitted before the explanation tokens"""
+        from chatbot.src.api import claim_verification_service as module
+        from tests.test_verification_engine import _context
+        service = module.ClaimVerificationService.__new__(module.ClaimVerificationService)
+        service.model = MagicMock(model_name="qwen3-8B")
+        service.model.stream.return_value = [AIMessageChunk(content="Klaim "), AIMessageChunk(content="wajar.")]
+
+        events = []
+        with patch.object(module, 'db'), patch.object(module, 'save_verification'), \
+             patch.object(module.graph_version, 'current', return_value=1), \
+             patch.object(module.HealthcareRepository, 'get_claim_status', return_value={"claim_id": "C2001", "status": None}), \
+             patch.object(module, 'load_claim_context', return_value=_context()):
+            result = service.verify_claim("C2001", emit=lambda event, data: events.append((event, data)))
+
+        assert [event for event, _ in events] == ["verdict", "token", "token"]
+        assert events[0][1]["validation_result"] == "NORMAL"
+        assert result["explanation"] == "Klaim wajar."
+        service.model.invoke.assert_not_called()
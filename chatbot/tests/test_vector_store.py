@@ -0,0 +1,49 @@
+import sys
+import os
+import threading
+import pytest
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+# Needs langchain_community's Neo4jVector
+vector_store = pytest.importorskip("chatbot.src.vector_store", exc_type=ImportError)
+
+
+@pytest.fixture(autouse=True)
+def embedding_model():
+    with patch.object(vector_store, "get_embedding_model") as model:
+        yield model
+
+
+class TestVectorStores:
+    """Test that vector stores are created once per index and shared"""
+
+    def test_created_once_per_index(self):
+        stores = vector_store.VectorStores()
+        with patch.object(vector_store.Neo4jVector, "from_existing_graph", side_effect=lambda **kwargs: MagicMock()) as create:
+            threads = [threading.Thread(target=stores.get, args=("diagnosis",)) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert stores.get("diagnosis") is stores.get("diagnosis")
+            stores.get("hospital")
+
+        assert create.call_count == 2
+        assert create.call_args.kwargs["index_name"] == "hospital_entity_index"
+        assert stores.stats()["stores"] == ["diagnosis", "hospital"]
+
+    def test_failed_creation_is_retried(self):
+        """A store that could not be created is created by the next search"""
+        stores = vector_store.VectorStores()
+        with patch.object(vector_store.Neo4jVector, "from_existing_graph",
+                          side_effect=Exception("Unable to retrieve routing information")):
+            with pytest.raises(Exception):
+                stores.get("doctor")
+        with patch.object(vector_store.Neo4jVector, "from_existing_graph", return_value=MagicMock()) as create:
+            stores.get("doctor")
+
+        assert create.call_count == 1
+        assert stores.stats()["failures"] == 1
+        assert stores.stats()["stores"] == ["doctor"]
@@ -0,0 +1,218 @@
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from chatbot.src.api.verification_engine import ENGINE_VERSION, evaluate_claim, load_claim_context
+from chatbot.src.verification_store import context_fingerprint
+
+
+def _context(**overrides):
+    context = {
+        "claim_id": "C2001",
+        "status": None,
+        "total_cost": 60_000_000.0,
+        "diagnosis": {"code": "I63.9", "name": "Cerebral Infarction (Stroke)", "avg_cost": 55_000_000.0, "severity": "High"},
+        "primary_procedures": [{"code": "88.91", "name": "MRI Head (Brain Scan)", "avg_cost": 5_500_000.0}],
+        "secondary_procedures": [{"code": "UNCODIFIED_00001", "name": "Oxygen Therapy", "avg_cost": 0.0}],
+        "diagnosis_rules": [{"code": "88.91", "relationship": "REQUIRES"}, {"code": "96.70", "relationship": "TYPICALLY_TREATED_WITH"}],
+        "doctor": {"id": "DOC004", "name": "Dr. Sinta Bella", "specialization": "GP"},
+        "hospital": {"id": "HOS002", "name": "Santosa Hospital", "specialties": ["Santosa Brain Centre"], "facilities": ["MRI 1.5T"]},
+    }
+    context.update(overrides)
+    return context
+
+
+class TestVerificationEngine:
+    """Test the deterministic claim checks"""
+
+    def test_normal_claim(self):
+        """A GP ordering an MRI for stroke within the cost tolerance is NORMAL"""
+        verdict = evaluate_claim(_context())
+        assert verdict.validation_result == "NORMAL"
+        assert all(check.passed for check in verdict.checks)
+        assert round(verdict.cost_deviation, 4) == round((60_000_000 - 60_500_000) / 60_500_000, 4)
+
+    def test_stored_status_is_final(self):
+        """Already labelled claims keep their status with confidence 100"""
+        verdict = evaluate_claim(_context(status="FRAUD"))
+        assert verdict.validation_result == "FRAUD"
+        assert verdict.confidence_score == 100
+        assert verdict.source == "stored_status"
+
+    def test_cost_above_twenty_percent(self):
+        """Cost more than 20% above diagnosis + procedure averages is FRAUD"""
+        verdict = evaluate_claim(_context(total_cost=80_000_000.0))
+        assert verdict.validation_result == "FRAUD"
+        assert [check.name for check in verdict.checks if check.passed is False] == ["cost"]
+
+    def test_procedure_outside_rules(self):
+        """Therapeutic procedures unrelated to the diagnosis fail; uncodified ones are lenient"""
+        surgery = [{"code": "51.23", "name": "Laparoscopic Cholecystectomy (Gallstone)", "avg_cost": 0.0}]
+        verdict = evaluate_claim(_context(primary_procedures=surgery, doctor={"id": "DOC002", "name": "Dr. Citra", "specialization": "General Surgeon"}))
+        assert verdict.validation_result == "FRAUD"
+        assert verdict.checks[1].passed is False
+
+        uncodified = [{"code": "UNCODIFIED_00002", "name": "Neuro Rehab", "avg_cost": 0.0}]
+        assert evaluate_claim(_context(primary_procedures=uncodified)).checks[1].passed is True
+
+    def test_specialist_contradiction(self):
+        """An orthopedist treating a stroke is a hard contradiction"""
+        verdict = evaluate_claim(_context(doctor={"id": "DOC006", "name": "Dr. Fajar", "specialization": "Orthopedist"}))
+        assert verdict.validation_result == "FRAUD"
+        assert verdict.checks[2].passed is False
+
+    def test_hospital_without_capability(self):
+        """Stroke at a dental hospital fails the facility keyword check"""
+        hospital = {"id": "HOS007", "name": "RSKGM", "specialties": ["Oral Surgery"], "facilities": ["Dental Radiology"]}
+        verdict = evaluate_claim(_context(hospital=hospital))
+        assert verdict.checks[3].passed is False
+
+
+class TestClaimBundle:
+    """Test the single round-trip claim context"""
+
+    def test_one_query_per_claim(self):
+        """The whole verification context comes from one read transaction"""
+        record = MagicMock()
+        record.data.return_value = _context()
+        session = MagicMock()
+        session.execute_read.return_value = [record]
+
+        context = load_claim_context(session, "C2001")
+
+        assert session.execute_read.call_count == 1
+        assert context["doctor"]["specialization"] == "GP"
+
+    def test_missing_claim(self):
+        """Unknown claim IDs return None"""
+        session = MagicMock()
+        session.execute_read.return_value = []
+        assert load_claim_context(session, "C9999") is None
+
+
+class TestStoredVerification:
+    """Test the data fingerprint that decides whether a stored verdict is still valid"""
+
+    def test_fingerprint_ignores_list_order(self):
+        """Pattern comprehension ordering does not change the fingerprint"""
+        context = _context()
+        reordered = _context(diagnosis_rules=list(reversed(context["diagnosis_rules"])))
+        assert context_fingerprint(context, ENGINE_VERSION) == context_fingerprint(reordered, ENGINE_VERSION)
+
+    def test_fingerprint_tracks_source_data(self):
+        """Changing a procedure cost, the stored verdict itself aside, changes the fingerprint"""
+        context = _context()
+        changed = _context(primary_procedures=[{"code": "88.91", "name": "MRI Head (Brain Scan)", "avg_cost": 9_000_000.0}])
+        with_verdict = _context(stored_verification={"validation_result": "NORMAL"})
+        assert context_fingerprint(context, ENGINE_VERSION) != context_fingerprint(changed, ENGINE_VERSION)
+        assert context_fingerprint(context, ENGINE_VERSION) == context_fingerprint(with_verdict, ENGINE_VERSION)
+        assert context_fingerprint(context, "1") != context_fingerprint(context, "2")
+
+
+class TestVerifyClaimService:
+    """Test how ClaimVerificationService uses the engine"""
+
+    def _service(self):
+        from chatbot.src.api import claim_verification_service as module
+        service = module.ClaimVerificationService.__new__(module.ClaimVerificationService)
+        service.model = MagicMock()
+        service.model.invoke.return_value = MagicMock(content="<think>x</think>Klaim wajar.")
+        service.model.model_name = "qwen3-8B"
+        service.agent_executor = MagicMock()
+        return module, service
+
+    def setup_method(self):
+        from chatbot.src.api import claim_verification_service as module
+        self._patches = [
+            patch.object(module, 'save_verification'),
+            patch.object(module.graph_version, 'current', return_value=7),
+        ]
+        self.save_verification = self._patches[0].start()
+        self._patches[1].start()
+
+    def teardown_method(self):
+        for p in self._patches:
+            p.stop()
+
+    def _stored(self, module, status):
+        return patch.object(module.HealthcareRepository, 'get_claim_status',
+                            return_value={"claim_id": "C2001", "total_cost": 60_000_000.0, "status": status})
+
+    def test_labelled_claim_shortcut(self):
+        """Labelled claims never reach the bundle query, the engine or the LLM"""
+        module, service = self._service()
+        before = module.verification_stats.stats()["stored_status_shortcut"]
+        with patch.object(module, 'db'), self._stored(module, "FRAUD"), \
+             patch.object(module, 'load_claim_context') as load_context:
+            result = service.verify_claim("C2001")
+
+        assert result["validation_result"] == "FRAUD"
+        assert result["confidence_score"] == 100
+        assert result["detail_claim_data"]["total_cost"] == 60_000_000.0
+        load_context.assert_not_called()
+        service.model.invoke.assert_not_called()
+        service.agent_executor.invoke.assert_not_called()
+        assert module.verification_stats.stats()["stored_status_shortcut"] == before + 1
+
+    def test_verdict_only_skips_llm(self):
+        """verdict_only returns the rule summary without any LLM call"""
+        module, service = self._service()
+        with patch.object(module, 'db'), self._stored(module, None), \
+             patch.object(module, 'load_claim_context', return_value=_context()):
+            result = service.verify_claim("C2001", verdict_only=True)
+
+        assert result["validation_result"] == "NORMAL"
+        assert result["metadata"]["llm_calls"] == 0
+        service.model.invoke.assert_not_called()
+        service.agent_executor.invoke.assert_not_called()
+
+    def test_llm_only_writes_explanation(self):
+        """The verdict comes from the engine; one LLM call writes the explanation"""
+        module, service = self._service()
+        with patch.object(module, 'db'), self._stored(module, None), \
+             patch.object(module, 'load_claim_context', return_value=_context(total_cost=90_000_000.0)):
+            result = service.verify_claim("C2001")
+
+        assert result["validation_result"] == "FRAUD"
+        assert result["explanation"] == "Klaim wajar."
+        assert service.model.invoke.call_count == 1
+        service.agent_executor.invoke.assert_not_called()
+
+        properties = self.save_verification.call_args[0][2]
+        assert properties["validation_result"] == "FRAUD"
+        assert properties["model_id"] == "qwen3-8B"
+        assert properties["graph_version"] == 7
+        assert properties["data_fingerprint"] == context_fingerprint(_context(total_cost=90_000_000.0), ENGINE_VERSION)
+
+    def test_stored_verification_is_reused(self):
+        """A verdict stored for the same data and model is returned without the engine or the LLM"""
+        module, service = self._service()
+        context = _context()
+        stored = {
+            "validation_result": "NORMAL", "confidence_score": 95, "explanation": "Klaim wajar.",
+            "model_id": "qwen3-8B", "source": "rules", "created_at": 1,
+            "data_fingerprint": context_fingerprint(context, ENGINE_VERSION),
+        }
+        with patch.object(module, 'db'), self._stored(module, None), \
+             patch.object(module, 'load_claim_context', return_value=_context(stored_verification=stored)), \
+             patch.object(module, 'evaluate_claim') as evaluate:
+            result = service.verify_claim("C2001")
+
+        assert result["explanation"] == "Klaim wajar."
+        assert result["metadata"]["engine"]["source"] == "stored_verification"
+        evaluate.assert_not_called()
+        service.model.invoke.assert_not_called()
+        self.save_verification.assert_not_called()
+
+    def test_stale_verification_is_recomputed(self):
+        """A verdict stored for older data is ignored and replaced"""
+        module, service = self._service()
+        stored = {"validation_result": "NORMAL", "confidence_score": 95, "model_id": "qwen3-8B", "data_fingerprint": "old"}
+        with patch.object(module, 'db'), self._stored(module, None), \
+             patch.object(module, 'load_claim_context', return_value=_context(total_cost=90_000_000.0, stored_verification=stored)):
+            result = service.verify_claim("C2001", verdict_only=True)
+
+        assert result["validation_result"] == "FRAUD"
+        assert self.save_verification.call_args[0][2]["model_id"] == "rules"